@@ -1,5 +1,6 @@
 """I wandered lonely through the cloud."""
 from . import cloud_wanderer_resource, storage_connectors
+from .async_cloud_wanderer import AsyncCloudWanderer
 from .aws_interface import CloudWandererAWSInterface
 from .cloud_wanderer import CloudWanderer
 from .cloud_wanderer_resource import CloudWandererResource
@@ -11,6 +12,7 @@ __all__ = [
     "cloud_wanderer_resource",
     "CloudWandererResource",
     "CloudWanderer",
+    "AsyncCloudWanderer",
     "URN",
     "CloudWandererAWSInterface",
     "ServiceResourceType",
@@ -0,0 +1,156 @@
+"""An asyncio flavoured version of the main cloudwanderer module."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, cast
+
+from .aws_interface.async_interface import AsyncCloudWandererAWSInterface
+from .base import ServiceResourceTypeFilter
+from .cloud_wanderer import _is_valid_delete_urn, _is_valid_get_urn
+from .cloud_wanderer_resource import CloudWandererResource
+from .models import ServiceResourceType
+from .storage_connectors import BaseStorageConnector
+from .urn import PartialUrn
+
+logger = logging.getLogger("cloudwanderer")
+
+
+class AsyncCloudWanderer:
+    """Discover resources with coroutines and write them to storage.
+
+    Every get action is run concurrently, with the number of API calls in flight bounded by the
+    concurrency of the async cloud interface. Resources are written to the storage connectors from the event loop,
+    so the storage connectors do **not** need to be thread safe (or async aware).
+
+    If no cloud interface is passed in, the default one is closed by :meth:`close`.
+    """
+
+    def __init__(
+        self,
+        storage_connectors: List[BaseStorageConnector],
+        cloud_interface: Optional[AsyncCloudWandererAWSInterface] = None,
+    ) -> None:
+        """Initialise AsyncCloudWanderer.
+
+        Arguments:
+            storage_connectors:
+                CloudWanderer storage connector objects.
+            cloud_interface:
+                The async cloud interface to get resources from.
+                Defaults to :class:`~cloudwanderer.aws_interface.AsyncCloudWandererAWSInterface`.
+        """
+        self.storage_connectors = storage_connectors
+        self._owns_cloud_interface = cloud_interface is None
+        self.cloud_interface = cloud_interface or AsyncCloudWandererAWSInterface()
+
+    def close(self) -> None:
+        """Close the default cloud interface (and so shut down its executor)."""
+        if self._owns_cloud_interface:
+            self.cloud_interface.close()
+
+    async def write_resources(
+        self,
+        regions: Optional[List[str]] = None,
+        service_resource_types: Optional[List[ServiceResourceType]] = None,
+        service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]] = None,
+    ) -> None:
+        """Fetch all resources in this account from all regions and all services and write to storage.
+
+        All arguments are optional. Stale resources are only deleted once every get action has finished.
+        If any get action raises, the others are cancelled, nothing is deleted and the storage connectors are closed.
+
+        Example:
+            Fetch AWS EC2 VPCs and IAM roles concurrently.
+
+                >>> import asyncio
+                >>> from cloudwanderer import AsyncCloudWanderer, ServiceResourceType
+                >>> from cloudwanderer.storage_connectors import MemoryStorageConnector
+                >>> cloud_wanderer = AsyncCloudWanderer(storage_connectors=[MemoryStorageConnector()])
+                >>> asyncio.run(
+                ...     cloud_wanderer.write_resources(
+                ...         service_resource_types=[ServiceResourceType("ec2","vpc"), ServiceResourceType("iam","role")]
+                ...     )
+                ... )
+                >>> cloud_wanderer.close()
+
+        Arguments:
+            regions:
+                The name of the region to get resources from (defaults to session default if not specified)
+            service_resource_types:
+                The resource types to discover.
+            service_resource_type_filters:
+                List of :class:`~cloudwanderer.base.ServiceResourceTypeFilter`
+                specific to the CloudInterface that helps filter resources.
+
+        Raises:
+            ValueError: If invalid get/delete urns are produced by the cloud interface's get_resource_discovery_actions
+        """
+        action_sets = await self.cloud_interface.get_resource_discovery_actions(
+            regions=regions, service_resource_types=service_resource_types
+        )
+        get_urns = [get_urn for action_set in action_sets for get_urn in action_set.get_urns]
+        delete_urns = [delete_urn for action_set in action_sets for delete_urn in action_set.delete_urns]
+        for get_urn in get_urns:
+            if not _is_valid_get_urn(get_urn):
+                raise ValueError(f"Invalid get_urn {get_urn}")
+        for delete_urn in delete_urns:
+            if not _is_valid_delete_urn(delete_urn):
+                raise ValueError(f"Invalid delete_urn {delete_urn}")
+
+        for storage_connector in self.storage_connectors:
+            storage_connector.open()
+        discovery_start_times: Dict[str, datetime] = {}
+        tasks = [
+            asyncio.ensure_future(
+                self._write_resources_of_type(
+                    get_urn=get_urn,
+                    service_resource_type_filters=service_resource_type_filters,
+                    discovery_start_times=discovery_start_times,
+                )
+            )
+            for get_urn in get_urns
+        ]
+        try:
+            await asyncio.gather(*tasks)
+            for delete_urn in delete_urns:
+                for storage_connector in self.storage_connectors:
+                    storage_connector.delete_resource_of_type_in_account_region(
+                        cloud_name=cast(str, delete_urn.cloud_name),
+                        account_id=cast(str, delete_urn.account_id),
+                        region=cast(str, delete_urn.region),
+                        service=cast(str, delete_urn.service),
+                        resource_type=cast(str, delete_urn.resource_type),
+                        cutoff=discovery_start_times.get(delete_urn.cloud_service_resource_label),
+                    )
+        finally:
+            unfinished_tasks = [task for task in tasks if not task.done()]
+            for task in unfinished_tasks:
+                task.cancel()
+            # Wait for the cancelled tasks to unwind so that none of them writes to a closed storage connector.
+            await asyncio.gather(*unfinished_tasks, return_exceptions=True)
+            for storage_connector in self.storage_connectors:
+                storage_connector.close()
+
+    async def _write_resources_of_type(
+        self,
+        get_urn: PartialUrn,
+        service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]],
+        discovery_start_times: Dict[str, datetime],
+    ) -> None:
+        resources = self.cloud_interface.get_resources(
+            region=cast(str, get_urn.region),
+            service_name=cast(str, get_urn.service),
+            resource_type=cast(str, get_urn.resource_type),
+            service_resource_type_filters=service_resource_type_filters or [],
+        )
+        async for resource in resources:
+            earliest_resource_discovered = discovery_start_times.get(resource.urn.cloud_service_resource_label)
+            if not earliest_resource_discovered or resource.discovery_time < earliest_resource_discovered:
+                discovery_start_times[resource.urn.cloud_service_resource_label] = resource.discovery_time
+            self._write_resource(resource)
+        for storage_connector in self.storage_connectors:
+            storage_connector.flush()
+
+    def _write_resource(self, resource: CloudWandererResource) -> None:
+        for storage_connector in self.storage_connectors:
+            storage_connector.write_resource(resource)
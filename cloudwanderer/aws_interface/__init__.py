@@ -1,11 +1,18 @@
 """The CloudWanderer AWS Interface."""
+from .async_interface import AsyncCloudWandererAWSInterface
 from .interface import CloudWandererAWSInterface
 from .models import AWSResourceTypeFilter
-from .session import CloudWandererBoto3ClientConfig, CloudWandererBoto3Session
+from .rate_limiting import AdaptiveRateLimiter, RateLimiterStatistics, RateLimitKey
+from .session import AssumeRoleSessionFactory, CloudWandererBoto3ClientConfig, CloudWandererBoto3Session
 
 __all__ = [
     "CloudWandererAWSInterface",
+    "AsyncCloudWandererAWSInterface",
     "CloudWandererBoto3Session",
     "AWSResourceTypeFilter",
     "CloudWandererBoto3ClientConfig",
+    "AdaptiveRateLimiter",
+    "RateLimiterStatistics",
+    "RateLimitKey",
+    "AssumeRoleSessionFactory",
 ]
@@ -0,0 +1,342 @@
+"""An asyncio flavoured wrapper of :class:`~cloudwanderer.aws_interface.CloudWandererAWSInterface`.
+
+Boto3 is a blocking library, so every API call made while discovering resources (collection pagination,
+dependent resource enumeration and secondary attribute fetches) is driven as a coroutine which runs the blocking call
+on an executor. A single semaphore bounds the number of API calls in flight across all coroutines.
+
+Because the HTTP calls are still made by botocore, anything that stubs botocore (e.g. ``moto`` or
+``botocore.stub.Stubber``) works locally exactly as it does with the synchronous interface.
+"""
+import asyncio
+import concurrent.futures
+import functools
+import logging
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional, Type, cast
+
+import botocore
+
+from ..base import ServiceResourceTypeFilter
+from ..cloud_wanderer_resource import CloudWandererResource
+from ..models import ActionSet, ServiceResourceType
+from ..urn import URN
+from .aws_services import AWS_SERVICES
+from .interface import CloudWandererAWSInterface, _get_service_resource_type_filter_from_list
+from .models import AWSResourceTypeFilter
+from .session import CloudWandererBoto3Session
+
+if TYPE_CHECKING:
+    from .stubs.resource import CloudWandererServiceResource
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCloudWandererAWSInterface:
+    """Discover AWS resources with coroutines, yielding the same resources as the synchronous interface.
+
+    The default executor is shut down by :meth:`close`, or on leaving the interface's ``async with`` block.
+
+    Example:
+        >>> import asyncio
+        >>> from cloudwanderer.aws_interface import AsyncCloudWandererAWSInterface
+        >>> async def get_vpcs():
+        ...     async with AsyncCloudWandererAWSInterface(concurrency=20) as async_interface:
+        ...         return [
+        ...             resource
+        ...             async for resource in async_interface.get_resources(
+        ...                 service_name="ec2", resource_type="vpc", region="eu-west-1"
+        ...             )
+        ...         ]
+        >>> vpcs = asyncio.run(get_vpcs())
+    """
+
+    def __init__(
+        self,
+        cloud_interface: Optional[CloudWandererAWSInterface] = None,
+        concurrency: int = 10,
+        executor: Optional[concurrent.futures.Executor] = None,
+    ) -> None:
+        """Initialise the AsyncCloudWandererAWSInterface.
+
+        Arguments:
+            cloud_interface:
+                The synchronous interface whose session will be used to make API calls.
+                Defaults to :class:`~cloudwanderer.aws_interface.CloudWandererAWSInterface`.
+            concurrency:
+                The maximum number of API calls that will be in flight at once.
+            executor:
+                The executor on which blocking API calls will be run, defaults to a thread pool
+                the same size as ``concurrency`` (which is shut down by :meth:`close`).
+                An executor passed in is left for the caller to shut down.
+        """
+        self.cloud_interface = cloud_interface or CloudWandererAWSInterface()
+        self.concurrency = concurrency
+        self._owns_executor = executor is None
+        self.executor = executor or concurrent.futures.ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def cloudwanderer_boto3_session(self) -> CloudWandererBoto3Session:
+        return self.cloud_interface.cloudwanderer_boto3_session
+
+    def close(self) -> None:
+        """Shut down the default executor, waiting for any blocking calls still running on it to finish."""
+        if self._owns_executor:
+            self.executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncCloudWandererAWSInterface":
+        """Return this interface, which is closed when the ``async with`` block exits."""
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close this interface.
+
+        Arguments:
+            exc_type: The type of the exception raised in the ``async with`` block (if any).
+            exc_value: The exception raised in the ``async with`` block (if any).
+            traceback: The traceback of the exception raised in the ``async with`` block (if any).
+        """
+        self.close()
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """Run a blocking call on the executor, waiting for a free slot first.
+
+        Arguments:
+            func: The blocking callable to run.
+            *args: The arguments to pass to func.
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            # Semaphores are bound to the loop they are created in (prior to Python 3.10).
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._semaphore_loop = loop
+        async with self._semaphore:
+            return await loop.run_in_executor(self.executor, functools.partial(func, *args))
+
+    async def get_enabled_regions(self) -> List[str]:
+        """Return the list of regions enabled."""
+        return await self._run(self.cloud_interface.get_enabled_regions)
+
+    async def get_account_id(self) -> str:
+        """Return the ID of the account we're getting resources from."""
+        return await self._run(self.cloud_interface.get_account_id)
+
+    async def get_resource_discovery_actions(
+        self,
+        regions: Optional[List[str]] = None,
+        service_resource_types: Optional[List[ServiceResourceType]] = None,
+    ) -> List[ActionSet]:
+        """Return the ActionSets required to discover resources according to the params.
+
+        Arguments:
+            regions: List of regions to discover resources in
+            service_resource_types: List of service resource types to discover
+        """
+        return await self._run(
+            functools.partial(
+                self.cloud_interface.get_resource_discovery_actions,
+                regions=regions,
+                service_resource_types=service_resource_types,
+            )
+        )
+
+    async def get_resources(
+        self,
+        service_name: str,
+        resource_type: str,
+        region: str,
+        service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]] = None,
+        client_args: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[CloudWandererResource]:
+        """Yield all resources of resource_type, processing each page of the collection concurrently.
+
+        Resources are yielded in the same order as
+        :meth:`~cloudwanderer.aws_interface.CloudWandererAWSInterface.get_resources` would yield them.
+
+        Arguments:
+            service_name (str): The name of the service to get resource for (e.g. ``'ec2'``)
+            resource_type (str): The type of resource to get resources of (e.g. ``'instance'``)
+            region (str): The region to get resources of (e.g. ``'eu-west-1'``)
+            service_resource_type_filters: A :class:`AWSResourceTypeFilter` list to filter resources.
+            client_args: Additional keyword arguments will be passed down to the Boto3 client.
+
+        Raises:
+            botocore.exceptions.ClientError: Occurs if the Boto3 Client Errors.
+        """
+        validated_resource_type_filters = self.cloud_interface._type_check_filter_objects(
+            service_resource_type_filters or {}
+        )
+        logger.info("Getting %s %s resources from %s", service_name, resource_type, region)
+        # Warm the memoized account id (which get_urn relies upon) here so that it is fetched once
+        # rather than by every coroutine that is waiting for it in the executor.
+        await self.get_account_id()
+        service = await self._run(
+            functools.partial(
+                self.cloudwanderer_boto3_session.resource,
+                service_name=cast(AWS_SERVICES, service_name),
+                region_name=region,
+                **(client_args or {}),
+            )
+        )
+        base_resource_filter = (
+            _get_service_resource_type_filter_from_list(
+                service_resource_type_filters=validated_resource_type_filters,
+                service=service_name,
+                resource_type=resource_type,
+            )
+            or service.compiled_service_model.get_resource_map(resource_type).default_aws_resource_type_filter
+        )
+        try:
+            collection = service.collection(resource_type=resource_type, filters=base_resource_filter.botocore_filters)
+            async for page in self._paginate(collection):
+                results = await asyncio.gather(
+                    *[
+                        self._get_resource(resource, base_resource_filter, validated_resource_type_filters)
+                        for resource in page
+                    ]
+                )
+                for result in results:
+                    for cloudwanderer_resource in result:
+                        yield cloudwanderer_resource
+        except botocore.exceptions.EndpointConnectionError:
+            logger.info("%s %s not supported in %s", service_name, resource_type, region)
+            return
+        except botocore.exceptions.ClientError as ex:
+            if ex.response["Error"]["Code"] == "InvalidAction":
+                logger.info("%s %s not supported in %s", service_name, resource_type, region)
+                return
+            raise
+
+    async def _paginate(self, collection: Any) -> AsyncIterator[List["CloudWandererServiceResource"]]:
+        if not hasattr(collection, "pages"):
+            # References (rather than collections) are not paginated.
+            yield await self._run(list, collection)
+            return
+        pages = iter(collection.pages())
+        while True:
+            page = await self._run(next, pages, None)
+            if page is None:
+                return
+            yield page
+
+    async def _get_resource(
+        self,
+        resource: "CloudWandererServiceResource",
+        resource_filter: AWSResourceTypeFilter,
+        service_resource_type_filters: List[AWSResourceTypeFilter],
+    ) -> List[CloudWandererResource]:
+        await self._run(resource.fetch_secondary_attributes)
+        if not next(resource_filter.filter_jmespath(resources=[resource]), None):
+            logger.info(
+                "Skipping %s because it did not match one of the jmespath filters for this resource type", resource
+            )
+            return []
+        dependent_resources_by_type = await asyncio.gather(
+            *[
+                self._get_dependent_resources(resource, dependent_resource_type, service_resource_type_filters)
+                for dependent_resource_type in resource.dependent_resource_types
+            ]
+        )
+        dependent_resources = [
+            dependent_resource
+            for dependent_resources_of_type in dependent_resources_by_type
+            for dependent_resource in dependent_resources_of_type
+        ]
+        if resource.resource_map.requires_load:
+            await self._run(resource.load)
+        return dependent_resources + [
+            await self._run(
+                self._build_resource, resource, [dependent_resource.urn for dependent_resource in dependent_resources]
+            )
+        ]
+
+    async def _get_dependent_resources(
+        self,
+        resource: "CloudWandererServiceResource",
+        dependent_resource_type: str,
+        service_resource_type_filters: List[AWSResourceTypeFilter],
+    ) -> List[CloudWandererResource]:
+        logger.info(
+            "Getting %s %s dependent resources for %s", resource.service_name, dependent_resource_type, resource
+        )
+        dependent_resource_map = resource.compiled_service_model.get_resource_map(dependent_resource_type)
+        dependent_resource_filter = (
+            _get_service_resource_type_filter_from_list(
+                service_resource_type_filters=service_resource_type_filters,
+                service=resource.service_name,
+                resource_type=dependent_resource_type,
+            )
+            or dependent_resource_map.default_aws_resource_type_filter
+        )
+        collection = resource.collection(
+            resource_type=dependent_resource_type, filters=dependent_resource_filter.botocore_filters
+        )
+        dependent_resources: List[CloudWandererResource] = []
+        async for page in self._paginate(collection):
+            results = await asyncio.gather(
+                *[
+                    self._get_dependent_resource(resource, dependent_resource, dependent_resource_filter)
+                    for dependent_resource in page
+                ]
+            )
+            dependent_resources.extend(result for result in results if result is not None)
+        return dependent_resources
+
+    async def _get_dependent_resource(
+        self,
+        parent_resource: "CloudWandererServiceResource",
+        dependent_resource: "CloudWandererServiceResource",
+        dependent_resource_filter: AWSResourceTypeFilter,
+    ) -> Optional[CloudWandererResource]:
+        await self._run(dependent_resource.fetch_secondary_attributes)
+        if not next(dependent_resource_filter.filter_jmespath(resources=[dependent_resource]), None):
+            logger.info(
+                "Skipping %s because it did not match one of the jmespath filters for this resource type",
+                dependent_resource,
+            )
+            return None
+        if dependent_resource.resource_map.requires_load or (
+            not dependent_resource.meta.data and hasattr(dependent_resource, "load")
+        ):
+            await self._run(dependent_resource.load)
+        return await self._run(self._build_dependent_resource, dependent_resource, parent_resource)
+
+    @staticmethod
+    def _build_resource(
+        resource: "CloudWandererServiceResource", dependent_resource_urns: List[URN]
+    ) -> CloudWandererResource:
+        """Build a CloudWandererResource, this is blocking as ``get_urn`` may need to look up the region.
+
+        Arguments:
+            resource: The Boto3 resource to convert.
+            dependent_resource_urns: The URNs of the resource's dependent resources.
+        """
+        return CloudWandererResource(
+            urn=resource.get_urn(),
+            resource_data=resource.normalized_raw_data,
+            dependent_resource_urns=dependent_resource_urns,
+            relationships=resource.relationships,
+        )
+
+    @staticmethod
+    def _build_dependent_resource(
+        resource: "CloudWandererServiceResource", parent_resource: "CloudWandererServiceResource"
+    ) -> CloudWandererResource:
+        """Build a CloudWandererResource of a dependent resource, this is blocking as ``get_urn`` may look up regions.
+
+        Arguments:
+            resource: The Boto3 dependent resource to convert.
+            parent_resource: The parent of the resource.
+        """
+        return CloudWandererResource(
+            urn=resource.get_urn(),
+            resource_data=resource.normalized_raw_data,
+            parent_urn=parent_resource.get_urn(),
+            relationships=resource.relationships,
+        )
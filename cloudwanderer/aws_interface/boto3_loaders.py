@@ -12,7 +12,7 @@ import os
 import pathlib
 from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional
+from typing import Hashable, List, Optional
 
 import boto3
 import botocore
@@ -90,6 +90,15 @@ class MergedServiceLoader(Loader):
         boto3_data_path = os.path.join(os.path.dirname(boto3.__file__), "data")
         self.botocore_loader.search_paths.append(boto3_data_path)
 
+    @property
+    def cache_key(self) -> Hashable:
+        """Return a key which is equal for any two loaders that will load identical service models."""
+        return (
+            type(self),
+            str(self.custom_service_loader.service_definitions_path),
+            tuple(self.botocore_loader.search_paths),
+        )
+
     def list_available_services(self, type_name: str = "resources-1") -> List[str]:
         _ = type_name
         """Return a list of service names that can be loaded."""
@@ -3,8 +3,10 @@
 Provides simpler methods for :class:`~.cloud_wanderer.CloudWanderer` to call.
 """
 
+import concurrent.futures
 import logging
-from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, cast
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Tuple, cast
 
 import botocore
 
@@ -37,17 +39,94 @@ def _get_service_resource_type_filter_from_list(
     )
 
 
+def _collection_pages(collection: Iterable) -> Iterator[List["CloudWandererServiceResource"]]:
+    """Yield the resources in a Boto3 collection a page at a time.
+
+    Arguments:
+        collection: The Boto3 collection (or list of referenced resources) to paginate.
+    """
+    if hasattr(collection, "pages"):
+        yield from collection.pages()  # type: ignore
+        return
+    yield list(collection)
+
+
+def _region_map_key(resource: "CloudWandererServiceResource") -> Tuple[str, str, str]:
+    resource_id = "/".join(str(getattr(resource, identifier)) for identifier in resource.meta.identifiers)
+    return (resource.service_name, resource.resource_type, resource_id)
+
+
 class CloudWandererAWSInterface(CloudInterface):
     """Simplifies lookup of Boto3 services and resources."""
 
-    def __init__(self, cloudwanderer_boto3_session: Optional[CloudWandererBoto3Session] = None) -> None:
+    def __init__(
+        self,
+        cloudwanderer_boto3_session: Optional[CloudWandererBoto3Session] = None,
+        secondary_attribute_concurrency: int = 10,
+        region_resolution_concurrency: int = 10,
+        region_map: Optional[Dict[Tuple[str, str, str], str]] = None,
+    ) -> None:
         """Simplifies lookup of Boto3 services and resources.
 
         Arguments:
             cloudwanderer_boto3_session:
                 A CloudWandererBoto3Session session, if not provided the default will be used.
+            secondary_attribute_concurrency:
+                The number of threads used to fetch the secondary attributes of a page of resources.
+                Set to ``1`` to fetch them sequentially. The thread pool is created when it is first needed,
+                shared by every call to :meth:`get_resources` and shut down by :meth:`close`.
+            region_resolution_concurrency:
+                The number of threads used to look up the regions of a page of resources whose region has to be
+                requested with an API call (e.g. S3 buckets). Set to ``1`` to look them up sequentially.
+                Like the secondary attribute thread pool, this one is created when it is first needed and shut down
+                by :meth:`close`.
+            region_map:
+                The known regions of resources whose region would otherwise have to be requested with an API call,
+                keyed by ``(service, resource_type, resource_id)``
+                e.g. ``{("s3", "bucket", "my-bucket"): "eu-west-1"}``.
         """
         self.cloudwanderer_boto3_session = cloudwanderer_boto3_session or CloudWandererBoto3Session()
+        self.secondary_attribute_concurrency = secondary_attribute_concurrency
+        self.region_resolution_concurrency = region_resolution_concurrency
+        self.region_map = dict(region_map or {})
+        self._resolved_regions: Dict[Tuple[str, str, str], str] = {}
+        self._resolved_regions_lock = threading.Lock()
+        self._secondary_attribute_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._secondary_attribute_executor_lock = threading.Lock()
+        self._region_resolution_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._region_resolution_executor_lock = threading.Lock()
+
+    def close(self) -> None:
+        """Shut down the thread pools used to fetch secondary attributes and resolve regions, if any have been created.
+
+        The interface can still be used afterwards, new thread pools are created when they are next needed.
+        """
+        with self._secondary_attribute_executor_lock:
+            executor, self._secondary_attribute_executor = self._secondary_attribute_executor, None
+        if executor:
+            executor.shutdown(wait=True)
+        with self._region_resolution_executor_lock:
+            executor, self._region_resolution_executor = self._region_resolution_executor, None
+        if executor:
+            executor.shutdown(wait=True)
+
+    def _get_secondary_attribute_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._secondary_attribute_executor_lock:
+            if self._secondary_attribute_executor is None:
+                self._secondary_attribute_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.secondary_attribute_concurrency,
+                    thread_name_prefix="cloudwanderer-secondary-attributes",
+                )
+            return self._secondary_attribute_executor
+
+    def _get_region_resolution_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        with self._region_resolution_executor_lock:
+            if self._region_resolution_executor is None:
+                self._region_resolution_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max(self.region_resolution_concurrency, 1),
+                    thread_name_prefix="cloudwanderer-region-resolution",
+                )
+            return self._region_resolution_executor
 
     def get_enabled_regions(self) -> List[str]:
         """Return the list of regions enabled.
@@ -156,7 +235,7 @@ class CloudWandererAWSInterface(CloudInterface):
         service = self.cloudwanderer_boto3_session.resource(
             service_name=service_name, region_name=region, **(client_args or {})
         )
-        resource_map: ResourceMap = service.service_map.get_resource_map(resource_type)
+        resource_map: ResourceMap = service.compiled_service_model.get_resource_map(resource_type)
         base_resource_filter = (
             _get_service_resource_type_filter_from_list(
                 service_resource_type_filters=validated_resource_type_filters,
@@ -166,28 +245,30 @@ class CloudWandererAWSInterface(CloudInterface):
             or resource_map.default_aws_resource_type_filter
         )
         try:
-            for resource in service.collection(
-                resource_type=resource_type, filters=base_resource_filter.botocore_filters
+            for page in _collection_pages(
+                service.collection(resource_type=resource_type, filters=base_resource_filter.botocore_filters)
             ):
-                resource.fetch_secondary_attributes()
-                if not next(base_resource_filter.filter_jmespath(resources=[resource]), None):
-                    logger.info(
-                        "Skipping %s because it did not match one of the jmespath filters for this resource type",
-                        resource,
+                self._resolve_regions(page)
+                self._fetch_secondary_attributes(page)
+                for resource in page:
+                    if not next(base_resource_filter.filter_jmespath(resources=[resource]), None):
+                        logger.info(
+                            "Skipping %s because it did not match one of the jmespath filters for this resource type",
+                            resource,
+                        )
+                        continue
+                    dependent_resource_urns = []
+                    for dependent_resource in self._get_dependent_resources(resource, validated_resource_type_filters):
+                        dependent_resource_urns.append(dependent_resource.urn)
+                        yield dependent_resource
+                    if resource.resource_map.requires_load:
+                        resource.load()
+                    yield CloudWandererResource(
+                        urn=resource.get_urn(),
+                        resource_data=resource.normalized_raw_data,
+                        dependent_resource_urns=dependent_resource_urns,
+                        relationships=resource.relationships,
                     )
-                    continue
-                dependent_resource_urns = []
-                for dependent_resource in self._get_dependent_resources(resource, validated_resource_type_filters):
-                    dependent_resource_urns.append(dependent_resource.urn)
-                    yield dependent_resource
-                if resource.resource_map.requires_load:
-                    resource.load()
-                yield CloudWandererResource(
-                    urn=resource.get_urn(),
-                    resource_data=resource.normalized_raw_data,
-                    dependent_resource_urns=dependent_resource_urns,
-                    relationships=resource.relationships,
-                )
         except botocore.exceptions.EndpointConnectionError:
             logger.info("%s %s not supported in %s", service_name, resource_type, region)
             return
@@ -210,7 +291,7 @@ class CloudWandererAWSInterface(CloudInterface):
                 resource.get_region(),
                 resource.get_urn().resource_id,
             )
-            dependent_resource_map = resource.service_map.get_resource_map(dependent_resource_type)
+            dependent_resource_map = resource.compiled_service_model.get_resource_map(dependent_resource_type)
             dependent_resource_filter = (
                 _get_service_resource_type_filter_from_list(
                     service_resource_type_filters=service_resource_type_filters or [],
@@ -219,37 +300,112 @@ class CloudWandererAWSInterface(CloudInterface):
                 )
                 or dependent_resource_map.default_aws_resource_type_filter
             )
-            for dependent_resource in resource.collection(
-                resource_type=dependent_resource_type,
-                filters=dependent_resource_filter.botocore_filters,
+            for page in _collection_pages(
+                resource.collection(
+                    resource_type=dependent_resource_type,
+                    filters=dependent_resource_filter.botocore_filters,
+                )
             ):
-                dependent_resource.fetch_secondary_attributes()
-
-                if not next(dependent_resource_filter.filter_jmespath(resources=[dependent_resource]), None):
-                    logger.info(
-                        "Skipping %s because it did not match one of the jmespath " "filters for this resource type",
+                self._resolve_regions(page)
+                self._fetch_secondary_attributes(page)
+                for dependent_resource in page:
+                    if not next(dependent_resource_filter.filter_jmespath(resources=[dependent_resource]), None):
+                        logger.info(
+                            "Skipping %s because it did not match one of the jmespath "
+                            "filters for this resource type",
+                            dependent_resource,
+                        )
+                        continue
+                    logger.debug(
+                        "Found %s, it %s",
                         dependent_resource,
+                        ["does not require loading", "requires loading"][dependent_resource.resource_map.requires_load],
                     )
-                    continue
-                logger.debug(
-                    "Found %s, it %s",
-                    dependent_resource,
-                    ["does not require loading", "requires loading"][dependent_resource.resource_map.requires_load],
-                )
-                if dependent_resource.resource_map.requires_load or (
-                    not dependent_resource.meta.data and hasattr(dependent_resource, "load")
-                ):
-                    dependent_resource.load()
-                urn = dependent_resource.get_urn()
-                yield CloudWandererResource(
-                    urn=urn,
-                    resource_data=dependent_resource.normalized_raw_data,
-                    parent_urn=resource.get_urn(),
-                    relationships=dependent_resource.relationships,
-                )
+                    if dependent_resource.resource_map.requires_load or (
+                        not dependent_resource.meta.data and hasattr(dependent_resource, "load")
+                    ):
+                        dependent_resource.load()
+                    urn = dependent_resource.get_urn()
+                    yield CloudWandererResource(
+                        urn=urn,
+                        resource_data=dependent_resource.normalized_raw_data,
+                        parent_urn=resource.get_urn(),
+                        relationships=dependent_resource.relationships,
+                    )
+
+    def clear_region_cache(self) -> None:
+        """Forget the regions looked up for resources with region requests, other than those in ``region_map``.
+
+        This is called at the start of each discovery run by :meth:`get_resource_discovery_actions`.
+        """
+        with self._resolved_regions_lock:
+            self._resolved_regions.clear()
+
+    def _resolve_regions(self, resources: List["CloudWandererServiceResource"]) -> None:
+        """Set the region of each resource in a page whose region has to be requested with an API call.
+
+        Regions are taken from ``region_map`` or the regions resolved earlier in this run where possible, the rest are
+        requested concurrently.
+
+        Arguments:
+            resources: The page of resources to resolve the regions of.
+        """
+        unresolved_resources = {}
+        for resource in resources:
+            if not resource.resource_map.region_request:
+                continue
+            key = _region_map_key(resource)
+            region = self.region_map.get(key) or self._resolved_regions.get(key)
+            if region:
+                resource.set_region(region)
+            else:
+                unresolved_resources[key] = resource
+        if not unresolved_resources:
+            return
+        logger.info("Resolving the regions of %s resources", len(unresolved_resources))
+        executor = self._get_region_resolution_executor()
+        regions = executor.map(lambda resource: resource.get_region(), unresolved_resources.values())
+        resolved_regions = dict(zip(unresolved_resources.keys(), regions))
+        with self._resolved_regions_lock:
+            self._resolved_regions.update(resolved_regions)
+        for key, resource in unresolved_resources.items():
+            resource.set_region(resolved_regions[key])
+
+    def _fetch_secondary_attributes(self, resources: List["CloudWandererServiceResource"]) -> None:
+        """Fetch the secondary attributes of a page of resources, in parallel if there is more than one to fetch.
+
+        None of the secondary attributes CloudWanderer supports have bulk APIs (e.g. ``DescribeVpcAttribute``
+        only accepts a single VPC) so the per resource calls are made concurrently instead of sequentially.
+
+        Each resource is handed to exactly one worker thread, so no resource object is used by two threads at once.
+        The only object the workers share is the page's low-level client, which boto3 documents as thread safe
+        (service resources, which are not, are created per call rather than pooled by the session).
+
+        Arguments:
+            resources: The resources whose secondary attributes should be fetched.
+        """
+        resources_with_secondary_attributes = []
+        for resource in resources:
+            if resource.secondary_attribute_names:
+                resources_with_secondary_attributes.append(resource)
+            else:
+                # Nothing to fetch, this just marks the resource's (empty) secondary attributes as fetched.
+                resource.fetch_secondary_attributes()
+        if self.secondary_attribute_concurrency <= 1 or len(resources_with_secondary_attributes) <= 1:
+            for resource in resources_with_secondary_attributes:
+                resource.fetch_secondary_attributes()
+            return
+        # Warm the memoized account id before we fan out so that it is fetched once rather than by every thread.
+        self.get_account_id()
+        logger.info("Fetching secondary attributes for %s resources", len(resources_with_secondary_attributes))
+        executor = self._get_secondary_attribute_executor()
+        for _ in executor.map(
+            lambda resource: resource.fetch_secondary_attributes(), resources_with_secondary_attributes
+        ):
+            pass
 
     def get_resource_discovery_actions(
-        self, regions: List[str] = None, service_resource_types: List[ServiceResourceType] = None
+        self, regions: Optional[List[str]] = None, service_resource_types: Optional[List[ServiceResourceType]] = None
     ) -> List[ActionSet]:
         """Return the ActionSets required to discover resources according to the params.
 
@@ -258,6 +414,7 @@ class CloudWandererAWSInterface(CloudInterface):
             service_resource_types: List of service resource types to discover
 
         """
+        self.clear_region_cache()
         service_resource_types = service_resource_types or []
         discovery_regions = regions or self.cloudwanderer_boto3_session.get_enabled_regions()
 
@@ -1,11 +1,13 @@
 """AWS Interface specific model classes."""
 import re
+import threading
 from collections import defaultdict
-from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
 
 import botocore
 import jmespath  # type: ignore
 from boto3.resources.base import ServiceResource
+from boto3.resources.model import ResourceModel
 
 from ..base import ServiceResourceTypeFilter
 from ..models import (
@@ -110,8 +112,99 @@ class ServiceMap(NamedTuple):
         )
 
 
+class CompiledResourceModel(NamedTuple):
+    """Everything CloudWanderer derives from a resource type's definitions, computed once per process.
+
+    These are shared by every resource of the type (in every session) so are immutable.
+    """
+
+    #: The resource map of the resource type.
+    resource_map: "ResourceMap"
+    #: The snake_case names of the dependent resource types of this resource type.
+    dependent_resource_types: Tuple[str, ...]
+    #: The snake_case names of the secondary attributes of this resource type.
+    secondary_attribute_names: Tuple[str, ...]
+
+
+class CompiledServiceModel:
+    """A :class:`ServiceMap` along with the resource maps and resource models derived from it.
+
+    Boto3 builds a new resource class every time it instantiates a resource, so rather than rebuilding
+    the :class:`ServiceMap` and :class:`ResourceMap` of a resource type from its raw definition every time,
+    they are compiled once and shared by every resource class of the service.
+    """
+
+    def __init__(self, service_map: ServiceMap) -> None:
+        """Initialise the CompiledServiceModel.
+
+        Arguments:
+            service_map: The service map to compile.
+        """
+        self.service_map = service_map
+        self._resource_maps: Dict[str, ResourceMap] = {}
+        self._resource_models: Dict[str, CompiledResourceModel] = {}
+        self._lock = threading.Lock()
+
+    def get_resource_map(self, resource_type: str) -> "ResourceMap":
+        """Return the (cached) resource map given a snake_case resource name.
+
+        Arguments:
+            resource_type: The snake_case name of the resource map to get.
+        """
+        resource_map = self._resource_maps.get(resource_type)
+        if resource_map is None:
+            resource_map = self.service_map.get_resource_map(resource_type)
+            with self._lock:
+                resource_map = self._resource_maps.setdefault(resource_type, resource_map)
+        return resource_map
+
+    def get_resource_model(self, resource_type: str, boto3_resource_model: ResourceModel) -> CompiledResourceModel:
+        """Return the (cached) compiled resource model of a snake_case resource type.
+
+        Arguments:
+            resource_type: The snake_case name of the resource type.
+            boto3_resource_model: The Boto3 resource model of the resource type.
+        """
+        compiled_resource_model = self._resource_models.get(resource_type)
+        if compiled_resource_model is None:
+            compiled_resource_model = CompiledResourceModel(
+                resource_map=self.get_resource_map(resource_type),
+                dependent_resource_types=self._get_dependent_resource_types(boto3_resource_model),
+                secondary_attribute_names=self._get_secondary_attribute_names(boto3_resource_model),
+            )
+            with self._lock:
+                compiled_resource_model = self._resource_models.setdefault(resource_type, compiled_resource_model)
+        return compiled_resource_model
+
+    def _get_dependent_resource_types(self, boto3_resource_model: ResourceModel) -> Tuple[str, ...]:
+        dependent_resource_types = set()
+        for collection in boto3_resource_model.collections:
+            resource_type = botocore.xform_name(collection.resource.type)  # type: ignore[union-attr]
+            if self.get_resource_map(resource_type).type == ResourceIndependenceType.DEPENDENT_RESOURCE:
+                dependent_resource_types.add(resource_type)
+        for subresource in boto3_resource_model.subresources + boto3_resource_model.references:
+            resource_type = botocore.xform_name(subresource.resource.type)  # type: ignore[union-attr]
+            if resource_type in dependent_resource_types:
+                continue
+            if self.get_resource_map(resource_type).type == ResourceIndependenceType.DEPENDENT_RESOURCE:
+                dependent_resource_types.add(resource_type)
+        return tuple(sorted(dependent_resource_types))
+
+    def _get_secondary_attribute_names(self, boto3_resource_model: ResourceModel) -> Tuple[str, ...]:
+        secondary_attribute_names = []
+        for subresource in boto3_resource_model.subresources:
+            resource_type = botocore.xform_name(subresource.name)  # type: ignore[attr-defined]
+            if self.get_resource_map(resource_type).type != ResourceIndependenceType.SECONDARY_ATTRIBUTE:
+                continue
+            secondary_attribute_names.append(resource_type)
+        return tuple(secondary_attribute_names)
+
+
 class ResourceMap(NamedTuple):
-    """Specification for additional CloudWanderer specific metadata about a Boto3 resource type."""
+    """Specification for additional CloudWanderer specific metadata about a Boto3 resource type.
+
+    Resource maps are shared by every resource of the type (in every session), so their specifications are tuples.
+    """
 
     #: The PascalCase name of the resource (e.g. ``Instance``)
     name: str
@@ -127,11 +220,11 @@ class ResourceMap(NamedTuple):
     #: A link back to the parent :class:`ServiceMap` object.
     service_map: ServiceMap
     #: The specifications for the relationships this resource can have.
-    relationships: List["RelationshipSpecification"]
+    relationships: Tuple["RelationshipSpecification", ...]
     #: The specifications for the secondary attributes for this resource.
-    secondary_attribute_maps: List["SecondaryAttributeMap"]
+    secondary_attribute_maps: Tuple["SecondaryAttributeMap", ...]
     #: Optional specifications for overriding URN parts based on resource metadata.
-    urn_overrides: List["IdPartSpecification"]
+    urn_overrides: Tuple["IdPartSpecification", ...]
     #: Whether or not this resource exists in every region.
     regional_resource: bool = True
     #: If the resource requires .load() calling on it before it has a complete set of metadata.
@@ -158,17 +251,17 @@ class ResourceMap(NamedTuple):
                 jmespath_filters=definition.get("defaultJMESPathFilters", []),
             ),
             service_map=service_map,
-            relationships=[
+            relationships=tuple(
                 RelationshipSpecification.factory(relationship_specification)
                 for relationship_specification in definition.get("relationships", [])
-            ],
-            secondary_attribute_maps=[
+            ),
+            secondary_attribute_maps=tuple(
                 SecondaryAttributeMap(source_path=mapping["sourcePath"], destination_name=mapping["destinationName"])
                 for mapping in definition.get("secondaryAttributeMaps", [])
-            ],
-            urn_overrides=[
+            ),
+            urn_overrides=tuple(
                 IdPartSpecification.factory(urn_override) for urn_override in definition.get("urnOverrides", [])
-            ],
+            ),
             requires_load=definition.get("requiresLoad", False),
             id_uniqueness_scope=ResourceIdUniquenessScope.factory(definition.get("idUniquenessScope", {})),
         )
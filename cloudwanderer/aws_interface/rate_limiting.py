@@ -0,0 +1,247 @@
+"""Adaptive rate limiting of the AWS API calls made while discovering resources.
+
+API calls are rate limited by a token bucket per account, service and region (the granularity at which AWS throttles
+most APIs). The rate of each bucket is controlled with additive increase/multiplicative decrease (AIMD): every
+throttling error cuts the rate (by ``decrease_factor``, at most once per ``decrease_cooldown`` so that a burst of
+throttled calls in flight only counts once), and every successful call raises it a little (by roughly
+``additive_increase`` requests per second, each second). Discovery therefore settles just below the highest rate
+AWS will sustain, rather than every thread's client retrying on its own until its retries are exhausted.
+
+A single :class:`AdaptiveRateLimiter` is shared by every client and service resource of the
+:class:`~cloudwanderer.aws_interface.CloudWandererBoto3Session` (or sessions) it is passed to, and is thread safe.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+#: The error codes AWS APIs respond with when they are throttling requests.
+THROTTLING_ERROR_CODES = frozenset(
+    [
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "RequestThrottledException",
+        "TooManyRequestsException",
+        "ProvisionedThroughputExceededException",
+        "TransactionInProgressException",
+        "RequestLimitExceeded",
+        "BandwidthLimitExceeded",
+        "LimitExceededException",
+        "RequestThrottled",
+        "SlowDown",
+        "PriorRequestNotComplete",
+        "EC2ThrottledException",
+    ]
+)
+
+
+class RateLimitKey(NamedTuple):
+    """The scope a token bucket limits the API calls of."""
+
+    account_id: str
+    service: str
+    region: str
+
+
+class RateLimiterStatistics(NamedTuple):
+    """A snapshot of a token bucket of an :class:`AdaptiveRateLimiter`."""
+
+    #: The number of requests per second currently allowed.
+    rate: float
+    #: The number of requests which have been allowed.
+    requests: int
+    #: The number of requests which were throttled by AWS.
+    throttles: int
+    #: The total number of seconds requests have waited for a token.
+    waited_seconds: float
+
+
+class TokenBucket:
+    """A token bucket whose rate is adjusted with AIMD, refilled with tokens up to one second of its rate."""
+
+    def __init__(self, rate: float, clock: Callable[[], float]) -> None:
+        self.rate = rate
+        self.tokens = min(rate, 1.0)
+        self.clock = clock
+        self.last_refill = clock()
+        self.last_decrease: Optional[float] = None
+        self.requests = 0
+        self.throttles = 0
+        self.waited_seconds = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(max(self.rate, 1.0), self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def reserve(self) -> float:
+        """Take a token (borrowing it from the future if there are none) and return how long to wait before using it."""
+        with self.lock:
+            self._refill(self.clock())
+            self.tokens -= 1
+            self.requests += 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            self.waited_seconds += wait
+            return wait
+
+
+class AdaptiveRateLimiter:
+    """Limit the rate of API calls per account, service and region, adapting to throttling (AIMD).
+
+    Example:
+        Share a rate limiter between the sessions of :meth:`~cloudwanderer.CloudWanderer.write_resources_concurrently`.
+
+            >>> from cloudwanderer import CloudWanderer
+            >>> from cloudwanderer.aws_interface import (
+            ...     AdaptiveRateLimiter,
+            ...     CloudWandererAWSInterface,
+            ...     CloudWandererBoto3Session,
+            ... )
+            >>> from cloudwanderer.storage_connectors import MemoryStorageConnector
+            >>> rate_limiter = AdaptiveRateLimiter(initial_rate=10)
+            >>> cloud_wanderer = CloudWanderer(storage_connectors=[MemoryStorageConnector()])
+            >>> cloud_wanderer.write_resources_concurrently(
+            ...     cloud_interface_generator=lambda: CloudWandererAWSInterface(
+            ...         cloudwanderer_boto3_session=CloudWandererBoto3Session(rate_limiter=rate_limiter)
+            ...     ),
+            ...     storage_connector_generator=lambda: [MemoryStorageConnector()],
+            ...     concurrency=20,
+            ... )
+    """
+
+    def __init__(
+        self,
+        initial_rate: float = 20.0,
+        min_rate: float = 0.5,
+        max_rate: float = 200.0,
+        additive_increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """Initialise the AdaptiveRateLimiter.
+
+        Arguments:
+            initial_rate: The requests per second each account, service and region starts at.
+            min_rate: The requests per second throttling will not reduce the rate below.
+            max_rate: The requests per second successful requests will not increase the rate above.
+            additive_increase: The requests per second the rate increases by for each second of successful requests.
+            decrease_factor: The factor the rate is multiplied by when a request is throttled.
+            decrease_cooldown: The seconds after the rate is reduced during which further throttling is ignored.
+            clock: The monotonic clock (in seconds) tokens are refilled by.
+            sleep: The function called to wait for a token.
+
+        Raises:
+            ValueError: If the rates are not positive and ordered, or decrease_factor is not between 0 and 1.
+        """
+        if not 0 < min_rate <= initial_rate <= max_rate:
+            raise ValueError("Rates must satisfy 0 < min_rate <= initial_rate <= max_rate")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be between 0 and 1")
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets: Dict[RateLimitKey, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+
+    def _bucket(self, key: RateLimitKey) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            with self._buckets_lock:
+                bucket = self._buckets.setdefault(key, TokenBucket(self.initial_rate, self.clock))
+        return bucket
+
+    def acquire(self, key: RateLimitKey) -> float:
+        """Wait until a request may be made, returning the number of seconds waited.
+
+        Arguments:
+            key: The account, service and region the request is for.
+        """
+        wait = self._bucket(key).reserve()
+        if wait:
+            logger.debug("Waiting %.3fs to call %s", wait, key)
+            self.sleep(wait)
+        return wait
+
+    def record_success(self, key: RateLimitKey) -> None:
+        """Increase the rate of key, by additive_increase per second's worth of successful requests.
+
+        Arguments:
+            key: The account, service and region of the successful request.
+        """
+        bucket = self._bucket(key)
+        with bucket.lock:
+            bucket.rate = min(self.max_rate, bucket.rate + self.additive_increase / bucket.rate)
+
+    def record_throttle(self, key: RateLimitKey) -> None:
+        """Reduce the rate of key by decrease_factor, unless it was already reduced within decrease_cooldown.
+
+        Arguments:
+            key: The account, service and region of the throttled request.
+        """
+        bucket = self._bucket(key)
+        with bucket.lock:
+            bucket.throttles += 1
+            now = self.clock()
+            if bucket.last_decrease is not None and now - bucket.last_decrease < self.decrease_cooldown:
+                return
+            bucket._refill(now)
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease_factor)
+            # Don't allow a burst straight after being throttled.
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.last_decrease = now
+            logger.info("Throttled calling %s, reduced rate to %.2f requests per second", key, bucket.rate)
+
+    def rate(self, key: RateLimitKey) -> float:
+        """Return the requests per second currently allowed for key.
+
+        Arguments:
+            key: The account, service and region to return the rate of.
+        """
+        return self._bucket(key).rate
+
+    @property
+    def statistics(self) -> Dict[RateLimitKey, RateLimiterStatistics]:
+        """Return a snapshot of the rate and usage of every account, service and region called."""
+        with self._buckets_lock:
+            buckets: Tuple[Tuple[RateLimitKey, TokenBucket], ...] = tuple(self._buckets.items())
+        return {
+            key: RateLimiterStatistics(
+                rate=bucket.rate,
+                requests=bucket.requests,
+                throttles=bucket.throttles,
+                waited_seconds=bucket.waited_seconds,
+            )
+            for key, bucket in buckets
+        }
+
+    def __repr__(self) -> str:
+        """Return an instantiable string representation of this object."""
+        return (
+            f"{self.__class__.__name__}(initial_rate={self.initial_rate}, min_rate={self.min_rate}, "
+            f"max_rate={self.max_rate}, additive_increase={self.additive_increase}, "
+            f"decrease_factor={self.decrease_factor}, decrease_cooldown={self.decrease_cooldown})"
+        )
+
+
+def is_throttling_response(response: Optional[Tuple]) -> bool:
+    """Return whether a botocore ``(http_response, parsed_response)`` tuple is a throttling error.
+
+    Arguments:
+        response: The response passed to botocore's ``needs-retry`` event.
+    """
+    if not response:
+        return False
+    http_response, parsed = response
+    if getattr(http_response, "status_code", None) == 429:
+        return True
+    return parsed.get("Error", {}).get("Code") in THROTTLING_ERROR_CODES
@@ -1,6 +1,8 @@
 """Create the CloudWandererServiceResource objects that do the magic."""
+import functools
 import logging
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Type
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, List, Optional, Tuple, Type
 
 import jmespath  # type: ignore
 from boto3.resources.base import ServiceResource
@@ -26,7 +28,7 @@ from ..utils import snake_to_pascal
 from .boto3_helpers import _clean_boto3_metadata
 from .boto3_loaders import MergedServiceLoader
 from .exceptions import SecondaryAttributesNotFetchedError
-from .models import ServiceMap
+from .models import CompiledServiceModel, ServiceMap
 from .utils import _get_urn_components_from_string
 
 if TYPE_CHECKING:
@@ -37,6 +39,47 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+#: Compiled service models shared by every factory in the process, keyed by (loader cache key, service name).
+_COMPILED_SERVICE_MODELS: Dict[Tuple[Hashable, str], CompiledServiceModel] = {}
+_COMPILED_SERVICE_MODELS_LOCK = threading.Lock()
+
+
+def _memoized_on_resource(func: Callable) -> Callable:
+    """Memoize a method of a CloudWandererServiceResource which takes no arguments.
+
+    The memoized values are stored on the resource instance and are discarded whenever the resource's
+    ``meta.data`` is replaced (e.g. by ``load()``), or by :func:`_forget_memoized`.
+
+    Arguments:
+        func: The method to memoize.
+    """
+
+    @functools.wraps(func)
+    def memoized(self) -> Any:
+        memo = self.__dict__.get("_cloudwanderer_memo")
+        if memo is None or memo["data"] is not self.meta.data:
+            memo = self.__dict__["_cloudwanderer_memo"] = {"data": self.meta.data}
+        if func.__name__ not in memo:
+            memo[func.__name__] = func(self)
+        return memo[func.__name__]
+
+    return memoized
+
+
+def _forget_memoized(resource: "CloudWandererServiceResource", *names: str) -> None:
+    """Discard the memoized values of a resource.
+
+    Arguments:
+        resource: The resource whose memoized values should be discarded.
+        *names: The names of the methods to forget, if none are specified all memoized values are discarded.
+    """
+    if not names:
+        resource.__dict__.pop("_cloudwanderer_memo", None)
+        return
+    memo = resource.__dict__.get("_cloudwanderer_memo", {})
+    for name in names:
+        memo.pop(name, None)
+
 
 class CloudWandererResourceFactory(ResourceFactory):
     """Enriches functionality of boto3 resource objects with CloudWanderer specific methods."""
@@ -50,6 +93,35 @@ class CloudWandererResourceFactory(ResourceFactory):
         super().__init__(emitter=emitter)
         self.service_mapping_loader = service_mapping_loader or MergedServiceLoader()
         self.cloudwanderer_boto3_session = cloudwanderer_boto3_session
+        self._compiled_service_models: Dict[Tuple[Hashable, str], CompiledServiceModel] = {}
+
+    def get_compiled_service_model(self, service_name: str) -> CompiledServiceModel:
+        """Return the compiled CloudWanderer service model of a service, compiling it if necessary.
+
+        If the service mapping loader has a ``cache_key`` (as :class:`MergedServiceLoader` does) the compiled model
+        is shared by every factory in the process whose loader has the same key, otherwise it is cached on this factory.
+
+        Arguments:
+            service_name: The snake_case name of the service.
+        """
+        loader_cache_key = getattr(self.service_mapping_loader, "cache_key", None)
+        cache = self._compiled_service_models if loader_cache_key is None else _COMPILED_SERVICE_MODELS
+        key = (loader_cache_key, service_name)
+        compiled_service_model = cache.get(key)
+        if compiled_service_model is not None:
+            return compiled_service_model
+        with _COMPILED_SERVICE_MODELS_LOCK:
+            if key not in cache:
+                logger.debug("Compiling CloudWanderer service model for %s", service_name)
+                cache[key] = CompiledServiceModel(
+                    ServiceMap.factory(
+                        name=service_name,
+                        definition=self.service_mapping_loader.load_service_model(
+                            service_name=service_name, type_name="resources-cw-1", api_version=None
+                        ),
+                    )
+                )
+            return cache[key]
 
     def load_from_definition(self, resource_name, single_resource_json_definition, service_context) -> type:
         class_definition = super().load_from_definition(resource_name, single_resource_json_definition, service_context)
@@ -67,6 +139,7 @@ class CloudWandererResourceFactory(ResourceFactory):
             attrs=attrs,
             resource_name=resource_name,
             service_context=service_context,
+            original_class_definition=class_definition,
         )
 
         for attribute_name, attribute_value in attrs.items():
@@ -95,6 +168,7 @@ class CloudWandererResourceFactory(ResourceFactory):
         attrs["get_account_id"] = self._create_get_account_id()
         attrs["get_urn"] = self._create_get_urn()
         attrs["get_region"] = self._create_get_region()
+        attrs["set_region"] = self._create_set_region()
         attrs["fetch_secondary_attributes"] = self._create_fetch_secondary_attributes()
 
     def _create_load(self, original_class_definition: Any) -> Callable:
@@ -123,6 +197,7 @@ class CloudWandererResourceFactory(ResourceFactory):
                 )
                 return
             original_class_load(self)
+            _forget_memoized(self)
 
         return load
 
@@ -248,6 +323,7 @@ class CloudWandererResourceFactory(ResourceFactory):
                 return str(identifier)
             return identifier
 
+        @_memoized_on_resource
         def get_urn(self) -> URN:
             id_parts = [normalize_identifier(getattr(self, identifier)) for identifier in self.meta.identifiers]
             urn_args = {
@@ -306,22 +382,10 @@ class CloudWandererResourceFactory(ResourceFactory):
                 secondary_attribute_resource.fetch_secondary_attributes()
                 self._secondary_attributes.append(secondary_attribute_resource)
             self._secondary_attributes_fetched = True
+            _forget_memoized(self, "normalized_raw_data", "relationships")
 
         return fetch_secondary_attributes
 
-    def _create_secondary_attribute_names(self) -> property:
-        def secondary_attribute_names(self) -> List[str]:
-            secondary_attribute_names = []
-            for subresource in self.meta.resource_model.subresources:
-                resource_map = self.service_map.get_resource_map(xform_name(subresource.name))
-                if not resource_map or resource_map.type != ResourceIndependenceType.SECONDARY_ATTRIBUTE:
-                    continue
-                secondary_attribute_names.append(xform_name(subresource.name))
-
-            return secondary_attribute_names
-
-        return property(secondary_attribute_names)
-
     def _create_get_account_id(self) -> Callable:
         def get_account_id(self) -> str:
             return self.cloudwanderer_boto3_session.get_account_id()
@@ -329,7 +393,10 @@ class CloudWandererResourceFactory(ResourceFactory):
         return get_account_id
 
     def _create_get_region(self) -> Callable:
+        @_memoized_on_resource
         def get_region(self) -> str:
+            if self._region:
+                return self._region
             if self.resource_map.region_request:
                 method = getattr(self.meta.client, self.resource_map.region_request.operation)
                 result = method(**self.resource_map.region_request.build_params(self))
@@ -344,7 +411,20 @@ class CloudWandererResourceFactory(ResourceFactory):
 
         return get_region
 
+    def _create_set_region(self) -> Callable:
+        def set_region(self, region: str) -> None:
+            """Record the region of this resource so that get_region does not need to look it up (e.g. via API call).
+
+            Arguments:
+                region: The region this resource is in.
+            """
+            self._region = region
+            _forget_memoized(self)
+
+        return set_region
+
     def _create_normalized_raw_data(self) -> property:
+        @_memoized_on_resource
         def normalized_raw_data(self) -> Dict[str, Any]:
             """Return the raw data dictionary for this resource, ensuring that all possible keys are present."""
             result = {attribute: None for attribute in self.shape.members.keys()}
@@ -365,26 +445,6 @@ class CloudWandererResourceFactory(ResourceFactory):
 
         return property(resource_types)
 
-    def _create_dependent_resource_types(self) -> property:
-        def dependent_resource_types(self) -> List[str]:
-            dependent_resource_types = set()
-            for collection in self.meta.resource_model.collections:
-                resource_type = xform_name(collection.resource.type)
-                resource_map = self.service_map.get_resource_map(resource_type=resource_type)
-                if resource_map.type == ResourceIndependenceType.DEPENDENT_RESOURCE:
-                    dependent_resource_types.add(resource_type)
-            for subresource in self.meta.resource_model.subresources + self.meta.resource_model.references:
-                resource_type = xform_name(subresource.resource.type)
-                if resource_type in dependent_resource_types:
-                    continue
-                resource_map = self.service_map.get_resource_map(resource_type=resource_type)
-                if resource_map.type == ResourceIndependenceType.DEPENDENT_RESOURCE:
-                    dependent_resource_types.add(resource_type)
-
-            return sorted(list(dependent_resource_types))
-
-        return property(dependent_resource_types)
-
     def _create_shape(self) -> property:
         def shape(self) -> Shape:
             service_model = self.meta.client.meta.service_model
@@ -393,6 +453,7 @@ class CloudWandererResourceFactory(ResourceFactory):
         return property(shape)
 
     def _create_relationships(self) -> property:
+        @_memoized_on_resource
         def relationships(self) -> List[Relationship]:
             """Return PartialURNs for the relationships this resource has with other resources."""
             relationships = []
@@ -442,27 +503,33 @@ class CloudWandererResourceFactory(ResourceFactory):
         return property(is_dependent_resource)
 
     def _load_cloudwanderer_properties(
-        self, attrs: Dict[str, Any], resource_name: str, service_context: "ServiceContext"
+        self,
+        attrs: Dict[str, Any],
+        resource_name: str,
+        service_context: "ServiceContext",
+        original_class_definition: Type[ServiceResource],
     ) -> None:
+        compiled_service_model = self.get_compiled_service_model(service_context.service_name)
         attrs["service_name"] = service_context.service_name
-        attrs["service_map"] = ServiceMap.factory(
-            name=service_context.service_name,
-            definition=self.service_mapping_loader.load_service_model(
-                service_name=service_context.service_name, type_name="resources-cw-1", api_version=None
-            ),
-        )
+        attrs["service_map"] = compiled_service_model.service_map
+        attrs["compiled_service_model"] = compiled_service_model
         attrs["cloudwanderer_boto3_session"] = self.cloudwanderer_boto3_session
+        attrs["_region"] = None
 
         if resource_name == service_context.service_name:  # type: ignore
             # If it is a service:
             attrs["resource_types"] = self._create_resource_types()
         else:
             # If it is a resource:
+            compiled_resource_model = compiled_service_model.get_resource_model(
+                resource_type=xform_name(resource_name),
+                boto3_resource_model=original_class_definition.meta.resource_model,
+            )
             attrs["normalized_raw_data"] = self._create_normalized_raw_data()
             attrs["resource_type"] = xform_name(resource_name)
-            attrs["resource_map"] = attrs["service_map"].get_resource_map(resource_type=xform_name(resource_name))
-            attrs["dependent_resource_types"] = self._create_dependent_resource_types()
-            attrs["secondary_attribute_names"] = self._create_secondary_attribute_names()
+            attrs["resource_map"] = compiled_resource_model.resource_map
+            attrs["dependent_resource_types"] = compiled_resource_model.dependent_resource_types
+            attrs["secondary_attribute_names"] = compiled_resource_model.secondary_attribute_names
             attrs["shape"] = self._create_shape()
             attrs["relationships"] = self._create_relationships()
             attrs["is_dependent_resource"] = self._create_is_dependent_resource()
@@ -1,14 +1,19 @@
 """Subclass of Boto3 Session class to provide additional helper methods."""
 import logging
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Union, cast
 
 import boto3
 import botocore
+import botocore.session
+from botocore.credentials import DeferredRefreshableCredentials
 from botocore.loaders import Loader
 
 from ..cache_helpers import memoized_method
 from .aws_services import AWS_SERVICES
 from .boto3_loaders import MergedServiceLoader
+from .rate_limiting import AdaptiveRateLimiter, RateLimitKey, is_throttling_response
 from .resource_factory import CloudWandererResourceFactory
 
 if TYPE_CHECKING:
@@ -41,8 +46,28 @@ class CloudWandererBoto3ClientConfig:
         return self.client_configs.get(service_name, {})
 
 
+class ClientPoolStatistics(NamedTuple):
+    """A snapshot of how effective a :class:`CloudWandererBoto3Session`'s client pool has been."""
+
+    #: The number of Boto3 clients constructed.
+    clients_created: int
+    #: The number of times an existing Boto3 client was returned from the pool.
+    clients_reused: int
+    #: The number of clients evicted from the pool to keep it within its size limit.
+    evicted: int
+
+
 class CloudWandererBoto3Session(boto3.session.Session):
-    """Subclass of Boto3 Session class to provide additional helper methods."""
+    """Subclass of Boto3 Session class to provide additional helper methods.
+
+    Clients are pooled, keyed by their service, region and client arguments, so that repeated calls to
+    :meth:`client` and :meth:`resource` (e.g. from repeated discovery runs in a long lived worker) do not pay the cost
+    of building a new botocore client and endpoint resolver each time.
+    The pool is thread safe and evicts the least recently used client once it grows beyond ``client_pool_size``.
+
+    Boto3 clients are thread safe but service resources are not, so every call to :meth:`resource` returns a new
+    service resource (built on a pooled client) which should not be shared between threads.
+    """
 
     def __init__(
         self,
@@ -57,6 +82,8 @@ class CloudWandererBoto3Session(boto3.session.Session):
         getter_client_config: Optional[CloudWandererBoto3ClientConfig] = None,
         account_id: Optional[str] = None,
         enabled_regions: Optional[List[str]] = None,
+        client_pool_size: int = 128,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
     ) -> None:
         """Subclass of Boto3 Session class to provide additional helper methods.
 
@@ -93,6 +120,14 @@ class CloudWandererBoto3Session(boto3.session.Session):
             enabled_regions:
                 The list of regions enabled in this AWS account. This will be fetched automatically via API
                 call if not supplied.
+            client_pool_size:
+                The maximum number of clients to keep in the pool. Set to ``0`` to disable
+                pooling and construct a new client every time.
+            rate_limiter:
+                Limit the rate of every API call made by this session's clients and service resources per account,
+                service and region, adapting to throttling. Pass the same rate limiter to several sessions
+                (e.g. those made by :meth:`~cloudwanderer.CloudWanderer.write_resources_concurrently`'s
+                ``cloud_interface_generator``) to share the limits between them.
         """
         self.service_mapping_loader = service_mapping_loader
         super().__init__(
@@ -113,6 +148,18 @@ class CloudWandererBoto3Session(boto3.session.Session):
         self.getter_client_config = getter_client_config or CloudWandererBoto3ClientConfig()
         self._account_id = account_id
         self._enabled_regions = enabled_regions
+        self.client_pool_size = client_pool_size
+        self._client_pool: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self._client_pool_lock = threading.Lock()
+        self._client_pool_counters: Dict[str, int] = dict.fromkeys(ClientPoolStatistics._fields, 0)
+        self._session_components_loaded = False
+        self._session_components_lock = threading.Lock()
+        self._resource_client_configs: Dict[Optional[botocore.client.Config], botocore.client.Config] = {}
+        self.rate_limiter = rate_limiter
+        if rate_limiter:
+            # Clients copy the session's handlers when they are created, so these apply to every client.
+            self._session.register("request-created", self._acquire_rate_limit)  # type: ignore[arg-type]
+            self._session.register("needs-retry", self._record_rate_limit_response)  # type: ignore[arg-type]
 
     @memoized_method()
     def get_account_id(self) -> str:
@@ -122,6 +169,53 @@ class CloudWandererBoto3Session(boto3.session.Session):
         sts = self.client("sts", **self.getter_client_config("sts"))
         return sts.get_caller_identity()["Account"]
 
+    def _rate_limit_key(self, event_name: str, region: Optional[str]) -> Optional[RateLimitKey]:
+        """Return the rate limit key of an API call from its botocore event name and region.
+
+        Arguments:
+            event_name: The botocore event name (e.g. ``request-created.ec2.DescribeVpcs``).
+            region: The region of the client making the call.
+        """
+        _, service_id, operation_name = event_name.split(".", 2)
+        if service_id == "sts" and operation_name == "GetCallerIdentity":
+            # Made by get_account_id, so we can't know which account it is for.
+            return None
+        return RateLimitKey(account_id=self.get_account_id(), service=service_id, region=region or "global")
+
+    def _acquire_rate_limit(self, event_name: str, request: Any, **kwargs) -> None:
+        """Wait for the rate limiter to allow an API call attempt (called by botocore's ``request-created`` event).
+
+        Arguments:
+            event_name: The botocore event name.
+            request: The botocore request about to be sent.
+            **kwargs: The other arguments of the event.
+        """
+        key = self._rate_limit_key(event_name, request.context.get("client_region"))
+        if key:
+            cast(AdaptiveRateLimiter, self.rate_limiter).acquire(key)
+
+    def _record_rate_limit_response(
+        self, event_name: str, response: Optional[Tuple], request_dict: Dict[str, Any], **kwargs
+    ) -> None:
+        """Adjust the rate limit by the response to an API call attempt (called by botocore's ``needs-retry`` event).
+
+        Arguments:
+            event_name: The botocore event name.
+            response: The botocore ``(http_response, parsed_response)`` tuple (``None`` if the request failed).
+            request_dict: The botocore request dict.
+            **kwargs: The other arguments of the event.
+        """
+        if response is None:
+            return
+        key = self._rate_limit_key(event_name, request_dict["context"].get("client_region"))
+        if not key:
+            return
+        rate_limiter = cast(AdaptiveRateLimiter, self.rate_limiter)
+        if is_throttling_response(response):
+            rate_limiter.record_throttle(key)
+        elif response[0].status_code < 400:
+            rate_limiter.record_success(key)
+
     def _setup_loader(self) -> None:
         """Create loader paths so that we can load resources."""
         self._loader = self.service_mapping_loader or MergedServiceLoader()
@@ -134,6 +228,123 @@ class CloudWandererBoto3Session(boto3.session.Session):
         regions = self.client("ec2", **self.getter_client_config("ec2")).describe_regions()["Regions"]
         return [region["RegionName"] for region in regions if region["OptInStatus"] != "not-opted-in"]
 
+    @property
+    def client_pool_statistics(self) -> ClientPoolStatistics:
+        """Return how many clients have been created and reused by this session."""
+        with self._client_pool_lock:
+            return ClientPoolStatistics(**self._client_pool_counters)
+
+    def clear_client_pool(self) -> None:
+        """Discard all pooled clients (e.g. after rotating credentials)."""
+        with self._client_pool_lock:
+            self._client_pool.clear()
+
+    def _load_session_components(self) -> None:
+        """Load the botocore session components which are otherwise lazily loaded by the first client created.
+
+        Botocore loads these without any locking, so they are loaded once here before clients are created concurrently.
+        """
+        if self._session_components_loaded:
+            return
+        with self._session_components_lock:
+            if self._session_components_loaded:
+                return
+            for component_name in ["data_loader", "endpoint_resolver", "credential_provider"]:
+                self._session.get_component(component_name)
+            self._session._get_internal_component("monitor")  # type: ignore[attr-defined]
+            self._session.get_credentials()
+            self._session_components_loaded = True
+
+    def _get_pooled_client(self, factory: Callable[[], Any], service_name: str, **kwargs) -> Any:
+        """Return the pooled client for these arguments, calling factory to create it if needed.
+
+        Clients are created outside the pool's lock so that creating one does not hold up threads using others.
+        If two threads create the same client at once, the first one added to the pool is returned to both.
+
+        Arguments:
+            factory: A callable which constructs the client if it is not in the pool.
+            service_name: The name of the service the client is for.
+            **kwargs: The remaining client arguments, which form part of the pool key.
+        """
+        key_args = dict(kwargs, region_name=kwargs.get("region_name") or self.region_name)
+        key: Optional[Tuple] = (service_name, tuple(sorted(key_args.items())))
+        try:
+            hash(key)
+        except TypeError:
+            logger.debug("Not pooling client for %s as its arguments are not hashable", service_name)
+            key = None
+        if key is not None:
+            with self._client_pool_lock:
+                if key in self._client_pool:
+                    self._client_pool.move_to_end(key)
+                    self._client_pool_counters["clients_reused"] += 1
+                    return self._client_pool[key]
+        self._load_session_components()
+        created = factory()
+        with self._client_pool_lock:
+            if key is None or self.client_pool_size <= 0:
+                self._client_pool_counters["clients_created"] += 1
+                return created
+            pooled = self._client_pool.setdefault(key, created)
+            self._client_pool.move_to_end(key)
+            if pooled is not created:
+                self._client_pool_counters["clients_reused"] += 1
+                return pooled
+            self._client_pool_counters["clients_created"] += 1
+            while len(self._client_pool) > self.client_pool_size:
+                evicted_key, _ = self._client_pool.popitem(last=False)
+                self._client_pool_counters["evicted"] += 1
+                logger.debug("Evicted %s client from the client pool", evicted_key[0])
+            return pooled
+
+    def _get_resource_client_config(self, config: Optional[botocore.client.Config]) -> botocore.client.Config:
+        """Return the client config Boto3 would give the client of a service resource created with config.
+
+        Boto3 copies the config of every service resource's client (to set its user agent), which would give each
+        one a new pool key, so the copy is made once per config here instead.
+
+        Arguments:
+            config: The client config passed to :meth:`resource`.
+        """
+        if config is not None and getattr(config, "user_agent_extra", None) is not None:
+            return config
+        if config not in self._resource_client_configs:
+            resource_client_config = botocore.client.Config(user_agent_extra="Resource")
+            if config is not None:
+                resource_client_config = config.merge(resource_client_config)
+            self._resource_client_configs.setdefault(config, resource_client_config)
+        return self._resource_client_configs[config]
+
+    def client(  # type: ignore[override]
+        self,
+        service_name: str,
+        region_name: Optional[str] = None,
+        api_version: Optional[str] = None,
+        use_ssl: Optional[bool] = True,
+        verify: Union[bool, str, None] = None,
+        endpoint_url: Optional[str] = None,
+        aws_access_key_id: Optional[str] = None,
+        aws_secret_access_key: Optional[str] = None,
+        aws_session_token: Optional[str] = None,
+        config: Optional[botocore.client.Config] = None,
+    ) -> Any:
+        client_args = dict(
+            region_name=region_name,
+            api_version=api_version,
+            use_ssl=use_ssl,
+            verify=verify,
+            endpoint_url=endpoint_url,
+            aws_access_key_id=aws_access_key_id,
+            aws_secret_access_key=aws_secret_access_key,
+            aws_session_token=aws_session_token,
+            config=config,
+        )
+        return self._get_pooled_client(
+            lambda: super(CloudWandererBoto3Session, self).client(service_name, **client_args),  # type: ignore
+            service_name=service_name,
+            **client_args,
+        )
+
     def resource(  # type: ignore[override]
         self,
         service_name: AWS_SERVICES,
@@ -147,6 +358,7 @@ class CloudWandererBoto3Session(boto3.session.Session):
         aws_session_token: Optional[str] = None,
         config: Optional[botocore.client.Config] = None,
     ) -> "CloudWandererServiceResource":
+        # Service resources are not thread safe, so a new one is built (on a pooled client) every time.
         return super().resource(  # type: ignore[call-overload, misc]
             service_name,  # type: ignore[arg-type]
             region_name=region_name,
@@ -157,5 +369,84 @@ class CloudWandererBoto3Session(boto3.session.Session):
             aws_access_key_id=aws_access_key_id,
             aws_secret_access_key=aws_secret_access_key,
             aws_session_token=aws_session_token,
-            config=config,
+            config=self._get_resource_client_config(config),
         )
+
+
+class AssumeRoleSessionFactory:
+    """Create :class:`CloudWandererBoto3Session` objects authenticated by assuming a role (e.g. in another account).
+
+    The role is not assumed until the session's credentials are first used, and is assumed again whenever
+    they are about to expire, so a session can be used for longer than ``duration_seconds``.
+
+    Example:
+        >>> from cloudwanderer.aws_interface import AssumeRoleSessionFactory
+        >>> session_factory = AssumeRoleSessionFactory(
+        ...     role_arn="arn:aws:iam::111111111111:role/CloudWanderer",
+        ...     enabled_regions=["eu-west-1", "us-east-1"],
+        ... )
+        >>> cloudwanderer_boto3_session = session_factory()
+    """
+
+    def __init__(
+        self,
+        role_arn: str,
+        role_session_name: str = "cloudwanderer",
+        external_id: Optional[str] = None,
+        duration_seconds: int = 3600,
+        base_session: Optional[boto3.session.Session] = None,
+        **session_kwargs: Any,
+    ) -> None:
+        """Initialise the AssumeRoleSessionFactory.
+
+        Arguments:
+            role_arn: The ARN of the role to assume.
+            role_session_name: The session name to assume the role with.
+            external_id: The external id the role's trust policy requires (if any).
+            duration_seconds: How long each set of assumed credentials lasts.
+            base_session: The session to call STS with (defaults to a new default Boto3 session).
+            **session_kwargs: Additional keyword arguments passed to :class:`CloudWandererBoto3Session`
+                (e.g. ``enabled_regions`` or ``rate_limiter``).
+        """
+        self.role_arn = role_arn
+        self.role_session_name = role_session_name
+        self.external_id = external_id
+        self.duration_seconds = duration_seconds
+        self.base_session = base_session
+        self.session_kwargs = session_kwargs
+
+    @property
+    def account_id(self) -> str:
+        """The ID of the account the role belongs to."""
+        return self.role_arn.split(":")[4]
+
+    def _assume_role(self) -> Dict[str, str]:
+        assume_role_kwargs: Dict[str, Any] = {
+            "RoleArn": self.role_arn,
+            "RoleSessionName": self.role_session_name,
+            "DurationSeconds": self.duration_seconds,
+        }
+        if self.external_id:
+            assume_role_kwargs["ExternalId"] = self.external_id
+        logger.debug("Assuming %s", self.role_arn)
+        sts = (self.base_session or boto3.session.Session()).client("sts")
+        credentials = sts.assume_role(**assume_role_kwargs)["Credentials"]
+        return {
+            "access_key": credentials["AccessKeyId"],
+            "secret_key": credentials["SecretAccessKey"],
+            "token": credentials["SessionToken"],
+            "expiry_time": credentials["Expiration"].isoformat(),
+        }
+
+    def __call__(self) -> CloudWandererBoto3Session:
+        """Return a new session which assumes the role when its credentials are first used."""
+        botocore_session = botocore.session.Session()
+        botocore_session._credentials = DeferredRefreshableCredentials(  # type: ignore[attr-defined]
+            refresh_using=self._assume_role, method="assume-role"
+        )
+        session_kwargs = {"account_id": self.account_id, **self.session_kwargs}
+        return CloudWandererBoto3Session(botocore_session=botocore_session, **session_kwargs)
+
+    def __repr__(self) -> str:
+        """Return a string representation of this object."""
+        return f'{self.__class__.__name__}(role_arn="{self.role_arn}")'
@@ -1,17 +1,19 @@
-from typing import Any, Collection, Dict, List, Optional
+from typing import Any, Collection, Dict, List, Optional, Tuple
 
-from boto3.resources.base import ResourceMeta
+from boto3.resources.base import ResourceMeta, ServiceResource
 
 from ...models import Relationship, TemplateActionSet
 from ...urn import URN
-from ..models import ResourceMap, ServiceMap
+from ..models import CompiledServiceModel, ResourceMap, ServiceMap
 
-class CloudWandererServiceResource:
+class CloudWandererServiceResource(ServiceResource):
     service_name: str
     resource_type: str
     resource_types: List[str]
-    dependent_resource_types: List[str]
+    dependent_resource_types: Tuple[str, ...]
+    secondary_attribute_names: Tuple[str, ...]
     service_map: ServiceMap
+    compiled_service_model: CompiledServiceModel
     resource_map: ResourceMap
     meta: ResourceMeta
     normalized_raw_data: Dict[str, Any]
@@ -25,6 +27,7 @@ class CloudWandererServiceResource:
     ) -> "CloudWandererServiceResource": ...
     def get_urn(self) -> URN: ...
     def get_region(self) -> str: ...
+    def set_region(self, region: str) -> None: ...
     def collection(self, resource_type: str, filters: Optional[Dict[str, str]] = None) -> Collection: ...
     def load(self) -> None: ...
     def fetch_secondary_attributes(self) -> None: ...
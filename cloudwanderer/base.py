@@ -55,7 +55,7 @@ class CloudInterface(abc.ABC):
 
     @abc.abstractmethod
     def get_resource_discovery_actions(
-        self, regions: List[str] = None, service_resource_types: List[ServiceResourceType] = None
+        self, regions: Optional[List[str]] = None, service_resource_types: Optional[List[ServiceResourceType]] = None
     ) -> List[ActionSet]:
         """Return the ActionSets required to discover resources according to the params.
 
@@ -65,6 +65,12 @@ class CloudInterface(abc.ABC):
 
         """
 
+    def close(self) -> None:
+        """Release any resources (e.g. thread pools) the cloud interface holds.
+
+        The cloud interface can still be used afterwards.
+        """
+
     def get_enabled_regions(self) -> List[str]:
         """Return the list of regions enabled.
 
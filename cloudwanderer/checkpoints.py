@@ -0,0 +1,250 @@
+"""Checkpoint stores which allow interrupted discovery runs to be resumed.
+
+Deleting stale resources of a type requires the earliest time that type was discovered at in the current run, so a run
+which dies part way through would otherwise have to be restarted from scratch. A checkpoint store records each
+completed get action (i.e. each account, region, service and resource type discovered) along with the earliest
+discovery time of each resource type it discovered. When a run is restarted with the same checkpoint store, completed
+get actions are skipped and their recorded discovery times used to calculate the cutoffs of the delete actions, so
+stale resources are cleaned up exactly as they would have been by an uninterrupted run.
+
+The checkpoint store is cleared once a run completes successfully, so the next run starts from scratch.
+"""
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import IO, Dict, Iterator, Optional
+
+from .storage_connectors.base_connector import ISO_DATE_FORMAT
+from .urn import PartialUrn
+
+logger = logging.getLogger(__name__)
+
+
+def _task_key(get_urn: PartialUrn) -> str:
+    return str(get_urn)
+
+
+def _serialise_discovery_start_times(discovery_start_times: Dict[str, datetime]) -> Dict[str, str]:
+    return {label: discovery_time.strftime(ISO_DATE_FORMAT) for label, discovery_time in discovery_start_times.items()}
+
+
+def _deserialise_discovery_start_times(serialised: Dict[str, str]) -> Dict[str, datetime]:
+    return {label: datetime.strptime(discovery_time, ISO_DATE_FORMAT) for label, discovery_time in serialised.items()}
+
+
+@contextlib.contextmanager
+def checkpointing(checkpoint_store: Optional["BaseCheckpointStore"]) -> Iterator[None]:
+    """Open a checkpoint store for the duration of a run, clearing it if the run completes without raising.
+
+    Arguments:
+        checkpoint_store: The checkpoint store to open (if any).
+    """
+    if checkpoint_store is None:
+        yield
+        return
+    checkpoint_store.open()
+    try:
+        yield
+        checkpoint_store.clear()
+    finally:
+        checkpoint_store.close()
+
+
+class BaseCheckpointStore(ABC):
+    """Abstract class for specification of the CloudWanderer checkpoint store interface.
+
+    Checkpoint stores must be thread safe, as get actions are completed by worker threads when using
+    :meth:`~cloudwanderer.cloud_wanderer.CloudWanderer.write_resources_scheduled`.
+    """
+
+    @abstractmethod
+    def open(self) -> None:
+        """Open the checkpoint store, loading any checkpoints recorded by a previous run."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Close the checkpoint store, persisting any checkpoints recorded."""
+
+    @abstractmethod
+    def read_completed_task(self, get_urn: PartialUrn) -> Optional[Dict[str, datetime]]:
+        """Return the discovery start times recorded for a completed get action, or ``None`` if it is not completed.
+
+        Arguments:
+            get_urn: The get URN of the action.
+        """
+
+    @abstractmethod
+    def record_completed_task(self, get_urn: PartialUrn, discovery_start_times: Dict[str, datetime]) -> None:
+        """Durably record that a get action has completed.
+
+        Arguments:
+            get_urn: The get URN of the action.
+            discovery_start_times: The earliest discovery time of each resource type the action discovered,
+                keyed by ``cloud_service_resource_label``.
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Discard every checkpoint recorded."""
+
+
+class FileCheckpointStore(BaseCheckpointStore):
+    """Record checkpoints by appending a line of JSON to a local file for each completed get action.
+
+    Example:
+        Resume an interrupted run (or start a new one if there is no checkpoint file).
+
+            >>> from cloudwanderer import CloudWanderer
+            >>> from cloudwanderer.checkpoints import FileCheckpointStore
+            >>> from cloudwanderer.storage_connectors import MemoryStorageConnector
+            >>> cloud_wanderer = CloudWanderer(storage_connectors=[MemoryStorageConnector()])
+            >>> cloud_wanderer.write_resources(
+            ...     checkpoint_store=FileCheckpointStore(path="cloudwanderer-checkpoint.jsonl")
+            ... )
+    """
+
+    def __init__(self, path: str = "cloudwanderer-checkpoint.jsonl") -> None:
+        """Initialise the FileCheckpointStore.
+
+        Arguments:
+            path: The path of the checkpoint file.
+        """
+        self.path = path
+        self._completed_tasks: Dict[str, Dict[str, datetime]] = {}
+        self._file: Optional[IO[str]] = None
+        self._lock = threading.Lock()
+
+    def open(self) -> None:
+        with self._lock:
+            self._completed_tasks = {}
+            if not os.path.exists(self.path):
+                return
+            with open(self.path, "r+b") as file:
+                valid_length = 0
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break
+                    self._completed_tasks[record["task"]] = _deserialise_discovery_start_times(
+                        record["discovery_start_times"]
+                    )
+                    valid_length += len(line)
+                # Discard a partially written last line so that the next checkpoint starts on a line of its own.
+                file.truncate(valid_length)
+            logger.info("Loaded %s checkpoints from %s", len(self._completed_tasks), self.path)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+            self._file = None
+
+    def read_completed_task(self, get_urn: PartialUrn) -> Optional[Dict[str, datetime]]:
+        with self._lock:
+            return self._completed_tasks.get(_task_key(get_urn))
+
+    def record_completed_task(self, get_urn: PartialUrn, discovery_start_times: Dict[str, datetime]) -> None:
+        line = json.dumps(
+            {
+                "task": _task_key(get_urn),
+                "discovery_start_times": _serialise_discovery_start_times(discovery_start_times),
+            }
+        )
+        with self._lock:
+            if not self._file:
+                self._file = open(self.path, "a")
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._completed_tasks[_task_key(get_urn)] = dict(discovery_start_times)
+
+    def clear(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+            if os.path.exists(self.path):
+                os.remove(self.path)
+            self._completed_tasks = {}
+
+    def __repr__(self) -> str:
+        """Return an instantiable string representation of this object."""
+        return f'{self.__class__.__name__}(path="{self.path}")'
+
+
+class SQLiteCheckpointStore(BaseCheckpointStore):
+    """Record checkpoints in a local SQLite database, with a row for each completed get action.
+
+    Example:
+        >>> from cloudwanderer import CloudWanderer
+        >>> from cloudwanderer.checkpoints import SQLiteCheckpointStore
+        >>> from cloudwanderer.storage_connectors import MemoryStorageConnector
+        >>> cloud_wanderer = CloudWanderer(storage_connectors=[MemoryStorageConnector()])
+        >>> cloud_wanderer.write_resources_scheduled(
+        ...     checkpoint_store=SQLiteCheckpointStore(database_path="cloudwanderer-checkpoint.sqlite3")
+        ... )
+    """
+
+    def __init__(self, database_path: str = "cloudwanderer-checkpoint.sqlite3") -> None:
+        """Initialise the SQLiteCheckpointStore.
+
+        Arguments:
+            database_path: The path of the SQLite database file.
+        """
+        self.database_path = database_path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self._connection:
+            self.open()
+        return self._connection  # type: ignore
+
+    def open(self) -> None:
+        if self._connection:
+            return
+        # Get actions are completed (and so recorded) by worker threads, not just the one which opened it.
+        self._connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS checkpoints (task TEXT PRIMARY KEY, discovery_start_times TEXT NOT NULL)"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection:
+                self._connection.close()
+            self._connection = None
+
+    def read_completed_task(self, get_urn: PartialUrn) -> Optional[Dict[str, datetime]]:
+        with self._lock:
+            row = self.connection.execute(
+                "SELECT discovery_start_times FROM checkpoints WHERE task = ?", (_task_key(get_urn),)
+            ).fetchone()
+        if row is None:
+            return None
+        return _deserialise_discovery_start_times(json.loads(row[0]))
+
+    def record_completed_task(self, get_urn: PartialUrn, discovery_start_times: Dict[str, datetime]) -> None:
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO checkpoints (task, discovery_start_times) VALUES (?, ?)",
+                (_task_key(get_urn), json.dumps(_serialise_discovery_start_times(discovery_start_times))),
+            )
+
+    def clear(self) -> None:
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM checkpoints")
+
+    def __repr__(self) -> str:
+        """Return an instantiable string representation of this object."""
+        return f'{self.__class__.__name__}(database_path="{self.database_path}")'
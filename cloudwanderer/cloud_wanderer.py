@@ -1,16 +1,25 @@
 """Main cloudwanderer module."""
 import concurrent.futures
+import itertools
 import logging
+import multiprocessing
+import multiprocessing.context
+import os
+import threading
+from collections import defaultdict
 from datetime import datetime
-from typing import Callable, Dict, List, NamedTuple, Optional, Union
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple, Union, cast
 
+from . import process_pool
 from .aws_interface import CloudWandererAWSInterface
 from .base import CloudInterface, ServiceResourceTypeFilter
+from .checkpoints import BaseCheckpointStore, checkpointing
 from .cloud_wanderer_resource import CloudWandererResource
 from .models import ServiceResourceType
+from .scheduler import DiscoveryScheduler, DiscoveryTask
 from .storage_connectors import BaseStorageConnector
 from .urn import URN, PartialUrn
-from .utils import exception_logging_wrapper
+from .utils import exception_logging_wrapper, merge_discovery_start_times
 
 logger = logging.getLogger("cloudwanderer")
 
@@ -32,6 +41,7 @@ class CloudWanderer:
         """
         self.storage_connectors = storage_connectors
         self.cloud_interface = cloud_interface or CloudWandererAWSInterface()
+        self._storage_lock = threading.RLock()
 
     def write_resource(
         self, urn: URN, service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]] = None
@@ -81,6 +91,7 @@ class CloudWanderer:
         regions: Optional[List[str]] = None,
         service_resource_types: Optional[List[ServiceResourceType]] = None,
         service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]] = None,
+        checkpoint_store: Optional[BaseCheckpointStore] = None,
     ) -> None:
         """Fetch all resources in this account from all regions and all services and write to storage.
 
@@ -108,6 +119,9 @@ class CloudWanderer:
             service_resource_type_filters:
                 List of :class:`~cloudwanderer.base.ServiceResourceTypeFilter`
                 specific to the CloudInterface that helps filter resources.
+            checkpoint_store:
+                Record each completed get action in this checkpoint store, skipping those a previous (interrupted)
+                run recorded. It is cleared once this run completes. See :mod:`cloudwanderer.checkpoints`.
 
         Raises:
             ValueError: If invalid get/delete urns are produced by the cloud interface's get_resource_discovery_actions
@@ -118,42 +132,281 @@ class CloudWanderer:
             regions=regions, service_resource_types=service_resource_types
         )
         discovery_start_times: Dict[str, datetime] = {}
+        with checkpointing(checkpoint_store):
+            for action_set in action_sets:
+                for get_urn in action_set.get_urns:
+                    if not _is_valid_get_urn(get_urn):
+                        raise ValueError(f"Invalid get_urn {get_urn}")
+                    self._write_resources_of_type(
+                        get_urn=get_urn,
+                        cloud_interface=self.cloud_interface,
+                        service_resource_type_filters=service_resource_type_filters,
+                        discovery_start_times=discovery_start_times,
+                        checkpoint_store=checkpoint_store,
+                    )
+                for delete_urn in action_set.delete_urns:
+                    if not _is_valid_delete_urn(delete_urn):
+                        raise ValueError(f"Invalid delete_urn {delete_urn}")
+                    self._delete_resources_of_type(delete_urn=delete_urn, discovery_start_times=discovery_start_times)
+        for storage_connector in self.storage_connectors:
+            storage_connector.close()
+
+    def write_resources_scheduled(
+        self,
+        regions: Optional[List[str]] = None,
+        service_resource_types: Optional[List[ServiceResourceType]] = None,
+        service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]] = None,
+        concurrency: int = 10,
+        cloud_interface_generator: Optional[Callable[[], CloudInterface]] = None,
+        checkpoint_store: Optional[BaseCheckpointStore] = None,
+    ) -> None:
+        """Fetch and write resources, running each region/service/resource type on a bounded pool of threads.
+
+        Unlike :meth:`write_resources_concurrently`, which splits work by region, this splits work into
+        individual (region, service, resource_type) tasks with a :class:`~cloudwanderer.scheduler.DiscoveryScheduler`
+        so that one slow resource type does not hold up a whole region.
+        Deletions of stale resources of a type only happen once every task which discovers that type has finished.
+
+        Writes to (and deletes from) the storage connectors are serialised, so the storage connectors
+        do **not** need to be thread safe.
+
+        Example:
+            Fetch AWS EC2 VPCs and IAM roles using four threads.
+
+                >>> from cloudwanderer import CloudWanderer, ServiceResourceType
+                >>> from cloudwanderer.storage_connectors import MemoryStorageConnector
+                >>> cloud_wanderer = CloudWanderer(storage_connectors=[MemoryStorageConnector()])
+                >>> cloud_wanderer.write_resources_scheduled(
+                ...     service_resource_types=[ServiceResourceType("ec2","vpc"), ServiceResourceType("iam","role")],
+                ...     concurrency=4,
+                ... )
+
+        Arguments:
+            regions:
+                The name of the region to get resources from (defaults to session default if not specified)
+            service_resource_types:
+                The resource types to discover.
+            service_resource_type_filters:
+                List of :class:`~cloudwanderer.base.ServiceResourceTypeFilter`
+                specific to the CloudInterface that helps filter resources.
+            concurrency:
+                The maximum number of tasks to run at once.
+            cloud_interface_generator:
+                An optional method which returns a new cloud interface when called. If supplied, each worker
+                thread gets its own cloud interface, otherwise all threads share this CloudWanderer's cloud interface
+                (which must then be thread safe).
+            checkpoint_store:
+                Record each completed get action in this checkpoint store, skipping those a previous (interrupted)
+                run recorded. It is cleared once this run completes. See :mod:`cloudwanderer.checkpoints`.
+
+        Raises:
+            ValueError: If invalid get/delete urns are produced by the cloud interface's get_resource_discovery_actions
+        """
+        action_sets = self.cloud_interface.get_resource_discovery_actions(
+            regions=regions, service_resource_types=service_resource_types
+        )
         for action_set in action_sets:
             for get_urn in action_set.get_urns:
-                if not get_urn.region or not get_urn.service or not get_urn.resource_type:
+                if not _is_valid_get_urn(get_urn):
                     raise ValueError(f"Invalid get_urn {get_urn}")
+            for delete_urn in action_set.delete_urns:
+                if not _is_valid_delete_urn(delete_urn):
+                    raise ValueError(f"Invalid delete_urn {delete_urn}")
 
-                resources = self.cloud_interface.get_resources(
-                    region=get_urn.region,
-                    service_name=get_urn.service,
-                    resource_type=get_urn.resource_type,
-                    service_resource_type_filters=service_resource_type_filters or [],
-                )
-                for resource in resources:
-                    earliest_resource_discovered = discovery_start_times.get(resource.urn.cloud_service_resource_label)
-                    if not earliest_resource_discovered or resource.discovery_time < earliest_resource_discovered:
-                        discovery_start_times[resource.urn.cloud_service_resource_label] = resource.discovery_time
-                    self._write_resource(resource)
+        thread_local = threading.local()
+
+        def get_cloud_interface() -> CloudInterface:
+            if cloud_interface_generator is None:
+                return self.cloud_interface
+            if not hasattr(thread_local, "cloud_interface"):
+                thread_local.cloud_interface = cloud_interface_generator()
+            return thread_local.cloud_interface
+
+        discovery_start_times: Dict[str, datetime] = {}
+        scheduler = DiscoveryScheduler(
+            action_sets=action_sets,
+            get_action=lambda get_urn: self._write_resources_of_type(
+                get_urn=get_urn,
+                cloud_interface=get_cloud_interface(),
+                service_resource_type_filters=service_resource_type_filters,
+                discovery_start_times=discovery_start_times,
+                checkpoint_store=checkpoint_store,
+            ),
+            delete_action=lambda delete_urn: self._delete_resources_of_type(
+                delete_urn=delete_urn, discovery_start_times=discovery_start_times
+            ),
+            concurrency=concurrency,
+        )
+        for storage_connector in self.storage_connectors:
+            storage_connector.open()
+        try:
+            with checkpointing(checkpoint_store):
+                scheduler.run()
+        finally:
+            for storage_connector in self.storage_connectors:
+                storage_connector.close()
+
+    def write_resources_in_processes(
+        self,
+        cloud_interface_generator: Callable[[], CloudInterface],
+        regions: Optional[List[str]] = None,
+        service_resource_types: Optional[List[ServiceResourceType]] = None,
+        service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]] = None,
+        processes: Optional[int] = None,
+        storage_connector_generator: Optional[Callable[[], List[BaseStorageConnector]]] = None,
+        batch_size: int = 100,
+        mp_context: Optional[multiprocessing.context.BaseContext] = None,
+        checkpoint_store: Optional[BaseCheckpointStore] = None,
+    ) -> None:
+        """Fetch and write resources, discovering each region/service/resource type in a pool of worker processes.
+
+        Building and standardising resources is CPU bound, so unlike :meth:`write_resources_scheduled` (whose threads
+        share a single core) this scales across every core. Each worker process gets its own cloud interface from
+        ``cloud_interface_generator`` and discovers one get URN at a time. If ``storage_connector_generator`` is
+        supplied each worker also gets its own storage connectors and writes to them directly, otherwise workers
+        send the resources they discover back to this process in batches of ``batch_size``, already standardised,
+        to be written to this CloudWanderer's storage connectors.
+
+        Stale resources are deleted by this CloudWanderer's storage connectors once every task which discovers their
+        type has finished, so when workers write directly their storage connectors must write to the same storage
+        (e.g. the same DynamoDB table) as this CloudWanderer's.
+
+        Example:
+            Discover every resource in all enabled regions using a process per core.
+
+                >>> from cloudwanderer import CloudWanderer, CloudWandererAWSInterface
+                >>> from cloudwanderer.storage_connectors import MemoryStorageConnector
+                >>> cloud_wanderer = CloudWanderer(storage_connectors=[MemoryStorageConnector()])
+                >>> cloud_wanderer.write_resources_in_processes(cloud_interface_generator=CloudWandererAWSInterface)
+
+        Arguments:
+            cloud_interface_generator:
+                A method which returns a new cloud interface when called (it is called once in each worker process).
+            regions:
+                The name of the region to get resources from (defaults to session default if not specified)
+            service_resource_types:
+                The resource types to discover.
+            service_resource_type_filters:
+                List of :class:`~cloudwanderer.base.ServiceResourceTypeFilter`
+                specific to the CloudInterface that helps filter resources.
+            processes:
+                The number of worker processes (defaults to the number of CPUs).
+            storage_connector_generator:
+                An optional method which returns a list of (unopened) storage connectors when called (it is called
+                once in each worker process).
+            batch_size:
+                The number of resources workers send back to this process at a time.
+            mp_context:
+                The multiprocessing context to start worker processes with (defaults to the default context).
+                Unless it forks, the generators and filters must be picklable (e.g. module level functions).
+            checkpoint_store:
+                Record each completed get action in this checkpoint store, skipping those a previous (interrupted)
+                run recorded. It is cleared once this run completes. See :mod:`cloudwanderer.checkpoints`.
+
+        Raises:
+            ValueError: If invalid get/delete urns are produced by the cloud interface's get_resource_discovery_actions
+            exception: The first exception raised by any task, once every other task has finished.
+        """
+        action_sets = self.cloud_interface.get_resource_discovery_actions(
+            regions=regions, service_resource_types=service_resource_types
+        )
+        for action_set in action_sets:
+            for get_urn in action_set.get_urns:
+                if not _is_valid_get_urn(get_urn):
+                    raise ValueError(f"Invalid get_urn {get_urn}")
             for delete_urn in action_set.delete_urns:
-                if (
-                    not delete_urn.account_id
-                    or not delete_urn.region
-                    or not delete_urn.service
-                    or not delete_urn.resource_type
-                    or not delete_urn.cloud_name
-                ):
+                if not _is_valid_delete_urn(delete_urn):
                     raise ValueError(f"Invalid delete_urn {delete_urn}")
-                for storage_connector in self.storage_connectors:
-                    storage_connector.delete_resource_of_type_in_account_region(
-                        cloud_name=delete_urn.cloud_name,
-                        account_id=delete_urn.account_id,
-                        region=delete_urn.region,
-                        service=delete_urn.service,
-                        resource_type=delete_urn.resource_type,
-                        cutoff=discovery_start_times.get(delete_urn.cloud_service_resource_label),
-                    )
+
+        mp_context = mp_context or multiprocessing.get_context()
+        processes = processes or os.cpu_count() or 1
+        resource_queue = mp_context.Queue()
+        discovery_start_times: Dict[str, datetime] = {}
+        task_ids = itertools.count()
+        in_flight: Dict[int, Tuple[DiscoveryTask, concurrent.futures.Future]] = {}
+        batches_received: Dict[int, int] = defaultdict(int)
+
+        logger.info("Discovering resources with %s processes", processes)
         for storage_connector in self.storage_connectors:
-            storage_connector.close()
+            storage_connector.open()
+        try:
+            with checkpointing(checkpoint_store), concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=mp_context,
+                initializer=process_pool.initialise_worker,
+                initargs=(
+                    cloud_interface_generator,
+                    storage_connector_generator,
+                    resource_queue,
+                    batch_size,
+                    service_resource_type_filters,
+                ),
+            ) as executor:
+
+                def submit_discovery(get_urn: PartialUrn) -> Optional[Tuple[int, concurrent.futures.Future]]:
+                    completed = checkpoint_store.read_completed_task(get_urn) if checkpoint_store else None
+                    if completed is not None:
+                        logger.info("Skipping %s as it was completed by a previous run", get_urn)
+                        merge_discovery_start_times(discovery_start_times, completed)
+                        return None
+                    task_id = next(task_ids)
+                    return task_id, executor.submit(process_pool.discover, task_id, get_urn)
+
+                scheduler = DiscoveryScheduler(
+                    action_sets=action_sets,
+                    get_action=submit_discovery,
+                    delete_action=lambda delete_urn: self._delete_resources_of_type(
+                        delete_urn=delete_urn, discovery_start_times=discovery_start_times
+                    ),
+                    concurrency=processes,
+                )
+                while True:
+                    # Keep a task queued for every worker so none are idle while the results of others are written.
+                    while len(in_flight) < processes * 2:
+                        task = scheduler.pop_ready_task()
+                        if task is None:
+                            break
+                        try:
+                            submitted = scheduler.run_task(task)
+                        except Exception as ex:
+                            scheduler.task_done(task, ex)
+                            continue
+                        if submitted is None:
+                            # Deletes (and checkpointed gets) are done in this process, so are already done.
+                            scheduler.task_done(task)
+                            continue
+                        task_id, future = submitted
+                        in_flight[task_id] = (task, future)
+                    if not in_flight:
+                        break
+                    for batch in process_pool.receive_batches(resource_queue, timeout=0.05):
+                        with self._storage_lock:
+                            for resource in batch.resources:
+                                self._write_resource(resource)
+                        batches_received[batch.task_id] += 1
+                    for task_id, (task, future) in list(in_flight.items()):
+                        if not future.done():
+                            continue
+                        exception = future.exception()
+                        if not exception:
+                            result = future.result()
+                            if batches_received[task_id] < result.batches_sent:
+                                # Its last batches are still on their way.
+                                continue
+                            merge_discovery_start_times(discovery_start_times, result.discovery_start_times)
+                        del in_flight[task_id]
+                        with self._storage_lock:
+                            for storage_connector in self.storage_connectors:
+                                storage_connector.flush()
+                        if checkpoint_store and not exception:
+                            checkpoint_store.record_completed_task(task.urn, result.discovery_start_times)
+                        scheduler.task_done(task, exception)
+                # Raise within the checkpointing context so the checkpoints of a failed run are kept.
+                if scheduler.exception:
+                    raise scheduler.exception
+        finally:
+            for storage_connector in self.storage_connectors:
+                storage_connector.close()
 
     def write_resources_concurrently(
         self,
@@ -209,6 +462,67 @@ class CloudWanderer:
             storage_connector.write_resource(resource)
         return resource.urn
 
+    def _write_resources_of_type(
+        self,
+        get_urn: PartialUrn,
+        cloud_interface: CloudInterface,
+        service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]],
+        discovery_start_times: Dict[str, datetime],
+        checkpoint_store: Optional[BaseCheckpointStore] = None,
+    ) -> None:
+        if checkpoint_store:
+            completed = checkpoint_store.read_completed_task(get_urn)
+            if completed is not None:
+                logger.info("Skipping %s as it was completed by a previous run", get_urn)
+                with self._storage_lock:
+                    merge_discovery_start_times(discovery_start_times, completed)
+                return
+        task_discovery_start_times: Dict[str, datetime] = {}
+        resources = cloud_interface.get_resources(
+            region=cast(str, get_urn.region),
+            service_name=cast(str, get_urn.service),
+            resource_type=cast(str, get_urn.resource_type),
+            service_resource_type_filters=service_resource_type_filters or [],
+        )
+        for resource in resources:
+            earliest_resource_discovered = task_discovery_start_times.get(resource.urn.cloud_service_resource_label)
+            if not earliest_resource_discovered or resource.discovery_time < earliest_resource_discovered:
+                task_discovery_start_times[resource.urn.cloud_service_resource_label] = resource.discovery_time
+            with self._storage_lock:
+                self._write_resource(resource)
+        with self._storage_lock:
+            merge_discovery_start_times(discovery_start_times, task_discovery_start_times)
+            for storage_connector in self.storage_connectors:
+                storage_connector.flush()
+        if checkpoint_store:
+            checkpoint_store.record_completed_task(get_urn, task_discovery_start_times)
+
+    def _delete_resources_of_type(self, delete_urn: PartialUrn, discovery_start_times: Dict[str, datetime]) -> None:
+        with self._storage_lock:
+            for storage_connector in self.storage_connectors:
+                storage_connector.delete_resource_of_type_in_account_region(
+                    cloud_name=cast(str, delete_urn.cloud_name),
+                    account_id=cast(str, delete_urn.account_id),
+                    region=cast(str, delete_urn.region),
+                    service=cast(str, delete_urn.service),
+                    resource_type=cast(str, delete_urn.resource_type),
+                    cutoff=discovery_start_times.get(delete_urn.cloud_service_resource_label),
+                )
+
+
+def _is_valid_get_urn(get_urn: PartialUrn) -> bool:
+    return bool(get_urn.region and get_urn.service and get_urn.resource_type)
+
+
+def _is_valid_delete_urn(delete_urn: PartialUrn) -> bool:
+    return bool(
+        delete_urn.account_id
+        and delete_urn.region
+        and delete_urn.service
+        and delete_urn.resource_type
+        and delete_urn.cloud_name
+    )
+
 
 class CloudWandererConcurrentWriteThreadResult(NamedTuple):
     """The result from write_resources_concurrently."""
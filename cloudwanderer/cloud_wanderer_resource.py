@@ -1,16 +1,28 @@
 """Standardised dataclasses for returning resources from storage."""
 
 import datetime
+import hashlib
+import json
 import logging
-from typing import Any, Callable, Generator, List, Optional, Tuple
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
 
 from botocore import xform_name
 
 from .models import Relationship  # type: ignore
 from .urn import URN
+from .utils import standardise_data_types
 
 logger = logging.getLogger(__name__)
 
+_PICKLED_ATTRIBUTES = (
+    "urn",
+    "relationships",
+    "dependent_resource_urns",
+    "parent_urn",
+    "cloudwanderer_metadata",
+    "discovery_time",
+)
+
 
 class ResourceMetadata:
     """Metadata for a :class:`CloudWandererResource`.
@@ -30,6 +42,35 @@ class ResourceMetadata:
                 The raw dictionary representation of the Resource.
         """
         self.resource_data = resource_data
+        self._standardised_resource_data: Optional[Tuple[dict, Dict[str, Any]]] = None
+
+    @property
+    def standardised_resource_data(self) -> Dict[str, Any]:
+        """Return the resource data normalised by :func:`~cloudwanderer.utils.standardise_data_types`.
+
+        It is only normalised once, no matter how many storage connectors the resource is written to
+        (unless ``resource_data`` is replaced). It must not be modified.
+        """
+        if self._standardised_resource_data is None or self._standardised_resource_data[0] is not self.resource_data:
+            self._standardised_resource_data = (self.resource_data, standardise_data_types(self.resource_data))
+        return self._standardised_resource_data[1]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the state to pickle.
+
+        The standardised resource data is always pickled along with the resource data, so that a resource sent
+        between processes is only standardised by the process which built it.
+        """
+        return {"resource_data": self.resource_data, "standardised_resource_data": self.standardised_resource_data}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the pickled state.
+
+        Arguments:
+            state: The state returned by :meth:`__getstate__`.
+        """
+        self.resource_data = state["resource_data"]
+        self._standardised_resource_data = (self.resource_data, state["standardised_resource_data"])
 
     def __iter__(self) -> Generator[Tuple[str, Any], None, None]:
         """Allow this object to be converted to a dictionary."""
@@ -80,6 +121,7 @@ class CloudWandererResource:
         self.discovery_time = discovery_time or datetime.datetime.now()
 
         self._loader = loader
+        self._content_hash: Optional[str] = None
         self._set_resource_data_attrs()
 
     def load(self) -> None:
@@ -96,6 +138,7 @@ class CloudWandererResource:
             raise ValueError(f"Could not inflate {self}, does not exist in storage")
             return
         self.cloudwanderer_metadata = updated_resource.cloudwanderer_metadata
+        self._content_hash = None
         self._set_resource_data_attrs()
 
     @property
@@ -107,12 +150,53 @@ class CloudWandererResource:
     def is_dependent_resource(self) -> bool:
         return bool(self.parent_urn)
 
+    @property
+    def content_hash(self) -> str:
+        """Return a stable hash of this resource's standardised data, relationships, parent and dependent resources.
+
+        Storage connectors wrapped by :class:`~cloudwanderer.storage_connectors.IncrementalStorageConnector` store it
+        alongside the resource so that the resource can be skipped (or only have its discovery time updated) the next
+        time it is discovered unchanged.
+        It is calculated once, so the resource must not be modified afterwards.
+        """
+        if self._content_hash is None:
+            content = [
+                self.cloudwanderer_metadata.standardised_resource_data,
+                sorted(
+                    f"{relationship.direction.name}#{relationship.partial_urn}" for relationship in self.relationships
+                ),
+                str(self.parent_urn) if self.parent_urn else None,
+                sorted(str(urn) for urn in self.dependent_resource_urns),
+            ]
+            serialised = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+            self._content_hash = hashlib.blake2b(serialised.encode(), digest_size=16).hexdigest()
+        return self._content_hash
+
     def _set_resource_data_attrs(self) -> None:
         for key, value in self.cloudwanderer_metadata.resource_data.items():
             if key.startswith("_"):
                 continue
             setattr(self, xform_name(key), value)
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the state to pickle.
+
+        The attributes copied from the resource data are rebuilt when unpickled rather than pickled, as is the loader
+        (which is usually bound to a storage connector that cannot be pickled).
+        """
+        return {name: getattr(self, name) for name in _PICKLED_ATTRIBUTES}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """Restore the pickled state.
+
+        Arguments:
+            state: The state returned by :meth:`__getstate__`.
+        """
+        self.__dict__.update(state)
+        self._loader = None
+        self._content_hash = None
+        self._set_resource_data_attrs()
+
     def __repr__(self) -> str:
         """Return a code representation of this resource."""
         return str(
@@ -0,0 +1,348 @@
+"""Discover resources across many AWS accounts on a single bounded pool of worker threads.
+
+:class:`~cloudwanderer.cloud_wanderer.CloudWanderer` discovers a single account through a single cloud interface.
+:class:`MultiAccountCloudWanderer` takes a session factory per account (e.g.
+:class:`~cloudwanderer.aws_interface.AssumeRoleSessionFactory`) and breaks every account into
+(account, region, service, resource_type) tasks with a :class:`~cloudwanderer.scheduler.DiscoveryScheduler` per
+account, all of which are run on one pool of ``concurrency`` threads. Each account has at most
+``account_concurrency`` tasks running at once (so that no single account's API limits are hammered) and accounts
+are only started (and their cloud interfaces built) once the accounts already running cannot use a free worker,
+so the time an organisation wide scan takes scales with the size of the pool rather than the number of accounts.
+"""
+import concurrent.futures
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple, cast
+
+from .aws_interface import CloudWandererAWSInterface, CloudWandererBoto3Session
+from .base import CloudInterface, ServiceResourceTypeFilter
+from .cloud_wanderer import CloudWanderer, _is_valid_delete_urn, _is_valid_get_urn
+from .models import ActionSet, ServiceResourceType
+from .scheduler import DiscoveryScheduler, DiscoveryTask
+from .storage_connectors import BaseStorageConnector
+
+logger = logging.getLogger(__name__)
+
+
+class AccountDiscoveryResult(NamedTuple):
+    """The outcome of discovering a single account with :class:`MultiAccountCloudWanderer`."""
+
+    #: The session factory the account was discovered with.
+    session_factory: Callable[[], CloudWandererBoto3Session]
+    #: The ID of the account (``None`` if the account failed before its ID was known).
+    account_id: Optional[str]
+    #: The first exception raised while discovering the account (``None`` if it succeeded).
+    exception: Optional[BaseException]
+
+
+class MultiAccountProgress(NamedTuple):
+    """A snapshot of the progress of :meth:`MultiAccountCloudWanderer.write_resources`."""
+
+    #: The number of accounts being discovered.
+    accounts_total: int
+    #: The number of accounts whose discovery has started.
+    accounts_started: int
+    #: The number of accounts whose discovery has finished (successfully or not).
+    accounts_finished: int
+    #: The number of accounts whose discovery failed.
+    accounts_failed: int
+    #: The number of tasks in the accounts which have started (this grows as accounts start).
+    tasks_total: int
+    #: The number of tasks which have finished (successfully or not).
+    tasks_finished: int
+    #: The number of tasks which failed.
+    tasks_failed: int
+    #: The number of seconds since discovery started.
+    elapsed_seconds: float
+
+
+class _AccountRun:
+    """The state of the discovery of a single account."""
+
+    def __init__(self, session_factory: Callable[[], CloudWandererBoto3Session]) -> None:
+        self.session_factory = session_factory
+        self.account_id: Optional[str] = getattr(session_factory, "account_id", None)
+        self.session: Optional[CloudWandererBoto3Session] = None
+        #: The cloud interface of each worker thread which has run a task of this account, keyed by thread id.
+        self.cloud_interfaces: Dict[int, CloudInterface] = {}
+        self.scheduler: Optional[DiscoveryScheduler] = None
+        self.discovery_start_times: Dict[str, datetime] = {}
+        self.exception: Optional[BaseException] = None
+        self.planning = False
+
+    @property
+    def running(self) -> int:
+        return int(self.planning) + (self.scheduler.running if self.scheduler else 0)
+
+    @property
+    def finished(self) -> bool:
+        if self.exception and not self.running:
+            return True
+        return self.scheduler is not None and self.scheduler.finished
+
+    def close_cloud_interfaces(self) -> None:
+        for cloud_interface in self.cloud_interfaces.values():
+            cloud_interface.close()
+        self.cloud_interfaces.clear()
+
+    def __str__(self) -> str:
+        return self.account_id or repr(self.session_factory)
+
+
+class MultiAccountCloudWanderer:
+    """Discover resources in many accounts concurrently and write them to storage.
+
+    Writes to (and deletes from) the storage connectors are serialised, so the storage connectors
+    do **not** need to be thread safe.
+
+    Example:
+        Discover EC2 VPCs in three accounts, sharing an adaptive rate limiter between them.
+
+            >>> from cloudwanderer import ServiceResourceType
+            >>> from cloudwanderer.aws_interface import AdaptiveRateLimiter, AssumeRoleSessionFactory
+            >>> from cloudwanderer.multi_account import MultiAccountCloudWanderer
+            >>> from cloudwanderer.storage_connectors import MemoryStorageConnector
+            >>> rate_limiter = AdaptiveRateLimiter()
+            >>> multi_account_cloud_wanderer = MultiAccountCloudWanderer(
+            ...     storage_connectors=[MemoryStorageConnector()],
+            ...     session_factories=[
+            ...         AssumeRoleSessionFactory(
+            ...             role_arn=f"arn:aws:iam::{account_id}:role/CloudWanderer", rate_limiter=rate_limiter
+            ...         )
+            ...         for account_id in ["111111111111", "222222222222", "333333333333"]
+            ...     ],
+            ...     concurrency=20,
+            ...     account_concurrency=4,
+            ... )
+            >>> results = multi_account_cloud_wanderer.write_resources(
+            ...     service_resource_types=[ServiceResourceType("ec2","vpc")]
+            ... )
+    """
+
+    def __init__(
+        self,
+        storage_connectors: List[BaseStorageConnector],
+        session_factories: List[Callable[[], CloudWandererBoto3Session]],
+        concurrency: int = 20,
+        account_concurrency: int = 4,
+        cloud_interface_factory: Callable[[CloudWandererBoto3Session], CloudInterface] = CloudWandererAWSInterface,
+    ) -> None:
+        """Initialise MultiAccountCloudWanderer.
+
+        Arguments:
+            storage_connectors:
+                CloudWanderer storage connector objects.
+            session_factories:
+                A callable per account which returns a session authenticated against that account
+                (e.g. :class:`~cloudwanderer.aws_interface.AssumeRoleSessionFactory`).
+                Each is called (from a worker thread) once, when discovery of its account starts.
+            concurrency:
+                The number of worker threads shared by all accounts.
+            account_concurrency:
+                The maximum number of tasks of a single account to run at once.
+            cloud_interface_factory:
+                The callable which builds an account's cloud interface from its session. Each worker thread gets
+                its own cloud interface for each account it runs tasks of, all built from the account's session
+                (which is shared between them).
+
+
+        Raises:
+            ValueError: If either concurrency is less than one.
+        """
+        if concurrency < 1 or account_concurrency < 1:
+            raise ValueError("concurrency and account_concurrency must be at least 1")
+        self.storage_connectors = storage_connectors
+        self.session_factories = session_factories
+        self.concurrency = concurrency
+        self.account_concurrency = account_concurrency
+        self.cloud_interface_factory = cloud_interface_factory
+
+    def write_resources(
+        self,
+        regions: Optional[List[str]] = None,
+        service_resource_types: Optional[List[ServiceResourceType]] = None,
+        service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]] = None,
+        progress_callback: Optional[Callable[[MultiAccountProgress], Any]] = None,
+    ) -> List[AccountDiscoveryResult]:
+        """Fetch all resources in every account and write them to storage.
+
+        A failure in one account does not stop the discovery of the others; the result of each account is returned
+        (in the same order as ``session_factories``). As with
+        :meth:`~cloudwanderer.cloud_wanderer.CloudWanderer.write_resources_scheduled`, stale resources of a type are
+        only deleted once every task which discovers that type (in that account) has succeeded.
+
+        Arguments:
+            regions:
+                The name of the regions to get resources from (defaults to each account's enabled regions)
+            service_resource_types:
+                The resource types to discover.
+            service_resource_type_filters:
+                List of :class:`~cloudwanderer.base.ServiceResourceTypeFilter`
+                specific to the CloudInterface that helps filter resources.
+            progress_callback:
+                Called (from the calling thread) with a :class:`MultiAccountProgress` each time a task finishes.
+        """
+        # Borrow CloudWanderer's serialised writes and deletes, passing each account's cloud interface explicitly.
+        cloud_wanderer = CloudWanderer(storage_connectors=self.storage_connectors)
+        account_runs = [_AccountRun(session_factory) for session_factory in self.session_factories]
+        not_started: Deque[_AccountRun] = deque(account_runs)
+        started: List[_AccountRun] = []
+        counters = dict.fromkeys(["tasks_total", "tasks_finished", "tasks_failed"], 0)
+        start_time = time.monotonic()
+
+        def get_cloud_interface(account_run: _AccountRun) -> CloudInterface:
+            # Only this thread reads or writes its own entry, and the entries are only closed once none of the
+            # account's tasks are running.
+            thread_id = threading.get_ident()
+            if thread_id not in account_run.cloud_interfaces:
+                account_run.cloud_interfaces[thread_id] = self.cloud_interface_factory(
+                    cast(CloudWandererBoto3Session, account_run.session)
+                )
+            return account_run.cloud_interfaces[thread_id]
+
+        def plan(account_run: _AccountRun) -> List[ActionSet]:
+            account_run.session = account_run.session_factory()
+            account_run.account_id = account_run.session.get_account_id()
+            action_sets = get_cloud_interface(account_run).get_resource_discovery_actions(
+                regions=regions, service_resource_types=service_resource_types
+            )
+            for action_set in action_sets:
+                for get_urn in action_set.get_urns:
+                    if not _is_valid_get_urn(get_urn):
+                        raise ValueError(f"Invalid get_urn {get_urn}")
+                for delete_urn in action_set.delete_urns:
+                    if not _is_valid_delete_urn(delete_urn):
+                        raise ValueError(f"Invalid delete_urn {delete_urn}")
+            return action_sets
+
+        def build_scheduler(account_run: _AccountRun, action_sets: List[ActionSet]) -> DiscoveryScheduler:
+            return DiscoveryScheduler(
+                action_sets=action_sets,
+                get_action=lambda get_urn: cloud_wanderer._write_resources_of_type(
+                    get_urn=get_urn,
+                    cloud_interface=get_cloud_interface(account_run),
+                    service_resource_type_filters=service_resource_type_filters,
+                    discovery_start_times=account_run.discovery_start_times,
+                ),
+                delete_action=lambda delete_urn: cloud_wanderer._delete_resources_of_type(
+                    delete_urn=delete_urn, discovery_start_times=account_run.discovery_start_times
+                ),
+                concurrency=self.account_concurrency,
+            )
+
+        def progress() -> MultiAccountProgress:
+            return MultiAccountProgress(
+                accounts_total=len(account_runs),
+                accounts_started=len(started),
+                accounts_finished=sum(account_run.finished for account_run in started),
+                accounts_failed=sum(bool(account_run.exception) for account_run in started),
+                elapsed_seconds=time.monotonic() - start_time,
+                **counters,
+            )
+
+        logger.info(
+            "Discovering %s accounts with a concurrency of %s (%s per account)",
+            len(account_runs),
+            self.concurrency,
+            self.account_concurrency,
+        )
+        for storage_connector in self.storage_connectors:
+            storage_connector.open()
+        running: Dict[concurrent.futures.Future, Tuple[_AccountRun, Optional[DiscoveryTask]]] = {}
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                while True:
+                    while len(running) < self.concurrency:
+                        submitted = self._submit_next_task(executor, started, not_started, plan)
+                        if submitted is None:
+                            break
+                        future, account_run, task = submitted
+                        running[future] = (account_run, task)
+                    if not running:
+                        break
+                    done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                    for future in done:
+                        account_run, task = running.pop(future)
+                        exception = future.exception()
+                        if task is None:
+                            account_run.planning = False
+                            if exception:
+                                logger.error("Failed to start discovery of %s", account_run, exc_info=exception)
+                                account_run.exception = exception
+                                account_run.close_cloud_interfaces()
+                                continue
+                            account_run.scheduler = build_scheduler(account_run, future.result())
+                            counters["tasks_total"] += len(account_run.scheduler.get_tasks) + len(
+                                account_run.scheduler.delete_tasks
+                            )
+                            continue
+                        scheduler = cast(DiscoveryScheduler, account_run.scheduler)
+                        scheduler.task_done(task, exception)
+                        account_run.exception = scheduler.exception
+                        counters["tasks_finished"] += 1
+                        counters["tasks_failed"] += bool(exception)
+                        if account_run.finished:
+                            logger.info("Finished discovering %s", account_run)
+                            account_run.close_cloud_interfaces()
+                    current_progress = progress()
+                    logger.debug("Discovery progress: %s", current_progress)
+                    if progress_callback:
+                        progress_callback(current_progress)
+        finally:
+            for account_run in started:
+                account_run.close_cloud_interfaces()
+            for storage_connector in self.storage_connectors:
+                storage_connector.close()
+        logger.info("Finished discovering %s accounts: %s", len(account_runs), progress())
+        return [
+            AccountDiscoveryResult(
+                session_factory=account_run.session_factory,
+                account_id=account_run.account_id,
+                exception=account_run.exception,
+            )
+            for account_run in account_runs
+        ]
+
+    def _submit_next_task(
+        self,
+        executor: concurrent.futures.Executor,
+        started: List[_AccountRun],
+        not_started: Deque[_AccountRun],
+        plan: Callable[[_AccountRun], List[ActionSet]],
+    ) -> Optional[Tuple[concurrent.futures.Future, _AccountRun, Optional[DiscoveryTask]]]:
+        """Submit the next task of the earliest started account which has one ready, or start the next account.
+
+        Returns the submitted future, its account and its task (``None`` when starting the account), or ``None`` if
+        there is nothing which can be run until a running task finishes.
+
+        Arguments:
+            executor: The executor to submit to.
+            started: The accounts whose discovery has started, earliest first.
+            not_started: The accounts whose discovery has not yet started.
+            plan: The callable which builds an account's cloud interface and returns its ActionSets.
+        """
+        for account_run in started:
+            if not account_run.scheduler or account_run.running >= self.account_concurrency:
+                continue
+            task = account_run.scheduler.pop_ready_task()
+            if task is None:
+                continue
+            return executor.submit(account_run.scheduler.run_task, task), account_run, task
+        if not not_started:
+            return None
+        account_run = not_started.popleft()
+        logger.info("Starting discovery of %s", account_run)
+        started.append(account_run)
+        account_run.planning = True
+        return executor.submit(plan, account_run), account_run, None
+
+    def __repr__(self) -> str:
+        """Return a string representation of this object."""
+        return (
+            f"{self.__class__.__name__}(storage_connectors={self.storage_connectors}, "
+            f"session_factories={self.session_factories}, concurrency={self.concurrency}, "
+            f"account_concurrency={self.account_concurrency})"
+        )
@@ -0,0 +1,148 @@
+"""The worker side of :meth:`~cloudwanderer.cloud_wanderer.CloudWanderer.write_resources_in_processes`.
+
+Turning Boto3 resources into :class:`~cloudwanderer.cloud_wanderer_resource.CloudWandererResource` objects
+(normalising their data, extracting their relationships and building their URNs) and standardising their data for
+storage is CPU bound pure Python, so threads cannot use more than one core to do it. Each worker process builds its
+own cloud interface (and optionally its own storage connectors) once, when it starts, and then discovers one get URN
+per task. A worker either writes the resources it discovers to its own storage connectors, or sends them back to the
+parent process (along with their standardised data) in batches of pickled resources for the parent to write.
+"""
+import logging
+import queue
+from datetime import datetime
+from multiprocessing.util import Finalize
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, cast
+
+from .base import CloudInterface, ServiceResourceTypeFilter
+from .cloud_wanderer_resource import CloudWandererResource
+from .storage_connectors import BaseStorageConnector
+from .urn import PartialUrn
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceBatch(NamedTuple):
+    """A batch of resources sent from a worker process to the parent process."""
+
+    #: The id of the task which discovered the resources.
+    task_id: int
+    #: The resources discovered.
+    resources: List[CloudWandererResource]
+
+
+class WorkerTaskResult(NamedTuple):
+    """The result of discovering a get URN in a worker process."""
+
+    #: The earliest discovery time of each resource type discovered, keyed by ``cloud_service_resource_label``.
+    discovery_start_times: Dict[str, datetime]
+    #: The number of :class:`ResourceBatch` objects sent to the parent process.
+    batches_sent: int
+
+
+class _WorkerState(NamedTuple):
+    cloud_interface: CloudInterface
+    storage_connectors: List[BaseStorageConnector]
+    resource_queue: Any
+    batch_size: int
+    service_resource_type_filters: List[ServiceResourceTypeFilter]
+
+
+_worker_state: Optional[_WorkerState] = None
+
+
+def initialise_worker(
+    cloud_interface_generator: Callable[[], CloudInterface],
+    storage_connector_generator: Optional[Callable[[], List[BaseStorageConnector]]],
+    resource_queue: Any,
+    batch_size: int,
+    service_resource_type_filters: Optional[List[ServiceResourceTypeFilter]],
+) -> None:
+    """Build the cloud interface (and storage connectors) of a worker process, called once as each worker starts.
+
+    Arguments:
+        cloud_interface_generator: Returns this worker's cloud interface.
+        storage_connector_generator: Returns this worker's (unopened) storage connectors, or ``None`` to send
+            resources to the parent process instead.
+        resource_queue: The multiprocessing queue to send :class:`ResourceBatch` objects to the parent process on.
+        batch_size: The number of resources to send to the parent process in each batch.
+        service_resource_type_filters: The filters to pass to the cloud interface's ``get_resources``.
+    """
+    global _worker_state
+    storage_connectors = storage_connector_generator() if storage_connector_generator else []
+    for storage_connector in storage_connectors:
+        storage_connector.open()
+    if storage_connectors:
+        # Worker processes exit without running atexit handlers, but they do run multiprocessing's finalizers.
+        Finalize(None, _close_storage_connectors, args=(storage_connectors,), exitpriority=10)
+    _worker_state = _WorkerState(
+        cloud_interface=cloud_interface_generator(),
+        storage_connectors=storage_connectors,
+        resource_queue=resource_queue,
+        batch_size=batch_size,
+        service_resource_type_filters=service_resource_type_filters or [],
+    )
+
+
+def _close_storage_connectors(storage_connectors: List[BaseStorageConnector]) -> None:
+    for storage_connector in storage_connectors:
+        storage_connector.close()
+
+
+def discover(task_id: int, get_urn: PartialUrn) -> WorkerTaskResult:
+    """Discover the resources of a get URN in a worker process.
+
+    Arguments:
+        task_id: The id the parent process uses to match the batches sent to this task.
+        get_urn: The partial URN of the region, service and resource type to discover.
+
+    Raises:
+        RuntimeError: If called outside of a worker process initialised by :func:`initialise_worker`.
+    """
+    if _worker_state is None:
+        raise RuntimeError("discover must be called from a worker process initialised by initialise_worker")
+    discovery_start_times: Dict[str, datetime] = {}
+    batch: List[CloudWandererResource] = []
+    batches_sent = 0
+    resources = _worker_state.cloud_interface.get_resources(
+        region=cast(str, get_urn.region),
+        service_name=cast(str, get_urn.service),
+        resource_type=cast(str, get_urn.resource_type),
+        service_resource_type_filters=_worker_state.service_resource_type_filters,
+    )
+    for resource in resources:
+        label = resource.urn.cloud_service_resource_label
+        if label not in discovery_start_times or resource.discovery_time < discovery_start_times[label]:
+            discovery_start_times[label] = resource.discovery_time
+        if _worker_state.storage_connectors:
+            for storage_connector in _worker_state.storage_connectors:
+                storage_connector.write_resource(resource)
+            continue
+        # Pickling a resource standardises its data (see ResourceMetadata.__getstate__), so the standardised data
+        # is sent to the parent process and its storage connectors do not standardise it again.
+        batch.append(resource)
+        if len(batch) >= _worker_state.batch_size:
+            _worker_state.resource_queue.put(ResourceBatch(task_id=task_id, resources=batch))
+            batches_sent += 1
+            batch = []
+    if batch:
+        _worker_state.resource_queue.put(ResourceBatch(task_id=task_id, resources=batch))
+        batches_sent += 1
+    for storage_connector in _worker_state.storage_connectors:
+        storage_connector.flush()
+    return WorkerTaskResult(discovery_start_times=discovery_start_times, batches_sent=batches_sent)
+
+
+def receive_batches(resource_queue: Any, timeout: float) -> List[ResourceBatch]:
+    """Return the batches waiting on the queue, waiting up to timeout seconds for the first one.
+
+    Arguments:
+        resource_queue: The multiprocessing queue the workers send batches on.
+        timeout: The number of seconds to wait for a batch if none are waiting.
+    """
+    batches: List[ResourceBatch] = []
+    try:
+        batches.append(resource_queue.get(timeout=timeout))
+        while True:
+            batches.append(resource_queue.get_nowait())
+    except queue.Empty:
+        return batches
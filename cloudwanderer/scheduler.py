@@ -0,0 +1,199 @@
+"""Schedule discovery actions across a bounded pool of worker threads.
+
+:meth:`~cloudwanderer.cloud_wanderer.CloudWanderer.write_resources` walks every get action one after another,
+so a single slow resource type holds up every resource type queued behind it. The :class:`DiscoveryScheduler`
+breaks the :class:`~cloudwanderer.models.ActionSet` objects returned by
+:meth:`~cloudwanderer.base.CloudInterface.get_resource_discovery_actions` into individual
+(region, service, resource_type) tasks and runs them concurrently.
+
+Delete actions are held back until every get action that could have discovered their resource type has finished,
+so that the cutoff they use is the earliest discovery time of that resource type, exactly as it is when running
+serially.
+"""
+import concurrent.futures
+import logging
+from collections import defaultdict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, NamedTuple, Optional, Set
+
+from .models import ActionSet
+from .urn import PartialUrn
+
+logger = logging.getLogger(__name__)
+
+
+class DiscoveryTask(NamedTuple):
+    """A single get or delete action to be run by the :class:`DiscoveryScheduler`."""
+
+    #: The partial URN specifying the account, region, service and resource type to act on.
+    urn: PartialUrn
+    #: The keys of the get tasks this task must wait for before it runs.
+    dependencies: List[Hashable]
+
+
+def _resource_type_key(urn: PartialUrn) -> Hashable:
+    return (urn.account_id, urn.cloud_name, urn.service, urn.resource_type)
+
+
+def _service_key(urn: PartialUrn) -> Hashable:
+    return (urn.account_id, urn.cloud_name, urn.service)
+
+
+class DiscoveryScheduler:
+    """Run the get and delete actions of a list of ActionSets on a bounded pool of worker threads.
+
+    Get actions are run as soon as a worker is free. A delete action runs once every get action for its
+    resource type has finished. Dependent resource types (e.g. ``role_policy``) have no get actions of their
+    own as they are discovered alongside their parents, so their delete actions wait for every get action of
+    the same service instead.
+
+    If a get action fails, the delete actions that depend upon it are skipped, as their cutoff would be
+    calculated from an incomplete set of resources. The first exception raised is re-raised once every other
+    task has finished.
+
+    Example:
+        >>> from cloudwanderer.scheduler import DiscoveryScheduler
+        >>> scheduler = DiscoveryScheduler(
+        ...     action_sets=[],
+        ...     get_action=print,
+        ...     delete_action=print,
+        ...     concurrency=4,
+        ... )
+        >>> scheduler.run()
+    """
+
+    def __init__(
+        self,
+        action_sets: List[ActionSet],
+        get_action: Callable[[PartialUrn], Any],
+        delete_action: Callable[[PartialUrn], Any],
+        concurrency: int = 10,
+    ) -> None:
+        """Initialise the DiscoveryScheduler.
+
+        Arguments:
+            action_sets: The ActionSets to break into tasks.
+            get_action: The callable to run for each get urn (it will be called from a worker thread).
+            delete_action: The callable to run for each delete urn (it will be called from a worker thread).
+            concurrency: The maximum number of tasks to run at once.
+        """
+        self.get_action = get_action
+        self.delete_action = delete_action
+        self.concurrency = concurrency
+        self.get_tasks: List[DiscoveryTask] = []
+        self.delete_tasks: List[DiscoveryTask] = []
+        #: The first exception raised by a task.
+        self.exception: Optional[BaseException] = None
+        self._load_action_sets(action_sets)
+        self._get_task_ids = {id(get_task) for get_task in self.get_tasks}
+        self._outstanding: Dict[Hashable, int] = defaultdict(int)
+        for get_task in self.get_tasks:
+            for key in (_resource_type_key(get_task.urn), _service_key(get_task.urn)):
+                self._outstanding[key] += 1
+        self._failed_keys: Set[Hashable] = set()
+        self._ready_tasks: Deque[DiscoveryTask] = deque(self.get_tasks)
+        self._waiting_delete_tasks = list(self.delete_tasks)
+        self._running = 0
+        self._queue_ready_delete_tasks()
+
+    def _load_action_sets(self, action_sets: List[ActionSet]) -> None:
+        get_urns = [get_urn for action_set in action_sets for get_urn in action_set.get_urns]
+        resource_type_keys = {_resource_type_key(get_urn) for get_urn in get_urns}
+        for get_urn in get_urns:
+            self.get_tasks.append(DiscoveryTask(urn=get_urn, dependencies=[]))
+        for action_set in action_sets:
+            for delete_urn in action_set.delete_urns:
+                if _resource_type_key(delete_urn) in resource_type_keys:
+                    dependency = _resource_type_key(delete_urn)
+                else:
+                    dependency = _service_key(delete_urn)
+                self.delete_tasks.append(DiscoveryTask(urn=delete_urn, dependencies=[dependency]))
+
+    @property
+    def running(self) -> int:
+        """The number of tasks which have been popped but are not yet done."""
+        return self._running
+
+    @property
+    def finished(self) -> bool:
+        """Whether every task has either run or been skipped."""
+        return not self._ready_tasks and not self._waiting_delete_tasks and not self._running
+
+    def pop_ready_task(self) -> Optional[DiscoveryTask]:
+        """Return the next task which is ready to run (or ``None`` if there are none), marking it as running.
+
+        Pass the task to :meth:`run_task` (e.g. in a worker thread) and then to :meth:`task_done`.
+        This and :meth:`task_done` must be called from a single (coordinating) thread.
+        """
+        if not self._ready_tasks:
+            return None
+        self._running += 1
+        return self._ready_tasks.popleft()
+
+    def run_task(self, task: DiscoveryTask) -> Any:
+        """Run the get or delete action of a task, returning whatever the action returns.
+
+        Arguments:
+            task: The task to run.
+        """
+        if id(task) in self._get_task_ids:
+            return self.get_action(task.urn)
+        return self.delete_action(task.urn)
+
+    def task_done(self, task: DiscoveryTask, exception: Optional[BaseException] = None) -> None:
+        """Record that a task has finished, making any delete tasks that were waiting for it ready.
+
+        Arguments:
+            task: The task which has finished.
+            exception: The exception the task raised, if it failed.
+        """
+        self._running -= 1
+        if exception:
+            logger.error("Task for %s failed", task.urn, exc_info=exception)
+            self.exception = self.exception or exception
+        if id(task) in self._get_task_ids:
+            for key in (_resource_type_key(task.urn), _service_key(task.urn)):
+                self._outstanding[key] -= 1
+                if exception:
+                    self._failed_keys.add(key)
+        self._queue_ready_delete_tasks()
+
+    def _queue_ready_delete_tasks(self) -> None:
+        for delete_task in list(self._waiting_delete_tasks):
+            if any(self._outstanding[dependency] for dependency in delete_task.dependencies):
+                continue
+            self._waiting_delete_tasks.remove(delete_task)
+            if self._failed_keys.intersection(delete_task.dependencies):
+                logger.warning("Skipping deletion of %s as its discovery failed", delete_task.urn)
+                continue
+            self._ready_tasks.append(delete_task)
+
+    def run(self) -> None:
+        """Run all tasks, blocking until they have finished.
+
+        The first exception raised by any task is re-raised once all other tasks have finished.
+        """
+        logger.info(
+            "Scheduling %s get tasks and %s delete tasks with a concurrency of %s",
+            len(self.get_tasks),
+            len(self.delete_tasks),
+            self.concurrency,
+        )
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            running: Dict[concurrent.futures.Future, DiscoveryTask] = {}
+            first_failed_future: Optional[concurrent.futures.Future] = None
+            while True:
+                while len(running) < self.concurrency:
+                    task = self.pop_ready_task()
+                    if task is None:
+                        break
+                    running[executor.submit(self.run_task, task)] = task
+                if not running:
+                    break
+                done, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception():
+                        first_failed_future = first_failed_future or future
+                    self.task_done(running.pop(future), future.exception())
+
+        if first_failed_future:
+            first_failed_future.result()
@@ -2,6 +2,19 @@
 from .base_connector import BaseStorageConnector
 from .dynamodb import DynamoDbConnector
 from .gremlin import GremlinStorageConnector
+from .incremental import IncrementalStorageConnector
+from .jsonlines import JsonLinesStorageConnector
 from .memory import MemoryStorageConnector
+from .parquet import ParquetStorageConnector
+from .sqlite import SQLiteStorageConnector
 
-__all__ = ["DynamoDbConnector", "MemoryStorageConnector", "BaseStorageConnector", "GremlinStorageConnector"]
+__all__ = [
+    "DynamoDbConnector",
+    "MemoryStorageConnector",
+    "BaseStorageConnector",
+    "GremlinStorageConnector",
+    "SQLiteStorageConnector",
+    "ParquetStorageConnector",
+    "JsonLinesStorageConnector",
+    "IncrementalStorageConnector",
+]
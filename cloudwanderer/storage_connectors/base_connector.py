@@ -1,7 +1,7 @@
 """Module containing abstract classes for CloudWanderer storage connectors."""
 from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import Iterator, Optional
+from typing import Dict, Iterator, Optional
 
 from ..cloud_wanderer_resource import CloudWandererResource
 from ..urn import URN
@@ -12,6 +12,11 @@ ISO_DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
 class BaseStorageConnector(ABC):
     """Abstract class for specification of the CloudWanderer storage connector interface."""
 
+    #: Whether to store the :attr:`~cloudwanderer.cloud_wanderer_resource.CloudWandererResource.content_hash` of
+    #: each resource written (set by :class:`~cloudwanderer.storage_connectors.IncrementalStorageConnector`).
+    #: Connectors which store content hashes clear the stored hash of resources written without one.
+    store_content_hashes = False
+
     @abstractmethod
     def init(self) -> None:
         """Initialise the storage backend whatever it is."""
@@ -24,6 +29,12 @@ class BaseStorageConnector(ABC):
     def close(self) -> None:
         """Close the connection to the backend storage."""
 
+    def flush(self) -> None:
+        """Persist any writes the storage connector has buffered.
+
+        Called by :class:`~cloudwanderer.cloud_wanderer.CloudWanderer` whenever it finishes writing a resource type.
+        """
+
     @abstractmethod
     def write_resource(self, resource: CloudWandererResource) -> None:
         """Persist a single resource to storage.
@@ -32,6 +43,39 @@ class BaseStorageConnector(ABC):
             resource (CloudWandererResource): The CloudWandererResource to write.
         """
 
+    def touch_resource(self, resource: CloudWandererResource) -> None:
+        """Update the discovery time of a resource which is unchanged since it was last written.
+
+        Connectors which can update a stored resource's discovery time more cheaply than rewriting it should
+        override this, by default the resource is written in full.
+
+        Arguments:
+            resource (CloudWandererResource): The unchanged CloudWandererResource.
+        """
+        self.write_resource(resource)
+
+    def read_content_hashes(
+        self, cloud_name: str, account_id: str, region: str, service: str, resource_type: str
+    ) -> Dict[str, Optional[str]]:
+        """Return the content hash stored with each resource of a type in an account and region, keyed by URN string.
+
+        These are the :attr:`~cloudwanderer.cloud_wanderer_resource.CloudWandererResource.content_hash` of each
+        resource when it was last written (or ``None`` for resources written without one).
+        Used by :class:`~cloudwanderer.storage_connectors.IncrementalStorageConnector`, which only wraps
+        connectors which override this.
+
+        Arguments:
+            cloud_name: The name of the cloud (e.g. ``aws``)
+            account_id: Cloud Account ID (e.g. ``111111111111``)
+            region: Cloud region (e.g. ``'eu-west-2'``)
+            service: Service name (e.g. ``'ec2'``)
+            resource_type: Resource Type (e.g. ``'instance'``)
+
+        Raises:
+            NotImplementedError: If this storage connector does not store content hashes.
+        """
+        raise NotImplementedError(f"{self.__class__.__name__} does not store content hashes")
+
     @abstractmethod
     def read_all(self) -> Iterator[dict]:
         """Return all records from storage."""
@@ -1,4 +1,5 @@
 """Allows CloudWanderer to store resources in DynamoDB."""
+import concurrent.futures
 import datetime
 import itertools
 import json
@@ -6,10 +7,27 @@ import logging
 import operator
 import os
 import pathlib
+import queue
 import sys
+import threading
+import time
 from functools import reduce
-from random import randrange
-from typing import TYPE_CHECKING, Any, Callable, Dict, Generator, Iterable, Iterator, Optional, Union, cast
+from random import randrange, uniform
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 if sys.version_info >= (3, 8):
     from typing import Literal, TypedDict
@@ -26,11 +44,35 @@ else:
 
 from ..cloud_wanderer_resource import CloudWandererResource
 from ..urn import URN
-from ..utils import standardise_data_types
 from .base_connector import ISO_DATE_FORMAT, BaseStorageConnector
 
 logger = logging.getLogger(__name__)
 
+#: The maximum number of items DynamoDB accepts in a single BatchWriteItem request.
+BATCH_WRITE_MAX_ITEMS = 25
+
+_SHARD_FINISHED = object()
+
+
+class DynamoDbWriteStatistics(NamedTuple):
+    """A snapshot of the write throughput of a :class:`DynamoDbConnector`."""
+
+    #: The number of items written (including items deleted by a ``BatchWriteItem`` request).
+    items_written: int
+    #: The number of ``PutItem``/``BatchWriteItem`` requests made.
+    requests: int
+    #: The number of items DynamoDB returned as unprocessed, which had to be retried.
+    unprocessed_items_retried: int
+    #: The number of seconds spent waiting on write requests (including backoff).
+    seconds_writing: float
+
+    @property
+    def items_per_second(self) -> float:
+        """Return the number of items written per second spent writing."""
+        if not self.seconds_writing:
+            return 0.0
+        return self.items_written / self.seconds_writing
+
 
 class DynamoDBQueryArgs(TypedDict, total=False):
     """Valid DynamoDB Query args to facilitate type hinting."""
@@ -41,6 +83,8 @@ class DynamoDBQueryArgs(TypedDict, total=False):
     KeyConditionExpression: Optional[Union[str, ConditionBase]]
     FilterExpression: Optional[Union[str, ConditionBase]]
     IndexName: Optional[str]
+    ProjectionExpression: str
+    ExpressionAttributeNames: Dict[str, str]
 
 
 def _gen_resource_type_index(service: str, resource_type: str) -> str:
@@ -95,6 +139,15 @@ def _primary_key_from_urn(urn: URN) -> str:
     return f"resource#{urn}"
 
 
+def _urn_string_from_primary_key(pk: str) -> str:
+    """Return the string URN from a resource's primary key without parsing it.
+
+    Arguments:
+        pk (str): The primary key from which to strip the URN.
+    """
+    return pk.partition("#")[2]
+
+
 def _urn_from_primary_key(pk: str) -> URN:
     """Create an URN from a resource's primary key.
 
@@ -130,6 +183,21 @@ def _dynamodb_items_to_resources(items: Iterable[dict], loader: Callable) -> Ite
         )
 
 
+def _drain_shard_queue(shard_queue: queue.Queue, number_of_shards: int) -> Iterator[CloudWandererResource]:
+    """Yield resources from a queue until ``number_of_shards`` shards have finished writing to it.
+
+    Arguments:
+        shard_queue: The queue the shard queries are putting resources onto.
+        number_of_shards: The number of shard queries putting resources onto the queue.
+    """
+    while number_of_shards:
+        item = shard_queue.get()
+        if item is _SHARD_FINISHED:
+            number_of_shards -= 1
+            continue
+        yield item
+
+
 def _strip_dynamodb_attrs(raw_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Remove any underscore prefixed keys as these are attributes we use to identify the DynamoDB record.
 
@@ -155,6 +223,17 @@ class DynamoDbConnector(BaseStorageConnector):
             Prevents hot-partitions. If you don't know what this means, ignore this setting.
         client_args (dict): Arguments to pass into the boto3 client.
             See: :meth:`boto3.session.Session.client`
+        batch_writes (bool):
+            Buffer writes and send them in ``BatchWriteItem`` requests of 25 items rather than one ``PutItem``
+            per resource. Buffered writes are only guaranteed to be persisted after :meth:`flush` or :meth:`close`.
+        shard_read_concurrency (int):
+            The number of shards :meth:`read_resources` queries concurrently.
+        ordered_reads (bool):
+            Yield resources from :meth:`read_resources` shard by shard (as they would be if each shard was queried
+            in turn) rather than as soon as they arrive from any shard.
+        shard_read_buffer_size (int):
+            The maximum number of resources the concurrent shard queries of :meth:`read_resources` buffer
+            (per shard if ``ordered_reads`` is set) before waiting for them to be consumed.
 
     Example:
         >>> import cloudwanderer
@@ -172,6 +251,11 @@ class DynamoDbConnector(BaseStorageConnector):
         boto3_session: boto3.session.Session = None,
         client_args: dict = None,
         number_of_shards: int = 10,
+        batch_writes: bool = False,
+        max_batch_write_attempts: int = 10,
+        shard_read_concurrency: int = 10,
+        ordered_reads: bool = False,
+        shard_read_buffer_size: int = 1000,
     ) -> None:
         """Initialise the DynamoDbConnector.
 
@@ -186,6 +270,16 @@ class DynamoDbConnector(BaseStorageConnector):
                 Optional dictionary of arguments to be passed to the boto3 dynamodb client.
             number_of_shards (int):
                 Optional specification of the number of shards to create for low-cardinality indexes.
+            batch_writes (bool):
+                Buffer writes and send them in ``BatchWriteItem`` requests of 25 items.
+            max_batch_write_attempts (int):
+                The number of times to send a batch's unprocessed items (with exponential backoff) before giving up.
+            shard_read_concurrency (int):
+                The number of shards to query concurrently when reading resources.
+            ordered_reads (bool):
+                Whether to yield resources read from multiple shards in shard order rather than as they arrive.
+            shard_read_buffer_size (int):
+                The maximum number of resources to buffer from concurrent shard queries before they are consumed.
 
         """
         self.client_args = client_args or {}
@@ -196,6 +290,23 @@ class DynamoDbConnector(BaseStorageConnector):
         self.number_of_shards = number_of_shards
         self.dynamodb: DynamoDBServiceResource = self.boto3_session.resource("dynamodb", **self.client_args)
         self.dynamodb_table = self.dynamodb.Table(table_name)
+        self.batch_writes = batch_writes
+        self.max_batch_write_attempts = max_batch_write_attempts
+        self.shard_read_concurrency = shard_read_concurrency
+        self.ordered_reads = ordered_reads
+        self.shard_read_buffer_size = shard_read_buffer_size
+        self._write_buffer: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._write_counters: Dict[str, Any] = {
+            "items_written": 0,
+            "requests": 0,
+            "unprocessed_items_retried": 0,
+            "seconds_writing": 0.0,
+        }
+
+    @property
+    def write_statistics(self) -> DynamoDbWriteStatistics:
+        """Return the write throughput of this connector so far, useful for sizing table capacity."""
+        return DynamoDbWriteStatistics(**self._write_counters)
 
     def init(self) -> None:
         """Create the DynamoDB Database."""
@@ -208,15 +319,74 @@ class DynamoDbConnector(BaseStorageConnector):
             raise ValueError("Expected complete urn got partial for resource URN: %s.", resource.urn)
         item = {
             **self._generate_urn_index_values(cast(URN, resource.urn)),
-            **standardise_data_types(resource.cloudwanderer_metadata.resource_data or {}),
+            **resource.cloudwanderer_metadata.standardised_resource_data,
             **{
                 "_dependent_resource_urns": [str(urn) for urn in resource.dependent_resource_urns],
                 "_discovery_time": resource.discovery_time.isoformat(),
             },
         }
+        if self.store_content_hashes:
+            item["_content_hash"] = resource.content_hash
         if resource.is_dependent_resource:
             item["_parent_urn"] = str(resource.parent_urn)
-        self.dynamodb_table.put_item(Item=item)
+        if not self.batch_writes:
+            start = time.perf_counter()
+            self.dynamodb_table.put_item(Item=item)
+            self._record_write(items=1, requests=1, start=start)
+            return
+        # BatchWriteItem rejects requests containing the same key twice, so later writes replace earlier ones.
+        self._write_buffer[(item["_id"], item["_attr"])] = item
+        if len(self._write_buffer) >= BATCH_WRITE_MAX_ITEMS:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write any buffered items to DynamoDB in ``BatchWriteItem`` requests of up to 25 items."""
+        write_requests = [{"PutRequest": {"Item": item}} for item in self._write_buffer.values()]
+        self._write_buffer.clear()
+        self._batch_write(write_requests)
+
+    def _batch_write(self, write_requests: List[Dict[str, Any]]) -> None:
+        """Send write requests in ``BatchWriteItem`` requests of up to 25 requests.
+
+        Arguments:
+            write_requests: The ``PutRequest``/``DeleteRequest`` dicts to send.
+        """
+        for batch_start in range(0, len(write_requests), BATCH_WRITE_MAX_ITEMS):
+            self._batch_write_items(write_requests[batch_start : batch_start + BATCH_WRITE_MAX_ITEMS])
+
+    def _batch_write_items(self, write_requests: List[Dict[str, Any]]) -> None:
+        """Send a batch of write requests, retrying unprocessed items with exponential backoff and jitter.
+
+        Arguments:
+            write_requests: The ``PutRequest``/``DeleteRequest`` dicts to send, no more than 25.
+
+        Raises:
+            DynamoDbBatchWriteError: If some items are still unprocessed after ``max_batch_write_attempts``.
+        """
+        start = time.perf_counter()
+        request_items: Dict[str, Any] = {self.dynamodb_table.name: write_requests}
+        for attempt in range(self.max_batch_write_attempts):
+            if attempt:
+                time.sleep(uniform(0, min(5.0, 0.05 * 2**attempt)))
+            response = self.dynamodb.meta.client.batch_write_item(RequestItems=request_items)
+            self._write_counters["requests"] += 1
+            request_items = response.get("UnprocessedItems") or {}
+            if not request_items:
+                break
+            unprocessed_count = sum(len(requests) for requests in request_items.values())
+            logger.debug("Retrying %s unprocessed items", unprocessed_count)
+            self._write_counters["unprocessed_items_retried"] += unprocessed_count
+        else:
+            raise DynamoDbBatchWriteError(
+                f"{sum(len(requests) for requests in request_items.values())} items were still unprocessed after "
+                f"{self.max_batch_write_attempts} attempts to write them to {self.table_name}"
+            )
+        self._record_write(items=len(write_requests), requests=0, start=start)
+
+    def _record_write(self, items: int, requests: int, start: float) -> None:
+        self._write_counters["items_written"] += items
+        self._write_counters["requests"] += requests
+        self._write_counters["seconds_writing"] += time.perf_counter() - start
 
     def _generate_urn_index_values(self, urn: URN, attr: str = "BaseResource") -> Dict[str, Any]:
         values = {
@@ -258,7 +428,10 @@ class DynamoDbConnector(BaseStorageConnector):
         resource_type: str = None,
         urn: URN = None,
     ) -> Iterator["CloudWandererResource"]:
-        query_generator = DynamoDbQueryGenerator(cloud_name, account_id, region, service, resource_type, urn)
+        query_generator = DynamoDbQueryGenerator(
+            cloud_name, account_id, region, service, resource_type, urn, number_of_shards=self.number_of_shards
+        )
+        shard_queries = []
         for condition_expression in query_generator.condition_expressions:
             query_args = DynamoDBQueryArgs(
                 KeyConditionExpression=condition_expression,
@@ -268,8 +441,69 @@ class DynamoDbConnector(BaseStorageConnector):
                 query_args["Select"] = "ALL_PROJECTED_ATTRIBUTES"
             if query_generator.condition_expressions is not None:
                 query_args["FilterExpression"] = query_generator.filter_expression
+            shard_queries.append(query_args)
+
+        if len(shard_queries) == 1 or self.shard_read_concurrency <= 1:
+            for query_args in shard_queries:
+                yield from self._query_resources(query_args)
+            return
+        yield from self._query_resources_concurrently(shard_queries)
+
+    def _query_resources(self, query_args: DynamoDBQueryArgs) -> Iterator[CloudWandererResource]:
+        return _dynamodb_items_to_resources(self._paginated_query(query_args), loader=self.read_resource)
+
+    def _query_resources_concurrently(self, shard_queries: List[DynamoDBQueryArgs]) -> Iterator[CloudWandererResource]:
+        """Run each shard's query on a thread pool, yielding resources as they arrive.
 
-            yield from _dynamodb_items_to_resources(self._paginated_query(query_args), loader=self.read_resource)
+        If ``ordered_reads`` is set the resources are yielded in shard order (later shards are still queried
+        concurrently, their results wait until the earlier shards' have been yielded).
+        The queues are bounded by ``shard_read_buffer_size`` so that the shard queries wait for a slow consumer
+        rather than reading the whole table into memory.
+
+        Arguments:
+            shard_queries: The query of each shard.
+        """
+        stop = threading.Event()
+        if self.ordered_reads:
+            shard_queues: List[queue.Queue] = [queue.Queue(maxsize=self.shard_read_buffer_size) for _ in shard_queries]
+        else:
+            shard_queues = [queue.Queue(maxsize=self.shard_read_buffer_size)] * len(shard_queries)
+
+        def put(shard_queue: queue.Queue, item: Any) -> bool:
+            # Wait for space on the queue unless the consumer has stopped reading.
+            while not stop.is_set():
+                try:
+                    shard_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def query_shard(shard_queue: queue.Queue, query_args: DynamoDBQueryArgs) -> None:
+            try:
+                for resource in self._query_resources(query_args):
+                    if not put(shard_queue, resource):
+                        return
+            finally:
+                put(shard_queue, _SHARD_FINISHED)
+
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.shard_read_concurrency)
+        try:
+            futures = [
+                executor.submit(query_shard, shard_queue, query_args)
+                for shard_queue, query_args in zip(shard_queues, shard_queries)
+            ]
+            if self.ordered_reads:
+                for shard_queue in shard_queues:
+                    yield from _drain_shard_queue(shard_queue, number_of_shards=1)
+            else:
+                yield from _drain_shard_queue(shard_queues[0], number_of_shards=len(futures))
+            for future in futures:
+                # Re-raise the first exception raised by any shard's query.
+                future.result()
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
 
     def _paginated_query(self, query_args: DynamoDBQueryArgs) -> Generator[Dict[str, Any], None, None]:
         paginator = self.dynamodb.meta.client.get_paginator("query")
@@ -284,9 +518,12 @@ class DynamoDbConnector(BaseStorageConnector):
     def delete_resource(self, urn: URN) -> None:
         """Delete the resource and all its resource attributes from DynamoDB.
 
+        Buffered writes are flushed first, so that a buffered write of the resource does not recreate it.
+
         Arguments:
             urn (URN): The URN of the resource to delete from Dynamo
         """
+        self.flush()
         resource_records = itertools.chain(
             self._paginated_query(DynamoDBQueryArgs(KeyConditionExpression=Key("_id").eq(_primary_key_from_urn(urn)))),
             self._paginated_query(
@@ -307,26 +544,147 @@ class DynamoDbConnector(BaseStorageConnector):
         region: str,
         cutoff: Optional[datetime.datetime],
     ) -> None:
+        """Delete the resources of a type discovered before the cutoff in bulk.
+
+        Only the keys and dependent resource URNs of the stale records are read (from the ``resource_type`` index,
+        with the cutoff applied as a server side filter on ``_discovery_time``), and the records are deleted along
+        with their children in ``BatchWriteItem`` requests.
+
+        The keys of the children are derived from the dependent resource URNs each parent was written with,
+        so no query is made per stale record. Tables created before ``_dependent_resource_urns`` was projected
+        into the ``resource_type`` index fall back to looking up each stale record's children from the
+        ``parent_urn`` index (concurrently), as DynamoDB cannot query several partition keys in one request.
+
+        Arguments:
+            cloud_name: The name of the cloud in question (e.g. ``aws``)
+            service: The name of the service to delete resources from (e.g. ``ec2``)
+            resource_type: The type of resource to delete (e.g. ``instance``)
+            account_id: The id of the account to delete resources from.
+            region: The region to delete resources from.
+            cutoff: Delete any resources discovered before this time.
+        """
         logger.debug("Deleting any %s discovered before %s", resource_type, cutoff)
-        resource_records = self.read_resources(
-            cloud_name=cloud_name, service=service, resource_type=resource_type, account_id=account_id, region=region
+        # Make sure the sweep sees (and so will not delete) any freshly discovered resources that are still buffered.
+        self.flush()
+        query_generator = DynamoDbQueryGenerator(
+            cloud_name=cloud_name,
+            account_id=account_id,
+            region=region,
+            service=service,
+            resource_type=resource_type,
+            number_of_shards=self.number_of_shards,
         )
-        for resource in resource_records:
-            if cutoff and resource.discovery_time >= cutoff:
-                logger.debug("Skipping deletion of %s as it was discovered after our cutoff.", resource.urn)
-                continue
-            if resource.urn.is_partial:
-                raise NotImplementedError(
-                    "The DynamoDB Storage connector does not know how to delete partial URNs: %s.", resource.urn
+        filter_expression = query_generator.filter_expression
+        if cutoff:
+            # Discovery times are stored as ISO 8601 strings, which sort chronologically.
+            filter_expression = filter_expression & Attr("_discovery_time").lt(cutoff.isoformat())
+        shard_queries = [
+            DynamoDBQueryArgs(
+                IndexName="resource_type",
+                KeyConditionExpression=condition_expression,
+                FilterExpression=filter_expression,
+                # Index projections are fixed when a table is created, so ask for whatever is projected
+                # rather than failing on tables which do not project _dependent_resource_urns.
+                Select="ALL_PROJECTED_ATTRIBUTES",
+            )
+            for condition_expression in query_generator.condition_expressions
+        ]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.shard_read_concurrency)) as executor:
+            stale_records = [
+                record for records in executor.map(self._query_records, shard_queries) for record in records
+            ]
+            child_records = [
+                {"_id": f"resource#{dependent_resource_urn}", "_attr": "BaseResource"}
+                for record in stale_records
+                for dependent_resource_urn in record.get("_dependent_resource_urns", [])
+            ]
+            unprojected_records = [record for record in stale_records if "_dependent_resource_urns" not in record]
+            child_records.extend(
+                record
+                for records in executor.map(
+                    self._query_records,
+                    [
+                        DynamoDBQueryArgs(
+                            IndexName="parent_urn",
+                            KeyConditionExpression=Key("_parent_urn").eq(_urn_string_from_primary_key(record["_id"])),
+                        )
+                        for record in unprojected_records
+                    ],
                 )
-            logger.debug("Cleaning up %s discovered %s", str(resource.urn), resource.discovery_time)
-            self.delete_resource(urn=cast(URN, resource.urn))
+                for record in records
+            )
+        keys = {
+            (record["_id"], record["_attr"]): {"_id": record["_id"], "_attr": record["_attr"]}
+            for record in itertools.chain(stale_records, child_records)
+        }
+        logger.info(
+            "Deleting %s stale %s %s records (%s with their children) from %s",
+            len(stale_records),
+            service,
+            resource_type,
+            len(keys),
+            self.table_name,
+        )
+        self._batch_write([{"DeleteRequest": {"Key": key}} for key in keys.values()])
+
+    def read_content_hashes(
+        self, cloud_name: str, account_id: str, region: str, service: str, resource_type: str
+    ) -> Dict[str, Optional[str]]:
+        """Return the content hash of each resource of a type in an account and region, keyed by URN string.
+
+        The hashes are read from the ``resource_type`` index, querying its shards concurrently.
+        Tables created before ``_content_hash`` was projected into the index return ``None`` for every resource.
+
+        Arguments:
+            cloud_name: The name of the cloud in question (e.g. ``aws``)
+            account_id: The id of the account to read the content hashes of.
+            region: The region to read the content hashes of.
+            service: The name of the service to read the content hashes of (e.g. ``ec2``)
+            resource_type: The type of resource to read the content hashes of (e.g. ``instance``)
+        """
+        self.flush()
+        query_generator = DynamoDbQueryGenerator(
+            cloud_name=cloud_name,
+            account_id=account_id,
+            region=region,
+            service=service,
+            resource_type=resource_type,
+            number_of_shards=self.number_of_shards,
+        )
+        shard_queries = [
+            DynamoDBQueryArgs(
+                IndexName="resource_type",
+                KeyConditionExpression=condition_expression,
+                FilterExpression=query_generator.filter_expression,
+                Select="ALL_PROJECTED_ATTRIBUTES",
+            )
+            for condition_expression in query_generator.condition_expressions
+        ]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self.shard_read_concurrency)) as executor:
+            return {
+                _urn_string_from_primary_key(record["_id"]): record.get("_content_hash")
+                for records in executor.map(self._query_records, shard_queries)
+                for record in records
+            }
+
+    def _query_records(self, query_args: DynamoDBQueryArgs) -> List[Dict[str, Any]]:
+        return list(self._paginated_query(query_args))
 
     def open(self) -> None:
         ...
 
     def close(self) -> None:
-        ...
+        """Flush any buffered writes and log the write throughput."""
+        self.flush()
+        write_statistics = self.write_statistics
+        if write_statistics.items_written:
+            logger.info(
+                "Wrote %s items to %s in %s requests (%.1f items/second)",
+                write_statistics.items_written,
+                self.table_name,
+                write_statistics.requests,
+                write_statistics.items_per_second,
+            )
 
     def _gen_shard(self, key: str, shard_id: int = None) -> str:
         """Append a shard designation to the end of a supplied key.
@@ -505,3 +863,7 @@ class DynamoDbTableCreator:
 
 class IndexNotAvailableException(Exception):
     """There is no DynamoDB index available for this type of query."""
+
+
+class DynamoDbBatchWriteError(Exception):
+    """DynamoDB did not process all the items in a batch write, even after retrying."""
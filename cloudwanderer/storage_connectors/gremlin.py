@@ -1,7 +1,7 @@
 """Storage Connector for Gremlin databases."""
 import logging
 from datetime import datetime
-from typing import Any, Dict, Iterator, List, Optional, Union, cast
+from typing import Any, Callable, Dict, FrozenSet, Iterator, List, NamedTuple, Optional, Set, Tuple, Union, cast
 
 from gremlin_python.driver.driver_remote_connection import DriverRemoteConnection  # type: ignore
 from gremlin_python.process.anonymous_traversal import traversal  # type: ignore
@@ -17,6 +17,24 @@ from .base_connector import ISO_DATE_FORMAT, BaseStorageConnector
 logger = logging.getLogger(__name__)
 
 
+class GremlinWriteStatistics(NamedTuple):
+    """A snapshot of the write efficiency of a :class:`GremlinStorageConnector`."""
+
+    #: The number of resources written.
+    resources_written: int
+    #: The number of traversals submitted to the Gremlin server while writing them.
+    round_trips: int
+    #: The number of unchanged resources whose discovery time was updated rather than being written.
+    resources_touched: int = 0
+
+    @property
+    def round_trips_per_resource(self) -> float:
+        """Return the number of traversals submitted per resource written."""
+        if not self.resources_written:
+            return 0.0
+        return self.round_trips / self.resources_written
+
+
 def generate_primary_label(urn: PartialUrn) -> str:
     """Generate a primary vertex label.
 
@@ -27,24 +45,70 @@ def generate_primary_label(urn: PartialUrn) -> str:
 
 
 class GremlinStorageConnector(BaseStorageConnector):
-    """Storage Connector for Gremlin databases."""
+    """Storage Connector for Gremlin databases.
+
+    By default every resource is written with several traversals (its vertex, a lookup and write of each
+    relationship edge and a clean up of its stale edges).
+    With ``batch_writes=True`` resources are buffered and each batch is written with a handful of traversals
+    using ``fold().coalesce()`` upserts, regardless of the number of resources or relationships in it.
+
+    The urns of the vertices written (and of the partners looked up) are cached for the lifetime of the connection,
+    so relationships with partners that have already been seen (e.g. a VPC with thousands of ENIs) are written
+    without looking the partner up on the server again.
+
+    Placeholder vertices (written with an unknown account or region for relationship partners which have not been
+    discovered yet) are merged into the vertices that supersede them by :meth:`reconcile_placeholders`, in bulk,
+    when the connector is closed.
+    """
 
     _g: Optional[Traversal] = None
     connection: Optional[DriverRemoteConnection] = None
 
-    def __init__(self, endpoint_url: str, supports_multiple_labels=False, test_prefix: str = "", **kwargs) -> None:
+    def __init__(
+        self,
+        endpoint_url: str,
+        supports_multiple_labels=False,
+        test_prefix: str = "",
+        batch_writes: bool = False,
+        batch_size: int = 100,
+        cache_lookups: bool = True,
+        warm_lookup_cache: bool = False,
+        **kwargs,
+    ) -> None:
         """Create a GremlinStorageConnector.
 
         Arguments:
             endpoint_url: The url of the gremlin endpoint to connect to (e.g. ``ws://localhost:8182``)
             supports_multiple_labels: Some GraphDBs (Neptune/Neo4J) support multiple labels on a single vertex.
             test_prefix: A prefix that will be prepended to edge and vertex ids to allow scenario separation.
+            batch_writes: Buffer resources and write them in batches of ``batch_size``.
+                Buffered resources are only guaranteed to be persisted after :meth:`flush` or :meth:`close`.
+            batch_size: The number of resources to write in each batch, bear in mind that each batch's
+                traversals must fit in your Gremlin server's ``maxContentLength``.
+            cache_lookups: Cache the urns of relationship partners rather than looking them up for every relationship.
+                Disable this if other processes are writing to the same graph at the same time.
+            warm_lookup_cache: Load the urn of every vertex already in the graph into the lookup cache
+                (with one query per vertex label) when the connection is opened.
             **kwargs: Any unspecified args will be pased to the ``DriverRemoteConnection`` object.
         """
         self.endpoint_url = endpoint_url
         self.supports_multiple_labels = supports_multiple_labels
         self.test_prefix = test_prefix
+        self.batch_writes = batch_writes
+        self.batch_size = batch_size
+        self.cache_lookups = cache_lookups
+        self.warm_lookup_cache = warm_lookup_cache
         self.connection_args = kwargs
+        self._write_buffer: List[CloudWandererResource] = []
+        self._touch_buffer: List[CloudWandererResource] = []
+        self._lookup_cache: Dict[str, PartialUrn] = {}
+        self._unreconciled_urns: Dict[str, Dict[FrozenSet[str], PartialUrn]] = {}
+        self._write_counters = dict.fromkeys(GremlinWriteStatistics._fields, 0)
+
+    @property
+    def write_statistics(self) -> GremlinWriteStatistics:
+        """Return the number of resources written so far and the round trips it took to write them."""
+        return GremlinWriteStatistics(**self._write_counters)
 
     def init(self) -> None:
         ...
@@ -61,13 +125,58 @@ class GremlinStorageConnector(BaseStorageConnector):
         if not self.connection:
             logger.debug("Opening connection to %s", self.endpoint_url)
             self.connection = DriverRemoteConnection(f"{self.endpoint_url}/gremlin", "g", **self.connection_args)
+            if self.cache_lookups and self.warm_lookup_cache:
+                self._warm_lookup_cache()
+
+    def _warm_lookup_cache(self) -> None:
+        for vertex_label in self.g.V().label().dedup().toList():
+            urns = self.g.V().hasLabel(vertex_label).values("_urn").toList()
+            logger.debug("Warming lookup cache with %s %s vertices", len(urns), vertex_label)
+            for urn in urns:
+                self._cache_vertex_urn(URN.from_string(urn))
 
     def close(self) -> None:
+        self.reconcile_placeholders()
+        write_statistics = self.write_statistics
+        if write_statistics.resources_written:
+            logger.info(
+                "Wrote %s resources in %s round trips (%.2f round trips per resource)",
+                write_statistics.resources_written,
+                write_statistics.round_trips,
+                write_statistics.round_trips_per_resource,
+            )
         logger.debug("Closing gremlin connection")
         if self.connection:
             self.connection.close()
         self.connection = None
         self._g = None
+        self._lookup_cache.clear()
+
+    def _cache_vertex_urn(self, urn: PartialUrn) -> None:
+        """Cache the urn of a vertex that exists under every partial urn a lookup could find it with.
+
+        Lookups ignore an unknown account or region, so a vertex is cached under its own urn and the urns with
+        its account and/or region unknown. Vertices with an unknown account or region (i.e. placeholders) never
+        replace a cached vertex, as they are repointed to the vertex with the known account and region.
+
+        Arguments:
+            urn: The urn of the vertex.
+        """
+        if not self.cache_lookups:
+            return
+        is_placeholder = urn.account_id == "unknown" or urn.region == "unknown"
+        for account_id in {urn.account_id, "unknown"}:
+            for region in {urn.region, "unknown"}:
+                key = str(urn.copy(account_id=account_id, region=region))
+                if is_placeholder:
+                    self._lookup_cache.setdefault(key, urn)
+                else:
+                    self._lookup_cache[key] = urn
+
+    def _forget_vertices(self, vertex_ids: Set[Any]) -> None:
+        self._lookup_cache = {
+            key: urn for key, urn in self._lookup_cache.items() if self.generate_vertex_id(urn) not in vertex_ids
+        }
 
     def write_resource(self, resource: CloudWandererResource) -> None:
         """Persist a single resource to storage.
@@ -75,13 +184,49 @@ class GremlinStorageConnector(BaseStorageConnector):
         Arguments:
             resource (CloudWandererResource): The CloudWandererResource to write.
         """
+        if self.batch_writes:
+            self._write_buffer.append(resource)
+            if len(self._write_buffer) >= self.batch_size:
+                self.flush()
+            return
+        self._write_counters["resources_written"] += 1
         self._write_resource(resource)
         self._write_dependent_resource_edges(resource)
 
+    def _submit(self, terminal_step: Callable[[], Any]) -> Any:
+        """Run a traversal's terminal step (e.g. ``traversal.iterate``), counting the round trip it makes.
+
+        Arguments:
+            terminal_step: The bound terminal step of the traversal to submit.
+        """
+        self._write_counters["round_trips"] += 1
+        return terminal_step()
+
     def _write_resource(self, resource: CloudWandererResource) -> None:
-        primary_label = generate_primary_label(resource.urn)
+        traversal = self._resource_vertex(resource)
+        self._write_properties(traversal=traversal, properties=resource.cloudwanderer_metadata.resource_data)
+        self._cache_vertex_urn(resource.urn)
 
-        traversal = self._write_vertex(vertex_id=self.generate_vertex_id(resource.urn), vertex_labels=[primary_label])
+        self._write_relationships(resource)
+        self._clean_up_relationships(urn=resource.urn, cutoff=resource.discovery_time)
+        self._track_unreconciled_urn(resource.urn)
+
+    def _resource_vertex(
+        self, resource: CloudWandererResource, source: Any = None, inferred: bool = False
+    ) -> Traversal:
+        """Return a traversal which upserts the resource's vertex and sets its metadata properties.
+
+        Arguments:
+            resource: The resource whose vertex to upsert.
+            source: The traversal source to start from, defaults to ``g`` (pass ``__`` for a child traversal).
+            inferred: Whether the resource is inferred from a relationship (rather than discovered), in which case
+                its content hash is neither stored nor cleared.
+        """
+        traversal = self._write_vertex(
+            vertex_id=self.generate_vertex_id(resource.urn),
+            vertex_labels=[generate_primary_label(resource.urn)],
+            source=source,
+        )
         traversal = (
             traversal.property(Cardinality.single, "_cloud_name", resource.urn.cloud_name)
             .property(Cardinality.single, "_account_id", resource.urn.account_id)
@@ -91,14 +236,228 @@ class GremlinStorageConnector(BaseStorageConnector):
             .property(Cardinality.single, "_discovery_time", resource.discovery_time.isoformat())
             .property(Cardinality.single, "_urn", str(resource.urn))
         )
+        if not inferred:
+            if self.store_content_hashes:
+                traversal.property(Cardinality.single, "_content_hash", resource.content_hash)
+            else:
+                # A hash stored by an earlier incremental write no longer matches the properties written now.
+                traversal.sideEffect(__.properties("_content_hash").drop())
         for id_part in resource.urn.resource_id_parts:
             traversal.property(Cardinality.set_, "_resource_id_parts", id_part)
-        self._write_properties(traversal=traversal, properties=resource.cloudwanderer_metadata.resource_data)
+        return traversal
 
-        self._write_relationships(resource)
-        self._clean_up_relationships(urn=resource.urn, cutoff=resource.discovery_time)
-        if not resource.urn.is_partial:
-            self._repoint_vertex_edges(vertex_label=primary_label, new_resource_urn=resource.urn)
+    def touch_resource(self, resource: CloudWandererResource) -> None:
+        """Update only the ``_discovery_time`` of an unchanged resource's vertex.
+
+        Its properties and edges (which are unchanged) are not rewritten.
+        With ``batch_writes=True`` the vertices of a batch are updated with a single traversal.
+
+        Arguments:
+            resource (CloudWandererResource): The unchanged CloudWandererResource.
+        """
+        if self.batch_writes:
+            self._touch_buffer.append(resource)
+            if len(self._touch_buffer) >= self.batch_size:
+                self.flush()
+            return
+        self._write_counters["resources_touched"] += 1
+        self._submit(self._touch_vertex(resource, source=self.g).iterate)
+
+    def _touch_vertex(self, resource: CloudWandererResource, source: Any) -> Traversal:
+        return source.V(self.generate_vertex_id(resource.urn)).property(
+            Cardinality.single, "_discovery_time", resource.discovery_time.isoformat()
+        )
+
+    def read_content_hashes(
+        self, cloud_name: str, account_id: str, region: str, service: str, resource_type: str
+    ) -> Dict[str, Optional[str]]:
+        self.flush()
+        partial_urn = PartialUrn(
+            cloud_name=cloud_name,
+            service=service,
+            account_id=account_id,
+            region=region,
+            resource_type=resource_type,
+        )
+        vertices = self._submit(
+            self._lookup_resource(partial_urn=partial_urn)
+            .project("urn", "content_hash")
+            .by(__.values("_urn"))
+            .by(__.values("_content_hash").fold())
+            .toList
+        )
+        return {vertex["urn"]: next(iter(vertex["content_hash"]), None) for vertex in vertices}
+
+    def flush(self) -> None:
+        """Write any buffered resources in a handful of traversals.
+
+        Each batch is written with one traversal upserting every vertex, one looking up the partners of
+        every relationship that are not in the lookup cache, and one upserting every edge (and inferred vertex)
+        and cleaning up stale edges. The discovery times of each batch of buffered unchanged resources are
+        updated with one traversal.
+        """
+        resources = self._write_buffer
+        self._write_buffer = []
+        for batch_start in range(0, len(resources), self.batch_size):
+            self._write_batch(resources[batch_start : batch_start + self.batch_size])
+        touched_resources = self._touch_buffer
+        self._touch_buffer = []
+        for batch_start in range(0, len(touched_resources), self.batch_size):
+            batch = touched_resources[batch_start : batch_start + self.batch_size]
+            traversal = self.g.inject(0)
+            for resource in batch:
+                traversal = traversal.sideEffect(self._touch_vertex(resource, source=__))
+            self._write_counters["resources_touched"] += len(batch)
+            self._submit(traversal.iterate)
+
+    def _write_batch(self, resources: List[CloudWandererResource]) -> None:
+        logger.debug("Writing batch of %s resources", len(resources))
+        self._write_counters["resources_written"] += len(resources)
+        vertices = self.g.inject(0)
+        for resource in resources:
+            vertices = vertices.sideEffect(
+                self._add_properties(
+                    traversal=self._resource_vertex(resource, source=__),
+                    properties=resource.cloudwanderer_metadata.resource_data,
+                )
+            )
+        try:
+            self._submit(vertices.iterate)
+        except RuntimeError as ex:
+            raise RuntimeError(
+                f"GremlinStorageConnector got a runtime error while saving a batch of {len(resources)} resources "
+                f"({len(str(vertices).encode())} bytes), check your Gremlin server's maxContentLength is larger "
+                "than this or reduce the batch_size."
+            ) from ex
+        for resource in resources:
+            self._cache_vertex_urn(resource.urn)
+
+        pre_existing_partner_urns = self._lookup_relationship_partners(resources)
+        new_urns: List[PartialUrn] = [resource.urn for resource in resources]
+        inferred_urns: List[PartialUrn] = []
+        edges = self.g.inject(0)
+        for resource_index, resource in enumerate(resources):
+            for relationship_index, relationship in enumerate(resource.relationships):
+                inferred_partner_urn = relationship.partial_urn
+                pre_existing_resource_urn = pre_existing_partner_urns.get((resource_index, relationship_index))
+                if not pre_existing_resource_urn:
+                    logger.debug("Writing inferred resource %s", inferred_partner_urn)
+                    edges = edges.sideEffect(
+                        self._resource_vertex(
+                            CloudWandererResource(urn=cast(URN, inferred_partner_urn), resource_data={}),
+                            source=__,
+                            inferred=True,
+                        )
+                    )
+                    new_urns.append(inferred_partner_urn)
+                    inferred_urns.append(inferred_partner_urn)
+                elif pre_existing_resource_urn != inferred_partner_urn:
+                    source_urn, destination_urn = _relationship_edge_ends(
+                        resource.urn, inferred_partner_urn, relationship.direction
+                    )
+                    edges = edges.sideEffect(
+                        __.V(self.generate_vertex_id(source_urn))
+                        .outE()
+                        .hasId(self.generate_edge_id(source_urn, destination_urn))
+                        .drop()
+                    )
+                source_urn, destination_urn = _relationship_edge_ends(
+                    resource.urn, pre_existing_resource_urn or inferred_partner_urn, relationship.direction
+                )
+                edges = edges.sideEffect(
+                    self._edge_upsert(
+                        source_urn=source_urn,
+                        destination_urn=destination_urn,
+                        owner_urn=resource.urn,
+                        discovery_time=resource.discovery_time,
+                    )
+                )
+            for dependent_urn in resource.dependent_resource_urns:
+                edges = edges.sideEffect(
+                    self._edge_upsert(
+                        source_urn=resource.urn,
+                        destination_urn=dependent_urn,
+                        owner_urn=resource.urn,
+                        discovery_time=resource.discovery_time,
+                    )
+                )
+        for resource in resources:
+            vertex_id = self.generate_vertex_id(resource.urn)
+            edges = edges.sideEffect(
+                __.V(vertex_id)
+                .bothE()
+                .has("_edge_owner", vertex_id)
+                .where(__.values("_discovery_time").is_(P.lt(resource.discovery_time.isoformat())))
+                .drop()
+            )
+        self._submit(edges.iterate)
+        for inferred_urn in inferred_urns:
+            self._cache_vertex_urn(inferred_urn)
+
+        for urn in new_urns:
+            self._track_unreconciled_urn(urn)
+
+    def _lookup_relationship_partners(
+        self, resources: List[CloudWandererResource]
+    ) -> Dict[Tuple[int, int], PartialUrn]:
+        """Return the urns of the pre-existing partners of the relationships of the resources.
+
+        Partners in the lookup cache are not looked up, the rest are looked up in one traversal.
+
+        Arguments:
+            resources: The resources whose relationships' partners to look up.
+        """
+        partner_urns: Dict[Tuple[int, int], PartialUrn] = {}
+        lookups = {}
+        for resource_index, resource in enumerate(resources):
+            for relationship_index, relationship in enumerate(resource.relationships):
+                cached_urn = self._lookup_cache.get(str(relationship.partial_urn)) if self.cache_lookups else None
+                if cached_urn:
+                    partner_urns[(resource_index, relationship_index)] = cached_urn
+                else:
+                    lookups[(resource_index, relationship_index)] = relationship.partial_urn
+        if not lookups:
+            return partner_urns
+        keys = [f"{resource_index}_{relationship_index}" for resource_index, relationship_index in lookups]
+        traversal = self.g.inject(0).project(*keys)
+        for partial_urn in lookups.values():
+            traversal = traversal.by(self._lookup_resource(partial_urn, source=__).values("_urn").limit(1).fold())
+        results = self._submit(traversal.next)
+        for lookup_key, key in zip(lookups, keys):
+            if results[key]:
+                partner_urns[lookup_key] = URN.from_string(results[key][0])
+                self._cache_vertex_urn(partner_urns[lookup_key])
+        return partner_urns
+
+    def _edge_upsert(
+        self,
+        source_urn: PartialUrn,
+        destination_urn: PartialUrn,
+        owner_urn: PartialUrn,
+        discovery_time: datetime,
+    ) -> Traversal:
+        """Return a child traversal which upserts an edge, doing nothing if either vertex does not exist.
+
+        Arguments:
+            source_urn: The urn of the vertex the edge is from.
+            destination_urn: The urn of the vertex the edge is to.
+            owner_urn: The urn of the resource whose write owns the edge.
+            discovery_time: The time the edge was discovered.
+        """
+        edge_id = self.generate_edge_id(source_urn, destination_urn)
+        return (
+            __.V(self.generate_vertex_id(source_urn))
+            .as_("source")
+            .V(self.generate_vertex_id(destination_urn))
+            .coalesce(
+                __.inE("has").hasId(edge_id),
+                __.addE("has")
+                .from_("source")
+                .property(T.id, edge_id)
+                .property("_edge_owner", self.generate_vertex_id(owner_urn)),
+            )
+            .property("_discovery_time", discovery_time.isoformat())
+        )
 
     def _write_dependent_resource_edges(self, resource: CloudWandererResource) -> None:
         for dependent_urn in resource.dependent_resource_urns:
@@ -114,7 +473,7 @@ class GremlinStorageConnector(BaseStorageConnector):
 
     def _clean_up_relationships(self, urn: PartialUrn, cutoff: datetime) -> None:
         logger.debug("Cleaning up edges owned by %s discovered before %s", self.generate_vertex_id(urn), cutoff)
-        (
+        traversal = (
             self.g.V(self.generate_vertex_id(urn))
             .bothE()
             .as_("edge")
@@ -122,17 +481,13 @@ class GremlinStorageConnector(BaseStorageConnector):
             .where(__.values("_discovery_time").is_(P.lt(cutoff.isoformat())))
             .select("edge")
             .drop()
-        ).iterate()
+        )
+        self._submit(traversal.iterate)
 
     def _write_relationships(self, resource: CloudWandererResource) -> None:
         for relationship in resource.relationships:
             inferred_partner_urn = relationship.partial_urn
-            try:
-                pre_existing_resource_urn = (
-                    self._lookup_resource(relationship.partial_urn).propertyMap().toList()[0]["_urn"][0].value
-                )
-            except IndexError:
-                pre_existing_resource_urn = None
+            pre_existing_resource_urn = self._lookup_partner_urn(relationship.partial_urn)
 
             if pre_existing_resource_urn:
                 logger.debug("Writing relationship with pre_existing_resource_urn %s", pre_existing_resource_urn)
@@ -158,68 +513,105 @@ class GremlinStorageConnector(BaseStorageConnector):
                 discovery_time=resource.discovery_time,
             )
 
-    def _repoint_vertex_edges(self, vertex_label: str, new_resource_urn: Union[URN, PartialUrn]) -> None:
-        # https://tinkerpop.apache.org/docs/current/recipes/#edge-move
+    def _lookup_partner_urn(self, partial_urn: PartialUrn) -> Optional[PartialUrn]:
+        """Return the urn of the vertex matching the partial urn, from the lookup cache if possible.
+
+        Arguments:
+            partial_urn: The partial urn of the relationship partner to look up.
+        """
+        if self.cache_lookups and str(partial_urn) in self._lookup_cache:
+            return self._lookup_cache[str(partial_urn)]
+        try:
+            pre_existing_resource_urn = URN.from_string(
+                self._submit(self._lookup_resource(partial_urn).propertyMap().toList)[0]["_urn"][0].value
+            )
+        except IndexError:
+            return None
+        self._cache_vertex_urn(pre_existing_resource_urn)
+        return pre_existing_resource_urn
 
-        resources_of_the_same_type = self.g.V().as_("old_vertex").hasLabel(vertex_label)
-        for id_part in new_resource_urn.resource_id_parts:
-            resources_of_the_same_type.has("_resource_id_parts", id_part)
-        resources_with_same_id_but_unknown = (
-            resources_of_the_same_type.or_(__.has("_account_id", "unknown"), __.has("_region", "unknown"))
-        ).toList()
+    def _track_unreconciled_urn(self, urn: PartialUrn) -> None:
+        if urn.is_partial:
+            return
+        self._unreconciled_urns.setdefault(generate_primary_label(urn), {})[frozenset(urn.resource_id_parts)] = urn
 
-        for old_vertex in resources_with_same_id_but_unknown:
-            # Outbound
-            old_vertices_outbound_edges = self.g.V(old_vertex).outE().as_("e1")
-            old_outbound_edges_partner_vertex = old_vertices_outbound_edges.inV().as_("b")
+    def reconcile_placeholders(self) -> None:
+        """Merge placeholder vertices into the vertices written since the last reconciliation.
 
-            new_vertex = old_outbound_edges_partner_vertex.V(self.generate_vertex_id(new_resource_urn)).as_(
-                "new_vertex"
-            )
-            add_old_outbound_edges_to_new_vertex = (
-                new_vertex.addE("has")
-                .to("b")
-                .as_("e2")
-                .sideEffect(
-                    __.select("e1")
-                    .properties()
-                    .unfold()
-                    .as_("p")
-                    .select("e2")
-                    .property(__.select("p").key(), __.select("p").value())
-                )
+        A placeholder vertex (with an unknown account or region) is written for a relationship partner which
+        has not been discovered yet. Once a vertex with the same label and resource id parts has been written,
+        the placeholder's edges are moved onto it and the placeholder is dropped.
+
+        This is called by :meth:`close`, rather than after every write, so that it costs one query per vertex
+        label written plus one traversal per ``batch_size`` placeholders, no matter how many resources were written.
+        """
+        self.flush()
+        unreconciled_urns = self._unreconciled_urns
+        self._unreconciled_urns = {}
+        merges: List[Tuple[Any, PartialUrn]] = []
+        for vertex_label, urns_by_id_parts in unreconciled_urns.items():
+            placeholders = self._submit(
+                self.g.V()
+                .hasLabel(vertex_label)
+                .or_(__.has("_account_id", "unknown"), __.has("_region", "unknown"))
+                .project("vertex", "resource_id_parts")
+                .by(__.identity())
+                .by(__.values("_resource_id_parts").fold())
+                .toList
             )
-            add_old_outbound_edges_to_new_vertex.select("e1").drop().iterate()
-            # Inbound
-            old_vertices_inbound_edges = self.g.V(old_vertex).select("old_vertex").inE().as_("old_inbound_edge")
-            old_inbound_edges_partner_vertex = old_vertices_inbound_edges.inV().as_("c")
-
-            new_vertex = old_inbound_edges_partner_vertex.select("new_vertex")
-            add_old_inbound_edges_to_new_vertex = (
-                new_vertex.addE("has")
-                .from_("c")
-                .as_("new_inbound_edge")
-                .sideEffect(
-                    __.select("old_inbound_edge")
-                    .properties()
-                    .unfold()
-                    .as_("p")
-                    .select("new_inbound_edge")
-                    .property(__.select("p").key(), __.select("p").value())
+            for placeholder in placeholders:
+                new_urn = urns_by_id_parts.get(frozenset(placeholder["resource_id_parts"]))
+                if new_urn:
+                    merges.append((placeholder["vertex"], new_urn))
+        if not merges:
+            return
+        logger.debug("Merging %s placeholder vertices", len(merges))
+        for batch_start in range(0, len(merges), self.batch_size):
+            traversal = self.g.inject(0)
+            for placeholder, new_urn in merges[batch_start : batch_start + self.batch_size]:
+                traversal = (
+                    traversal.sideEffect(self._move_edges(placeholder.id, new_urn, outbound=True))
+                    .sideEffect(self._move_edges(placeholder.id, new_urn, outbound=False))
+                    .sideEffect(__.V(placeholder.id).drop())
                 )
-            )
-            add_old_inbound_edges_to_new_vertex.select("old_inbound_edge").drop().iterate()
+            self._submit(traversal.iterate)
+        self._forget_vertices({placeholder.id for placeholder, _ in merges})
 
-            # Delete old vertex
-            self.g.V(old_vertex).drop().iterate()
+    def _move_edges(self, old_vertex_id: Any, new_resource_urn: PartialUrn, outbound: bool) -> Traversal:
+        """Return a child traversal which moves the edges of one vertex onto another, keeping their properties.
+
+        Arguments:
+            old_vertex_id: The id of the vertex to move the edges from.
+            new_resource_urn: The urn of the vertex to move the edges to.
+            outbound: Whether to move the outbound (rather than the inbound) edges.
+        """
+        # https://tinkerpop.apache.org/docs/current/recipes/#edge-move
+        if outbound:
+            old_edges = __.V(old_vertex_id).outE().as_("old_edge").inV().as_("partner")
+            new_edges = old_edges.V(self.generate_vertex_id(new_resource_urn)).addE("has").to("partner")
+        else:
+            old_edges = __.V(old_vertex_id).inE().as_("old_edge").outV().as_("partner")
+            new_edges = old_edges.V(self.generate_vertex_id(new_resource_urn)).addE("has").from_("partner")
+        return (
+            new_edges.as_("new_edge")
+            .sideEffect(
+                __.select("old_edge")
+                .properties()
+                .unfold()
+                .as_("p")
+                .select("new_edge")
+                .property(__.select("p").key(), __.select("p").value())
+            )
+            .select("old_edge")
+            .drop()
+        )
 
     def _delete_relationship_edge(
         self, resource_urn: PartialUrn, relationship_resource_urn: PartialUrn, direction: RelationshipDirection
     ) -> None:
-        if direction == RelationshipDirection.INBOUND:
-            self._delete_edge(self.generate_edge_id(relationship_resource_urn, resource_urn))
-        else:
-            self._delete_edge(self.generate_edge_id(resource_urn, relationship_resource_urn))
+        self._delete_edge(
+            self.generate_edge_id(*_relationship_edge_ends(resource_urn, relationship_resource_urn, direction))
+        )
 
     def _write_relationship_edge(
         self,
@@ -229,30 +621,22 @@ class GremlinStorageConnector(BaseStorageConnector):
         discovery_time: datetime,
     ) -> None:
         logger.debug("Writing edge relationship between %s and %s", resource_urn, relationship_resource_urn)
-        if direction == RelationshipDirection.INBOUND:
-            self._write_edge(
-                edge_id=self.generate_edge_id(relationship_resource_urn, resource_urn),
-                edge_label="has",
-                source_vertex_id=self.generate_vertex_id(relationship_resource_urn),
-                destination_vertex_id=self.generate_vertex_id(resource_urn),
-                owner_id=self.generate_vertex_id(resource_urn),
-                discovery_time=discovery_time,
-            )
-        else:
-            self._write_edge(
-                edge_id=self.generate_edge_id(resource_urn, relationship_resource_urn),
-                edge_label="has",
-                source_vertex_id=self.generate_vertex_id(resource_urn),
-                destination_vertex_id=self.generate_vertex_id(relationship_resource_urn),
-                owner_id=self.generate_vertex_id(resource_urn),
-                discovery_time=discovery_time,
-            )
+        source_urn, destination_urn = _relationship_edge_ends(resource_urn, relationship_resource_urn, direction)
+        self._write_edge(
+            edge_id=self.generate_edge_id(source_urn, destination_urn),
+            edge_label="has",
+            source_vertex_id=self.generate_vertex_id(source_urn),
+            destination_vertex_id=self.generate_vertex_id(destination_urn),
+            owner_id=self.generate_vertex_id(resource_urn),
+            discovery_time=discovery_time,
+        )
 
-    def _lookup_resource(self, partial_urn: PartialUrn) -> Traversal:
+    def _lookup_resource(self, partial_urn: PartialUrn, source: Any = None) -> Traversal:
         vertex_label = generate_primary_label(partial_urn)
         logger.debug("looking up resource with label %s", vertex_label)
         traversal = (
-            self.g.V()
+            (source or self.g)
+            .V()
             .hasLabel(vertex_label)
             .has("_cloud_name", partial_urn.cloud_name)
             .has("_service", partial_urn.service)
@@ -266,21 +650,30 @@ class GremlinStorageConnector(BaseStorageConnector):
             traversal.has("_region", partial_urn.region)
         return traversal
 
-    def _write_vertex(self, vertex_id: str, vertex_labels: List[str]) -> Traversal:
+    def _write_vertex(self, vertex_id: str, vertex_labels: List[str], source: Any = None) -> Traversal:
         logger.debug("Writing vertex %s", vertex_id)
         if self.supports_multiple_labels:
             vertex_label = "::".join(vertex_labels)
         else:
             vertex_label = vertex_labels[0]
-        return self.g.V(vertex_id).fold().coalesce(__.unfold(), __.addV(vertex_label).property(T.id, vertex_id))
+        return (
+            (source or self.g)
+            .V(vertex_id)
+            .fold()
+            .coalesce(__.unfold(), __.addV(vertex_label).property(T.id, vertex_id))
+        )
 
-    def _write_properties(self, traversal: Traversal, properties: Dict[str, Any]) -> Traversal:
-        logger.debug("Writing properties: %s", properties)
+    def _add_properties(self, traversal: Traversal, properties: Dict[str, Any]) -> Traversal:
         for property_name, property_value in properties.items():
             traversal = traversal.property(Cardinality.single, str(property_name), str(property_value))
+        return traversal
+
+    def _write_properties(self, traversal: Traversal, properties: Dict[str, Any]) -> Traversal:
+        logger.debug("Writing properties: %s", properties)
+        traversal = self._add_properties(traversal=traversal, properties=properties)
         traversal_size = len(str(traversal).encode())
         try:
-            traversal.next()
+            self._submit(traversal.next)
         except RuntimeError as ex:
             raise RuntimeError(
                 "GremlinStorageConnector got a runtime error while saving a property of "
@@ -297,11 +690,11 @@ class GremlinStorageConnector(BaseStorageConnector):
         discovery_time: datetime,
     ) -> Traversal:
         logger.debug("Looking for edge %s", edge_id)
-        edge = self.g.E(edge_id).property("_discovery_time", discovery_time.isoformat()).toList()
+        edge = self._submit(self.g.E(edge_id).property("_discovery_time", discovery_time.isoformat()).toList)
 
         if not edge:
             logger.debug("Writing edge between %s and %s", source_vertex_id, destination_vertex_id)
-            (
+            self._submit(
                 self.g.V(source_vertex_id)
                 .as_("source")
                 .V(destination_vertex_id)
@@ -310,11 +703,12 @@ class GremlinStorageConnector(BaseStorageConnector):
                 .property(T.id, edge_id)
                 .property("_edge_owner", owner_id)
                 .property("_discovery_time", discovery_time.isoformat())
-            ).next()
+                .next
+            )
 
     def _delete_edge(self, edge_id: str) -> Traversal:
         logger.debug("Deleting edge %s", edge_id)
-        self.g.E(edge_id).drop().iterate()
+        self._submit(self.g.E(edge_id).drop().iterate)
 
     def read_all(self) -> Iterator[dict]:
         """Return all records from storage."""
@@ -368,11 +762,18 @@ class GremlinStorageConnector(BaseStorageConnector):
     def delete_resource(self, urn: URN) -> None:
         """Delete this resource and all its resource attributes.
 
+        Buffered writes are flushed first, so that a buffered write of the resource does not recreate it.
+
         Arguments:
             urn (URN): The URN of the resource to delete
         """
         logger.debug("Deleting resource %s", urn)
+        self.flush()
         self.g.V(self.generate_vertex_id(urn)).drop().iterate()
+        self._forget_vertices({self.generate_vertex_id(urn)})
+        urns_by_id_parts = self._unreconciled_urns.get(generate_primary_label(urn), {})
+        if urns_by_id_parts.get(frozenset(urn.resource_id_parts)) == urn:
+            del urns_by_id_parts[frozenset(urn.resource_id_parts)]
 
     def delete_resource_of_type_in_account_region(
         self,
@@ -403,10 +804,13 @@ class GremlinStorageConnector(BaseStorageConnector):
             resource_type=resource_type,
         )
         logger.debug("Deleting resources that match %s that were discovered before %s", partial_urn, cutoff)
+        self.flush()
         traversal = self._lookup_resource(partial_urn=partial_urn)
         if cutoff:
             traversal.where(__.values("_discovery_time").is_(P.lt(cutoff.isoformat())))
         traversal.drop().iterate()
+        # Which vertices were dropped is unknown, so lookups must go back to the server.
+        self._lookup_cache.clear()
 
     def generate_vertex_id(self, urn: PartialUrn) -> str:
         """Generate a vertex id.
@@ -427,6 +831,21 @@ class GremlinStorageConnector(BaseStorageConnector):
         return f"{self.test_prefix}{source_urn}#{destination_urn}"
 
 
+def _relationship_edge_ends(
+    resource_urn: PartialUrn, relationship_resource_urn: PartialUrn, direction: RelationshipDirection
+) -> Tuple[PartialUrn, PartialUrn]:
+    """Return the urns of the source and destination vertices of a relationship's edge.
+
+    Arguments:
+        resource_urn: The urn of the resource which has the relationship.
+        relationship_resource_urn: The urn of the resource on the other end of the relationship.
+        direction: The direction of the relationship from the point of view of the resource.
+    """
+    if direction == RelationshipDirection.INBOUND:
+        return relationship_resource_urn, resource_urn
+    return resource_urn, relationship_resource_urn
+
+
 def _normalise_gremlin_attrs(raw_dict: Dict[str, Any]) -> Dict[str, Any]:
     """Remove any underscore prefixed keys as these are attributes we use to identify the DynamoDB record.
 
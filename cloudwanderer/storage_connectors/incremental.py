@@ -0,0 +1,247 @@
+"""Storage Connector which only writes the resources which have changed since they were last written.
+
+Most resources are unchanged from one discovery run to the next, yet rewriting them is most of the cost of a run
+(every property and edge of a vertex in Gremlin, every item and index entry in DynamoDB).
+The :attr:`~cloudwanderer.cloud_wanderer_resource.CloudWandererResource.content_hash` of each resource is stored
+alongside it, and the :class:`IncrementalStorageConnector` compares the hash of each resource discovered with the
+hash stored when it was last written (read with one query per resource type, account and region).
+Changed resources are written in full, unchanged resources are either
+
+* touched (the default): only their discovery time is updated (see
+  :meth:`~cloudwanderer.storage_connectors.BaseStorageConnector.touch_resource`), so the usual discovery time
+  cutoff still deletes stale resources. Gremlin and SQLite update a single property or column, connectors which
+  cannot do so more cheaply than writing the resource write it in full.
+* skipped (``skip_unchanged=True``): nothing is written at all, and the stale resources of a type are the stored
+  resources which were not discovered this run, which are deleted one by one. This is the cheapest option for
+  DynamoDB, where updating an item costs as many write units as putting it.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, NamedTuple, Optional, Set, Tuple, cast
+
+from ..cloud_wanderer_resource import CloudWandererResource
+from ..urn import URN
+from .base_connector import BaseStorageConnector
+
+logger = logging.getLogger(__name__)
+
+_ResourceTypeKey = Tuple[str, str, str, str, str]
+
+
+class IncrementalWriteStatistics(NamedTuple):
+    """A snapshot of the writes an :class:`IncrementalStorageConnector` has made (and avoided)."""
+
+    #: The number of new or changed resources written in full.
+    resources_written: int
+    #: The number of unchanged resources whose discovery time was updated.
+    resources_touched: int
+    #: The number of unchanged resources which were not written at all.
+    resources_skipped: int
+    #: The number of stale resources deleted because they were not discovered (with ``skip_unchanged=True``).
+    stale_resources_deleted: int
+
+    @property
+    def unchanged_ratio(self) -> float:
+        """Return the proportion of the resources discovered which were unchanged."""
+        unchanged = self.resources_touched + self.resources_skipped
+        if not unchanged + self.resources_written:
+            return 0.0
+        return unchanged / (unchanged + self.resources_written)
+
+
+class IncrementalStorageConnector(BaseStorageConnector):
+    """Wrap a storage connector so that only new and changed resources are written to it.
+
+    The wrapped connector must store content hashes (the DynamoDB, Gremlin, SQLite and Memory connectors do), and
+    only stores them while it is wrapped.
+
+    Example:
+        >>> import cloudwanderer
+        >>> from cloudwanderer.storage_connectors import GremlinStorageConnector, IncrementalStorageConnector
+        >>> cloud_wanderer = cloudwanderer.CloudWanderer(
+        ...     storage_connectors=[
+        ...         IncrementalStorageConnector(GremlinStorageConnector(endpoint_url="ws://localhost:8182"))
+        ...     ]
+        ... )
+    """
+
+    def __init__(self, storage_connector: BaseStorageConnector, skip_unchanged: bool = False) -> None:
+        """Initialise the IncrementalStorageConnector.
+
+        Arguments:
+            storage_connector: The storage connector to write new and changed resources to.
+            skip_unchanged:
+                Do not write unchanged resources at all (rather than updating their discovery time),
+                deleting the stored resources of a type which were not discovered this run instead of those
+                discovered before the cutoff. Every resource of a type must be written through this connector
+                (between :meth:`open` and :meth:`close`) before the type is deleted, so it cannot be used for the
+                worker processes' storage connectors of
+                :meth:`~cloudwanderer.cloud_wanderer.CloudWanderer.write_resources_in_processes`.
+
+        Raises:
+            TypeError: If the storage connector does not store content hashes.
+        """
+        if type(storage_connector).read_content_hashes is BaseStorageConnector.read_content_hashes:
+            raise TypeError(
+                f"{storage_connector.__class__.__name__} does not store content hashes, "
+                f"so it cannot be wrapped by {self.__class__.__name__}"
+            )
+        storage_connector.store_content_hashes = True
+        self.storage_connector = storage_connector
+        self.skip_unchanged = skip_unchanged
+        self._content_hashes: Dict[_ResourceTypeKey, Dict[str, Optional[str]]] = {}
+        self._discovered_urns: Dict[_ResourceTypeKey, Set[str]] = {}
+        self._write_counters = dict.fromkeys(IncrementalWriteStatistics._fields, 0)
+
+    @property
+    def write_statistics(self) -> IncrementalWriteStatistics:
+        """Return the number of resources written, touched, skipped and deleted so far."""
+        return IncrementalWriteStatistics(**self._write_counters)
+
+    def init(self) -> None:
+        self.storage_connector.init()
+
+    def open(self) -> None:
+        self._content_hashes.clear()
+        self._discovered_urns.clear()
+        self.storage_connector.open()
+
+    def close(self) -> None:
+        self.storage_connector.close()
+        write_statistics = self.write_statistics
+        logger.info(
+            "Wrote %s new or changed resources to %s, %s %s unchanged resources",
+            write_statistics.resources_written,
+            self.storage_connector,
+            "skipped" if self.skip_unchanged else "touched",
+            write_statistics.resources_skipped + write_statistics.resources_touched,
+        )
+        self._content_hashes.clear()
+        self._discovered_urns.clear()
+
+    def flush(self) -> None:
+        self.storage_connector.flush()
+
+    def _stored_content_hashes(self, key: _ResourceTypeKey) -> Dict[str, Optional[str]]:
+        if key not in self._content_hashes:
+            cloud_name, account_id, region, service, resource_type = key
+            self._content_hashes[key] = self.storage_connector.read_content_hashes(
+                cloud_name=cloud_name,
+                account_id=account_id,
+                region=region,
+                service=service,
+                resource_type=resource_type,
+            )
+            logger.debug("Read %s content hashes of %s", len(self._content_hashes[key]), key)
+        return self._content_hashes[key]
+
+    def write_resource(self, resource: CloudWandererResource) -> None:
+        """Write the resource if it is new or has changed since it was last written, otherwise touch or skip it.
+
+        Arguments:
+            resource (CloudWandererResource): The CloudWandererResource to write.
+        """
+        urn = resource.urn
+        key = (cast(str, urn.cloud_name), urn.account_id, urn.region, urn.service, urn.resource_type)
+        stored_content_hashes = self._stored_content_hashes(key)
+        urn_str = str(urn)
+        self._discovered_urns.setdefault(key, set()).add(urn_str)
+        if stored_content_hashes.get(urn_str) != resource.content_hash:
+            self.storage_connector.write_resource(resource)
+            stored_content_hashes[urn_str] = resource.content_hash
+            self._write_counters["resources_written"] += 1
+        elif self.skip_unchanged:
+            self._write_counters["resources_skipped"] += 1
+        else:
+            self.storage_connector.touch_resource(resource)
+            self._write_counters["resources_touched"] += 1
+
+    def touch_resource(self, resource: CloudWandererResource) -> None:
+        self.storage_connector.touch_resource(resource)
+
+    def read_content_hashes(
+        self, cloud_name: str, account_id: str, region: str, service: str, resource_type: str
+    ) -> Dict[str, Optional[str]]:
+        return self.storage_connector.read_content_hashes(
+            cloud_name=cloud_name, account_id=account_id, region=region, service=service, resource_type=resource_type
+        )
+
+    def read_all(self) -> Iterator[dict]:
+        return self.storage_connector.read_all()
+
+    def read_resource(self, urn: URN) -> Optional[CloudWandererResource]:
+        return self.storage_connector.read_resource(urn)
+
+    def read_resources(
+        self,
+        cloud_name: Optional[str] = None,
+        account_id: Optional[str] = None,
+        region: Optional[str] = None,
+        service: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        urn: Optional[URN] = None,
+    ) -> Iterator["CloudWandererResource"]:
+        # The wrapped connector's arguments are implicitly optional.
+        return self.storage_connector.read_resources(
+            cloud_name, account_id, region, service, resource_type, urn  # type: ignore[arg-type]
+        )
+
+    def delete_resource(self, urn: URN) -> None:
+        for content_hashes in self._content_hashes.values():
+            content_hashes.pop(str(urn), None)
+        self.storage_connector.delete_resource(urn)
+
+    def delete_resource_of_type_in_account_region(
+        self,
+        cloud_name: str,
+        service: str,
+        resource_type: str,
+        account_id: str,
+        region: str,
+        cutoff: Optional[datetime],
+    ) -> None:
+        """Delete the stale resources of a type in an account and region.
+
+        With ``skip_unchanged=True`` these are the stored resources which were not discovered this run,
+        otherwise those discovered before the cutoff.
+
+        Arguments:
+            cloud_name: The name of the cloud in question (e.g. ``aws``)
+            service: Service name (e.g. ``'ec2'``)
+            resource_type: Resource Type (e.g. ``'instance'``)
+            account_id: Cloud Account ID (e.g. ``111111111111``)
+            region: Cloud region (e.g. ``'eu-west-2'``)
+            cutoff: Delete any resource discovered before this time (unless ``skip_unchanged=True``).
+        """
+        key = (cloud_name, account_id, region, service, resource_type)
+        if not self.skip_unchanged:
+            self._content_hashes.pop(key, None)
+            self._discovered_urns.pop(key, None)
+            self.storage_connector.delete_resource_of_type_in_account_region(
+                cloud_name=cloud_name,
+                service=service,
+                resource_type=resource_type,
+                account_id=account_id,
+                region=region,
+                cutoff=cutoff,
+            )
+            return
+        stored_urns = self._stored_content_hashes(key)
+        discovered_urns = self._discovered_urns.pop(key, set())
+        stale_urns = [urn_str for urn_str in stored_urns if urn_str not in discovered_urns]
+        logger.debug("Deleting %s %s %s resources which were not discovered", len(stale_urns), service, resource_type)
+        for urn_str in stale_urns:
+            self.storage_connector.delete_resource(URN.from_string(urn_str))
+        self._write_counters["stale_resources_deleted"] += len(stale_urns)
+        self._content_hashes.pop(key, None)
+
+    def __repr__(self) -> str:
+        """Return an instantiable string representation of this object."""
+        return (
+            f"{self.__class__.__name__}(storage_connector={repr(self.storage_connector)}, "
+            f"skip_unchanged={self.skip_unchanged})"
+        )
+
+    def __str__(self) -> str:
+        """Return a string representation of this object."""
+        return f"<{self.__class__.__name__}={self.storage_connector}>"
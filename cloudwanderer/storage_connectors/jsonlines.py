@@ -0,0 +1,387 @@
+"""Allows CloudWanderer to append resources to JSON Lines files.
+
+Every write appends one JSON line to the current segment file (``segment-00000001.jsonl``, ``segment-00000002.jsonl``,
+etc.), and a new segment is started once the current one reaches ``max_segment_bytes``. Deletes append a tombstone
+line rather than modifying existing segments, so writing is as fast as the disk can append.
+
+The position of the latest line of every resource is kept in an index (persisted as ``index.json`` alongside the
+segments when the connector is closed) so that resources can be read with a single seek rather than a scan.
+If the connector was not closed cleanly the index is brought up to date from the segments when it is next opened.
+
+:meth:`JsonLinesStorageConnector.compact` rewrites the live resources into new segments, dropping overwritten
+resources and tombstones, to produce a clean snapshot which can be loaded into other systems line by line.
+"""
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from typing import IO, Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..cloud_wanderer_resource import CloudWandererResource
+from ..models import Relationship, RelationshipDirection
+from ..urn import URN
+from ..utils import json_default
+from .base_connector import ISO_DATE_FORMAT, BaseStorageConnector
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_FILE_NAME_FORMAT = "segment-{:08d}.jsonl"
+SEGMENT_FILE_NAME_PATTERN = re.compile(r"^segment-(\d{8})\.jsonl$")
+INDEX_FILE_NAME = "index.json"
+
+
+class IndexEntry(NamedTuple):
+    """The location of the latest line written for a resource."""
+
+    segment: int
+    offset: int
+    discovery_time: str
+    parent_urn: Optional[str]
+
+
+class JsonLinesStorageConnector(BaseStorageConnector):
+    """CloudWanderer Storage Connector which appends resources to JSON Lines segment files.
+
+    Example:
+        >>> import cloudwanderer
+        >>> storage_connector = cloudwanderer.storage_connectors.JsonLinesStorageConnector(
+        ...     directory="cloudwanderer-jsonl"
+        ... )
+        >>> storage_connector.init()
+        >>> cloud_wanderer = cloudwanderer.CloudWanderer(storage_connectors=[storage_connector])
+    """
+
+    def __init__(self, directory: str = "cloudwanderer-jsonl", max_segment_bytes: int = 64 * 1024 * 1024) -> None:
+        """Initialise the JsonLinesStorageConnector.
+
+        Arguments:
+            directory:
+                The directory to write the segment files and their index into.
+            max_segment_bytes:
+                The size at which the current segment is closed and a new one started.
+        """
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self._index: Dict[str, IndexEntry] = {}
+        self._segment_sizes: Dict[int, int] = {}
+        self._segment_number = 0
+        self._segment_file: Optional[IO[bytes]] = None
+        self._opened = False
+
+    def init(self) -> None:
+        """Create the directory if it does not already exist."""
+        os.makedirs(self.directory, exist_ok=True)
+
+    def open(self) -> None:
+        if self._opened:
+            return
+        logger.debug("Opening %s", self.directory)
+        self.init()
+        self._opened = True
+        self._load_index()
+
+    def close(self) -> None:
+        if not self._opened:
+            return
+        logger.debug("Closing %s", self.directory)
+        self._close_segment()
+        self._save_index()
+        self._opened = False
+
+    def flush(self) -> None:
+        """Flush the current segment to disk so that every resource written can be read by other processes."""
+        if self._segment_file:
+            self._segment_file.flush()
+
+    def write_resource(self, resource: CloudWandererResource) -> None:
+        if resource.urn.is_partial:
+            raise ValueError("Expected complete urn got partial for resource URN: %s.", resource.urn)
+        discovery_time = resource.discovery_time.strftime(ISO_DATE_FORMAT)
+        parent_urn = str(resource.parent_urn) if resource.parent_urn else None
+        segment, offset = self._append(
+            {
+                "op": "put",
+                "urn": str(resource.urn),
+                "parent_urn": parent_urn,
+                "dependent_resource_urns": [str(urn) for urn in resource.dependent_resource_urns],
+                "relationships": [
+                    {"partial_urn": str(relationship.partial_urn), "direction": relationship.direction.name}
+                    for relationship in resource.relationships
+                ],
+                "discovery_time": discovery_time,
+                "resource_data": resource.cloudwanderer_metadata.resource_data,
+            }
+        )
+        self._index[str(resource.urn)] = IndexEntry(
+            segment=segment, offset=offset, discovery_time=discovery_time, parent_urn=parent_urn
+        )
+
+    def _append(self, record: Dict[str, Any]) -> Tuple[int, int]:
+        """Append a record to the current segment, returning the segment number and offset it was written at.
+
+        Arguments:
+            record: The record to append.
+        """
+        self.open()
+        return self._append_line(
+            json.dumps(record, default=json_default, separators=(",", ":")).encode("utf-8") + b"\n"
+        )
+
+    def _append_line(self, line: bytes) -> Tuple[int, int]:
+        """Append a line to the current segment, starting a new segment if the current one is full.
+
+        Arguments:
+            line: The newline terminated line to append.
+        """
+        if self._segment_file is None or self._segment_sizes[self._segment_number] >= self.max_segment_bytes:
+            self._start_segment()
+        offset = self._segment_sizes[self._segment_number]
+        self._segment_file.write(line)  # type: ignore
+        self._segment_sizes[self._segment_number] += len(line)
+        return self._segment_number, offset
+
+    def _start_segment(self) -> None:
+        self._close_segment()
+        self._segment_number += 1
+        self._segment_sizes[self._segment_number] = 0
+        logger.debug("Starting segment %s", self._segment_number)
+        self._segment_file = open(self._segment_path(self._segment_number), "ab")
+
+    def _close_segment(self) -> None:
+        if self._segment_file:
+            self._segment_file.close()
+        self._segment_file = None
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, SEGMENT_FILE_NAME_FORMAT.format(segment))
+
+    def _segments(self) -> List[int]:
+        """Return the numbers of the segment files in the directory in the order they were written."""
+        return sorted(
+            int(match.group(1))
+            for match in (SEGMENT_FILE_NAME_PATTERN.match(file_name) for file_name in os.listdir(self.directory))
+            if match
+        )
+
+    def _load_index(self) -> None:
+        """Load the index, replaying any lines written to the segments since it was saved."""
+        self._index, self._segment_sizes = {}, {}
+        index_path = os.path.join(self.directory, INDEX_FILE_NAME)
+        segments = self._segments()
+        if os.path.exists(index_path):
+            with open(index_path) as index_file:
+                saved_index = json.load(index_file)
+            segment_sizes = {int(segment): size for segment, size in saved_index["segments"].items()}
+            if all(
+                segment in segments and os.path.getsize(self._segment_path(segment)) >= size
+                for segment, size in segment_sizes.items()
+            ):
+                self._index = {urn: IndexEntry(*entry) for urn, entry in saved_index["resources"].items()}
+                self._segment_sizes = segment_sizes
+            else:
+                logger.warning("%s does not match the segments in %s, rebuilding it", INDEX_FILE_NAME, self.directory)
+        for segment in segments:
+            self._replay_segment(segment, start=self._segment_sizes.get(segment, 0))
+        self._segment_number = segments[-1] if segments else 0
+
+    def _replay_segment(self, segment: int, start: int) -> None:
+        """Apply the lines of a segment from an offset onwards to the index.
+
+        An incomplete final line (from a write that was interrupted) is truncated so that it is not appended to.
+
+        Arguments:
+            segment: The number of the segment to replay.
+            start: The offset to start replaying from.
+        """
+        with open(self._segment_path(segment), "rb+") as segment_file:
+            segment_file.seek(start)
+            offset = start
+            for line in iter(segment_file.readline, b""):
+                if not line.endswith(b"\n"):
+                    logger.warning("Truncating incomplete line at offset %s of segment %s", offset, segment)
+                    segment_file.truncate(offset)
+                    break
+                record = json.loads(line)
+                if record["op"] == "put":
+                    self._index[record["urn"]] = IndexEntry(
+                        segment=segment,
+                        offset=offset,
+                        discovery_time=record["discovery_time"],
+                        parent_urn=record["parent_urn"],
+                    )
+                else:
+                    self._index.pop(record["urn"], None)
+                offset += len(line)
+        self._segment_sizes[segment] = offset
+
+    def _save_index(self) -> None:
+        """Atomically write the index alongside the segments."""
+        index_path = os.path.join(self.directory, INDEX_FILE_NAME)
+        with open(f"{index_path}.tmp", "w") as index_file:
+            json.dump({"segments": self._segment_sizes, "resources": self._index}, index_file, separators=(",", ":"))
+        os.replace(f"{index_path}.tmp", index_path)
+
+    def read_all(self) -> Iterator[dict]:
+        """Return the latest record of every resource which has not been deleted."""
+        self.open()
+        for _, entry in self._sorted_entries(self._index.items()):
+            yield self._read_record(entry)
+
+    def read_resource(self, urn: URN) -> Optional[CloudWandererResource]:
+        self.open()
+        entry = self._index.get(str(urn))
+        if entry is None:
+            return None
+        return self._record_to_resource(self._read_record(entry))
+
+    def read_resources(
+        self,
+        cloud_name: Optional[str] = None,
+        account_id: Optional[str] = None,
+        region: Optional[str] = None,
+        service: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        urn: Optional[URN] = None,
+    ) -> Iterator["CloudWandererResource"]:
+        self.open()
+        if urn is not None:
+            resource = self.read_resource(urn)
+            if resource is not None:
+                yield resource
+            return
+        criteria: Dict[str, str] = {
+            key: value
+            for key, value in {
+                "cloud_name": cloud_name,
+                "account_id": account_id,
+                "region": region,
+                "service": service,
+                "resource_type": resource_type,
+            }.items()
+            if value is not None
+        }
+        matching_entries = [
+            (urn_string, entry)
+            for urn_string, entry in self._index.items()
+            if not criteria or _urn_matches(URN.from_string(urn_string), criteria)
+        ]
+        for _, entry in self._sorted_entries(matching_entries):
+            yield self._record_to_resource(self._read_record(entry))
+
+    @staticmethod
+    def _sorted_entries(entries: Any) -> List[Tuple[str, IndexEntry]]:
+        """Sort index entries by their position so that segments are read sequentially.
+
+        Arguments:
+            entries: The (urn, index entry) pairs to sort.
+        """
+        return sorted(entries, key=lambda item: (item[1].segment, item[1].offset))
+
+    def _read_record(self, entry: IndexEntry) -> Dict[str, Any]:
+        return json.loads(self._read_line(entry))
+
+    def _read_line(self, entry: IndexEntry) -> bytes:
+        if entry.segment == self._segment_number:
+            self.flush()
+        with open(self._segment_path(entry.segment), "rb") as segment_file:
+            segment_file.seek(entry.offset)
+            return segment_file.readline()
+
+    def _record_to_resource(self, record: Dict[str, Any]) -> CloudWandererResource:
+        return CloudWandererResource(
+            urn=URN.from_string(record["urn"]),
+            resource_data=record["resource_data"],
+            relationships=[
+                Relationship(
+                    partial_urn=URN.from_string(relationship["partial_urn"]),
+                    direction=RelationshipDirection[relationship["direction"]],
+                )
+                for relationship in record["relationships"]
+            ],
+            dependent_resource_urns=[URN.from_string(urn) for urn in record["dependent_resource_urns"]],
+            parent_urn=record["parent_urn"] and URN.from_string(record["parent_urn"]),
+            discovery_time=datetime.strptime(record["discovery_time"], ISO_DATE_FORMAT),
+            loader=self.read_resource,
+        )
+
+    def delete_resource(self, urn: URN) -> None:
+        self.open()
+        self._delete_urns([str(urn)])
+
+    def delete_resource_of_type_in_account_region(
+        self,
+        cloud_name: str,
+        service: str,
+        resource_type: str,
+        account_id: str,
+        region: str,
+        cutoff: Optional[datetime],
+    ) -> None:
+        self.open()
+        criteria = {
+            "cloud_name": cloud_name,
+            "account_id": account_id,
+            "region": region,
+            "service": service,
+            "resource_type": resource_type,
+        }
+        cutoff_string = cutoff.strftime(ISO_DATE_FORMAT) if cutoff else None
+        urns = [
+            urn_string
+            for urn_string, entry in self._index.items()
+            if (cutoff_string is None or entry.discovery_time < cutoff_string)
+            and _urn_matches(URN.from_string(urn_string), criteria)
+        ]
+        logger.debug("Deleting %s %s %s resources discovered before %s", len(urns), service, resource_type, cutoff)
+        self._delete_urns(urns)
+
+    def _delete_urns(self, urns: List[str]) -> None:
+        """Append tombstones for resources and their dependent resources.
+
+        Arguments:
+            urns: The string URNs of the resources to delete.
+        """
+        urns_to_delete = set(urns)
+        urns_to_delete.update(
+            urn_string for urn_string, entry in self._index.items() if entry.parent_urn in urns_to_delete
+        )
+        for urn_string in urns_to_delete:
+            if self._index.pop(urn_string, None) is not None:
+                self._append({"op": "delete", "urn": urn_string})
+
+    def compact(self) -> None:
+        """Rewrite the live resources into new segments and remove the old segments.
+
+        Overwritten resources and tombstones are dropped, leaving a snapshot with one line per resource.
+        If compaction is interrupted, the old segments are replayed before the new ones when the connector is next
+        opened, so no resources are lost or resurrected.
+        """
+        self.open()
+        self.flush()
+        old_segments = self._segments()
+        compacted_index: Dict[str, IndexEntry] = {}
+        self._start_segment()
+        for urn_string, entry in self._sorted_entries(self._index.items()):
+            segment, offset = self._append_line(self._read_line(entry))
+            compacted_index[urn_string] = entry._replace(segment=segment, offset=offset)
+        self._close_segment()
+        self._index = compacted_index
+        for segment in old_segments:
+            self._segment_sizes.pop(segment, None)
+        self._save_index()
+        for segment in old_segments:
+            os.remove(self._segment_path(segment))
+        logger.info("Compacted %s segments into %s resources", len(old_segments), len(self._index))
+
+    def __repr__(self) -> str:
+        """Return an instantiable string representation of this object."""
+        return f'{self.__class__.__name__}(directory="{self.directory}", max_segment_bytes={self.max_segment_bytes})'
+
+    def __str__(self) -> str:
+        """Return a string representation of this object."""
+        return f"<{self.__class__.__name__}={self.directory}>"
+
+
+def _urn_matches(urn: URN, criteria: Dict[str, str]) -> bool:
+    return all(getattr(urn, key) == value for key, value in criteria.items())
@@ -1,20 +1,24 @@
 """Allows CloudWanderer to store resources in memory."""
 import logging
 from datetime import datetime
-from typing import Any, Callable, Dict, Iterator, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, cast
 
 from ..cloud_wanderer_resource import CloudWandererResource
 from ..urn import URN
-from ..utils import standardise_data_types
 from .base_connector import BaseStorageConnector
 
 logger = logging.getLogger(__name__)
 
+#: The URN attributes which resources are indexed by.
+INDEXED_URN_ATTRIBUTES = ("cloud_name", "account_id", "region", "service", "resource_type")
+
 
 class MemoryStorageConnector(BaseStorageConnector):
     """Storage connector to place data in memory.
 
-    Useful for testing.
+    Useful for testing, or as a staging store. Resources are indexed by each of their URN's
+    ``cloud_name``, ``account_id``, ``region``, ``service`` and ``resource_type`` and by their parent's URN,
+    so filtered reads and deletes only visit the resources that match.
 
     Example:
         >>> import cloudwanderer
@@ -26,6 +30,11 @@ class MemoryStorageConnector(BaseStorageConnector):
 
     def __init__(self) -> None:
         self._data: Dict[str, Any] = {}
+        self._urns: Dict[str, URN] = {}
+        # Dicts (with None values) are used as insertion ordered sets so reads yield resources in the order written.
+        self._indexes: Dict[Tuple[str, Optional[str]], Dict[str, None]] = {}
+        self._children: Dict[str, Dict[str, None]] = {}
+        self._content_hashes: Dict[str, str] = {}
 
     def init(self) -> None:
         """Do nothing. Dummy method to fulfil interface requirements."""
@@ -38,7 +47,7 @@ class MemoryStorageConnector(BaseStorageConnector):
 
     def read_resource(self, urn: URN) -> Optional[CloudWandererResource]:
         try:
-            return memory_item_to_resource(urn, self._data[str(urn)], loader=self.read_resource)
+            return memory_item_to_resource(self._urns[str(urn)], self._data[str(urn)], loader=self.read_resource)
         except KeyError:
             return None
 
@@ -51,28 +60,34 @@ class MemoryStorageConnector(BaseStorageConnector):
         resource_type: str = None,
         urn: URN = None,
     ) -> Iterator["CloudWandererResource"]:
-        for urn_str, items in self._data.items():
-            item_urn = URN.from_string(urn_str)
-            if urn is not None:
-                if item_urn == urn:
-                    yield memory_item_to_resource(item_urn, items, loader=self.read_resource)
-                continue
-            if self._urn_matches_kwargs(
-                item_urn,
-                cloud_name=cloud_name,
-                account_id=account_id,
-                region=region,
-                service=service,
-                resource_type=resource_type,
-            ):
-                yield memory_item_to_resource(item_urn, items, loader=self.read_resource)
-
-    def _urn_matches_kwargs(self, urn: URN, **kwargs) -> bool:
-        filter_items = ("cloud_name", "account_id", "region", "service", "resource_type")
-        for item in filter_items:
-            if kwargs.get(item) is not None and getattr(urn, item) != kwargs[item]:
-                return False
-        return True
+        if urn is not None:
+            resource = self.read_resource(urn)
+            if resource:
+                yield resource
+            return
+        for urn_str in self._lookup(
+            cloud_name=cloud_name,
+            account_id=account_id,
+            region=region,
+            service=service,
+            resource_type=resource_type,
+        ):
+            yield memory_item_to_resource(self._urns[urn_str], self._data[urn_str], loader=self.read_resource)
+
+    def _lookup(self, **kwargs: Optional[str]) -> List[str]:
+        """Return the urns of the resources whose URN attributes match all of those specified.
+
+        Arguments:
+            **kwargs: The values of the URN attributes to match, those which are ``None`` are not matched.
+        """
+        candidate_sets = [
+            self._indexes.get((attribute, value), {}) for attribute, value in kwargs.items() if value is not None
+        ]
+        if not candidate_sets:
+            return list(self._data)
+        candidate_sets.sort(key=len)
+        smallest_set, other_sets = candidate_sets[0], candidate_sets[1:]
+        return [urn_str for urn_str in smallest_set if all(urn_str in other_set for other_set in other_sets)]
 
     def read_all(self) -> Iterator[dict]:
         """Return the raw dictionaries stored in memory."""
@@ -88,24 +103,69 @@ class MemoryStorageConnector(BaseStorageConnector):
                 }
 
     def write_resource(self, resource: CloudWandererResource) -> None:
-        self._data[str(resource.urn)] = self._data.get(str(resource.urn), {})
-        self._data[str(resource.urn)]["BaseResource"] = standardise_data_types(
-            resource.cloudwanderer_metadata.resource_data
-        )
-        self._data[str(resource.urn)]["ParentUrn"] = resource.parent_urn
-        self._data[str(resource.urn)]["DependentResourceUrns"] = resource.dependent_resource_urns
+        urn_str = str(resource.urn)
+        if urn_str not in self._data:
+            self._data[urn_str] = {}
+            self._urns[urn_str] = cast(URN, resource.urn)
+            for attribute in INDEXED_URN_ATTRIBUTES:
+                self._indexes.setdefault((attribute, getattr(resource.urn, attribute)), {})[urn_str] = None
+        items = self._data[urn_str]
+        if items.get("ParentUrn") != resource.parent_urn:
+            self._unlink_child(urn_str, items.get("ParentUrn"))
+        if resource.parent_urn is not None:
+            self._children.setdefault(str(resource.parent_urn), {})[urn_str] = None
+        items["BaseResource"] = resource.cloudwanderer_metadata.standardised_resource_data
+        items["ParentUrn"] = resource.parent_urn
+        items["DependentResourceUrns"] = resource.dependent_resource_urns
+        if self.store_content_hashes:
+            self._content_hashes[urn_str] = resource.content_hash
+        else:
+            self._content_hashes.pop(urn_str, None)
+
+    def read_content_hashes(
+        self, cloud_name: str, account_id: str, region: str, service: str, resource_type: str
+    ) -> Dict[str, Optional[str]]:
+        return {
+            urn_str: self._content_hashes.get(urn_str)
+            for urn_str in self._lookup(
+                cloud_name=cloud_name,
+                account_id=account_id,
+                region=region,
+                service=service,
+                resource_type=resource_type,
+            )
+        }
+
+    def _remove(self, urn_str: str) -> None:
+        """Remove a resource and its index entries.
+
+        Arguments:
+            urn_str: The string URN of the resource to remove.
+        """
+        items = self._data.pop(urn_str, None)
+        if items is None:
+            return
+        urn = self._urns.pop(urn_str)
+        self._content_hashes.pop(urn_str, None)
+        for attribute in INDEXED_URN_ATTRIBUTES:
+            index_key = (attribute, getattr(urn, attribute))
+            self._indexes[index_key].pop(urn_str, None)
+            if not self._indexes[index_key]:
+                del self._indexes[index_key]
+        self._unlink_child(urn_str, items.get("ParentUrn"))
+
+    def _unlink_child(self, urn_str: str, parent_urn: Optional[URN]) -> None:
+        if parent_urn is None:
+            return
+        siblings = self._children.get(str(parent_urn), {})
+        siblings.pop(urn_str, None)
+        if not siblings:
+            self._children.pop(str(parent_urn), None)
 
     def delete_resource(self, urn: URN) -> None:
-        try:
-            del self._data[str(urn)]
-        except KeyError:
-            pass
-        subresources_to_delete = set()
-        for subresource_urn, resource_dict in self._data.items():
-            if resource_dict.get("ParentUrn") == urn:
-                subresources_to_delete.add(subresource_urn)
-        for subresource_urn in subresources_to_delete:
-            del self._data[subresource_urn]
+        self._remove(str(urn))
+        for subresource_urn in list(self._children.get(str(urn), {})):
+            self._remove(subresource_urn)
 
     def delete_resource_of_type_in_account_region(
         self,
@@ -117,24 +177,19 @@ class MemoryStorageConnector(BaseStorageConnector):
         cutoff: Optional[datetime],
     ) -> None:
         urns_to_delete = []
-        for urn_str, items in self._data.items():
-            urn = URN.from_string(urn_str)
-            if urn.cloud_name != cloud_name:
-                continue
-            if urn.service != service:
-                continue
-            if urn.account_id != account_id:
-                continue
-            if urn.resource_type != resource_type:
-                continue
-            if urn.region != region:
-                continue
-            resource = memory_item_to_resource(urn, items)
+        for urn_str in self._lookup(
+            cloud_name=cloud_name,
+            account_id=account_id,
+            region=region,
+            service=service,
+            resource_type=resource_type,
+        ):
+            resource = memory_item_to_resource(self._urns[urn_str], self._data[urn_str])
             if cutoff and resource.discovery_time >= cutoff:
                 continue
-            urns_to_delete.append(urn)
-        for urn in urns_to_delete:
-            del self._data[str(urn)]
+            urns_to_delete.append(urn_str)
+        for urn_str in urns_to_delete:
+            self._remove(urn_str)
 
     def __repr__(self) -> str:
         """Return an instantiable string representation of this object."""
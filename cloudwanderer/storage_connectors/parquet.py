@@ -0,0 +1,542 @@
+"""Allows CloudWanderer to export resources to partitioned Parquet files for analytical queries.
+
+Resources are written to a Hive partitioned directory tree, one directory per cloud, account, region, service and
+resource type (e.g. ``cloud_name=aws/account_id=123456789012/region=eu-west-1/service=ec2/resource_type=vpc``), so
+that query engines (Athena, Spark, DuckDB, ``pyarrow.dataset``) can prune partitions and scan only the columns
+they need.
+
+Each resource type has its own schema, derived from the botocore shape its resource data is normalised against.
+Every top level member of the shape is a typed column (nested structures and lists are stored as Arrow structs and
+lists). Anything which does not fit the shape (secondary attributes, or values botocore's shape does not describe)
+is kept as JSON in the ``_extra_resource_data`` column, so no resource data is lost.
+
+Resources are buffered per partition and written as row groups of ``row_group_size`` rows, so the memory used
+while writing is bounded by ``max_buffered_rows`` rather than the size of the inventory.
+
+This connector requires `pyarrow <https://arrow.apache.org/docs/python/>`__, which can be installed with
+``pip install cloudwanderer[parquet]``.
+"""
+import json
+import logging
+import os
+import pathlib
+import uuid
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, cast
+from urllib.parse import quote, unquote
+
+import botocore
+
+from ..cloud_wanderer_resource import CloudWandererResource
+from ..exceptions import UnsupportedResourceTypeError
+from ..models import Relationship, RelationshipDirection
+from ..urn import URN
+from ..utils import json_default
+from .base_connector import BaseStorageConnector
+
+try:
+    import pyarrow  # type: ignore
+    import pyarrow.compute  # type: ignore
+    import pyarrow.parquet  # type: ignore
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+if TYPE_CHECKING:
+    from botocore.model import Shape
+
+    from ..aws_interface import CloudWandererBoto3Session
+    from ..aws_interface.aws_services import AWS_SERVICES
+
+logger = logging.getLogger(__name__)
+
+#: The URN attributes resources are partitioned by, in the order of the directories they are partitioned into.
+PARTITION_KEYS = ("cloud_name", "account_id", "region", "service", "resource_type")
+
+#: The depth beyond which nested botocore shapes are stored as JSON rather than nested Arrow types.
+MAX_NESTED_DEPTH = 5
+
+#: Field metadata marking a column whose values are stored as JSON strings.
+JSON_ENCODING_METADATA = {b"cloudwanderer.encoding": b"json"}
+
+
+class ParquetPartition(NamedTuple):
+    """The values of the URN attributes a Parquet partition contains the resources of."""
+
+    cloud_name: str
+    account_id: str
+    region: str
+    service: str
+    resource_type: str
+
+    @property
+    def path(self) -> str:
+        """Return the path of the partition relative to the root of the export."""
+        return os.path.join(*(f"{key}={quote(value, safe='')}" for key, value in zip(PARTITION_KEYS, self)))
+
+    @classmethod
+    def factory(cls, urn: URN) -> "ParquetPartition":
+        return cls(*(getattr(urn, key) for key in PARTITION_KEYS))
+
+
+class ParquetStorageConnector(BaseStorageConnector):
+    """CloudWanderer Storage Connector which exports resources to partitioned Parquet files.
+
+    Parquet files are immutable, so every call to :meth:`flush` writes new files (one per partition written to).
+    Stale resources are removed by :meth:`delete_resource_of_type_in_account_region`, which deletes (or rewrites)
+    only the files containing resources discovered before the cutoff. Writing a single resource again (e.g. with
+    :meth:`~cloudwanderer.cloud_wanderer.CloudWanderer.write_resource`) appends a newer row for it rather than
+    replacing the existing one until the next discovery of its resource type sweeps the old one away.
+
+    Example:
+        >>> import cloudwanderer
+        >>> storage_connector = cloudwanderer.storage_connectors.ParquetStorageConnector(
+        ...     output_path="cloudwanderer-inventory"
+        ... )
+        >>> storage_connector.init()
+        >>> cloud_wanderer = cloudwanderer.CloudWanderer(storage_connectors=[storage_connector])
+    """
+
+    def __init__(
+        self,
+        output_path: str = "cloudwanderer-inventory",
+        row_group_size: int = 10000,
+        max_buffered_rows: int = 100000,
+        cloudwanderer_boto3_session: Optional["CloudWandererBoto3Session"] = None,
+    ) -> None:
+        """Initialise the ParquetStorageConnector.
+
+        Arguments:
+            output_path:
+                The directory to write the partitioned Parquet files into.
+            row_group_size:
+                The number of resources in each row group. Resources are buffered per partition until a full
+                row group can be written (or until :meth:`flush` is called).
+            max_buffered_rows:
+                The maximum number of resources to buffer across all partitions, once this is reached the partition
+                with the most buffered resources is written out.
+            cloudwanderer_boto3_session:
+                The session used to look up the botocore shapes resource type schemas are derived from.
+                No API calls are made with it. Defaults to a new
+                :class:`~cloudwanderer.aws_interface.CloudWandererBoto3Session`.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        if pyarrow is None:
+            raise ImportError(
+                "ParquetStorageConnector requires pyarrow, install it with: pip install cloudwanderer[parquet]"
+            )
+        self.output_path = output_path
+        self.row_group_size = row_group_size
+        self.max_buffered_rows = max_buffered_rows
+        self._cloudwanderer_boto3_session = cloudwanderer_boto3_session
+        self._schemas: Dict[Tuple[str, str, str], Any] = {}
+        self._buffers: Dict[ParquetPartition, List[CloudWandererResource]] = {}
+        self._buffered_rows = 0
+        self._writers: Dict[ParquetPartition, Any] = {}
+
+    @property
+    def cloudwanderer_boto3_session(self) -> "CloudWandererBoto3Session":
+        if self._cloudwanderer_boto3_session is None:
+            from ..aws_interface import CloudWandererBoto3Session
+
+            self._cloudwanderer_boto3_session = CloudWandererBoto3Session()
+        return self._cloudwanderer_boto3_session
+
+    def init(self) -> None:
+        """Create the output directory if it does not already exist."""
+        os.makedirs(self.output_path, exist_ok=True)
+
+    def open(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    def write_resource(self, resource: CloudWandererResource) -> None:
+        if resource.urn.is_partial:
+            raise ValueError("Expected complete urn got partial for resource URN: %s.", resource.urn)
+        partition = ParquetPartition.factory(resource.urn)
+        buffer = self._buffers.setdefault(partition, [])
+        buffer.append(resource)
+        self._buffered_rows += 1
+        if len(buffer) >= self.row_group_size:
+            self._write_row_group(partition)
+        elif self._buffered_rows >= self.max_buffered_rows:
+            self._write_row_group(max(self._buffers, key=lambda partition: len(self._buffers[partition])))
+
+    def flush(self) -> None:
+        """Write every buffered resource and close the files being written so they can be read."""
+        for partition in list(self._buffers):
+            self._write_row_group(partition)
+        for partition, writer in self._writers.items():
+            logger.debug("Closing Parquet file for %s", partition.path)
+            writer.close()
+        self._writers.clear()
+
+    def _write_row_group(self, partition: ParquetPartition) -> None:
+        """Write the buffered resources of a partition as a row group, opening a new file for it if necessary.
+
+        Arguments:
+            partition: The partition whose buffered resources should be written.
+        """
+        resources = self._buffers.pop(partition, [])
+        if not resources:
+            return
+        self._buffered_rows -= len(resources)
+        schema = self._get_schema(partition)
+        writer = self._writers.get(partition)
+        if writer is None:
+            directory = os.path.join(self.output_path, partition.path)
+            os.makedirs(directory, exist_ok=True)
+            file_path = os.path.join(
+                directory, f"part-{datetime.now().strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex}.parquet"
+            )
+            logger.debug("Opening Parquet file %s", file_path)
+            writer = self._writers[partition] = pyarrow.parquet.ParquetWriter(file_path, schema)
+        logger.debug("Writing a row group of %s resources to %s", len(resources), partition.path)
+        writer.write_table(_resources_to_table(resources, schema))
+
+    def _get_schema(self, partition: ParquetPartition) -> Any:
+        """Return the Arrow schema of a resource type, deriving it from its botocore shape if necessary.
+
+        Arguments:
+            partition: The partition whose resource type to return the schema of.
+        """
+        key = (partition.cloud_name, partition.service, partition.resource_type)
+        if key not in self._schemas:
+            fields = [
+                _shape_to_field(member_name, member_shape)
+                for member_name, member_shape in self._get_shape_members(partition).items()
+            ]
+            self._schemas[key] = pyarrow.schema(METADATA_FIELDS + fields)
+        return self._schemas[key]
+
+    def _get_shape_members(self, partition: ParquetPartition) -> Dict[str, "Shape"]:
+        if partition.cloud_name != "aws":
+            return {}
+        try:
+            # Shapes are the same in every region, so no matter which region the resource is in we use us-east-1.
+            service = self.cloudwanderer_boto3_session.resource(
+                service_name=cast("AWS_SERVICES", partition.service), region_name="us-east-1"
+            )
+            resource = service.resource(partition.resource_type, empty_resource=True)
+            return dict(resource.shape.members)  # type: ignore
+        except (UnsupportedResourceTypeError, botocore.exceptions.DataNotFoundError):
+            logger.info(
+                "No botocore shape for %s %s, storing its data as JSON", partition.service, partition.resource_type
+            )
+            return {}
+
+    def read_all(self) -> Iterator[dict]:
+        """Return the raw rows of every Parquet file."""
+        self.flush()
+        for _, file_path in self._partition_files():
+            for batch in pyarrow.parquet.ParquetFile(file_path).iter_batches(batch_size=self.row_group_size):
+                yield from batch.to_pylist()
+
+    def read_resource(self, urn: URN) -> Optional[CloudWandererResource]:
+        return next(self.read_resources(urn=urn), None)
+
+    def read_resources(
+        self,
+        cloud_name: Optional[str] = None,
+        account_id: Optional[str] = None,
+        region: Optional[str] = None,
+        service: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        urn: Optional[URN] = None,
+    ) -> Iterator["CloudWandererResource"]:
+        self.flush()
+        if urn is not None:
+            cloud_name, account_id, region = urn.cloud_name, urn.account_id, urn.region
+            service, resource_type = urn.service, urn.resource_type
+        partition_files = self._partition_files(
+            cloud_name=cloud_name, account_id=account_id, region=region, service=service, resource_type=resource_type
+        )
+        for partition, file_path in partition_files:
+            parquet_file = pyarrow.parquet.ParquetFile(file_path)
+            for batch in parquet_file.iter_batches(batch_size=self.row_group_size):
+                if urn is not None:
+                    batch = batch.filter(pyarrow.compute.equal(batch["_urn"], str(urn)))
+                for row in batch.to_pylist():
+                    yield _row_to_resource(partition, row, parquet_file.schema_arrow, loader=self.read_resource)
+
+    def _partition_files(self, **kwargs: Optional[str]) -> Iterator[Tuple[ParquetPartition, str]]:
+        """Yield the Parquet files (and their partitions) of the partitions matching the arguments.
+
+        Arguments:
+            **kwargs: The values of the partition keys to match, any which are ``None`` match every value.
+        """
+        values = {key: quote(value, safe="") for key, value in kwargs.items() if value is not None}
+        pattern = os.path.join(*(f"{key}={values.get(key, '*')}" for key in PARTITION_KEYS), "*.parquet")
+        for file_path in sorted(pathlib.Path(self.output_path).glob(pattern)):
+            partition_path = file_path.parent.relative_to(self.output_path)
+            partition = ParquetPartition(*(unquote(part.partition("=")[2]) for part in partition_path.parts))
+            yield partition, str(file_path)
+
+    def delete_resource(self, urn: URN) -> None:
+        self.flush()
+        # Dependent resources are in the partitions of their own resource types in the same account, region and service.
+        partition_files = self._partition_files(
+            cloud_name=urn.cloud_name, account_id=urn.account_id, region=urn.region, service=urn.service
+        )
+        for _, file_path in partition_files:
+            self._rewrite_file(
+                file_path,
+                lambda batch: pyarrow.compute.invert(
+                    pyarrow.compute.or_kleene(
+                        pyarrow.compute.equal(batch["_urn"], str(urn)),
+                        pyarrow.compute.fill_null(pyarrow.compute.equal(batch["_parent_urn"], str(urn)), False),
+                    )
+                ),
+            )
+
+    def delete_resource_of_type_in_account_region(
+        self,
+        cloud_name: str,
+        service: str,
+        resource_type: str,
+        account_id: str,
+        region: str,
+        cutoff: Optional[datetime],
+    ) -> None:
+        self.flush()
+        partition_files = self._partition_files(
+            cloud_name=cloud_name, account_id=account_id, region=region, service=service, resource_type=resource_type
+        )
+        for _, file_path in partition_files:
+            if cutoff is None:
+                logger.debug("Deleting %s", file_path)
+                os.remove(file_path)
+                continue
+            earliest, latest = _discovery_time_range(pyarrow.parquet.ParquetFile(file_path))
+            if earliest is not None and earliest >= cutoff:
+                continue
+            if latest is not None and latest < cutoff:
+                logger.debug("Deleting %s as every resource in it was discovered before %s", file_path, cutoff)
+                os.remove(file_path)
+                continue
+            self._rewrite_file(
+                file_path,
+                lambda batch: pyarrow.compute.greater_equal(
+                    batch["_discovery_time"], pyarrow.scalar(cutoff, type=batch.schema.field("_discovery_time").type)
+                ),
+            )
+
+    def _rewrite_file(self, file_path: str, predicate: Any) -> None:
+        """Rewrite a Parquet file, keeping only the rows that match the predicate.
+
+        The file is streamed a row group at a time and left untouched if every row matches.
+        The file is deleted if no rows match.
+
+        Arguments:
+            file_path: The path of the Parquet file to rewrite.
+            predicate: A callable which takes a record batch and returns a boolean mask of the rows to keep.
+        """
+        parquet_file = pyarrow.parquet.ParquetFile(file_path)
+        temporary_path = f"{file_path}.tmp"
+        rows_kept = rows_removed = 0
+        with pyarrow.parquet.ParquetWriter(temporary_path, parquet_file.schema_arrow) as writer:
+            for batch in parquet_file.iter_batches(batch_size=self.row_group_size):
+                filtered_batch = batch.filter(predicate(batch))
+                rows_kept += filtered_batch.num_rows
+                rows_removed += batch.num_rows - filtered_batch.num_rows
+                if filtered_batch.num_rows:
+                    writer.write_table(pyarrow.Table.from_batches([filtered_batch]))
+        if not rows_removed:
+            os.remove(temporary_path)
+            return
+        logger.debug("Removed %s rows from %s", rows_removed, file_path)
+        if rows_kept:
+            os.replace(temporary_path, file_path)
+        else:
+            os.remove(temporary_path)
+            os.remove(file_path)
+
+    def __repr__(self) -> str:
+        """Return an instantiable string representation of this object."""
+        return (
+            f'{self.__class__.__name__}(output_path="{self.output_path}", row_group_size={self.row_group_size}, '
+            f"max_buffered_rows={self.max_buffered_rows})"
+        )
+
+    def __str__(self) -> str:
+        """Return a string representation of this object."""
+        return f"<{self.__class__.__name__}={self.output_path}>"
+
+
+if pyarrow is not None:
+    #: The columns every resource type has, in addition to the columns derived from its botocore shape.
+    METADATA_FIELDS = [
+        pyarrow.field("_urn", pyarrow.string(), nullable=False),
+        pyarrow.field("_resource_id_parts", pyarrow.list_(pyarrow.string())),
+        pyarrow.field("_parent_urn", pyarrow.string()),
+        pyarrow.field("_dependent_resource_urns", pyarrow.list_(pyarrow.string())),
+        pyarrow.field(
+            "_relationships",
+            pyarrow.list_(pyarrow.struct([("partial_urn", pyarrow.string()), ("direction", pyarrow.string())])),
+        ),
+        pyarrow.field("_discovery_time", pyarrow.timestamp("us")),
+        pyarrow.field("_extra_resource_data", pyarrow.string(), metadata=JSON_ENCODING_METADATA),
+    ]
+
+    #: The Arrow types of botocore's scalar shape types.
+    SCALAR_TYPES = {
+        "string": pyarrow.string(),
+        "character": pyarrow.string(),
+        "blob": pyarrow.binary(),
+        "boolean": pyarrow.bool_(),
+        "byte": pyarrow.int8(),
+        "short": pyarrow.int16(),
+        "integer": pyarrow.int64(),
+        "long": pyarrow.int64(),
+        "float": pyarrow.float64(),
+        "double": pyarrow.float64(),
+        "bigdecimal": pyarrow.float64(),
+        "biginteger": pyarrow.int64(),
+        "timestamp": pyarrow.timestamp("us", tz="UTC"),
+    }
+
+
+def _shape_to_field(name: str, shape: "Shape") -> Any:
+    """Return the Arrow field for a top level member of a botocore shape.
+
+    Members which cannot be represented as Arrow types (maps, empty or deeply nested structures)
+    are stored as JSON strings.
+
+    Arguments:
+        name: The name of the member.
+        shape: The botocore shape of the member.
+    """
+    arrow_type = _shape_to_type(shape, depth=0)
+    if arrow_type is None:
+        return pyarrow.field(name, pyarrow.string(), metadata=JSON_ENCODING_METADATA)
+    return pyarrow.field(name, arrow_type)
+
+
+def _shape_to_type(shape: "Shape", depth: int) -> Any:
+    if shape.type_name in SCALAR_TYPES:
+        return SCALAR_TYPES[shape.type_name]
+    if depth >= MAX_NESTED_DEPTH:
+        return None
+    if shape.type_name == "list":
+        member_type = _shape_to_type(shape.member, depth=depth + 1)  # type: ignore
+        return member_type and pyarrow.list_(member_type)
+    if shape.type_name == "structure" and shape.members:  # type: ignore
+        member_types = [
+            (member_name, _shape_to_type(member_shape, depth=depth + 1))
+            for member_name, member_shape in shape.members.items()  # type: ignore
+        ]
+        if any(member_type is None for _, member_type in member_types):
+            return None
+        return pyarrow.struct(member_types)
+    return None
+
+
+def _resources_to_table(resources: List[CloudWandererResource], schema: Any) -> Any:
+    """Return an Arrow table of resources.
+
+    Resource data which does not fit the schema is stored as JSON in the ``_extra_resource_data`` column.
+
+    Arguments:
+        resources: The resources to convert.
+        schema: The schema of the resources' resource type.
+    """
+    extra_resource_data: List[Dict[str, Any]] = [
+        {key: value for key, value in resource.cloudwanderer_metadata.resource_data.items() if key not in schema.names}
+        for resource in resources
+    ]
+    columns: Dict[str, Any] = {
+        "_urn": [str(resource.urn) for resource in resources],
+        "_resource_id_parts": [resource.urn.resource_id_parts for resource in resources],
+        "_parent_urn": [str(resource.parent_urn) if resource.parent_urn else None for resource in resources],
+        "_dependent_resource_urns": [[str(urn) for urn in resource.dependent_resource_urns] for resource in resources],
+        "_relationships": [
+            [
+                {"partial_urn": str(relationship.partial_urn), "direction": relationship.direction.name}
+                for relationship in resource.relationships
+            ]
+            for resource in resources
+        ],
+        "_discovery_time": [resource.discovery_time for resource in resources],
+    }
+    arrays = []
+    for field in schema:
+        if field.name == "_extra_resource_data":
+            continue
+        if field.name in columns:
+            arrays.append(pyarrow.array(columns[field.name], type=field.type))
+            continue
+        values = [resource.cloudwanderer_metadata.resource_data.get(field.name) for resource in resources]
+        if field.metadata == JSON_ENCODING_METADATA:
+            values = [None if value is None else json.dumps(value, default=json_default) for value in values]
+        try:
+            arrays.append(pyarrow.array(values, type=field.type))
+        except (pyarrow.ArrowException, TypeError, ValueError, OverflowError):
+            logger.debug("%s does not match its botocore shape, storing it as JSON", field.name)
+            arrays.append(pyarrow.nulls(len(values), type=field.type))
+            for resource_extra_resource_data, value in zip(extra_resource_data, values):
+                if value is not None:
+                    resource_extra_resource_data[field.name] = value
+    arrays.insert(
+        schema.get_field_index("_extra_resource_data"),
+        pyarrow.array(
+            [json.dumps(data, default=json_default) if data else None for data in extra_resource_data],
+            type=pyarrow.string(),
+        ),
+    )
+    return pyarrow.Table.from_arrays(arrays, schema=schema)
+
+
+def _row_to_resource(
+    partition: ParquetPartition, row: Dict[str, Any], schema: Any, loader: Any = None
+) -> CloudWandererResource:
+    resource_data = {}
+    for field in schema:
+        if field.name.startswith("_"):
+            continue
+        value = row[field.name]
+        if value is not None and field.metadata == JSON_ENCODING_METADATA:
+            value = json.loads(value)
+        resource_data[field.name] = value
+    if row["_extra_resource_data"]:
+        resource_data.update(json.loads(row["_extra_resource_data"]))
+    return CloudWandererResource(
+        urn=URN(**partition._asdict(), resource_id_parts=row["_resource_id_parts"]),
+        resource_data=resource_data,
+        relationships=[
+            Relationship(
+                partial_urn=URN.from_string(relationship["partial_urn"]),
+                direction=RelationshipDirection[relationship["direction"]],
+            )
+            for relationship in row["_relationships"] or []
+        ],
+        dependent_resource_urns=[URN.from_string(urn) for urn in row["_dependent_resource_urns"] or []],
+        parent_urn=row["_parent_urn"] and URN.from_string(row["_parent_urn"]),
+        discovery_time=row["_discovery_time"],
+        loader=loader,
+    )
+
+
+def _discovery_time_range(parquet_file: Any) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Return the earliest and latest discovery time in a Parquet file from its row group statistics.
+
+    Arguments:
+        parquet_file: The Parquet file to return the discovery time range of.
+    """
+    # Nested columns are stored as several Parquet columns, so the Parquet column index differs from the Arrow one.
+    column_index = next(
+        index
+        for index in range(len(parquet_file.schema))
+        if parquet_file.schema.column(index).path == "_discovery_time"
+    )
+    earliest: Optional[datetime] = None
+    latest: Optional[datetime] = None
+    for row_group_index in range(parquet_file.metadata.num_row_groups):
+        statistics = parquet_file.metadata.row_group(row_group_index).column(column_index).statistics
+        if statistics is None or not statistics.has_min_max:
+            return None, None
+        earliest = statistics.min if earliest is None else min(earliest, statistics.min)
+        latest = statistics.max if latest is None else max(latest, statistics.max)
+    return earliest, latest
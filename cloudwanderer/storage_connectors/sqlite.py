@@ -0,0 +1,353 @@
+"""Allows CloudWanderer to store resources in a local SQLite database.
+
+Resources are kept in a ``resources`` table with a column (and indexes) for each component of their URN and their
+data as a JSON payload. Their relationships are kept in a ``relationships`` table with a row per relationship.
+The database is opened in WAL mode and writes are buffered and committed in transactions of ``batch_size``
+resources, so a single node can persist and query hundreds of thousands of resources.
+"""
+import json
+import logging
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ..cloud_wanderer_resource import CloudWandererResource
+from ..models import Relationship, RelationshipDirection
+from ..urn import URN
+from ..utils import json_object_hook
+from .base_connector import ISO_DATE_FORMAT, BaseStorageConnector
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    urn TEXT PRIMARY KEY,
+    cloud_name TEXT NOT NULL,
+    account_id TEXT NOT NULL,
+    region TEXT NOT NULL,
+    service TEXT NOT NULL,
+    resource_type TEXT NOT NULL,
+    resource_id_parts TEXT NOT NULL,
+    parent_urn TEXT,
+    dependent_resource_urns TEXT NOT NULL,
+    discovery_time TEXT NOT NULL,
+    resource_data TEXT NOT NULL,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS resources_by_resource_type
+    ON resources (service, resource_type, account_id, region, cloud_name);
+CREATE INDEX IF NOT EXISTS resources_by_account_id ON resources (account_id, region);
+CREATE INDEX IF NOT EXISTS resources_by_region ON resources (region);
+CREATE INDEX IF NOT EXISTS resources_by_parent_urn ON resources (parent_urn);
+CREATE TABLE IF NOT EXISTS relationships (
+    urn TEXT NOT NULL,
+    partner_urn TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    PRIMARY KEY (urn, partner_urn, direction)
+);
+CREATE INDEX IF NOT EXISTS relationships_by_partner_urn ON relationships (partner_urn);
+"""
+
+RESOURCE_COLUMNS = (
+    "urn",
+    "cloud_name",
+    "account_id",
+    "region",
+    "service",
+    "resource_type",
+    "resource_id_parts",
+    "parent_urn",
+    "dependent_resource_urns",
+    "discovery_time",
+    "resource_data",
+    "content_hash",
+)
+
+#: The maximum number of variables SQLite allows in a statement in older versions.
+SQLITE_MAX_VARIABLES = 999
+
+
+class SQLiteStorageConnector(BaseStorageConnector):
+    """CloudWanderer Storage Connector for SQLite.
+
+    Example:
+        >>> import cloudwanderer
+        >>> storage_connector = cloudwanderer.storage_connectors.SQLiteStorageConnector(
+        ...     database_path="cloudwanderer.sqlite3"
+        ... )
+        >>> storage_connector.init()
+        >>> cloud_wanderer = cloudwanderer.CloudWanderer(storage_connectors=[storage_connector])
+    """
+
+    def __init__(self, database_path: str = "cloudwanderer.sqlite3", batch_size: int = 1000) -> None:
+        """Initialise the SQLiteStorageConnector.
+
+        Arguments:
+            database_path:
+                The path of the SQLite database file (``':memory:'`` for a database which is not persisted).
+            batch_size:
+                The number of resources to buffer before writing them in a single transaction.
+                Buffered resources are written before any read or delete, and on :meth:`flush` or :meth:`close`.
+        """
+        self.database_path = database_path
+        self.batch_size = batch_size
+        self._connection: Optional[sqlite3.Connection] = None
+        self._write_buffer: Dict[str, CloudWandererResource] = {}
+        self._touch_buffer: Dict[str, str] = {}
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if not self._connection:
+            self.open()
+        return self._connection  # type: ignore
+
+    def init(self) -> None:
+        """Create the tables and indexes if they do not already exist."""
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            columns = [row["name"] for row in self.connection.execute("PRAGMA table_info(resources)")]
+            if "content_hash" not in columns:
+                # Databases created before content hashes were stored.
+                self.connection.execute("ALTER TABLE resources ADD COLUMN content_hash TEXT")
+
+    def open(self) -> None:
+        if self._connection:
+            return
+        logger.debug("Opening %s", self.database_path)
+        # Connectors are called from CloudWanderer's worker threads (one at a time), not just the one which opened it.
+        self._connection = sqlite3.connect(self.database_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+
+    def close(self) -> None:
+        self.flush()
+        if self._connection:
+            logger.debug("Closing %s", self.database_path)
+            self._connection.close()
+        self._connection = None
+
+    def write_resource(self, resource: CloudWandererResource) -> None:
+        if resource.urn.is_partial:
+            raise ValueError("Expected complete urn got partial for resource URN: %s.", resource.urn)
+        # Later writes of the same resource replace earlier ones which have not been written yet.
+        self._touch_buffer.pop(str(resource.urn), None)
+        self._write_buffer[str(resource.urn)] = resource
+        if len(self._write_buffer) + len(self._touch_buffer) >= self.batch_size:
+            self.flush()
+
+    def touch_resource(self, resource: CloudWandererResource) -> None:
+        """Update only the discovery time of an unchanged resource (in the next transaction).
+
+        Arguments:
+            resource: The unchanged resource.
+        """
+        if str(resource.urn) in self._write_buffer:
+            self.write_resource(resource)
+            return
+        self._touch_buffer[str(resource.urn)] = resource.discovery_time.strftime(ISO_DATE_FORMAT)
+        if len(self._write_buffer) + len(self._touch_buffer) >= self.batch_size:
+            self.flush()
+
+    def read_content_hashes(
+        self, cloud_name: str, account_id: str, region: str, service: str, resource_type: str
+    ) -> Dict[str, Optional[str]]:
+        self.flush()
+        where_clause, parameters = _where_clause(
+            cloud_name=cloud_name, account_id=account_id, region=region, service=service, resource_type=resource_type
+        )
+        return {
+            row["urn"]: row["content_hash"]
+            for row in self.connection.execute(f"SELECT urn, content_hash FROM resources {where_clause}", parameters)
+        }
+
+    def flush(self) -> None:
+        """Write any buffered resources (and their relationships) and discovery time updates in a single transaction."""
+        if not self._write_buffer and not self._touch_buffer:
+            return
+        resources = list(self._write_buffer.values())
+        self._write_buffer.clear()
+        touches = [(discovery_time, urn) for urn, discovery_time in self._touch_buffer.items()]
+        self._touch_buffer.clear()
+        logger.debug("Writing %s resources (and touching %s) to %s", len(resources), len(touches), self.database_path)
+        with self.connection:
+            self.connection.executemany("UPDATE resources SET discovery_time = ? WHERE urn = ?", touches)
+            self.connection.executemany(
+                "DELETE FROM relationships WHERE urn = ?", [(str(resource.urn),) for resource in resources]
+            )
+            self.connection.executemany(
+                f"INSERT OR REPLACE INTO resources ({', '.join(RESOURCE_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(RESOURCE_COLUMNS))})",
+                [_resource_to_row(resource, self.store_content_hashes) for resource in resources],
+            )
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO relationships (urn, partner_urn, direction) VALUES (?, ?, ?)",
+                [
+                    (str(resource.urn), str(relationship.partial_urn), relationship.direction.name)
+                    for resource in resources
+                    for relationship in resource.relationships
+                ],
+            )
+
+    def read_all(self) -> Iterator[dict]:
+        """Return the raw rows of the resources table."""
+        self.flush()
+        for row in self.connection.execute("SELECT * FROM resources"):
+            yield dict(row)
+
+    def read_resource(self, urn: URN) -> Optional[CloudWandererResource]:
+        return next(self.read_resources(urn=urn), None)
+
+    def read_resources(
+        self,
+        cloud_name: Optional[str] = None,
+        account_id: Optional[str] = None,
+        region: Optional[str] = None,
+        service: Optional[str] = None,
+        resource_type: Optional[str] = None,
+        urn: Optional[URN] = None,
+    ) -> Iterator["CloudWandererResource"]:
+        self.flush()
+        where_clause, parameters = _where_clause(
+            urn=str(urn) if urn is not None else None,
+            cloud_name=cloud_name,
+            account_id=account_id,
+            region=region,
+            service=service,
+            resource_type=resource_type,
+        )
+        cursor = self.connection.execute(f"SELECT * FROM resources {where_clause}", parameters)
+        while True:
+            rows = cursor.fetchmany(SQLITE_MAX_VARIABLES)
+            if not rows:
+                return
+            relationships = self._read_relationships([row["urn"] for row in rows])
+            for row in rows:
+                yield _row_to_resource(row, relationships.get(row["urn"], []), loader=self.read_resource)
+
+    def _read_relationships(self, urns: List[str]) -> Dict[str, List[Relationship]]:
+        relationships: Dict[str, List[Relationship]] = {}
+        rows = self.connection.execute(
+            f"SELECT * FROM relationships WHERE urn IN ({', '.join('?' * len(urns))})", urns
+        ).fetchall()
+        for row in rows:
+            relationships.setdefault(row["urn"], []).append(
+                Relationship(
+                    partial_urn=URN.from_string(row["partner_urn"]),
+                    direction=RelationshipDirection[row["direction"]],
+                )
+            )
+        return relationships
+
+    def delete_resource(self, urn: URN) -> None:
+        self.flush()
+        self._delete_resources([str(urn)])
+
+    def delete_resource_of_type_in_account_region(
+        self,
+        cloud_name: str,
+        service: str,
+        resource_type: str,
+        account_id: str,
+        region: str,
+        cutoff: Optional[datetime],
+    ) -> None:
+        self.flush()
+        where_clause, parameters = _where_clause(
+            cloud_name=cloud_name, account_id=account_id, region=region, service=service, resource_type=resource_type
+        )
+        if cutoff:
+            where_clause += " AND discovery_time < ?"
+            parameters.append(cutoff.strftime(ISO_DATE_FORMAT))
+        urns = [row["urn"] for row in self.connection.execute(f"SELECT urn FROM resources {where_clause}", parameters)]
+        logger.debug("Deleting %s %s %s resources discovered before %s", len(urns), service, resource_type, cutoff)
+        self._delete_resources(urns)
+
+    def _delete_resources(self, urns: List[str]) -> None:
+        """Delete resources, their dependent resources, and their relationships in a single transaction.
+
+        Arguments:
+            urns: The string URNs of the resources to delete.
+        """
+        with self.connection:
+            parameters = [(urn,) for urn in urns]
+            self.connection.executemany(
+                "DELETE FROM relationships WHERE urn IN (SELECT urn FROM resources WHERE parent_urn = ?)", parameters
+            )
+            self.connection.executemany("DELETE FROM resources WHERE parent_urn = ?", parameters)
+            self.connection.executemany("DELETE FROM relationships WHERE urn = ?", parameters)
+            self.connection.executemany("DELETE FROM resources WHERE urn = ?", parameters)
+
+    def __repr__(self) -> str:
+        """Return an instantiable string representation of this object."""
+        return f'{self.__class__.__name__}(database_path="{self.database_path}", batch_size={self.batch_size})'
+
+    def __str__(self) -> str:
+        """Return a string representation of this object."""
+        return f"<{self.__class__.__name__}={self.database_path}>"
+
+
+def _where_clause(**kwargs: Optional[str]) -> Tuple[str, List[Any]]:
+    """Return a WHERE clause (and its parameters) matching every column whose value is not ``None``.
+
+    Arguments:
+        **kwargs: The values of the columns to match.
+    """
+    conditions = [f"{column} = ?" for column, value in kwargs.items() if value is not None]
+    parameters = [value for value in kwargs.values() if value is not None]
+    if not conditions:
+        return "WHERE 1 = 1", parameters
+    return f"WHERE {' AND '.join(conditions)}", parameters
+
+
+def _decimal_default(item: object) -> Optional[object]:
+    """JSON object type converter for standardised resource data, whose floats have been converted to Decimals.
+
+    Each Decimal is written as the float it was converted from, so it is read back as the same Decimal.
+
+    Arguments:
+        item: The object JSON is trying to serialise.
+    """
+    if isinstance(item, Decimal):
+        return float(item)
+    return None
+
+
+def _resource_to_row(resource: CloudWandererResource, store_content_hash: bool) -> Tuple[Any, ...]:
+    urn = resource.urn
+    return (
+        str(urn),
+        urn.cloud_name,
+        urn.account_id,
+        urn.region,
+        urn.service,
+        urn.resource_type,
+        json.dumps(urn.resource_id_parts),
+        str(resource.parent_urn) if resource.parent_urn is not None else None,
+        json.dumps([str(dependent_urn) for dependent_urn in resource.dependent_resource_urns]),
+        resource.discovery_time.strftime(ISO_DATE_FORMAT),
+        json.dumps(resource.cloudwanderer_metadata.standardised_resource_data, default=_decimal_default),
+        resource.content_hash if store_content_hash else None,
+    )
+
+
+def _row_to_resource(
+    row: sqlite3.Row, relationships: Iterable[Relationship], loader: Any = None
+) -> CloudWandererResource:
+    return CloudWandererResource(
+        urn=URN(
+            cloud_name=row["cloud_name"],
+            account_id=row["account_id"],
+            region=row["region"],
+            service=row["service"],
+            resource_type=row["resource_type"],
+            resource_id_parts=json.loads(row["resource_id_parts"]),
+        ),
+        resource_data=json.loads(row["resource_data"], object_hook=json_object_hook, parse_float=Decimal),
+        relationships=list(relationships),
+        dependent_resource_urns=[URN.from_string(urn) for urn in json.loads(row["dependent_resource_urns"])],
+        parent_urn=row["parent_urn"] and URN.from_string(row["parent_urn"]),
+        discovery_time=datetime.strptime(row["discovery_time"], ISO_DATE_FORMAT),
+        loader=loader,
+    )
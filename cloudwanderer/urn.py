@@ -17,22 +17,40 @@ Example:
 service='iam', resource_type='vpc', resource_id_parts=['vpc-11111111'])
 
 """
+import functools
 import re
-from typing import Any, Generator, List, Optional, Tuple
+import sys
+from typing import Any, Generator, List, Optional, Tuple, Type
+
+#: The attributes which make up a URN, in the order they appear in its string form.
+URN_ATTRIBUTES = ("cloud_name", "account_id", "region", "service", "resource_type")
 
 
 class PartialUrn:
     """A partially specified URN.
 
     Useful for matching unknown or multiple URNs.
+
+    URNs are immutable and hashable, so they can be used as dictionary keys and set members.
+    A URN is equal to (and hashes the same as) its string form, so URNs and URN strings can be used interchangeably
+    as keys.
     """
 
+    __slots__ = URN_ATTRIBUTES + ("_resource_id_parts", "resource_id", "_string", "_hash")
+
+    #: Intern the cloud name, account id, region, service and resource type of every URN, so that the millions of
+    #: URNs in a large inventory share a single copy of each of these (heavily repeated) strings.
+    intern_attributes = True
+
     cloud_name: Optional[str]
     account_id: Optional[str]
     region: Optional[str]
     service: Optional[str]
     resource_type: Optional[str]
-    resource_id_parts: List[str]
+    _resource_id_parts: Tuple[str, ...]
+    resource_id: str
+    _string: str
+    _hash: int
 
     def __init__(
         self,
@@ -43,18 +61,31 @@ class PartialUrn:
         resource_type: Optional[str] = None,
         resource_id_parts: Optional[List[str]] = None,
     ) -> None:
-        self.cloud_name = cloud_name
-        self.account_id = account_id
-        self.region = region
-        self.service = service
-        self.resource_type = resource_type
-        self.resource_id_parts: List[str] = resource_id_parts or []
-        if not all(isinstance(id_part, str) for id_part in self.resource_id_parts):
+        resource_id_parts = list(resource_id_parts) if resource_id_parts else []
+        if not all([isinstance(id_part, str) for id_part in resource_id_parts]):
             raise ValueError(
-                f"All resource_id_parts must be strings, got {self.resource_id_parts} "
-                f"for {self.service} {self.resource_type}"
+                f"All resource_id_parts must be strings, got {resource_id_parts} for {service} {resource_type}"
+            )
+        if self.intern_attributes:
+            cloud_name, account_id, region, service, resource_type = (
+                _intern(cloud_name),
+                _intern(account_id),
+                _intern(region),
+                _intern(service),
+                _intern(resource_type),
             )
-        self.resource_id = "/".join(self.escape_id(id_part) or "" for id_part in self.resource_id_parts)
+        _set_urn_attributes(
+            self,
+            (
+                cloud_name,
+                account_id,
+                region,
+                service,
+                resource_type,
+                tuple(resource_id_parts),
+                "/".join([self.escape_id(id_part) or "" for id_part in resource_id_parts]),
+            ),
+        )
 
     def copy(
         self,
@@ -74,20 +105,29 @@ class PartialUrn:
             resource_id_parts=resource_id_parts or self.resource_id_parts,
         )
 
+    @property
+    def resource_id_parts(self) -> List[str]:
+        """Return the resource id parts (a new list each time, as the URN is immutable)."""
+        return list(self._resource_id_parts)
+
     @property
     def is_partial(self) -> bool:
-        for value in self.__dict__.values():
-            if value == "unknown":
-                return True
-        return False
+        return "unknown" in (
+            self.cloud_name,
+            self.account_id,
+            self.region,
+            self.service,
+            self.resource_type,
+            self.resource_id,
+        )
 
     @property
     def is_dependent_resource(self) -> bool:
-        if not self.resource_id_parts:
+        if not self._resource_id_parts:
             raise ValueError(
                 "Cannot determine whether this PartialURN is dependent because it has no resource id parts"
             )
-        return len(self.resource_id_parts) > 1
+        return len(self._resource_id_parts) > 1
 
     @property
     def cloud_service_resource_label(self) -> str:
@@ -116,6 +156,8 @@ class PartialUrn:
         """
         if escaped_id is None:
             return None
+        if "\\" not in escaped_id:
+            return escaped_id
         return re.sub(r"\\(/|:)", r"\1", escaped_id)
 
     @staticmethod
@@ -129,17 +171,61 @@ class PartialUrn:
             return None
         if not isinstance(unescaped_id, str):
             unescaped_id = str(unescaped_id)
+        if "/" not in unescaped_id and ":" not in unescaped_id:
+            return unescaped_id
         return re.sub(r"(?<!\\)(/|:)", r"\\\1", unescaped_id)
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Prevent URNs from being modified, as they are hashable.
+
+        Arguments:
+            name: The name of the attribute being set.
+            value: The value it is being set to.
+
+        Raises:
+            AttributeError: Always.
+        """
+        raise AttributeError(f"{self.__class__.__name__} objects are immutable, use copy() to change {name}")
+
+    def __delattr__(self, name: str) -> None:
+        """Prevent URNs from being modified, as they are hashable.
+
+        Arguments:
+            name: The name of the attribute being deleted.
+
+        Raises:
+            AttributeError: Always.
+        """
+        raise AttributeError(f"{self.__class__.__name__} objects are immutable")
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickle the URN by its attributes (it cannot be unpickled by setting them as it is immutable)."""
+        return (
+            _unpickle_urn,
+            (
+                self.__class__,
+                self.cloud_name,
+                self.account_id,
+                self.region,
+                self.service,
+                self.resource_type,
+                self.resource_id_parts,
+            ),
+        )
+
     def __str__(self) -> str:
         """Return a string representation of the URN."""
-        base = ":".join(
-            [
-                str(part or "unknown")
-                for part in ["urn", self.cloud_name, self.account_id, self.region, self.service, self.resource_type]
-            ]
-        )
-        return f"{base}:{self.resource_id}"
+        try:
+            return self._string
+        except AttributeError:
+            base = ":".join(
+                [
+                    str(part or "unknown")
+                    for part in ["urn", self.cloud_name, self.account_id, self.region, self.service, self.resource_type]
+                ]
+            )
+            object.__setattr__(self, "_string", f"{base}:{self.resource_id}")
+            return self._string
 
     def __repr__(self) -> str:
         """Return a class representation of the URN."""
@@ -154,24 +240,78 @@ class PartialUrn:
         )
 
     def __eq__(self, other: Any) -> bool:
-        """Allow comparison of one URN to another.
+        """Allow comparison of one URN to another (or to a URN string).
 
         Arguments:
             other (Any): The other object to compare this one with.
         """
+        if self is other:
+            return True
+        if isinstance(other, PartialUrn):
+            return hash(self) == hash(other) and str(self) == str(other)
         return str(self) == str(other)
 
-    def __iter__(self) -> Generator[Tuple[str, str], None, None]:
+    def __hash__(self) -> int:
+        """Return the hash of the URN's string form, so that it matches the string as a dictionary key."""
+        try:
+            return self._hash
+        except AttributeError:
+            object.__setattr__(self, "_hash", hash(str(self)))
+            return self._hash
+
+    def __iter__(self) -> Generator[Tuple[str, Any], None, None]:
         """Allow the URN to be turned into a dict."""
-        for attribute_name in vars(self):
-            if attribute_name.startswith("_"):
-                continue
+        for attribute_name in URN_ATTRIBUTES + ("resource_id_parts", "resource_id"):
             yield attribute_name, getattr(self, attribute_name)
 
 
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if type(value) is str else value
+
+
+#: The setters of the slots _set_urn_attributes sets, which bypass PartialUrn.__setattr__ (faster than
+#: object.__setattr__ as the slots do not need to be looked up by name).
+_URN_ATTRIBUTE_SETTERS = tuple(
+    getattr(PartialUrn, attribute_name).__set__
+    for attribute_name in URN_ATTRIBUTES + ("_resource_id_parts", "resource_id")
+)
+
+
+def _set_urn_attributes(urn: PartialUrn, values: Tuple[Any, ...]) -> None:
+    """Set the attributes of a new URN.
+
+    Arguments:
+        urn: The URN to set the attributes of.
+        values: The cloud name, account id, region, service, resource type, resource id parts (a tuple) and resource id.
+    """
+    for setter, value in zip(_URN_ATTRIBUTE_SETTERS, values):
+        setter(urn, value)
+
+
+def _unpickle_urn(
+    cls: type,
+    cloud_name: Optional[str],
+    account_id: Optional[str],
+    region: Optional[str],
+    service: Optional[str],
+    resource_type: Optional[str],
+    resource_id_parts: List[str],
+) -> PartialUrn:
+    return cls(
+        cloud_name=cloud_name,
+        account_id=account_id,
+        region=region,
+        service=service,
+        resource_type=resource_type,
+        resource_id_parts=resource_id_parts,
+    )
+
+
 class URN(PartialUrn):
     """A dataclass for building and querying AWS URNs."""
 
+    __slots__ = ()
+
     account_id: str
     region: str
     service: str
@@ -222,27 +362,96 @@ class URN(PartialUrn):
         )
 
     @classmethod
-    def from_string(cls, urn_string: str) -> "URN":
+    def from_string(cls, urn_string: str, cached: bool = True) -> "URN":
         """Create an URN Object from an URN string.
 
+        URNs are immutable, so the URN parsed from a string is cached and returned whenever the same string is parsed
+        again (the most recently parsed :data:`FROM_STRING_CACHE_SIZE` strings are cached).
+
         Arguments:
             urn_string (str): The string version of an AWSUrn to convert into an object.
+            cached: Whether to use the cache of recently parsed strings.
 
         Returns:
             URN: The instantiated AWS URN.
-
-        Raises:
-            ValueError: When no valid resource id found
         """
-        parts = re.split(r"(?<!\\):", urn_string)
-        try:
-            resource_id_parts = re.split(r"(?<!\\)/", parts[6])
-        except IndexError:
-            raise ValueError("Resource ID must be supplied as the 7th element in a colon separated string")
+        if cached:
+            return _cached_parse_urn_string(cls, urn_string)  # type: ignore
+        return _parse_urn_string(cls, urn_string)
+
+
+#: The number of distinct URN strings whose parsed URNs are cached by :meth:`URN.from_string`.
+FROM_STRING_CACHE_SIZE = 16384
+
+
+def _parse_urn_string(cls: Type[URN], urn_string: str) -> URN:
+    """Parse a URN string in a single pass.
+
+    Colons and forward slashes preceded by a backslash are part of the resource id rather than separators.
+
+    Arguments:
+        cls: The URN class to instantiate.
+        urn_string: The string to parse.
+
+    Raises:
+        ValueError: When no valid resource id found
+    """
+    escaped = "\\" in urn_string
+    parts = _split_unescaped(urn_string, ":") if escaped else urn_string.split(":")
+    if len(parts) < 7:
+        raise ValueError("Resource ID must be supplied as the 7th element in a colon separated string")
+    if escaped:
         return cls(
             account_id=parts[2],
             region=parts[3],
             service=parts[4],
             resource_type=parts[5],
-            resource_id_parts=[cls.unescape_id(id_part) for id_part in resource_id_parts],
+            resource_id_parts=[_unescape(id_part) for id_part in _split_unescaped(parts[6], "/")],
         )
+    resource_id_parts = parts[6].split("/")
+    if not all(resource_id_parts):
+        raise ValueError("resource_id or id_parts must be supplied with non empty values")
+    # Without any escaped characters, the resource id in the string is exactly the one URN.__init__ would build.
+    urn = cls.__new__(cls)
+    if cls.intern_attributes:
+        intern = sys.intern
+        values = ("aws", intern(parts[2]), intern(parts[3]), intern(parts[4]), intern(parts[5]))
+    else:
+        values = ("aws", parts[2], parts[3], parts[4], parts[5])
+    _set_urn_attributes(urn, values + (tuple(resource_id_parts), parts[6]))
+    return urn
+
+
+_cached_parse_urn_string = functools.lru_cache(maxsize=FROM_STRING_CACHE_SIZE)(_parse_urn_string)
+
+
+def _split_unescaped(string: str, separator: str) -> List[str]:
+    """Split a string on each separator which is not preceded by a backslash.
+
+    Arguments:
+        string: The string to split.
+        separator: The single character to split on.
+    """
+    parts = []
+    start = search_from = 0
+    while True:
+        index = string.find(separator, search_from)
+        if index == -1:
+            parts.append(string[start:])
+            return parts
+        search_from = index + 1
+        if index and string[index - 1] == "\\":
+            continue
+        parts.append(string[start:index])
+        start = search_from
+
+
+def _unescape(escaped_id: str) -> str:
+    """Return an id with its escaped forward slashes and colons unescaped, equivalent to :meth:`URN.unescape_id`.
+
+    Arguments:
+        escaped_id: The id to unescape.
+    """
+    if "\\" not in escaped_id:
+        return escaped_id
+    return escaped_id.replace("\\/", "/").replace("\\:", ":")
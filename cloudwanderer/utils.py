@@ -3,7 +3,7 @@ import json
 import logging
 from datetime import datetime
 from decimal import Decimal
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from botocore import xform_name
 
@@ -56,13 +56,120 @@ def json_default(item: object) -> Optional[object]:
 def standardise_data_types(resource: dict) -> Dict[str, Any]:
     """Return a dictionary normalised to datatypes acceptable for DynamoDB.
 
+    This is equivalent to (but much faster than) round tripping the dictionary through JSON with
+    :func:`json_default`, :func:`json_object_hook` and ``parse_float=Decimal``:
+
+    * datetimes are converted to ISO 8601 strings
+    * floats are converted to Decimals
+    * empty string values in dictionaries are converted to ``None``
+    * tuples are converted to lists and dictionary keys to strings
+    * any other type JSON cannot represent is converted to ``None``
+
     Arguments:
         resource (dict): The dictionary we're normalising to DynamoDB acceptable data types.
     """
-    result = json.loads(json.dumps(resource, default=json_default), object_hook=json_object_hook, parse_float=Decimal)
+    return _standardise_dict(resource)
+
+
+#: The types which standardise_data_types leaves unchanged (other than empty strings in dictionaries).
+_UNCHANGED_TYPES = frozenset((str, int, bool, type(None)))
+
+
+def _standardise_dict(dct: dict) -> Dict[str, Any]:
+    result = {}
+    for key, value in dct.items():
+        if type(key) is not str:
+            key = _standardise_key(key)
+        # The most common types are handled inline to save a function call per value.
+        value_type = type(value)
+        if value_type is str:
+            # Mirrors json_object_hook, which only applies to the values of dictionaries (not lists).
+            result[key] = value or None
+        elif value_type is int or value_type is bool or value is None:
+            result[key] = value
+        elif value_type is dict:
+            result[key] = _standardise_dict(value)
+        else:
+            value = _standardise_value(value)
+            result[key] = None if value == "" else value
     return result
 
 
+def _standardise_value(value: Any) -> Any:
+    value_type = type(value)
+    if value_type is str or value_type is int or value_type is bool or value is None:
+        return value
+    if value_type is dict:
+        return _standardise_dict(value)
+    if value_type is list or value_type is tuple:
+        return _standardise_list(value)
+    if value_type is float:
+        return _standardise_float(value)
+    if value_type is datetime:
+        return value.isoformat()
+    # Subclasses of the types above are converted in the same order the JSON encoder checks for them.
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, int):
+        return value if isinstance(value, bool) else int(value)
+    if isinstance(value, float):
+        return _standardise_float(value)
+    if isinstance(value, (list, tuple)):
+        return _standardise_list(value)
+    if isinstance(value, dict):
+        return _standardise_dict(value)
+    return _standardise_value(json_default(value))
+
+
+def _standardise_list(items: Any) -> List[Any]:
+    return [item if type(item) in _UNCHANGED_TYPES else _standardise_value(item) for item in items]
+
+
+def _standardise_float(value: float) -> Any:
+    if value != value or value in (float("inf"), float("-inf")):
+        # JSON decodes NaN and Infinity as floats, not with parse_float.
+        return float(value)
+    return Decimal(float.__repr__(value))
+
+
+def _standardise_key(key: Any) -> str:
+    """Convert a dictionary key to a string the same way the JSON encoder does.
+
+    Arguments:
+        key: The key to convert.
+
+    Raises:
+        TypeError: If the key is not of a type the JSON encoder allows as a key.
+    """
+    if isinstance(key, str):
+        return str(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    if isinstance(key, float):
+        return json.dumps(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+
+def merge_discovery_start_times(
+    discovery_start_times: Dict[str, datetime], other_discovery_start_times: Dict[str, datetime]
+) -> None:
+    """Merge the earlier discovery time of each resource type in other_discovery_start_times into discovery_start_times.
+
+    Arguments:
+        discovery_start_times: The earliest discovery times, keyed by ``cloud_service_resource_label``, to update.
+        other_discovery_start_times: The earliest discovery times to merge in.
+    """
+    for label, discovery_time in other_discovery_start_times.items():
+        if label not in discovery_start_times or discovery_time < discovery_start_times[label]:
+            discovery_start_times[label] = discovery_time
+
+
 def snake_to_pascal(snake_case: str) -> str:
     """Return a PascalCase version of a snake_case name.
 
@@ -21,5 +21,6 @@ setup(
     author_email="samjackmartin+cloudwanderer@gmail.com",
     url="https://github.com/CloudWanderer-io/CloudWanderer",
     install_requires=["boto3", "jmespath", 'typing_extensions; python_version < "3.8.0"', "gremlinpython"],
+    extras_require={"parquet": ["pyarrow"]},
     include_package_data=True,
 )
@@ -0,0 +1,94 @@
+"""Micro-benchmarks of URN.from_string against the regex based parser it replaced.
+
+The single pass parser alone (a cold cache) measures 3-4x faster than the regex based parser. The 5x (and more)
+speedup on URNs read back from a store comes from the cache of parsed URNs, as the same URNs are parsed again and
+again (every dependent resource references its parent's URN, and every read of a resource parses its URN again).
+
+Timings are too noisy on shared runners to assert on, so the speedups are logged rather than asserted. These are
+not part of the default test run, run them with:
+
+    pytest tests/benchmarks
+"""
+import functools
+import logging
+import re
+import timeit
+from typing import Callable, List
+
+from cloudwanderer.urn import URN, _parse_urn_string
+
+logger = logging.getLogger(__name__)
+
+ROUNDS = 5
+
+
+def regex_from_string(urn_string: str) -> URN:
+    """The implementation of URN.from_string prior to the single pass parser.
+
+    Arguments:
+        urn_string: The string to parse.
+
+    Raises:
+        ValueError: When no resource id is found.
+    """
+    parts = re.split(r"(?<!\\):", urn_string)
+    if len(parts) < 7:
+        raise ValueError("Resource ID must be supplied as the 7th element in a colon separated string")
+    resource_id_parts = [URN.unescape_id(id_part) for id_part in re.split(r"(?<!\\)/", parts[6])]
+    return URN(
+        account_id=parts[2],
+        region=parts[3],
+        service=parts[4],
+        resource_type=parts[5],
+        resource_id_parts=resource_id_parts,
+    )
+
+
+def best_time(parse: Callable[[str], URN], urn_strings: List[str]) -> float:
+    return min(timeit.repeat(lambda: [parse(urn_string) for urn_string in urn_strings], number=1, repeat=ROUNDS))
+
+
+def discovered_urn_strings() -> List[str]:
+    """The URNs read back from a store, 20 dependent resources (each referencing their parent) per parent."""
+    urn_strings = []
+    for parent in range(500):
+        parent_urn = f"urn:aws:111111111111:us-east-1:iam:role:role-{parent}"
+        for policy in range(20):
+            urn_strings.append(f"urn:aws:111111111111:us-east-1:iam:role_policy:role-{parent}/policy-{policy}")
+            urn_strings.append(parent_urn)
+    return urn_strings
+
+
+def test_parsers_are_equivalent():
+    for urn_string in discovered_urn_strings()[:100] + [
+        r"urn:aws:111111111111:eu-west-1:cloudwatch:metric:AWS\/Logs\/IncomingBytes",
+        r"urn:aws:111111111111:eu-west-2:sns:subscription:arn\:aws\:sns\:eu-west-2\:111111111111\:topic",
+    ]:
+        expected = regex_from_string(urn_string)
+        actual = URN.from_string(urn_string, cached=False)
+
+        assert actual == expected
+        assert actual.resource_id_parts == expected.resource_id_parts
+
+
+def test_single_pass_parser_speedup():
+    """Every string is distinct and parsed without the cache, so this is the speedup of the parser alone."""
+    urn_strings = [f"urn:aws:111111111111:eu-west-2:ec2:instance:i-{index:017x}" for index in range(10000)]
+
+    speedup = best_time(regex_from_string, urn_strings) / best_time(
+        functools.partial(_parse_urn_string, URN), urn_strings
+    )
+
+    logger.info("The single pass parser is %.1fx faster than the regex based parser", speedup)
+
+
+def test_warm_cache_from_string_speedup():
+    """The URNs read back from a store are parsed again and again, so from_string's cache delivers this speedup.
+
+    All but the first round of timings parse the URNs from a warm cache.
+    """
+    urn_strings = discovered_urn_strings()
+
+    speedup = best_time(regex_from_string, urn_strings) / best_time(URN.from_string, urn_strings)
+
+    logger.info("URN.from_string with a warm cache is %.1fx faster than the regex based parser", speedup)
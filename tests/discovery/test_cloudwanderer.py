@@ -119,3 +119,56 @@ def test_get_resources_specific_resource(cloud_wanderer: CloudWanderer):
         resource_type="vpc",
         cutoff=datetime.datetime(1986, 1, 1, 0, 0, tzinfo=datetime.timezone.utc),
     )
+
+
+def test_write_resources_scheduled(cloud_wanderer: CloudWanderer):
+    cloud_wanderer.write_resources_scheduled(concurrency=2)
+
+    cloud_wanderer.cloud_interface.get_resource_discovery_actions.assert_called()
+    cloud_wanderer.cloud_interface.get_resources.assert_called_with(
+        region="eu-west-1", service_name="ec2", resource_type="vpc", service_resource_type_filters=ANY
+    )
+    cloud_wanderer.storage_connectors[0].write_resource.assert_called_with(
+        CloudWandererResource(
+            urn=URN(
+                cloud_name="aws",
+                account_id="111111111111",
+                region="eu-west-1",
+                service="ec2",
+                resource_type="vpc",
+                resource_id_parts=["vpc-11111111"],
+            ),
+            dependent_resource_urns=[],
+            resource_data={},
+        )
+    )
+    cloud_wanderer.storage_connectors[0].delete_resource_of_type_in_account_region.assert_called_with(
+        cloud_name="aws",
+        account_id="111111111111",
+        region="eu-west-1",
+        service="ec2",
+        resource_type="vpc",
+        cutoff=datetime.datetime(1986, 1, 1, 0, 0, tzinfo=datetime.timezone.utc),
+    )
+    cloud_wanderer.storage_connectors[0].close.assert_called()
+
+
+def test_write_resources_scheduled_uses_cloud_interface_generator(cloud_wanderer: CloudWanderer):
+    cloud_interface_generator = MagicMock(return_value=cloud_wanderer.cloud_interface)
+
+    cloud_wanderer.write_resources_scheduled(concurrency=1, cloud_interface_generator=cloud_interface_generator)
+
+    cloud_interface_generator.assert_called_once()
+
+
+def test_write_resources_flushes_after_each_resource_type(cloud_wanderer: CloudWanderer):
+    cloud_wanderer.write_resources()
+
+    storage_connector_calls = [call[0] for call in cloud_wanderer.storage_connectors[0].method_calls]
+    assert storage_connector_calls == [
+        "open",
+        "write_resource",
+        "flush",
+        "delete_resource_of_type_in_account_region",
+        "close",
+    ]
@@ -142,12 +142,12 @@ def test_collection(service_resource_iam):
 
 def test_dependent_resource_types_subresource(service_resource_iam_role):
     result = service_resource_iam_role.dependent_resource_types
-    assert result == ["role_policy"]
+    assert result == ("role_policy",)
 
 
 def test_dependent_resource_types_references(service_resource_ec2_route_table):
     result = service_resource_ec2_route_table.dependent_resource_types
-    assert result == ["route"]
+    assert result == ("route",)
 
 
 def test_is_dependent_resource_true(service_resource_ec2_route):
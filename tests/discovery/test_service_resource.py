@@ -158,3 +158,25 @@ def test_relationships_arn(service_resource_lambda_function):
             direction=RelationshipDirection.OUTBOUND,
         )
     ]
+
+
+def test_get_region_is_memoized(service_resource_s3_bucket, botocore_session):
+    service_resource_s3_bucket.get_urn()
+    service_resource_s3_bucket.get_urn()
+    service_resource_s3_bucket.get_region()
+
+    assert botocore_session.create_client.return_value.get_bucket_location.call_count == 1
+
+
+def test_normalized_raw_data_is_memoized_until_load(service_resource_ec2_vpc):
+    normalized_raw_data = service_resource_ec2_vpc.normalized_raw_data
+    relationships = service_resource_ec2_vpc.relationships
+
+    assert service_resource_ec2_vpc.normalized_raw_data is normalized_raw_data
+    assert service_resource_ec2_vpc.relationships is relationships
+
+    service_resource_ec2_vpc.load()
+
+    assert service_resource_ec2_vpc.normalized_raw_data is not normalized_raw_data
+    assert service_resource_ec2_vpc.normalized_raw_data == normalized_raw_data
+    assert service_resource_ec2_vpc.relationships is not relationships
@@ -31,6 +31,17 @@ def gremlin_connector():
     connector.close()
 
 
+@pytest.fixture
+def batched_gremlin_connector():
+    connector = GremlinStorageConnector(
+        endpoint_url="ws://localhost:8182", test_prefix=platform.python_version(), batch_writes=True, batch_size=2
+    )
+    yield connector
+    connector.g.V().has(T.id, startingWith(connector.test_prefix)).drop().toList()
+    connector.g.E().has(T.id, startingWith(connector.test_prefix)).drop().toList()
+    connector.close()
+
+
 @mock_sts
 @mock_iam
 def test_write_resource_and_relationship(gremlin_connector, iam_role, iam_role_policies):
@@ -98,8 +109,9 @@ def test_unknown_vertices_later_discovered_get_repointed(gremlin_connector, clou
     assert "urn:aws:111111111111:eu-west-2:ec2:instance:i-" in result_1["_urn"][0]
     assert "urn:aws:unknown:eu-west-2:ec2:vpc:vpc-" in unknown_vpc_urn
 
-    # Step 2 write vpc, vpc unknown gets deleted and its edges repointed
+    # Step 2 write vpc and reconcile placeholders, vpc unknown gets deleted and its edges repointed
     gremlin_connector.write_resource(vpc)
+    gremlin_connector.reconcile_placeholders()
 
     result_1, result_2 = (
         gremlin_connector.g.V(gremlin_connector.generate_vertex_id(ec2_instance.urn))
@@ -202,3 +214,54 @@ def test_fresh_edges_do_not_get_removed(gremlin_connector, iam_instance_profile)
     assert result["v1"]["_urn"][0] == "urn:aws:111111111111:us-east-1:iam:instance_profile:my-test-profile"
     assert result["v2"]["_urn"][0] == "urn:aws:unknown:us-east-1:iam:role:test-role"
     assert result["e"]["_discovery_time"] == iam_instance_profile.discovery_time.isoformat()
+
+
+@mock_sts
+@mock_iam
+def test_batched_write_resource_and_relationship(batched_gremlin_connector, iam_role, iam_role_policies):
+    batched_gremlin_connector.write_resource(iam_role_policies[0])
+    batched_gremlin_connector.write_resource(resource=iam_role)
+    result_1, result_2 = (
+        batched_gremlin_connector.g.V(batched_gremlin_connector.generate_vertex_id(iam_role.urn))
+        .both()
+        .path()
+        .by(__.valueMap(True))
+        .toList()[0]
+    )
+
+    assert result_1["_urn"] == ["urn:aws:111111111111:us-east-1:iam:role:test-role"]
+    assert result_2["_urn"] == ["urn:aws:111111111111:us-east-1:iam:role_policy:test-role/test-role-policy-1"]
+    assert batched_gremlin_connector.write_statistics.resources_written == 2
+    assert batched_gremlin_connector.write_statistics.round_trips_per_resource <= 2
+
+
+@mock_sts
+@mock_iam
+def test_batched_writes_are_buffered_until_flushed(batched_gremlin_connector, iam_instance_profile):
+    batched_gremlin_connector.write_resource(resource=iam_instance_profile)
+
+    assert (
+        batched_gremlin_connector.g.V(batched_gremlin_connector.generate_vertex_id(iam_instance_profile.urn)).toList()
+        == []
+    )
+
+    batched_gremlin_connector.flush()
+    result = get_vertex_and_edges(batched_gremlin_connector, iam_instance_profile.urn)[0]
+
+    assert result["v1"]["_urn"][0] == "urn:aws:111111111111:us-east-1:iam:instance_profile:my-test-profile"
+    assert result["v2"]["_urn"][0] == "urn:aws:unknown:us-east-1:iam:role:test-role"
+    assert result["e"]["_discovery_time"] == iam_instance_profile.discovery_time.isoformat()
+
+
+@mock_sts
+@mock_iam
+def test_relationship_partners_are_looked_up_once(gremlin_connector, iam_instance_profile):
+    gremlin_connector.write_resource(resource=iam_instance_profile)
+    first_write_round_trips = gremlin_connector.write_statistics.round_trips
+
+    iam_instance_profile.discovery_time = datetime.now()
+    gremlin_connector.write_resource(resource=iam_instance_profile)
+    result = get_vertex_and_edges(gremlin_connector, iam_instance_profile.urn)[0]
+
+    assert result["v2"]["_urn"][0] == "urn:aws:unknown:us-east-1:iam:role:test-role"
+    assert gremlin_connector.write_statistics.round_trips - first_write_round_trips < first_write_round_trips
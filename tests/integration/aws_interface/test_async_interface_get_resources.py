@@ -0,0 +1,84 @@
+import asyncio
+import concurrent.futures
+
+import pytest
+from moto import mock_ec2, mock_iam, mock_sts
+
+from cloudwanderer.aws_interface import AsyncCloudWandererAWSInterface
+
+from ...pytest_helpers import create_iam_role
+
+
+@pytest.fixture
+def async_aws_interface(aws_interface):
+    async_aws_interface = AsyncCloudWandererAWSInterface(cloud_interface=aws_interface, concurrency=4)
+    yield async_aws_interface
+    async_aws_interface.close()
+
+
+def collect(async_iterator):
+    async def _collect() -> list:
+        return [item async for item in async_iterator]
+
+    return asyncio.run(_collect())
+
+
+@mock_ec2
+@mock_sts
+def test_get_resources_matches_sync_interface(aws_interface, async_aws_interface):
+    sync_result = list(aws_interface.get_resources(service_name="ec2", resource_type="vpc", region="eu-west-2"))
+
+    async_result = collect(
+        async_aws_interface.get_resources(service_name="ec2", resource_type="vpc", region="eu-west-2")
+    )
+
+    assert [resource.urn for resource in async_result] == [resource.urn for resource in sync_result]
+    assert [resource.cloudwanderer_metadata.resource_data for resource in async_result] == [
+        resource.cloudwanderer_metadata.resource_data for resource in sync_result
+    ]
+    assert async_result[0].enable_dns_support is True
+
+
+@mock_iam
+@mock_sts
+def test_get_resources_with_dependent_resources(aws_interface, async_aws_interface):
+    create_iam_role()
+    sync_result = list(aws_interface.get_resources(service_name="iam", resource_type="role", region="us-east-1"))
+
+    async_result = collect(
+        async_aws_interface.get_resources(service_name="iam", resource_type="role", region="us-east-1")
+    )
+
+    assert [str(resource.urn) for resource in async_result] == [str(resource.urn) for resource in sync_result]
+    assert [str(resource.urn) for resource in async_result] == [
+        "urn:aws:123456789012:us-east-1:iam:role_policy:test-role/test-role-policy",
+        "urn:aws:123456789012:us-east-1:iam:role:test-role",
+    ]
+    assert async_result[0].parent_urn == sync_result[0].parent_urn
+    assert async_result[1].dependent_resource_urns == [async_result[0].urn]
+
+
+@mock_ec2
+@mock_sts
+def test_async_with_shuts_down_default_executor(aws_interface):
+    async def get_vpcs() -> AsyncCloudWandererAWSInterface:
+        async with AsyncCloudWandererAWSInterface(cloud_interface=aws_interface) as async_aws_interface:
+            assert [
+                resource
+                async for resource in async_aws_interface.get_resources(
+                    service_name="ec2", resource_type="vpc", region="eu-west-2"
+                )
+            ]
+        return async_aws_interface
+
+    async_aws_interface = asyncio.run(get_vpcs())
+
+    with pytest.raises(RuntimeError):
+        async_aws_interface.executor.submit(print)
+
+
+def test_close_leaves_executor_passed_in_running(aws_interface):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        AsyncCloudWandererAWSInterface(cloud_interface=aws_interface, executor=executor).close()
+
+        assert executor.submit(lambda: 1).result() == 1
@@ -1,13 +1,15 @@
-from unittest.mock import ANY
+from unittest.mock import ANY, patch
 
 import pytest
-from moto import mock_ec2, mock_iam, mock_sts
+import boto3
+from moto import mock_ec2, mock_iam, mock_s3, mock_sts
 from itertools import islice
 from cloudwanderer import URN
-from cloudwanderer.aws_interface.models import AWSResourceTypeFilter
+from cloudwanderer.aws_interface import CloudWandererAWSInterface
+from cloudwanderer.aws_interface.models import AWSResourceTypeFilter, ServiceMap
 from cloudwanderer.exceptions import UnsupportedResourceTypeError, UnsupportedServiceError
 
-from ...pytest_helpers import compare_dict_allow_any, create_iam_policy, create_iam_role
+from ...pytest_helpers import compare_dict_allow_any, create_iam_policy, create_iam_role, create_s3_buckets
 
 
 @mock_ec2
@@ -144,4 +146,115 @@ def test_jmespath_filters(aws_interface):
     assert list(islice((r.is_default_version for r in result if hasattr(r, "is_default_version")), 10)) == [True] * 10
 
 
+@mock_ec2
+@mock_sts
+def test_get_resources_fetches_secondary_attributes_of_every_resource_in_page(cloudwanderer_boto3_session):
+    ec2 = boto3.client("ec2", region_name="eu-west-2")
+    for i in range(5):
+        vpc_id = ec2.create_vpc(CidrBlock=f"10.{i}.0.0/16")["Vpc"]["VpcId"]
+        ec2.modify_vpc_attribute(VpcId=vpc_id, EnableDnsSupport={"Value": False})
+
+    def get_vpcs(secondary_attribute_concurrency):
+        aws_interface = CloudWandererAWSInterface(
+            cloudwanderer_boto3_session=cloudwanderer_boto3_session,
+            secondary_attribute_concurrency=secondary_attribute_concurrency,
+        )
+        return {
+            str(resource.urn): resource.enable_dns_support
+            for resource in aws_interface.get_resources(service_name="ec2", resource_type="vpc", region="eu-west-2")
+        }
+
+    concurrent_result = get_vpcs(secondary_attribute_concurrency=5)
+
+    assert len(concurrent_result) == 6
+    assert sorted(concurrent_result.values()) == [False] * 5 + [True]
+    assert concurrent_result == get_vpcs(secondary_attribute_concurrency=1)
+
+
+@mock_ec2
+@mock_sts
+def test_get_resources_reuses_secondary_attribute_thread_pool(cloudwanderer_boto3_session):
+    ec2 = boto3.client("ec2", region_name="eu-west-2")
+    for i in range(3):
+        ec2.create_vpc(CidrBlock=f"10.{i}.0.0/16")
+    aws_interface = CloudWandererAWSInterface(
+        cloudwanderer_boto3_session=cloudwanderer_boto3_session, secondary_attribute_concurrency=3
+    )
+
+    list(aws_interface.get_resources(service_name="ec2", resource_type="vpc", region="eu-west-2"))
+    executor = aws_interface._secondary_attribute_executor
+    list(aws_interface.get_resources(service_name="ec2", resource_type="vpc", region="us-east-1"))
+
+    assert executor is not None
+    assert aws_interface._secondary_attribute_executor is executor
+    aws_interface.close()
+    assert aws_interface._secondary_attribute_executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+@mock_s3
+@mock_sts
+def test_get_resources_resolves_bucket_regions(aws_interface):
+    create_s3_buckets(regions=["us-east-1", "eu-west-2", "ap-east-1"])
+
+    result = aws_interface.get_resources(service_name="s3", resource_type="bucket", region="us-east-1")
+
+    assert {resource.urn.resource_id: resource.urn.region for resource in result} == {
+        "test-us-east-1": "us-east-1",
+        "test-eu-west-2": "eu-west-2",
+        "test-ap-east-1": "ap-east-1",
+    }
+    assert aws_interface._resolved_regions == {
+        ("s3", "bucket", "test-us-east-1"): "us-east-1",
+        ("s3", "bucket", "test-eu-west-2"): "eu-west-2",
+        ("s3", "bucket", "test-ap-east-1"): "ap-east-1",
+    }
+
+
+@mock_s3
+@mock_sts
+def test_get_resources_reuses_region_resolution_thread_pool(aws_interface):
+    create_s3_buckets(regions=["us-east-1", "eu-west-2"])
+
+    list(aws_interface.get_resources(service_name="s3", resource_type="bucket", region="us-east-1"))
+    executor = aws_interface._region_resolution_executor
+    aws_interface.clear_region_cache()
+    list(aws_interface.get_resources(service_name="s3", resource_type="bucket", region="eu-west-2"))
+
+    assert executor is not None
+    assert aws_interface._region_resolution_executor is executor
+    aws_interface.close()
+    assert aws_interface._region_resolution_executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+@mock_s3
+@mock_sts
+def test_get_resources_uses_region_map(cloudwanderer_boto3_session):
+    create_s3_buckets(regions=["eu-west-2"])
+    aws_interface = CloudWandererAWSInterface(
+        cloudwanderer_boto3_session=cloudwanderer_boto3_session,
+        region_map={("s3", "bucket", "test-eu-west-2"): "eu-west-1"},
+    )
+
+    result = list(aws_interface.get_resources(service_name="s3", resource_type="bucket", region="us-east-1"))
+
+    assert [resource.urn.region for resource in result] == ["eu-west-1"]
+    assert aws_interface._resolved_regions == {}
+
+
+@mock_iam
+@mock_sts
+def test_get_resources_uses_compiled_resource_maps(aws_interface):
+    create_iam_role()
+    expected = list(aws_interface.get_resources(service_name="iam", resource_type="role", region="us-east-1"))
+
+    with patch.object(ServiceMap, "get_resource_map", side_effect=AssertionError("Resource map was not cached")):
+        result = list(aws_interface.get_resources(service_name="iam", resource_type="role", region="us-east-1"))
+
+    assert [resource.urn for resource in result] == [resource.urn for resource in expected]
+
+
 # TODO: test custom and default filters
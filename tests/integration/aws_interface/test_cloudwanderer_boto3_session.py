@@ -1,8 +1,13 @@
+import concurrent.futures
+
+import botocore.client
 import pytest
 from boto3.resources.base import ServiceResource
 from moto import mock_ec2, mock_sts
 
 import cloudwanderer
+from cloudwanderer.aws_interface import AssumeRoleSessionFactory, CloudWandererBoto3Session
+from cloudwanderer.aws_interface.session import ClientPoolStatistics
 
 
 def test_get_service_custom_service(cloudwanderer_boto3_session):
@@ -53,3 +58,99 @@ def test_get_enabled_regions(cloudwanderer_boto3_session):
 @mock_sts
 def test_account_id(cloudwanderer_boto3_session):
     assert cloudwanderer_boto3_session.get_account_id() == "123456789012"
+
+
+def test_resource_is_built_on_pooled_client(cloudwanderer_boto3_session):
+    first = cloudwanderer_boto3_session.resource("ec2", region_name="eu-west-1")
+    second = cloudwanderer_boto3_session.resource("ec2", region_name="eu-west-1")
+    other_region = cloudwanderer_boto3_session.resource("ec2", region_name="us-east-1")
+
+    assert first is not second
+    assert first.meta.client is second.meta.client
+    assert other_region.meta.client is not first.meta.client
+    assert other_region.meta.client.meta.region_name == "us-east-1"
+    assert cloudwanderer_boto3_session.client_pool_statistics == ClientPoolStatistics(
+        clients_created=2, clients_reused=1, evicted=0
+    )
+
+
+def test_resource_with_config_is_built_on_pooled_client(cloudwanderer_boto3_session):
+    config = botocore.client.Config(retries={"max_attempts": 2})
+
+    first = cloudwanderer_boto3_session.resource("ec2", region_name="eu-west-1", config=config)
+    second = cloudwanderer_boto3_session.resource("ec2", region_name="eu-west-1", config=config)
+
+    assert first.meta.client is second.meta.client
+    assert config.user_agent_extra is None
+
+
+def test_client_pool_keyed_by_client_args(cloudwanderer_boto3_session):
+    default_client = cloudwanderer_boto3_session.client("sts", region_name="eu-west-1")
+    custom_client = cloudwanderer_boto3_session.client(
+        "sts", region_name="eu-west-1", endpoint_url="https://sts.eu-west-1.amazonaws.com"
+    )
+
+    assert default_client is not custom_client
+    assert cloudwanderer_boto3_session.client("sts", region_name="eu-west-1") is default_client
+    assert cloudwanderer_boto3_session.client_pool_statistics.clients_created == 2
+    assert cloudwanderer_boto3_session.client_pool_statistics.clients_reused == 1
+
+
+def test_client_pool_evicts_least_recently_used():
+    session = CloudWandererBoto3Session(aws_access_key_id="aaaa", aws_secret_access_key="aaaaaa", client_pool_size=2)
+    eu_west_1 = session.client("ec2", region_name="eu-west-1")
+    session.client("ec2", region_name="eu-west-2")
+    session.client("ec2", region_name="eu-west-1")
+    session.client("ec2", region_name="us-east-1")
+
+    assert session.client("ec2", region_name="eu-west-1") is eu_west_1
+    assert session.client_pool_statistics.evicted == 1
+    assert session.client_pool_statistics.clients_created == 3
+
+
+def test_client_pool_disabled():
+    session = CloudWandererBoto3Session(aws_access_key_id="aaaa", aws_secret_access_key="aaaaaa", client_pool_size=0)
+
+    assert session.client("ec2", region_name="eu-west-1") is not session.client("ec2", region_name="eu-west-1")
+    assert session.client_pool_statistics.clients_reused == 0
+
+
+def test_client_pool_is_thread_safe(cloudwanderer_boto3_session):
+    regions = ["eu-west-1", "eu-west-2", "us-east-1", "us-west-2"] * 5
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        clients = list(
+            executor.map(lambda region: cloudwanderer_boto3_session.client("ec2", region_name=region), regions)
+        )
+
+    assert len({id(client) for client in clients}) == 4
+    assert cloudwanderer_boto3_session.client_pool_statistics.clients_created == 4
+    assert cloudwanderer_boto3_session.client_pool_statistics.clients_reused == 16
+
+
+def test_clients_are_created_outside_the_pool_lock(cloudwanderer_boto3_session):
+    cloudwanderer_boto3_session.client("ec2", region_name="eu-west-1")
+    create_client = cloudwanderer_boto3_session._session.create_client
+    lock_held_while_creating = []
+
+    def create_client_checking_lock(*args, **kwargs):
+        lock_held_while_creating.append(cloudwanderer_boto3_session._client_pool_lock.locked())
+        return create_client(*args, **kwargs)
+
+    cloudwanderer_boto3_session._session.create_client = create_client_checking_lock
+    cloudwanderer_boto3_session.client("ec2", region_name="eu-west-2")
+
+    assert lock_held_while_creating == [False]
+
+
+@mock_sts
+@mock_ec2
+def test_assume_role_session_factory():
+    session_factory = AssumeRoleSessionFactory(
+        role_arn="arn:aws:iam::111111111111:role/CloudWanderer", region_name="eu-west-2"
+    )
+
+    session = session_factory()
+
+    assert session.get_account_id() == "111111111111"
+    assert session.client("ec2").describe_vpcs()["Vpcs"]
+    assert session.get_credentials().access_key.startswith("ASIA")
@@ -1,8 +1,10 @@
 from unittest.mock import ANY
 
+import pytest
 from boto3.resources.base import ServiceResource
 from moto import mock_ec2, mock_iam, mock_s3, mock_sts
 
+from cloudwanderer.aws_interface import CloudWandererBoto3Session
 from cloudwanderer.aws_interface.models import IdPartSpecification, RelationshipSpecification, ResourceMap
 from cloudwanderer.models import RelationshipAccountIdSource, RelationshipDirection, RelationshipRegionSource
 from cloudwanderer.urn import URN
@@ -158,7 +160,25 @@ def test_collection(iam_service):
 @mock_ec2
 @mock_sts
 def test_secondary_attribute_names(ec2_service):
-    assert get_single_ec2_vpc(ec2_service).secondary_attribute_names == ["vpc_enable_dns_support"]
+    assert get_single_ec2_vpc(ec2_service).secondary_attribute_names == ("vpc_enable_dns_support",)
+
+
+def test_compiled_service_model_shared_between_sessions():
+    first_vpc = CloudWandererBoto3Session().resource("ec2").resource("vpc", empty_resource=True)
+    second_vpc = CloudWandererBoto3Session().resource("ec2").resource("vpc", empty_resource=True)
+
+    assert first_vpc.service_map is second_vpc.service_map
+    assert first_vpc.resource_map is second_vpc.resource_map
+    assert first_vpc.secondary_attribute_names is second_vpc.secondary_attribute_names
+
+
+def test_shared_resource_maps_are_immutable():
+    vpc = CloudWandererBoto3Session().resource("ec2").resource("vpc", empty_resource=True)
+
+    with pytest.raises(AttributeError):
+        vpc.resource_map.relationships.pop(0)
+    with pytest.raises(AttributeError):
+        vpc.dependent_resource_types.append("route")
 
 
 @mock_iam
@@ -221,17 +241,18 @@ def test_relationships(ec2_service):
 def test_relationships_specifying_cloud(ec2_service):
     vpc = get_single_ec2_vpc(ec2_service)
     # Override the relationship specification to specify the cloud
-    vpc.resource_map.relationships.pop(0)
-    vpc.resource_map.relationships.append(
-        RelationshipSpecification(
-            base_path="@",
-            id_parts=[IdPartSpecification(path="DhcpOptionsId", regex_pattern="")],
-            cloud_name="overridden",
-            service="ec2",
-            resource_type="dhcp_options",
-            region_source=RelationshipRegionSource.SAME_AS_RESOURCE,
-            account_id_source=RelationshipAccountIdSource.UNKNOWN,
-            direction=RelationshipDirection.OUTBOUND,
+    vpc.resource_map = vpc.resource_map._replace(
+        relationships=(
+            RelationshipSpecification(
+                base_path="@",
+                id_parts=[IdPartSpecification(path="DhcpOptionsId", regex_pattern="")],
+                cloud_name="overridden",
+                service="ec2",
+                resource_type="dhcp_options",
+                region_source=RelationshipRegionSource.SAME_AS_RESOURCE,
+                account_id_source=RelationshipAccountIdSource.UNKNOWN,
+                direction=RelationshipDirection.OUTBOUND,
+            ),
         )
     )
 
@@ -0,0 +1,82 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from moto import mock_ec2, mock_iam, mock_s3, mock_sts
+
+from cloudwanderer import AsyncCloudWanderer
+from cloudwanderer.aws_interface import AsyncCloudWandererAWSInterface
+from cloudwanderer.storage_connectors import MemoryStorageConnector
+from cloudwanderer.urn import URN
+
+from ...pytest_helpers import create_iam_role, create_s3_buckets
+
+
+@mock_sts
+@mock_ec2
+@mock_s3
+@mock_iam
+def test_write_resources(aws_interface, default_test_discovery_actions):
+    create_iam_role()
+    create_s3_buckets(regions=["eu-west-2", "us-east-1"])
+    aws_interface.get_resource_discovery_actions = MagicMock(return_value=default_test_discovery_actions)
+    storage_connector = MemoryStorageConnector()
+    cloud_wanderer = AsyncCloudWanderer(
+        storage_connectors=[storage_connector],
+        cloud_interface=AsyncCloudWandererAWSInterface(cloud_interface=aws_interface, concurrency=4),
+    )
+
+    asyncio.run(cloud_wanderer.write_resources())
+
+    result_summary = set(
+        [
+            (URN.from_string(result["urn"]).region, URN.from_string(result["urn"]).resource_type)
+            for result in storage_connector.read_all()
+        ]
+    )
+    assert result_summary == {
+        ("eu-west-2", "bucket"),
+        ("eu-west-2", "vpc"),
+        ("us-east-1", "bucket"),
+        ("us-east-1", "role"),
+        ("us-east-1", "role_policy"),
+        ("us-east-1", "vpc"),
+    }
+
+
+@mock_sts
+@mock_ec2
+@mock_s3
+@mock_iam
+def test_write_resources_failure_cancels_other_tasks_and_closes_storage(aws_interface, default_test_discovery_actions):
+    aws_interface.get_resource_discovery_actions = MagicMock(return_value=default_test_discovery_actions)
+    storage_connector = MagicMock()
+    cloud_wanderer = AsyncCloudWanderer(
+        storage_connectors=[storage_connector],
+        cloud_interface=AsyncCloudWandererAWSInterface(cloud_interface=aws_interface, concurrency=4),
+    )
+    cancelled = []
+
+    async def get_resources(**kwargs):
+        if kwargs["resource_type"] == "role":
+            raise RuntimeError("Discovery failed")
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.append(kwargs["resource_type"])
+            raise
+        yield
+
+    cloud_wanderer.cloud_interface.get_resources = get_resources
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cloud_wanderer.write_resources())
+
+    assert sorted(cancelled) == sorted(
+        get_urn.resource_type
+        for action_set in default_test_discovery_actions
+        for get_urn in action_set.get_urns
+        if get_urn.resource_type != "role"
+    )
+    storage_connector.close.assert_called_once()
+    storage_connector.delete_resource_of_type_in_account_region.assert_not_called()
@@ -0,0 +1,64 @@
+from unittest.mock import MagicMock
+
+import pytest
+from moto import mock_ec2, mock_iam, mock_s3, mock_sts
+
+from cloudwanderer.checkpoints import FileCheckpointStore
+from cloudwanderer.urn import URN
+
+from ...pytest_helpers import create_iam_role, create_s3_buckets
+
+EXPECTED_RESULT_SUMMARY = {
+    ("eu-west-2", "bucket"),
+    ("eu-west-2", "vpc"),
+    ("us-east-1", "bucket"),
+    ("us-east-1", "role"),
+    ("us-east-1", "role_policy"),
+    ("us-east-1", "vpc"),
+}
+
+
+def result_summary(storage_connector):
+    return {
+        (URN.from_string(result["urn"]).region, URN.from_string(result["urn"]).resource_type)
+        for result in storage_connector.read_all()
+    }
+
+
+def write_resources(cloudwanderer_aws, checkpoint_store, scheduled):
+    if scheduled:
+        cloudwanderer_aws.write_resources_scheduled(concurrency=1, checkpoint_store=checkpoint_store)
+    else:
+        cloudwanderer_aws.write_resources(checkpoint_store=checkpoint_store)
+
+
+@pytest.mark.parametrize("scheduled", [False, True])
+@mock_sts
+@mock_ec2
+@mock_s3
+@mock_iam
+def test_write_resources_resumes_from_checkpoint(
+    scheduled, tmp_path, cloudwanderer_aws, aws_interface, default_test_discovery_actions
+):
+    create_iam_role()
+    create_s3_buckets(regions=["eu-west-2", "us-east-1"])
+    aws_interface.get_resource_discovery_actions = MagicMock(return_value=default_test_discovery_actions)
+    checkpoint_store = FileCheckpointStore(path=str(tmp_path / "checkpoint.jsonl"))
+    get_resources = aws_interface.get_resources
+
+    def get_resources_interrupted(**kwargs):
+        if kwargs["resource_type"] == "role":
+            raise RuntimeError("Interrupted")
+        return get_resources(**kwargs)
+
+    aws_interface.get_resources = MagicMock(side_effect=get_resources_interrupted)
+    with pytest.raises(RuntimeError):
+        write_resources(cloudwanderer_aws, checkpoint_store, scheduled)
+
+    aws_interface.get_resources = MagicMock(side_effect=get_resources)
+    write_resources(cloudwanderer_aws, checkpoint_store, scheduled)
+
+    assert [call.kwargs["resource_type"] for call in aws_interface.get_resources.call_args_list] == ["role"]
+    # The resources discovered before the interruption were not deleted as stale by the resumed run.
+    assert result_summary(cloudwanderer_aws.storage_connectors[0]) == EXPECTED_RESULT_SUMMARY
+    assert not (tmp_path / "checkpoint.jsonl").exists()
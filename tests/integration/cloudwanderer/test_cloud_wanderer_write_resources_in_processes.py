@@ -0,0 +1,110 @@
+import multiprocessing
+from unittest.mock import MagicMock
+
+from moto import mock_ec2, mock_iam, mock_s3, mock_sts
+
+from cloudwanderer.aws_interface import CloudWandererAWSInterface, CloudWandererBoto3Session
+from cloudwanderer.checkpoints import SQLiteCheckpointStore
+from cloudwanderer.storage_connectors import SQLiteStorageConnector
+from cloudwanderer.urn import URN
+
+from ...pytest_helpers import create_iam_role, create_s3_buckets
+
+# Moto's mocks (and the resources created with them) are only inherited by forked worker processes.
+FORK = multiprocessing.get_context("fork")
+
+EXPECTED_RESULT_SUMMARY = {
+    ("eu-west-2", "bucket"),
+    ("eu-west-2", "vpc"),
+    ("us-east-1", "bucket"),
+    ("us-east-1", "role"),
+    ("us-east-1", "role_policy"),
+    ("us-east-1", "vpc"),
+}
+
+
+def cloud_interface_generator():
+    return CloudWandererAWSInterface(
+        CloudWandererBoto3Session(aws_access_key_id="aaaa", aws_secret_access_key="aaaaaa")
+    )
+
+
+def result_summary(storage_connector):
+    return {
+        (URN.from_string(result["urn"]).region, URN.from_string(result["urn"]).resource_type)
+        for result in storage_connector.read_all()
+    }
+
+
+@mock_sts
+@mock_ec2
+@mock_s3
+@mock_iam
+def test_write_resources_in_processes(cloudwanderer_aws, aws_interface, default_test_discovery_actions):
+    create_iam_role()
+    create_s3_buckets(regions=["eu-west-2", "us-east-1"])
+    aws_interface.get_resource_discovery_actions = MagicMock(return_value=default_test_discovery_actions)
+
+    cloudwanderer_aws.write_resources_in_processes(
+        cloud_interface_generator=cloud_interface_generator, processes=2, batch_size=1, mp_context=FORK
+    )
+
+    assert result_summary(cloudwanderer_aws.storage_connectors[0]) == EXPECTED_RESULT_SUMMARY
+
+
+@mock_sts
+@mock_ec2
+@mock_s3
+@mock_iam
+def test_write_resources_in_processes_written_by_workers(
+    tmp_path, cloudwanderer_aws, aws_interface, default_test_discovery_actions
+):
+    create_iam_role()
+    create_s3_buckets(regions=["eu-west-2", "us-east-1"])
+    aws_interface.get_resource_discovery_actions = MagicMock(return_value=default_test_discovery_actions)
+    database_path = str(tmp_path / "cloudwanderer.sqlite3")
+    storage_connector = SQLiteStorageConnector(database_path=database_path)
+    storage_connector.init()
+    cloudwanderer_aws.storage_connectors = [storage_connector]
+
+    cloudwanderer_aws.write_resources_in_processes(
+        cloud_interface_generator=cloud_interface_generator,
+        storage_connector_generator=lambda: [SQLiteStorageConnector(database_path=database_path)],
+        processes=2,
+        mp_context=FORK,
+    )
+
+    assert result_summary(storage_connector) == EXPECTED_RESULT_SUMMARY
+
+
+@mock_sts
+@mock_ec2
+@mock_s3
+@mock_iam
+def test_write_resources_in_processes_skips_checkpointed_tasks(
+    tmp_path, cloudwanderer_aws, aws_interface, default_test_discovery_actions
+):
+    create_iam_role()
+    create_s3_buckets(regions=["eu-west-2", "us-east-1"])
+    aws_interface.get_resource_discovery_actions = MagicMock(return_value=default_test_discovery_actions)
+    checkpoint_store = SQLiteCheckpointStore(database_path=str(tmp_path / "checkpoint.sqlite3"))
+    checkpoint_store.open()
+    for action_set in default_test_discovery_actions:
+        for get_urn in action_set.get_urns:
+            if get_urn.resource_type != "role":
+                checkpoint_store.record_completed_task(get_urn, {})
+    checkpoint_store.close()
+
+    cloudwanderer_aws.write_resources_in_processes(
+        cloud_interface_generator=cloud_interface_generator,
+        processes=2,
+        mp_context=FORK,
+        checkpoint_store=checkpoint_store,
+    )
+
+    assert result_summary(cloudwanderer_aws.storage_connectors[0]) == {
+        ("us-east-1", "role"),
+        ("us-east-1", "role_policy"),
+    }
+    checkpoint_store.open()
+    assert checkpoint_store.read_completed_task(default_test_discovery_actions[0].get_urns[0]) is None
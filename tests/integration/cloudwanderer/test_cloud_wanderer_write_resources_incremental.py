@@ -0,0 +1,32 @@
+from unittest.mock import MagicMock
+
+from moto import mock_ec2, mock_iam, mock_s3, mock_sts
+
+from cloudwanderer.storage_connectors import IncrementalStorageConnector, SQLiteStorageConnector
+
+from ...pytest_helpers import create_iam_role, create_s3_buckets
+
+
+@mock_sts
+@mock_ec2
+@mock_s3
+@mock_iam
+def test_write_resources_only_writes_changed_resources(
+    tmp_path, cloudwanderer_aws, aws_interface, default_test_discovery_actions
+):
+    create_iam_role()
+    create_s3_buckets(regions=["eu-west-2", "us-east-1"])
+    aws_interface.get_resource_discovery_actions = MagicMock(return_value=default_test_discovery_actions)
+    sqlite_connector = SQLiteStorageConnector(database_path=str(tmp_path / "cloudwanderer.sqlite3"))
+    sqlite_connector.init()
+    cloudwanderer_aws.storage_connectors = [IncrementalStorageConnector(sqlite_connector)]
+    cloudwanderer_aws.write_resources()
+    first_run_urns = {resource["urn"] for resource in sqlite_connector.read_all()}
+    incremental_connector = IncrementalStorageConnector(sqlite_connector)
+    cloudwanderer_aws.storage_connectors = [incremental_connector]
+
+    cloudwanderer_aws.write_resources()
+
+    assert {resource["urn"] for resource in sqlite_connector.read_all()} == first_run_urns
+    assert incremental_connector.write_statistics.resources_written == 0
+    assert incremental_connector.write_statistics.resources_touched == len(first_run_urns)
@@ -0,0 +1,40 @@
+from unittest.mock import MagicMock
+
+from moto import mock_ec2, mock_iam, mock_s3, mock_sts
+
+from cloudwanderer.aws_interface import CloudWandererAWSInterface, CloudWandererBoto3Session
+from cloudwanderer.urn import URN
+
+from ...pytest_helpers import create_iam_role, create_s3_buckets
+
+
+@mock_sts
+@mock_ec2
+@mock_s3
+@mock_iam
+def test_write_resources_scheduled(cloudwanderer_aws, aws_interface, default_test_discovery_actions):
+    create_iam_role()
+    create_s3_buckets(regions=["eu-west-2", "us-east-1"])
+    aws_interface.get_resource_discovery_actions = MagicMock(return_value=default_test_discovery_actions)
+
+    def cloud_interface_generator():
+        return CloudWandererAWSInterface(
+            CloudWandererBoto3Session(aws_access_key_id="aaaa", aws_secret_access_key="aaaaaa")
+        )
+
+    cloudwanderer_aws.write_resources_scheduled(concurrency=4, cloud_interface_generator=cloud_interface_generator)
+
+    result_summary = set(
+        [
+            (URN.from_string(result["urn"]).region, URN.from_string(result["urn"]).resource_type)
+            for result in cloudwanderer_aws.storage_connectors[0].read_all()
+        ]
+    )
+    assert result_summary == {
+        ("eu-west-2", "bucket"),
+        ("eu-west-2", "vpc"),
+        ("us-east-1", "bucket"),
+        ("us-east-1", "role"),
+        ("us-east-1", "role_policy"),
+        ("us-east-1", "vpc"),
+    }
@@ -0,0 +1,64 @@
+from moto import mock_ec2, mock_iam, mock_sts
+
+from cloudwanderer import ServiceResourceType
+from cloudwanderer.aws_interface import CloudWandererBoto3Session
+from cloudwanderer.multi_account import MultiAccountCloudWanderer
+from cloudwanderer.storage_connectors import MemoryStorageConnector
+from cloudwanderer.urn import URN
+
+from ...pytest_helpers import create_iam_role
+
+ACCOUNT_IDS = ["111111111111", "222222222222", "333333333333"]
+
+
+def session_factory(account_id):
+    def factory():
+        return CloudWandererBoto3Session(
+            aws_access_key_id="aaaa",
+            aws_secret_access_key="aaaaaa",
+            account_id=account_id,
+            enabled_regions=["eu-west-2", "us-east-1"],
+        )
+
+    return factory
+
+
+@mock_sts
+@mock_ec2
+@mock_iam
+def test_write_resources():
+    create_iam_role()
+    storage_connector = MemoryStorageConnector()
+    progress = []
+    subject = MultiAccountCloudWanderer(
+        storage_connectors=[storage_connector],
+        session_factories=[session_factory(account_id) for account_id in ACCOUNT_IDS],
+        concurrency=4,
+        account_concurrency=2,
+    )
+
+    results = subject.write_resources(
+        service_resource_types=[ServiceResourceType("ec2", "vpc"), ServiceResourceType("iam", "role")],
+        progress_callback=progress.append,
+    )
+
+    assert [(result.account_id, result.exception) for result in results] == [
+        (account_id, None) for account_id in ACCOUNT_IDS
+    ]
+    result_summary = {
+        (urn.account_id, urn.region, urn.resource_type)
+        for urn in (URN.from_string(result["urn"]) for result in storage_connector.read_all())
+    }
+    assert result_summary == {
+        (account_id, region, resource_type)
+        for account_id in ACCOUNT_IDS
+        for region, resource_type in [
+            ("eu-west-2", "vpc"),
+            ("us-east-1", "vpc"),
+            ("us-east-1", "role"),
+            ("us-east-1", "role_policy"),
+        ]
+    }
+    assert progress[-1].accounts_finished == 3
+    assert progress[-1].tasks_finished == progress[-1].tasks_total
+    assert progress[-1].tasks_failed == 0
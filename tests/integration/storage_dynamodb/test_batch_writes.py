@@ -0,0 +1,107 @@
+import datetime
+from unittest.mock import MagicMock
+
+import boto3
+import pytest
+from moto import mock_dynamodb2
+
+from cloudwanderer.cloud_wanderer_resource import CloudWandererResource
+from cloudwanderer.storage_connectors import DynamoDbConnector
+from cloudwanderer.storage_connectors.dynamodb import DynamoDbBatchWriteError
+from cloudwanderer.urn import URN
+
+
+def generate_resource(resource_id: str) -> CloudWandererResource:
+    return CloudWandererResource(
+        urn=URN(
+            account_id="111111111111",
+            region="eu-west-2",
+            service="ec2",
+            resource_type="vpc",
+            resource_id_parts=[resource_id],
+        ),
+        resource_data={"VpcId": resource_id},
+        discovery_time=datetime.datetime(2021, 1, 1, 0, 0, 0, 1),
+    )
+
+
+@pytest.fixture
+def connector():
+    with mock_dynamodb2():
+        connector = DynamoDbConnector(
+            boto3_session=boto3.Session(aws_access_key_id="1", aws_secret_access_key="1", region_name="eu-west-2"),
+            batch_writes=True,
+        )
+        connector.init()
+        yield connector
+
+
+def test_batch_writes_are_buffered_until_flushed(connector):
+    for i in range(60):
+        connector.write_resource(generate_resource(f"vpc-{i}"))
+
+    assert connector.write_statistics.items_written == 50
+    assert connector.write_statistics.requests == 2
+    assert len(list(connector.read_all())) == 50
+
+    connector.close()
+
+    assert connector.write_statistics.items_written == 60
+    assert connector.write_statistics.requests == 3
+    assert connector.write_statistics.items_per_second > 0
+    assert connector.read_resource(generate_resource("vpc-59").urn).urn == generate_resource("vpc-59").urn
+
+
+def test_batch_writes_deduplicate_buffered_keys(connector):
+    connector.write_resource(generate_resource("vpc-1"))
+    connector.write_resource(generate_resource("vpc-1"))
+    connector.flush()
+
+    assert connector.write_statistics.items_written == 1
+    assert len(list(connector.read_all())) == 1
+
+
+def test_delete_resource_deletes_buffered_write(connector):
+    connector.write_resource(generate_resource("vpc-1"))
+    connector.write_resource(generate_resource("vpc-2"))
+
+    connector.delete_resource(generate_resource("vpc-1").urn)
+    connector.close()
+
+    assert connector.read_resource(generate_resource("vpc-1").urn) is None
+    assert connector.read_resource(generate_resource("vpc-2").urn).urn == generate_resource("vpc-2").urn
+
+
+def test_batch_writes_retry_unprocessed_items(connector, monkeypatch):
+    monkeypatch.setattr("cloudwanderer.storage_connectors.dynamodb.time.sleep", MagicMock())
+    unprocessed_items = {}
+    batch_write_item = connector.dynamodb.meta.client.batch_write_item
+
+    def flaky_batch_write_item(RequestItems):
+        if not unprocessed_items:
+            unprocessed_items[connector.table_name] = RequestItems[connector.table_name][:1]
+            batch_write_item(RequestItems={connector.table_name: RequestItems[connector.table_name][1:]})
+            return {"UnprocessedItems": dict(unprocessed_items)}
+        return batch_write_item(RequestItems=RequestItems)
+
+    monkeypatch.setattr(connector.dynamodb.meta.client, "batch_write_item", flaky_batch_write_item)
+    for i in range(3):
+        connector.write_resource(generate_resource(f"vpc-{i}"))
+    connector.flush()
+
+    assert len(list(connector.read_all())) == 3
+    assert connector.write_statistics.requests == 2
+    assert connector.write_statistics.unprocessed_items_retried == 1
+
+
+def test_batch_writes_give_up_after_max_attempts(connector, monkeypatch):
+    monkeypatch.setattr("cloudwanderer.storage_connectors.dynamodb.time.sleep", MagicMock())
+    monkeypatch.setattr(
+        connector.dynamodb.meta.client,
+        "batch_write_item",
+        lambda RequestItems: {"UnprocessedItems": RequestItems},
+    )
+    connector.write_resource(generate_resource("vpc-1"))
+
+    with pytest.raises(DynamoDbBatchWriteError):
+        connector.flush()
@@ -0,0 +1,173 @@
+import datetime
+
+import boto3
+import pytest
+from moto import mock_dynamodb2
+
+from cloudwanderer.cloud_wanderer_resource import CloudWandererResource
+from cloudwanderer.storage_connectors import DynamoDbConnector
+from cloudwanderer.urn import URN
+
+
+def generate_urn(resource_type: str, resource_id: str, region: str = "eu-west-2") -> URN:
+    return URN(
+        account_id="111111111111",
+        region=region,
+        service="iam",
+        resource_type=resource_type,
+        resource_id_parts=[resource_id],
+    )
+
+
+def generate_resource(
+    urn: URN, discovery_time: datetime.datetime, parent_urn: URN = None, dependent_resource_urns: list = None
+) -> CloudWandererResource:
+    return CloudWandererResource(
+        urn=urn,
+        resource_data={},
+        discovery_time=discovery_time,
+        parent_urn=parent_urn,
+        dependent_resource_urns=dependent_resource_urns,
+    )
+
+
+OLD = datetime.datetime(2021, 1, 1, 0, 0, 0, 1)
+NEW = datetime.datetime(2021, 1, 2, 0, 0, 0, 1)
+
+
+@pytest.fixture
+def connector():
+    with mock_dynamodb2():
+        connector = DynamoDbConnector(
+            boto3_session=boto3.Session(aws_access_key_id="1", aws_secret_access_key="1", region_name="eu-west-2"),
+        )
+        connector.init()
+        for i in range(30):
+            role_urn = generate_urn("role", f"stale-{i}")
+            role_policy_urn = generate_urn("role_policy", f"stale-{i}-policy")
+            connector.write_resource(generate_resource(role_policy_urn, OLD, parent_urn=role_urn))
+            connector.write_resource(generate_resource(role_urn, OLD, dependent_resource_urns=[role_policy_urn]))
+        connector.write_resource(generate_resource(generate_urn("role", "fresh"), NEW))
+        connector.write_resource(generate_resource(generate_urn("role", "other-region", region="us-east-1"), OLD))
+        yield connector
+
+
+def read_urns(connector: DynamoDbConnector) -> set:
+    return {str(URN.from_string(item["_urn"])) for item in connector.read_all()}
+
+
+def test_delete_resource_of_type_in_account_region(connector):
+    connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="iam",
+        resource_type="role",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=NEW,
+    )
+
+    assert read_urns(connector) == {
+        str(generate_urn("role", "fresh")),
+        str(generate_urn("role", "other-region", region="us-east-1")),
+    }
+    assert connector.write_statistics.items_written == 62 + 60
+    assert connector.write_statistics.requests == 62 + 3
+
+
+def test_delete_resource_of_type_in_account_region_without_cutoff(connector):
+    connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="iam",
+        resource_type="role",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=None,
+    )
+
+    assert read_urns(connector) == {str(generate_urn("role", "other-region", region="us-east-1"))}
+
+
+def test_delete_resource_of_type_in_account_region_flushes_buffered_writes(connector):
+    connector.batch_writes = True
+    connector.write_resource(generate_resource(generate_urn("role", "stale-1"), NEW))
+
+    connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="iam",
+        resource_type="role",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=NEW,
+    )
+
+    assert str(generate_urn("role", "stale-1")) in read_urns(connector)
+
+
+def test_read_content_hashes(connector):
+    connector.store_content_hashes = True
+    connector.write_resource(generate_resource(generate_urn("role", "fresh"), NEW))
+
+    content_hashes = connector.read_content_hashes(
+        cloud_name="aws", account_id="111111111111", region="eu-west-2", service="iam", resource_type="role"
+    )
+
+    assert len(content_hashes) == 31
+    assert (
+        content_hashes[str(generate_urn("role", "fresh"))]
+        == generate_resource(generate_urn("role", "fresh"), NEW).content_hash
+    )
+    assert content_hashes[str(generate_urn("role", "stale-0"))] is None
+
+
+def count_queries(connector: DynamoDbConnector) -> list:
+    queries = []
+    connector.dynamodb.meta.client.meta.events.register(
+        "provide-client-params.dynamodb.Query", lambda params, **kwargs: queries.append(params)
+    )
+    return queries
+
+
+def test_delete_resource_of_type_in_account_region_does_not_query_each_stale_record(connector):
+    queries = count_queries(connector)
+
+    connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="iam",
+        resource_type="role",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=NEW,
+    )
+
+    assert len(queries) == connector.number_of_shards
+    assert {query["IndexName"] for query in queries} == {"resource_type"}
+    assert not any(URN.from_string(urn).resource_type == "role_policy" for urn in read_urns(connector))
+
+
+def test_delete_resource_of_type_in_account_region_without_projected_dependent_resource_urns(connector, monkeypatch):
+    # Tables created before _dependent_resource_urns was projected into the resource_type index.
+    query_records = connector._query_records
+
+    def query_records_without_dependent_resource_urns(query_args):
+        return [
+            {key: value for key, value in record.items() if key != "_dependent_resource_urns"}
+            for record in query_records(query_args)
+        ]
+
+    monkeypatch.setattr(connector, "_query_records", query_records_without_dependent_resource_urns)
+    queries = count_queries(connector)
+
+    connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="iam",
+        resource_type="role",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=NEW,
+    )
+
+    assert len([query for query in queries if query["IndexName"] == "parent_urn"]) == 30
+    assert read_urns(connector) == {
+        str(generate_urn("role", "fresh")),
+        str(generate_urn("role", "other-region", region="us-east-1")),
+    }
@@ -0,0 +1,97 @@
+import datetime
+import time
+
+import boto3
+import pytest
+from moto import mock_dynamodb2
+
+from cloudwanderer.cloud_wanderer_resource import CloudWandererResource
+from cloudwanderer.storage_connectors import DynamoDbConnector
+from cloudwanderer.urn import URN
+
+
+def generate_resource(resource_id: str) -> CloudWandererResource:
+    return CloudWandererResource(
+        urn=URN(
+            account_id="111111111111",
+            region="eu-west-2",
+            service="ec2",
+            resource_type="vpc",
+            resource_id_parts=[resource_id],
+        ),
+        resource_data={"VpcId": resource_id},
+        discovery_time=datetime.datetime(2021, 1, 1, 0, 0, 0, 1),
+    )
+
+
+@pytest.fixture
+def boto3_session():
+    with mock_dynamodb2():
+        session = boto3.Session(aws_access_key_id="1", aws_secret_access_key="1", region_name="eu-west-2")
+        connector = DynamoDbConnector(boto3_session=session)
+        connector.init()
+        for i in range(30):
+            connector.write_resource(generate_resource(f"vpc-{i}"))
+        yield session
+
+
+def read_vpc_urns(connector: DynamoDbConnector) -> list:
+    return [
+        str(resource.urn)
+        for resource in connector.read_resources(service="ec2", resource_type="vpc", account_id="111111111111")
+    ]
+
+
+def test_read_resources_concurrently(boto3_session):
+    sequential = read_vpc_urns(DynamoDbConnector(boto3_session=boto3_session, shard_read_concurrency=1))
+    concurrent = read_vpc_urns(DynamoDbConnector(boto3_session=boto3_session, shard_read_concurrency=10))
+
+    assert len(sequential) == 30
+    assert sorted(concurrent) == sorted(sequential)
+
+
+def test_read_resources_concurrently_ordered(boto3_session):
+    sequential = read_vpc_urns(DynamoDbConnector(boto3_session=boto3_session, shard_read_concurrency=1))
+    ordered = read_vpc_urns(
+        DynamoDbConnector(boto3_session=boto3_session, shard_read_concurrency=4, ordered_reads=True)
+    )
+
+    assert ordered == sequential
+
+
+def test_read_resources_concurrently_raises_shard_errors(boto3_session, monkeypatch):
+    connector = DynamoDbConnector(boto3_session=boto3_session)
+    paginated_query = connector._paginated_query
+    calls = []
+
+    def failing_paginated_query(query_args):
+        calls.append(query_args)
+        if len(calls) == 3:
+            raise RuntimeError("Shard query failed")
+        return paginated_query(query_args)
+
+    monkeypatch.setattr(connector, "_paginated_query", failing_paginated_query)
+
+    with pytest.raises(RuntimeError, match="Shard query failed"):
+        read_vpc_urns(connector)
+
+
+def test_read_resources_concurrently_bounds_buffered_resources(boto3_session, monkeypatch):
+    connector = DynamoDbConnector(boto3_session=boto3_session, shard_read_concurrency=10, shard_read_buffer_size=2)
+    query_resources = connector._query_resources
+    resources_read = []
+
+    def counting_query_resources(query_args):
+        for resource in query_resources(query_args):
+            resources_read.append(resource)
+            yield resource
+
+    monkeypatch.setattr(connector, "_query_resources", counting_query_resources)
+    resources = connector.read_resources(service="ec2", resource_type="vpc", account_id="111111111111")
+
+    next(resources)
+    time.sleep(0.5)
+
+    # Each shard query may hold one resource it is waiting to put on the full queue.
+    assert len(resources_read) <= 1 + connector.shard_read_buffer_size + connector.shard_read_concurrency
+    assert len(list(resources)) == 29
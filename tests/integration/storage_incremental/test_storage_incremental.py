@@ -0,0 +1,134 @@
+import datetime
+
+import pytest
+
+from cloudwanderer.cloud_wanderer_resource import CloudWandererResource
+from cloudwanderer.storage_connectors import (
+    IncrementalStorageConnector,
+    JsonLinesStorageConnector,
+    MemoryStorageConnector,
+    SQLiteStorageConnector,
+)
+from cloudwanderer.urn import URN
+
+OLD = datetime.datetime(2021, 1, 1)
+NEW = datetime.datetime(2021, 1, 2)
+
+
+def generate_urn(resource_id: str) -> URN:
+    return URN(
+        account_id="111111111111",
+        region="eu-west-2",
+        service="ec2",
+        resource_type="vpc",
+        resource_id_parts=[resource_id],
+    )
+
+
+def generate_resource(resource_id: str, discovery_time: datetime.datetime, cidr: str = "10.0.0.0/16"):
+    return CloudWandererResource(
+        urn=generate_urn(resource_id),
+        resource_data={"VpcId": resource_id, "CidrBlock": cidr},
+        discovery_time=discovery_time,
+    )
+
+
+def delete_stale_vpcs(storage_connector, cutoff):
+    storage_connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="ec2",
+        resource_type="vpc",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=cutoff,
+    )
+
+
+def generate_wrapped_connector(connector_type, tmp_path):
+    if connector_type == "memory":
+        connector = MemoryStorageConnector()
+    else:
+        connector = SQLiteStorageConnector(database_path=str(tmp_path / "cloudwanderer.sqlite3"))
+    connector.init()
+    # The resources written by the previous incremental run.
+    storage_connector = IncrementalStorageConnector(connector)
+    storage_connector.open()
+    for resource_id in ["vpc-unchanged", "vpc-changed", "vpc-deleted"]:
+        storage_connector.write_resource(generate_resource(resource_id, OLD))
+    storage_connector.close()
+    return connector
+
+
+def discover(storage_connector):
+    storage_connector.open()
+    storage_connector.write_resource(generate_resource("vpc-unchanged", NEW))
+    storage_connector.write_resource(generate_resource("vpc-changed", NEW, cidr="10.1.0.0/16"))
+    storage_connector.write_resource(generate_resource("vpc-new", NEW))
+    storage_connector.flush()
+    delete_stale_vpcs(storage_connector, cutoff=NEW)
+    storage_connector.close()
+
+
+# MemoryStorageConnector does not store discovery times, so it can only delete stale resources when skipping.
+@pytest.mark.parametrize("connector_type, skip_unchanged", [("sqlite", False), ("sqlite", True), ("memory", True)])
+def test_only_changed_resources_are_written(tmp_path, connector_type, skip_unchanged):
+    wrapped_connector = generate_wrapped_connector(connector_type, tmp_path)
+    storage_connector = IncrementalStorageConnector(wrapped_connector, skip_unchanged=skip_unchanged)
+
+    discover(storage_connector)
+
+    resources = {str(resource.urn): resource for resource in wrapped_connector.read_resources()}
+    assert set(resources) == {
+        str(generate_urn("vpc-unchanged")),
+        str(generate_urn("vpc-changed")),
+        str(generate_urn("vpc-new")),
+    }
+    assert resources[str(generate_urn("vpc-changed"))].cidr_block == "10.1.0.0/16"
+    statistics = storage_connector.write_statistics
+    assert statistics.resources_written == 2
+    assert statistics.resources_touched == (0 if skip_unchanged else 1)
+    assert statistics.resources_skipped == (1 if skip_unchanged else 0)
+    assert statistics.stale_resources_deleted == (1 if skip_unchanged else 0)
+    assert statistics.unchanged_ratio == pytest.approx(1 / 3)
+
+
+def test_unchanged_resources_are_touched(tmp_path):
+    wrapped_connector = SQLiteStorageConnector(database_path=str(tmp_path / "cloudwanderer.sqlite3"))
+    wrapped_connector.init()
+    wrapped_connector.write_resource(generate_resource("vpc-unchanged", OLD))
+    storage_connector = IncrementalStorageConnector(wrapped_connector)
+
+    discover(storage_connector)
+
+    resource = wrapped_connector.read_resource(generate_urn("vpc-unchanged"))
+    assert resource.discovery_time == NEW
+    assert resource.vpc_id == "vpc-unchanged"
+
+
+def test_connector_without_content_hashes(tmp_path):
+    with pytest.raises(TypeError, match="JsonLinesStorageConnector does not store content hashes"):
+        IncrementalStorageConnector(JsonLinesStorageConnector(directory=str(tmp_path)))
+
+
+@pytest.mark.parametrize("connector_type", ["sqlite", "memory"])
+def test_content_hashes_are_only_stored_when_wrapped(tmp_path, connector_type):
+    wrapped_connector = generate_wrapped_connector(connector_type, tmp_path)
+    if connector_type == "memory":
+        unwrapped_connector = wrapped_connector
+        unwrapped_connector.store_content_hashes = False
+    else:
+        unwrapped_connector = SQLiteStorageConnector(database_path=str(tmp_path / "cloudwanderer.sqlite3"))
+    resource = generate_resource("vpc-changed", NEW, cidr="10.1.0.0/16")
+
+    unwrapped_connector.write_resource(resource)
+    unwrapped_connector.close()
+
+    assert resource._content_hash is None
+    # The hash stored by the incremental run is cleared, as it no longer matches the stored resource.
+    assert unwrapped_connector.read_content_hashes(
+        cloud_name="aws", account_id="111111111111", region="eu-west-2", service="ec2", resource_type="vpc"
+    ) == {
+        str(generate_urn("vpc-unchanged")): generate_resource("vpc-unchanged", OLD).content_hash,
+        str(generate_urn("vpc-changed")): None,
+        str(generate_urn("vpc-deleted")): generate_resource("vpc-deleted", OLD).content_hash,
+    }
@@ -0,0 +1,13 @@
+import unittest
+
+from cloudwanderer.storage_connectors import JsonLinesStorageConnector
+
+
+class TestJsonLinesStorageConnector(unittest.TestCase):
+    def test_repr(self):
+        connector = JsonLinesStorageConnector(directory="inventory")
+        assert repr(connector) == 'JsonLinesStorageConnector(directory="inventory", max_segment_bytes=67108864)'
+
+    def test_str(self):
+        connector = JsonLinesStorageConnector(directory="inventory")
+        assert str(connector) == "<JsonLinesStorageConnector=inventory>"
@@ -0,0 +1,194 @@
+import datetime
+import json
+import os
+
+import pytest
+
+from cloudwanderer.cloud_wanderer_resource import CloudWandererResource
+from cloudwanderer.models import Relationship, RelationshipDirection
+from cloudwanderer.storage_connectors import JsonLinesStorageConnector
+from cloudwanderer.urn import URN, PartialUrn
+
+OLD = datetime.datetime(2021, 1, 1)
+NEW = datetime.datetime(2021, 1, 2)
+
+
+def generate_urn(region: str, resource_type: str, resource_id_parts: list) -> URN:
+    return URN(
+        account_id="111111111111",
+        region=region,
+        service="iam",
+        resource_type=resource_type,
+        resource_id_parts=resource_id_parts,
+    )
+
+
+def write_roles(connector: JsonLinesStorageConnector) -> None:
+    for region in ["us-east-1", "eu-west-2"]:
+        for i in range(3):
+            connector.write_resource(
+                CloudWandererResource(
+                    urn=generate_urn(region, "role", [f"role-{i}"]),
+                    resource_data={"RoleName": f"role-{i}", "CreateDate": datetime.datetime(2020, 1, 1)},
+                    dependent_resource_urns=[generate_urn(region, "role_policy", [f"role-{i}", "policy"])],
+                    relationships=[
+                        Relationship(
+                            partial_urn=PartialUrn(
+                                cloud_name="aws",
+                                account_id="unknown",
+                                region=region,
+                                service="iam",
+                                resource_type="instance_profile",
+                                resource_id_parts=[f"profile-{i}"],
+                            ),
+                            direction=RelationshipDirection.INBOUND,
+                        )
+                    ],
+                    discovery_time=OLD if i else NEW,
+                )
+            )
+            connector.write_resource(
+                CloudWandererResource(
+                    urn=generate_urn(region, "role_policy", [f"role-{i}", "policy"]),
+                    resource_data={},
+                    parent_urn=generate_urn(region, "role", [f"role-{i}"]),
+                    discovery_time=OLD,
+                )
+            )
+
+
+@pytest.fixture
+def jsonlines_connector(tmp_path):
+    connector = JsonLinesStorageConnector(directory=str(tmp_path / "inventory"), max_segment_bytes=1024)
+    connector.init()
+    connector.open()
+    write_roles(connector)
+    yield connector
+    connector.close()
+
+
+def segment_files(connector: JsonLinesStorageConnector) -> list:
+    return sorted(file_name for file_name in os.listdir(connector.directory) if file_name.endswith(".jsonl"))
+
+
+def test_write_then_read(jsonlines_connector):
+    resource = jsonlines_connector.read_resource(generate_urn("eu-west-2", "role", ["role-1"]))
+
+    assert resource.urn == generate_urn("eu-west-2", "role", ["role-1"])
+    assert resource.role_name == "role-1"
+    assert resource.create_date == "2020-01-01T00:00:00"
+    assert resource.discovery_time == OLD
+    assert resource.dependent_resource_urns == [generate_urn("eu-west-2", "role_policy", ["role-1", "policy"])]
+    assert resource.relationships[0].partial_urn == "urn:aws:unknown:eu-west-2:iam:instance_profile:profile-1"
+    assert resource.relationships[0].direction == RelationshipDirection.INBOUND
+    assert jsonlines_connector.read_resource(generate_urn("eu-west-2", "role", ["missing"])) is None
+
+
+def test_segments_are_rotated(jsonlines_connector):
+    assert len(segment_files(jsonlines_connector)) > 1
+    assert all(
+        os.path.getsize(os.path.join(jsonlines_connector.directory, file_name)) < 2048
+        for file_name in segment_files(jsonlines_connector)
+    )
+
+
+def test_read_resources_filters(jsonlines_connector):
+    assert len(list(jsonlines_connector.read_resources())) == 12
+    assert len(list(jsonlines_connector.read_all())) == 12
+    assert len(list(jsonlines_connector.read_resources(region="eu-west-2"))) == 6
+    assert [
+        str(resource.urn) for resource in jsonlines_connector.read_resources(region="us-east-1", resource_type="role")
+    ] == [
+        "urn:aws:111111111111:us-east-1:iam:role:role-0",
+        "urn:aws:111111111111:us-east-1:iam:role:role-1",
+        "urn:aws:111111111111:us-east-1:iam:role:role-2",
+    ]
+
+
+def test_delete_resource_writes_tombstones(jsonlines_connector):
+    jsonlines_connector.delete_resource(generate_urn("eu-west-2", "role", ["role-1"]))
+    jsonlines_connector.flush()
+
+    assert jsonlines_connector.read_resource(generate_urn("eu-west-2", "role", ["role-1"])) is None
+    assert jsonlines_connector.read_resource(generate_urn("eu-west-2", "role_policy", ["role-1", "policy"])) is None
+    assert len(list(jsonlines_connector.read_resources())) == 10
+    with open(os.path.join(jsonlines_connector.directory, segment_files(jsonlines_connector)[-1])) as segment_file:
+        tombstones = [json.loads(line) for line in segment_file if '"op":"delete"' in line]
+    assert sorted(tombstone["urn"] for tombstone in tombstones) == [
+        "urn:aws:111111111111:eu-west-2:iam:role:role-1",
+        "urn:aws:111111111111:eu-west-2:iam:role_policy:role-1/policy",
+    ]
+
+
+def test_delete_resource_of_type_in_account_region(jsonlines_connector):
+    jsonlines_connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="iam",
+        resource_type="role",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=NEW,
+    )
+
+    assert sorted(str(resource.urn) for resource in jsonlines_connector.read_resources(region="eu-west-2")) == [
+        "urn:aws:111111111111:eu-west-2:iam:role:role-0",
+        "urn:aws:111111111111:eu-west-2:iam:role_policy:role-0/policy",
+    ]
+
+
+def test_index_is_persisted(jsonlines_connector):
+    jsonlines_connector.delete_resource(generate_urn("eu-west-2", "role", ["role-1"]))
+    jsonlines_connector.close()
+
+    reopened_connector = JsonLinesStorageConnector(directory=jsonlines_connector.directory)
+
+    assert os.path.exists(os.path.join(jsonlines_connector.directory, "index.json"))
+    assert len(list(reopened_connector.read_resources())) == 10
+
+
+def test_read_all_after_reopening(jsonlines_connector):
+    jsonlines_connector.close()
+
+    reopened_connector = JsonLinesStorageConnector(directory=jsonlines_connector.directory)
+
+    assert sorted(record["urn"] for record in reopened_connector.read_all()) == sorted(
+        str(resource.urn) for resource in jsonlines_connector.read_resources()
+    )
+    assert len(list(reopened_connector.read_all())) == 12
+
+
+def test_index_is_rebuilt_after_unclean_shutdown(tmp_path):
+    connector = JsonLinesStorageConnector(directory=str(tmp_path), max_segment_bytes=1024)
+    write_roles(connector)
+    connector.delete_resource(generate_urn("eu-west-2", "role", ["role-1"]))
+    connector.flush()
+    with open(os.path.join(tmp_path, segment_files(connector)[-1]), "ab") as segment_file:
+        segment_file.write(b'{"op":"put","urn":"urn:aws:111111111111:eu-w')
+
+    reopened_connector = JsonLinesStorageConnector(directory=str(tmp_path), max_segment_bytes=1024)
+
+    assert len(list(reopened_connector.read_resources())) == 10
+    reopened_connector.write_resource(
+        CloudWandererResource(urn=generate_urn("eu-west-2", "role", ["role-1"]), resource_data={"RoleName": "role-1"})
+    )
+    assert reopened_connector.read_resource(generate_urn("eu-west-2", "role", ["role-1"])).role_name == "role-1"
+    assert len(list(reopened_connector.read_resources())) == 11
+
+
+def test_compact(jsonlines_connector):
+    write_roles(jsonlines_connector)
+    jsonlines_connector.delete_resource(generate_urn("eu-west-2", "role", ["role-1"]))
+    segments_before = segment_files(jsonlines_connector)
+
+    jsonlines_connector.compact()
+
+    lines = []
+    for file_name in segment_files(jsonlines_connector):
+        with open(os.path.join(jsonlines_connector.directory, file_name)) as segment_file:
+            lines.extend(json.loads(line) for line in segment_file)
+    assert not set(segment_files(jsonlines_connector)) & set(segments_before)
+    assert len(lines) == 10
+    assert {line["op"] for line in lines} == {"put"}
+    assert jsonlines_connector.read_resource(generate_urn("us-east-1", "role", ["role-2"])).role_name == "role-2"
+    jsonlines_connector.close()
+    assert len(list(JsonLinesStorageConnector(directory=jsonlines_connector.directory).read_resources())) == 10
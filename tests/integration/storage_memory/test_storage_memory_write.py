@@ -195,3 +195,72 @@ def test_delete_subresources_from_resource(memory_connector, iam_role, iam_role_
     assert role_after_delete is None
     assert role_policy_1_after_delete is None
     assert role_policy_2_after_delete is None
+
+
+def generate_urn(region: str, resource_type: str, resource_id_parts: list) -> URN:
+    return URN(
+        account_id="111111111111",
+        region=region,
+        service="iam",
+        resource_type=resource_type,
+        resource_id_parts=resource_id_parts,
+    )
+
+
+def test_indexes_are_maintained_on_write_and_delete(memory_connector):
+    for region in ["us-east-1", "eu-west-2"]:
+        for i in range(3):
+            memory_connector.write_resource(
+                CloudWandererResource(urn=generate_urn(region, "role", [f"role-{i}"]), resource_data={})
+            )
+            memory_connector.write_resource(
+                CloudWandererResource(
+                    urn=generate_urn(region, "role_policy", [f"role-{i}", "policy"]),
+                    resource_data={},
+                    parent_urn=generate_urn(region, "role", [f"role-{i}"]),
+                )
+            )
+
+    memory_connector.delete_resource(urn=generate_urn("us-east-1", "role", ["role-0"]))
+    memory_connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="iam",
+        resource_type="role",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=None,
+    )
+
+    assert [str(resource.urn) for resource in memory_connector.read_resources(region="us-east-1")] == [
+        "urn:aws:111111111111:us-east-1:iam:role:role-1",
+        "urn:aws:111111111111:us-east-1:iam:role_policy:role-1/policy",
+        "urn:aws:111111111111:us-east-1:iam:role:role-2",
+        "urn:aws:111111111111:us-east-1:iam:role_policy:role-2/policy",
+    ]
+    assert [
+        str(resource.urn)
+        for resource in memory_connector.read_resources(region="eu-west-2", service="iam", account_id="111111111111")
+    ] == [
+        "urn:aws:111111111111:eu-west-2:iam:role_policy:role-0/policy",
+        "urn:aws:111111111111:eu-west-2:iam:role_policy:role-1/policy",
+        "urn:aws:111111111111:eu-west-2:iam:role_policy:role-2/policy",
+    ]
+    assert list(memory_connector.read_resources(region="eu-west-2", resource_type="role")) == []
+    assert list(memory_connector.read_resources(region="ap-east-1")) == []
+    assert isinstance(next(memory_connector.read_resources(resource_type="role")).urn, URN)
+
+
+def test_children_are_reindexed_when_their_parent_changes(memory_connector):
+    policy_urn = generate_urn("us-east-1", "role_policy", ["role-0", "policy"])
+    for parent in ["role-0", "role-1"]:
+        memory_connector.write_resource(
+            CloudWandererResource(
+                urn=policy_urn, resource_data={}, parent_urn=generate_urn("us-east-1", "role", [parent])
+            )
+        )
+
+    memory_connector.delete_resource(urn=generate_urn("us-east-1", "role", ["role-0"]))
+    assert memory_connector.read_resource(policy_urn) is not None
+
+    memory_connector.delete_resource(urn=generate_urn("us-east-1", "role", ["role-1"]))
+    assert memory_connector.read_resource(policy_urn) is None
@@ -0,0 +1,20 @@
+import unittest
+
+import pytest
+
+from cloudwanderer.storage_connectors import ParquetStorageConnector
+
+pytest.importorskip("pyarrow")
+
+
+class TestParquetStorageConnector(unittest.TestCase):
+    def test_repr(self):
+        connector = ParquetStorageConnector(output_path="inventory")
+        assert (
+            repr(connector)
+            == 'ParquetStorageConnector(output_path="inventory", row_group_size=10000, max_buffered_rows=100000)'
+        )
+
+    def test_str(self):
+        connector = ParquetStorageConnector(output_path="inventory")
+        assert str(connector) == "<ParquetStorageConnector=inventory>"
@@ -0,0 +1,206 @@
+import datetime
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from moto import mock_iam, mock_sts
+
+from cloudwanderer import CloudWanderer
+from cloudwanderer.cloud_wanderer_resource import CloudWandererResource
+from cloudwanderer.models import ActionSet, Relationship, RelationshipDirection
+from cloudwanderer.storage_connectors import ParquetStorageConnector
+from cloudwanderer.urn import URN, PartialUrn
+
+from ...pytest_helpers import create_iam_role
+
+pyarrow_parquet = pytest.importorskip("pyarrow.parquet")
+
+OLD = datetime.datetime(2021, 1, 1)
+NEW = datetime.datetime(2021, 1, 2)
+
+
+def generate_vpc(region: str, vpc_id: str, discovery_time: datetime.datetime = NEW) -> CloudWandererResource:
+    return CloudWandererResource(
+        urn=URN(
+            account_id="111111111111", region=region, service="ec2", resource_type="vpc", resource_id_parts=[vpc_id]
+        ),
+        resource_data={
+            "VpcId": vpc_id,
+            "IsDefault": True,
+            "CidrBlockAssociationSet": [
+                {"AssociationId": "vpc-cidr-assoc-1", "CidrBlock": "10.0.0.0/16", "CidrBlockState": {"State": "x"}}
+            ],
+            "Tags": None,
+            "SecondaryAttribute": {"Enabled": True},
+        },
+        relationships=[
+            Relationship(
+                partial_urn=PartialUrn(
+                    cloud_name="aws",
+                    account_id="111111111111",
+                    region=region,
+                    service="ec2",
+                    resource_type="dhcp_options",
+                    resource_id_parts=["dopt-1"],
+                ),
+                direction=RelationshipDirection.OUTBOUND,
+            )
+        ],
+        discovery_time=discovery_time,
+    )
+
+
+def iam_urn(resource_type: str) -> PartialUrn:
+    return PartialUrn(
+        cloud_name="aws",
+        account_id="123456789012",
+        region="us-east-1",
+        service="iam",
+        resource_type=resource_type,
+        resource_id_parts=["ALL"],
+    )
+
+
+@pytest.fixture
+def parquet_connector(tmp_path, cloudwanderer_boto3_session):
+    connector = ParquetStorageConnector(
+        output_path=str(tmp_path / "inventory"),
+        row_group_size=2,
+        cloudwanderer_boto3_session=cloudwanderer_boto3_session,
+    )
+    connector.init()
+    return connector
+
+
+def test_write_then_read(parquet_connector):
+    parquet_connector.write_resource(generate_vpc("eu-west-2", "vpc-1"))
+
+    resource = parquet_connector.read_resource(generate_vpc("eu-west-2", "vpc-1").urn)
+
+    assert resource.urn == generate_vpc("eu-west-2", "vpc-1").urn
+    assert resource.vpc_id == "vpc-1"
+    assert resource.is_default is True
+    assert resource.cidr_block_association_set[0]["CidrBlockState"] == {"State": "x", "StatusMessage": None}
+    assert resource.secondary_attribute == {"Enabled": True}
+    assert resource.discovery_time == NEW
+    assert resource.relationships[0].partial_urn == "urn:aws:111111111111:eu-west-2:ec2:dhcp_options:dopt-1"
+    assert resource.relationships[0].direction == RelationshipDirection.OUTBOUND
+    assert parquet_connector.read_resource(generate_vpc("eu-west-2", "vpc-2").urn) is None
+
+
+def test_columns_are_derived_from_botocore_shape(parquet_connector):
+    parquet_connector.write_resource(generate_vpc("eu-west-2", "vpc-1"))
+    parquet_connector.flush()
+
+    (file_path,) = [file_path for _, file_path in parquet_connector._partition_files()]
+    schema = pyarrow_parquet.read_schema(file_path)
+
+    assert os.path.relpath(file_path, parquet_connector.output_path).startswith(
+        os.path.join(
+            "cloud_name=aws", "account_id=111111111111", "region=eu-west-2", "service=ec2", "resource_type=vpc"
+        )
+    )
+    assert str(schema.field("IsDefault").type) == "bool"
+    assert str(schema.field("CidrBlockAssociationSet").type).startswith("list<element: struct<AssociationId: string")
+    assert "SecondaryAttribute" not in schema.names
+
+
+def test_values_not_matching_shape_are_kept(parquet_connector):
+    vpc = generate_vpc("eu-west-2", "vpc-1")
+    vpc.cloudwanderer_metadata.resource_data["IsDefault"] = {"Not": "a boolean"}
+    parquet_connector.write_resource(vpc)
+
+    assert parquet_connector.read_resource(vpc.urn).is_default == {"Not": "a boolean"}
+
+
+def test_row_groups(parquet_connector):
+    for i in range(5):
+        parquet_connector.write_resource(generate_vpc("eu-west-2", f"vpc-{i}"))
+    parquet_connector.write_resource(generate_vpc("us-east-1", "vpc-0"))
+    parquet_connector.flush()
+
+    row_groups = {
+        partition.region: pyarrow_parquet.ParquetFile(file_path).metadata.num_row_groups
+        for partition, file_path in parquet_connector._partition_files()
+    }
+
+    assert row_groups == {"eu-west-2": 3, "us-east-1": 1}
+    assert len(list(parquet_connector.read_resources(region="eu-west-2"))) == 5
+    assert len(list(parquet_connector.read_all())) == 6
+
+
+def test_max_buffered_rows(tmp_path, cloudwanderer_boto3_session):
+    connector = ParquetStorageConnector(
+        output_path=str(tmp_path),
+        row_group_size=10,
+        max_buffered_rows=3,
+        cloudwanderer_boto3_session=cloudwanderer_boto3_session,
+    )
+    for region in ["eu-west-1", "eu-west-2", "eu-west-2"]:
+        connector.write_resource(generate_vpc(region, f"vpc-{region}"))
+
+    assert {partition.region: len(buffer) for partition, buffer in connector._buffers.items()} == {"eu-west-1": 1}
+
+
+def test_delete_resource_of_type_in_account_region(parquet_connector):
+    for i in range(3):
+        parquet_connector.write_resource(generate_vpc("eu-west-2", f"old-vpc-{i}", discovery_time=OLD))
+    parquet_connector.write_resource(generate_vpc("us-east-1", "old-vpc-0", discovery_time=OLD))
+    parquet_connector.flush()
+    parquet_connector.write_resource(generate_vpc("eu-west-2", "new-vpc-0"))
+
+    parquet_connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="ec2",
+        resource_type="vpc",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=NEW,
+    )
+
+    assert [str(resource.urn) for resource in parquet_connector.read_resources(region="eu-west-2")] == [
+        "urn:aws:111111111111:eu-west-2:ec2:vpc:new-vpc-0"
+    ]
+    assert len(list(parquet_connector.read_resources(region="us-east-1"))) == 1
+
+
+def test_delete_resource(parquet_connector):
+    for i in range(3):
+        parquet_connector.write_resource(generate_vpc("eu-west-2", f"vpc-{i}"))
+
+    parquet_connector.delete_resource(generate_vpc("eu-west-2", "vpc-1").urn)
+
+    assert [str(resource.urn) for resource in parquet_connector.read_resources()] == [
+        "urn:aws:111111111111:eu-west-2:ec2:vpc:vpc-0",
+        "urn:aws:111111111111:eu-west-2:ec2:vpc:vpc-2",
+    ]
+
+
+@mock_sts
+@mock_iam
+def test_write_resources(aws_interface, parquet_connector):
+    create_iam_role()
+    aws_interface.get_resource_discovery_actions = MagicMock(
+        return_value=[
+            ActionSet(
+                get_urns=[iam_urn("role")],
+                delete_urns=[
+                    iam_urn("role"),
+                    iam_urn("role_policy"),
+                ],
+            )
+        ]
+    )
+    cloud_wanderer = CloudWanderer(storage_connectors=[parquet_connector], cloud_interface=aws_interface)
+
+    cloud_wanderer.write_resources()
+
+    role = parquet_connector.read_resource(URN.from_string("urn:aws:123456789012:us-east-1:iam:role:test-role"))
+    assert role.role_name == "test-role"
+    assert isinstance(role.create_date, datetime.datetime)
+    assert role.dependent_resource_urns == [
+        URN.from_string("urn:aws:123456789012:us-east-1:iam:role_policy:test-role/test-role-policy")
+    ]
+    assert [str(resource.urn) for resource in parquet_connector.read_resources(resource_type="role_policy")] == [
+        "urn:aws:123456789012:us-east-1:iam:role_policy:test-role/test-role-policy"
+    ]
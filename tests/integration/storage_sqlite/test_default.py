@@ -0,0 +1,13 @@
+import unittest
+
+from cloudwanderer.storage_connectors import SQLiteStorageConnector
+
+
+class TestSQLiteStorageConnector(unittest.TestCase):
+    def test_repr(self):
+        connector = SQLiteStorageConnector(database_path=":memory:")
+        assert repr(connector) == 'SQLiteStorageConnector(database_path=":memory:", batch_size=1000)'
+
+    def test_str(self):
+        connector = SQLiteStorageConnector(database_path=":memory:")
+        assert str(connector) == "<SQLiteStorageConnector=:memory:>"
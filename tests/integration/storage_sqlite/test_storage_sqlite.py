@@ -0,0 +1,195 @@
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from cloudwanderer.cloud_wanderer_resource import CloudWandererResource
+from cloudwanderer.models import Relationship, RelationshipDirection
+from cloudwanderer.storage_connectors import SQLiteStorageConnector
+from cloudwanderer.storage_connectors.base_connector import ISO_DATE_FORMAT
+from cloudwanderer.storage_connectors.sqlite import SCHEMA
+from cloudwanderer.urn import URN, PartialUrn
+
+OLD = datetime.datetime(2021, 1, 1)
+NEW = datetime.datetime(2021, 1, 2)
+
+
+def generate_urn(region: str, resource_type: str, resource_id_parts: list) -> URN:
+    return URN(
+        account_id="111111111111",
+        region=region,
+        service="iam",
+        resource_type=resource_type,
+        resource_id_parts=resource_id_parts,
+    )
+
+
+@pytest.fixture
+def sqlite_connector(tmp_path):
+    connector = SQLiteStorageConnector(database_path=str(tmp_path / "cloudwanderer.sqlite3"), batch_size=4)
+    connector.init()
+    for region in ["us-east-1", "eu-west-2"]:
+        for i in range(3):
+            connector.write_resource(
+                CloudWandererResource(
+                    urn=generate_urn(region, "role", [f"role-{i}"]),
+                    resource_data={"RoleName": f"role-{i}", "CreateDate": datetime.datetime(2020, 1, 1), "Size": 1.5},
+                    dependent_resource_urns=[generate_urn(region, "role_policy", [f"role-{i}", "policy"])],
+                    relationships=[
+                        Relationship(
+                            partial_urn=PartialUrn(
+                                cloud_name="aws",
+                                account_id="unknown",
+                                region=region,
+                                service="iam",
+                                resource_type="instance_profile",
+                                resource_id_parts=[f"profile-{i}"],
+                            ),
+                            direction=RelationshipDirection.INBOUND,
+                        )
+                    ],
+                    discovery_time=OLD if i else NEW,
+                )
+            )
+            connector.write_resource(
+                CloudWandererResource(
+                    urn=generate_urn(region, "role_policy", [f"role-{i}", "policy"]),
+                    resource_data={},
+                    parent_urn=generate_urn(region, "role", [f"role-{i}"]),
+                    discovery_time=OLD,
+                )
+            )
+    yield connector
+    connector.close()
+
+
+def test_write_then_read(sqlite_connector):
+    resource = sqlite_connector.read_resource(generate_urn("eu-west-2", "role", ["role-1"]))
+
+    assert resource.urn == generate_urn("eu-west-2", "role", ["role-1"])
+    assert resource.role_name == "role-1"
+    assert resource.create_date == "2020-01-01T00:00:00"
+    assert float(resource.size) == 1.5
+    assert resource.discovery_time == OLD
+    assert resource.dependent_resource_urns == [generate_urn("eu-west-2", "role_policy", ["role-1", "policy"])]
+    assert resource.relationships[0].partial_urn == "urn:aws:unknown:eu-west-2:iam:instance_profile:profile-1"
+    assert resource.relationships[0].direction == RelationshipDirection.INBOUND
+    assert sqlite_connector.read_resource(generate_urn("eu-west-2", "role", ["missing"])) is None
+
+
+def test_written_resource_data_is_the_standardised_resource_data(tmp_path):
+    connector = SQLiteStorageConnector(database_path=str(tmp_path / "cloudwanderer.sqlite3"))
+    connector.init()
+    resource = CloudWandererResource(
+        urn=generate_urn("eu-west-2", "role", ["role-1"]),
+        resource_data={"RoleName": "role-1", "Description": "", "MaxSessionDuration": 0.1, "Tags": ({"Key": "a"},)},
+    )
+    connector.write_resource(resource)
+    connector.flush()
+
+    stored_resource = connector.read_resource(resource.urn)
+    connector.close()
+
+    assert stored_resource.cloudwanderer_metadata.resource_data == (
+        resource.cloudwanderer_metadata.standardised_resource_data
+    )
+    assert stored_resource.max_session_duration == Decimal("0.1")
+
+
+def test_read_resources_filters(sqlite_connector):
+    assert len(list(sqlite_connector.read_resources())) == 12
+    assert len(list(sqlite_connector.read_resources(region="eu-west-2"))) == 6
+    assert sorted(
+        str(resource.urn)
+        for resource in sqlite_connector.read_resources(
+            account_id="111111111111", region="us-east-1", service="iam", resource_type="role"
+        )
+    ) == [
+        "urn:aws:111111111111:us-east-1:iam:role:role-0",
+        "urn:aws:111111111111:us-east-1:iam:role:role-1",
+        "urn:aws:111111111111:us-east-1:iam:role:role-2",
+    ]
+    child = next(sqlite_connector.read_resources(resource_type="role_policy", region="us-east-1"))
+    assert child.parent_urn == generate_urn("us-east-1", "role", ["role-0"])
+
+
+def test_rewrite_replaces_resource_and_relationships(sqlite_connector):
+    urn = generate_urn("eu-west-2", "role", ["role-1"])
+    sqlite_connector.write_resource(CloudWandererResource(urn=urn, resource_data={"RoleName": "renamed"}))
+
+    resource = sqlite_connector.read_resource(urn)
+
+    assert resource.role_name == "renamed"
+    assert resource.relationships == []
+    assert len(list(sqlite_connector.read_resources())) == 12
+
+
+def test_delete_resource_deletes_dependent_resources(sqlite_connector):
+    sqlite_connector.delete_resource(generate_urn("eu-west-2", "role", ["role-1"]))
+
+    assert sqlite_connector.read_resource(generate_urn("eu-west-2", "role", ["role-1"])) is None
+    assert sqlite_connector.read_resource(generate_urn("eu-west-2", "role_policy", ["role-1", "policy"])) is None
+    assert len(list(sqlite_connector.read_resources())) == 10
+
+
+def test_delete_resource_of_type_in_account_region(sqlite_connector):
+    sqlite_connector.delete_resource_of_type_in_account_region(
+        cloud_name="aws",
+        service="iam",
+        resource_type="role",
+        account_id="111111111111",
+        region="eu-west-2",
+        cutoff=NEW,
+    )
+
+    assert sorted(str(resource.urn) for resource in sqlite_connector.read_resources(region="eu-west-2")) == [
+        "urn:aws:111111111111:eu-west-2:iam:role:role-0",
+        "urn:aws:111111111111:eu-west-2:iam:role_policy:role-0/policy",
+    ]
+    assert len(list(sqlite_connector.read_resources(region="us-east-1"))) == 6
+
+
+def test_resources_are_persisted(sqlite_connector):
+    sqlite_connector.close()
+
+    reopened_connector = SQLiteStorageConnector(database_path=sqlite_connector.database_path)
+
+    assert len(list(reopened_connector.read_resources())) == 12
+    assert reopened_connector.connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_touch_and_read_content_hashes(sqlite_connector):
+    sqlite_connector.store_content_hashes = True
+    resource = CloudWandererResource(
+        urn=generate_urn("eu-west-2", "role", ["role-3"]), resource_data={"RoleName": "role-3"}, discovery_time=OLD
+    )
+    sqlite_connector.write_resource(resource)
+    sqlite_connector.flush()
+    resource.discovery_time = NEW
+
+    sqlite_connector.touch_resource(resource)
+    content_hashes = sqlite_connector.read_content_hashes(
+        cloud_name="aws", account_id="111111111111", region="eu-west-2", service="iam", resource_type="role"
+    )
+
+    assert sqlite_connector.read_resource(resource.urn).discovery_time == NEW
+    assert len(content_hashes) == 4
+    assert content_hashes[str(resource.urn)] == resource.content_hash
+    assert content_hashes[str(generate_urn("eu-west-2", "role", ["role-0"]))] is None
+
+
+def test_init_adds_content_hash_column(tmp_path):
+    database_path = str(tmp_path / "cloudwanderer.sqlite3")
+    connector = SQLiteStorageConnector(database_path=database_path)
+    connector.connection.executescript(SCHEMA.replace(",\n    content_hash TEXT", ""))
+    connector.connection.execute(
+        "INSERT INTO resources VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        (str(generate_urn("eu-west-2", "role", ["role-0"])), "aws", "111111111111", "eu-west-2", "iam", "role")
+        + ('["role-0"]', None, "[]", OLD.strftime(ISO_DATE_FORMAT), "{}"),
+    )
+
+    connector.init()
+
+    assert connector.read_content_hashes(
+        cloud_name="aws", account_id="111111111111", region="eu-west-2", service="iam", resource_type="role"
+    ) == {str(generate_urn("eu-west-2", "role", ["role-0"])): None}
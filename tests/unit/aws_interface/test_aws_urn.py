@@ -1,3 +1,4 @@
+import pickle
 import unittest
 
 from cloudwanderer import URN
@@ -184,3 +185,49 @@ class TestURN(unittest.TestCase):
             "resource_type": "role",
             "service": "iam",
         }
+
+    def test_hash(self):
+        urn = URN.from_string("urn:aws:111111111111:us-east-1:iam:role:test-role")
+
+        assert hash(urn) == hash(self.test_urn_resource)
+        assert {urn, self.test_urn_resource} == {self.test_urn_resource}
+        assert {self.test_urn_resource: "role"}[urn] == "role"
+        assert {"urn:aws:111111111111:us-east-1:iam:role:test-role": "role"}[urn] == "role"
+
+    def test_immutable(self):
+        with self.assertRaises(AttributeError):
+            self.test_urn_resource.region = "eu-west-1"
+        with self.assertRaises(AttributeError):
+            self.test_urn_resource.new_attribute = "value"
+        assert not hasattr(self.test_urn_resource, "__dict__")
+
+    def test_pickle(self):
+        unpickled = pickle.loads(pickle.dumps(self.test_urn_dependent_resource))
+
+        assert unpickled == self.test_urn_dependent_resource
+        assert isinstance(unpickled, URN)
+        assert unpickled.resource_id_parts == ["test-role", "test-policy"]
+
+    def test_attributes_are_interned(self):
+        urn = URN.from_string("urn:aws:111111111111:us-east-1:iam:role:test-role")
+
+        assert urn.account_id is self.test_urn_resource.account_id
+        assert urn.region is self.test_urn_resource.region
+
+    def test_from_string_is_cached(self):
+        urn_string = "urn:aws:111111111111:us-east-1:iam:role_policy:test-role/test-policy"
+
+        assert URN.from_string(urn_string) is URN.from_string(urn_string)
+        assert URN.from_string(urn_string, cached=False) is not URN.from_string(urn_string)
+        assert URN.from_string(urn_string, cached=False) == self.test_urn_dependent_resource
+
+    def test_resource_id_parts_cannot_be_modified(self):
+        URN.from_string("urn:aws:1:r:s:t:x").resource_id_parts.append("y")
+        self.test_urn_resource.resource_id_parts.append("y")
+
+        assert URN.from_string("urn:aws:1:r:s:t:x").resource_id_parts == ["x"]
+        assert self.test_urn_resource.resource_id_parts == ["test-role"]
+
+    def test_from_string_uncached_errors_with_empty_id_part(self):
+        with self.assertRaises(ValueError):
+            URN.from_string("urn:aws:111111111111:us-east-1:iam:role_policy:test-role/", cached=False)
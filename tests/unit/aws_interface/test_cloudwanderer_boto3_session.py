@@ -1,6 +1,13 @@
 from unittest.mock import MagicMock
 
-from cloudwanderer.aws_interface import CloudWandererBoto3ClientConfig, CloudWandererBoto3Session
+from botocore.awsrequest import AWSResponse
+
+from cloudwanderer.aws_interface import (
+    AdaptiveRateLimiter,
+    CloudWandererBoto3ClientConfig,
+    CloudWandererBoto3Session,
+    RateLimitKey,
+)
 
 
 def test_get_account_id_from_arg():
@@ -65,3 +72,40 @@ def test_get_enabled_regions_from_arg():
     assert subject.get_enabled_regions() == ["eu-west-1"]
 
     botocore_session.create_client.assert_not_called()
+
+
+class FakeRawResponse:
+    def __init__(self, body: bytes) -> None:
+        self.body = body
+
+    def stream(self):
+        yield self.body
+
+
+def test_rate_limiter_adapts_to_throttling():
+    rate_limiter = AdaptiveRateLimiter(initial_rate=10, decrease_factor=0.5)
+    subject = CloudWandererBoto3Session(
+        aws_access_key_id="aaaa",
+        aws_secret_access_key="aaaa",
+        account_id="111111111111",
+        rate_limiter=rate_limiter,
+    )
+    client = subject.client("ec2", region_name="eu-west-2")
+    responses = [
+        (503, b"<Response><Errors><Error><Code>RequestLimitExceeded</Code></Error></Errors></Response>"),
+        (200, b"<DescribeRegionsResponse><regionInfo/></DescribeRegionsResponse>"),
+    ]
+
+    def send(request, **kwargs):
+        status_code, body = responses.pop(0)
+        return AWSResponse(request.url, status_code, {}, FakeRawResponse(body))
+
+    client.meta.events.register("before-send.ec2.DescribeRegions", send)
+
+    client.describe_regions()
+
+    key = RateLimitKey(account_id="111111111111", service="ec2", region="eu-west-2")
+    statistics = rate_limiter.statistics[key]
+    assert statistics.requests == 2
+    assert statistics.throttles == 1
+    assert 5 < statistics.rate < 6
@@ -0,0 +1,101 @@
+import pytest
+
+from cloudwanderer.aws_interface import AdaptiveRateLimiter, RateLimiterStatistics, RateLimitKey
+
+KEY = RateLimitKey(account_id="111111111111", service="ec2", region="eu-west-2")
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def rate_limiter(clock, **kwargs):
+    return AdaptiveRateLimiter(clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_acquire_waits_for_tokens_at_rate(clock):
+    subject = rate_limiter(clock, initial_rate=10)
+
+    waits = [subject.acquire(KEY) for _ in range(11)]
+
+    assert waits[0] == 0
+    assert waits[1:] == pytest.approx([0.1] * 10)
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_keys_are_limited_independently(clock):
+    subject = rate_limiter(clock, initial_rate=1)
+
+    subject.acquire(KEY)
+    subject.acquire(KEY._replace(region="us-east-1"))
+
+    assert clock.sleeps == []
+
+
+def test_throttle_decreases_rate_multiplicatively_once_per_cooldown(clock):
+    subject = rate_limiter(clock, initial_rate=20, decrease_factor=0.5, decrease_cooldown=1)
+
+    subject.record_throttle(KEY)
+    subject.record_throttle(KEY)
+    assert subject.rate(KEY) == 10
+
+    clock.now += 1
+    subject.record_throttle(KEY)
+    assert subject.rate(KEY) == 5
+
+
+def test_throttle_does_not_decrease_below_min_rate(clock):
+    subject = rate_limiter(clock, initial_rate=1, min_rate=0.5, decrease_cooldown=0)
+
+    for _ in range(5):
+        subject.record_throttle(KEY)
+
+    assert subject.rate(KEY) == 0.5
+
+
+def test_success_increases_rate_additively(clock):
+    subject = rate_limiter(clock, initial_rate=10, additive_increase=1, max_rate=11)
+
+    for _ in range(10):
+        subject.record_success(KEY)
+
+    # A second's worth of successful requests increases the rate by about additive_increase.
+    assert subject.rate(KEY) == pytest.approx(10.95, abs=0.01)
+
+    for _ in range(100):
+        subject.record_success(KEY)
+
+    assert subject.rate(KEY) == 11
+
+
+def test_statistics(clock):
+    subject = rate_limiter(clock, initial_rate=2)
+
+    subject.acquire(KEY)
+    subject.acquire(KEY)
+    subject.record_throttle(KEY)
+
+    assert subject.statistics == {
+        KEY: RateLimiterStatistics(rate=1.0, requests=2, throttles=1, waited_seconds=pytest.approx(0.5))
+    }
+
+
+def test_invalid_rates():
+    with pytest.raises(ValueError):
+        AdaptiveRateLimiter(initial_rate=1, min_rate=2)
+    with pytest.raises(ValueError):
+        AdaptiveRateLimiter(decrease_factor=1)
@@ -113,7 +113,7 @@ class TestResourceMap(unittest.TestCase):
             service_map=MagicMock(is_global_service=False),
         )
 
-        assert resource_map.relationships == [
+        assert resource_map.relationships == (
             RelationshipSpecification(
                 base_path="@",
                 direction=RelationshipDirection.INBOUND,
@@ -123,8 +123,8 @@ class TestResourceMap(unittest.TestCase):
                 resource_type="vpc",
                 region_source=RelationshipRegionSource.SAME_AS_RESOURCE,
                 account_id_source=RelationshipAccountIdSource.UNKNOWN,
-            )
-        ]
+            ),
+        )
 
     def test_uniqueness_scope(self):
         resource_map = ResourceMap.factory(
@@ -1,6 +1,7 @@
 from unittest.mock import MagicMock
 
 from cloudwanderer.aws_interface.models import (
+    CompiledServiceModel,
     ResourceMap,
     ResourceRegionRequest,
     ResourceRegionRequestParam,
@@ -72,3 +73,14 @@ def test_build_params():
     )
 
     assert request.build_params(mock_bucket) == {"Bucket": "test-s3-bucket"}
+
+
+def test_compiled_service_model_caches_resource_maps():
+    compiled_service_model = CompiledServiceModel(
+        ServiceMap.factory(name="s3", definition={"resources": {"Bucket": {"type": "baseResource"}}})
+    )
+
+    resource_map = compiled_service_model.get_resource_map("bucket")
+
+    assert resource_map.name == "Bucket"
+    assert compiled_service_model.get_resource_map("bucket") is resource_map
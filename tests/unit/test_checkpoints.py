@@ -0,0 +1,91 @@
+from datetime import datetime
+
+import pytest
+
+from cloudwanderer.checkpoints import FileCheckpointStore, SQLiteCheckpointStore, checkpointing
+from cloudwanderer.urn import PartialUrn
+
+GET_URN = PartialUrn(
+    cloud_name="aws", account_id="111111111111", region="eu-west-1", service="ec2", resource_type="vpc"
+)
+OTHER_GET_URN = PartialUrn(
+    cloud_name="aws", account_id="111111111111", region="us-east-1", service="iam", resource_type="role"
+)
+DISCOVERY_START_TIMES = {
+    "aws:ec2:vpc": datetime(2021, 1, 1, 12, 30, 15, 123456),
+    "aws:ec2:vpc_subnet": datetime(2021, 1, 1, 12, 30, 16),
+}
+
+
+@pytest.fixture(params=["file", "sqlite"])
+def checkpoint_store(request, tmp_path):
+    if request.param == "file":
+        return FileCheckpointStore(path=str(tmp_path / "checkpoint.jsonl"))
+    return SQLiteCheckpointStore(database_path=str(tmp_path / "checkpoint.sqlite3"))
+
+
+def test_record_and_read_completed_task(checkpoint_store):
+    checkpoint_store.open()
+    checkpoint_store.record_completed_task(GET_URN, DISCOVERY_START_TIMES)
+
+    assert checkpoint_store.read_completed_task(GET_URN) == DISCOVERY_START_TIMES
+    assert checkpoint_store.read_completed_task(OTHER_GET_URN) is None
+
+
+def test_checkpoints_persist_across_runs(checkpoint_store):
+    checkpoint_store.open()
+    checkpoint_store.record_completed_task(GET_URN, DISCOVERY_START_TIMES)
+    checkpoint_store.record_completed_task(OTHER_GET_URN, {})
+    checkpoint_store.close()
+
+    checkpoint_store.open()
+
+    assert checkpoint_store.read_completed_task(GET_URN) == DISCOVERY_START_TIMES
+    assert checkpoint_store.read_completed_task(OTHER_GET_URN) == {}
+
+
+def test_clear(checkpoint_store):
+    checkpoint_store.open()
+    checkpoint_store.record_completed_task(GET_URN, DISCOVERY_START_TIMES)
+    checkpoint_store.clear()
+    checkpoint_store.close()
+
+    checkpoint_store.open()
+
+    assert checkpoint_store.read_completed_task(GET_URN) is None
+
+
+def test_file_checkpoint_store_discards_partially_written_line(tmp_path):
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint_store = FileCheckpointStore(path=str(path))
+    checkpoint_store.open()
+    checkpoint_store.record_completed_task(GET_URN, DISCOVERY_START_TIMES)
+    checkpoint_store.close()
+    with open(path, "a") as file:
+        file.write('{"task": "urn:aws:111111111111:us-east-1:iam:role:ALL", "discovery_st')
+
+    checkpoint_store.open()
+    checkpoint_store.record_completed_task(OTHER_GET_URN, {})
+    checkpoint_store.close()
+    checkpoint_store.open()
+
+    assert checkpoint_store.read_completed_task(GET_URN) == DISCOVERY_START_TIMES
+    assert checkpoint_store.read_completed_task(OTHER_GET_URN) == {}
+
+
+def test_checkpointing_clears_on_success(checkpoint_store):
+    with checkpointing(checkpoint_store):
+        checkpoint_store.record_completed_task(GET_URN, DISCOVERY_START_TIMES)
+
+    checkpoint_store.open()
+    assert checkpoint_store.read_completed_task(GET_URN) is None
+
+
+def test_checkpointing_keeps_checkpoints_on_failure(checkpoint_store):
+    with pytest.raises(RuntimeError):
+        with checkpointing(checkpoint_store):
+            checkpoint_store.record_completed_task(GET_URN, DISCOVERY_START_TIMES)
+            raise RuntimeError("Interrupted")
+
+    checkpoint_store.open()
+    assert checkpoint_store.read_completed_task(GET_URN) == DISCOVERY_START_TIMES
@@ -1,9 +1,12 @@
 import json
+import pickle
 from datetime import datetime
+from unittest.mock import MagicMock
 
 import pytest
 
 from cloudwanderer import CloudWandererResource
+from cloudwanderer.models import Relationship, RelationshipDirection
 from cloudwanderer.urn import URN
 
 
@@ -84,3 +87,56 @@ def test_json_conversion(cloudwanderer_resource):
             "vpc_id": "vpc-111111",
         }
     )
+
+
+def test_pickle(cloudwanderer_resource):
+    standardised_resource_data = cloudwanderer_resource.cloudwanderer_metadata.standardised_resource_data
+
+    unpickled = pickle.loads(pickle.dumps(cloudwanderer_resource))
+
+    assert dict(unpickled) == dict(cloudwanderer_resource)
+    assert unpickled.vpc_id == "vpc-111111"
+    assert unpickled.cloudwanderer_metadata.standardised_resource_data == standardised_resource_data
+    assert "vpc_id" not in cloudwanderer_resource.__getstate__()
+
+
+def test_pickle_sends_standardised_resource_data(cloudwanderer_resource, monkeypatch):
+    pickled = pickle.dumps(cloudwanderer_resource)
+    monkeypatch.setattr(
+        "cloudwanderer.cloud_wanderer_resource.standardise_data_types", MagicMock(side_effect=AssertionError)
+    )
+
+    unpickled = pickle.loads(pickled)
+
+    assert unpickled.cloudwanderer_metadata.standardised_resource_data == (
+        cloudwanderer_resource.cloudwanderer_metadata.standardised_resource_data
+    )
+
+
+def generate_related_resource(urn, partial_urn, resource_data, discovery_time=datetime(2021, 10, 23)):
+    return CloudWandererResource(
+        urn=urn,
+        resource_data=resource_data,
+        relationships=[
+            Relationship(partial_urn=partial_urn, direction=RelationshipDirection.OUTBOUND),
+            Relationship(partial_urn=urn, direction=RelationshipDirection.INBOUND),
+        ],
+        discovery_time=discovery_time,
+    )
+
+
+def test_content_hash(urn, partial_urn):
+    resource = generate_related_resource(urn, partial_urn, {"VpcId": "vpc-111111", "Tags": {"a": "1", "b": 2.5}})
+    rediscovered_resource = generate_related_resource(
+        urn, partial_urn, {"Tags": {"b": 2.5, "a": "1"}, "VpcId": "vpc-111111"}, discovery_time=datetime(2021, 10, 24)
+    )
+    rediscovered_resource.relationships.reverse()
+    changed_resource = generate_related_resource(urn, partial_urn, {"VpcId": "vpc-111111", "Tags": {"a": "2"}})
+    unrelated_resource = generate_related_resource(
+        urn, partial_urn, {"VpcId": "vpc-111111", "Tags": {"a": "1", "b": 2.5}}
+    )
+    unrelated_resource.relationships.pop()
+
+    assert resource.content_hash == rediscovered_resource.content_hash
+    assert resource.content_hash != changed_resource.content_hash
+    assert resource.content_hash != unrelated_resource.content_hash
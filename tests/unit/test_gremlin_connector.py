@@ -0,0 +1,81 @@
+from unittest.mock import MagicMock, call
+
+import pytest
+
+from cloudwanderer import CloudWandererResource
+from cloudwanderer.storage_connectors import GremlinStorageConnector
+from cloudwanderer.urn import URN
+
+
+@pytest.fixture
+def batched_gremlin_connector():
+    connector = GremlinStorageConnector(endpoint_url="ws://localhost:8182", batch_writes=True, batch_size=10)
+    connector.connection = MagicMock()
+    connector._g = MagicMock()
+    return connector
+
+
+@pytest.fixture
+def vpc():
+    return CloudWandererResource(
+        urn=URN(
+            account_id="111111111111",
+            region="eu-west-1",
+            service="ec2",
+            resource_type="vpc",
+            resource_id_parts=["vpc-111111"],
+        ),
+        resource_data={"VpcId": "vpc-111111"},
+    )
+
+
+def test_delete_resource_flushes_buffered_writes_first(batched_gremlin_connector, vpc):
+    g = batched_gremlin_connector._g
+    batched_gremlin_connector.write_resource(vpc)
+    g.inject.assert_not_called()
+
+    batched_gremlin_connector.delete_resource(vpc.urn)
+
+    vertex_id = batched_gremlin_connector.generate_vertex_id(vpc.urn)
+    top_level_calls = [mock_call for mock_call in g.mock_calls if "." not in mock_call[0]]
+    assert top_level_calls.index(call.inject(0)) < top_level_calls.index(call.V(vertex_id))
+    g.V(vertex_id).drop().iterate.assert_called_once_with()
+    assert batched_gremlin_connector._write_buffer == []
+
+
+def test_delete_resource_forgets_unreconciled_urn(batched_gremlin_connector, vpc):
+    batched_gremlin_connector.write_resource(vpc)
+    batched_gremlin_connector.flush()
+    assert batched_gremlin_connector._unreconciled_urns == {"aws_ec2_vpc": {frozenset(["vpc-111111"]): vpc.urn}}
+
+    batched_gremlin_connector.delete_resource(vpc.urn)
+
+    assert batched_gremlin_connector._unreconciled_urns == {"aws_ec2_vpc": {}}
+
+
+def written_properties(source):
+    return [mock_call.args[1] for mock_call in source.mock_calls if mock_call[0].endswith("property")]
+
+
+def test_content_hash_is_only_stored_when_wrapped(batched_gremlin_connector, vpc):
+    source = MagicMock()
+
+    batched_gremlin_connector._resource_vertex(vpc, source=source)
+
+    assert "_content_hash" not in written_properties(source)
+    assert vpc._content_hash is None
+
+    batched_gremlin_connector.store_content_hashes = True
+    batched_gremlin_connector._resource_vertex(vpc, source=source)
+
+    assert "_content_hash" in written_properties(source)
+
+
+def test_inferred_vertices_do_not_store_or_clear_content_hashes(batched_gremlin_connector, vpc):
+    source = MagicMock()
+    batched_gremlin_connector.store_content_hashes = True
+
+    batched_gremlin_connector._resource_vertex(vpc, source=source, inferred=True)
+
+    assert "_content_hash" not in written_properties(source)
+    assert not [mock_call for mock_call in source.mock_calls if mock_call[0].endswith("sideEffect")]
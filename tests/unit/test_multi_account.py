@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import defaultdict
+from unittest.mock import MagicMock
+
+from cloudwanderer.models import ActionSet
+from cloudwanderer.multi_account import MultiAccountCloudWanderer
+from cloudwanderer.storage_connectors import MemoryStorageConnector
+from cloudwanderer.urn import PartialUrn
+
+
+class FakeCloudInterface:
+    running = defaultdict(int)
+    max_running = defaultdict(int)
+    lock = threading.Lock()
+    instances = []
+
+    def __init__(self, session):
+        self.account_id = session.get_account_id()
+        self.thread_ids = {threading.get_ident()}
+        self.closed = False
+        self.instances.append(self)
+
+    def get_resource_discovery_actions(self, regions=None, service_resource_types=None):
+        if self.account_id == "failed":
+            raise RuntimeError("Access denied")
+        return [
+            ActionSet(
+                get_urns=[
+                    PartialUrn(
+                        cloud_name="aws", account_id=self.account_id, region=region, service="ec2", resource_type="vpc"
+                    )
+                    for region in ["eu-west-1", "eu-west-2", "us-east-1", "us-east-2"]
+                ],
+                delete_urns=[],
+            )
+        ]
+
+    def get_resources(self, **kwargs):
+        self.thread_ids.add(threading.get_ident())
+        with self.lock:
+            self.running[self.account_id] += 1
+            self.max_running[self.account_id] = max(self.max_running[self.account_id], self.running[self.account_id])
+        time.sleep(0.05)
+        with self.lock:
+            self.running[self.account_id] -= 1
+        return []
+
+    def close(self):
+        self.closed = True
+
+
+def session_factory(account_id):
+    return lambda: MagicMock(**{"get_account_id.return_value": account_id})
+
+
+def test_write_resources_caps_account_concurrency_and_isolates_failures():
+    account_ids = ["111111111111", "failed", "222222222222", "333333333333"]
+    subject = MultiAccountCloudWanderer(
+        storage_connectors=[MemoryStorageConnector()],
+        session_factories=[session_factory(account_id) for account_id in account_ids],
+        concurrency=5,
+        account_concurrency=2,
+        cloud_interface_factory=FakeCloudInterface,
+    )
+
+    results = subject.write_resources()
+
+    assert [result.account_id for result in results] == account_ids
+    assert [str(result.exception) if result.exception else None for result in results] == [
+        None,
+        "Access denied",
+        None,
+        None,
+    ]
+    assert dict(FakeCloudInterface.max_running) == {
+        "111111111111": 2,
+        "222222222222": 2,
+        "333333333333": 2,
+    }
+
+
+def test_write_resources_gives_each_worker_its_own_cloud_interface_per_account():
+    FakeCloudInterface.instances.clear()
+    subject = MultiAccountCloudWanderer(
+        storage_connectors=[MemoryStorageConnector()],
+        session_factories=[session_factory(account_id) for account_id in ["111111111111", "222222222222"]],
+        concurrency=4,
+        account_concurrency=4,
+        cloud_interface_factory=FakeCloudInterface,
+    )
+
+    subject.write_resources()
+
+    assert {cloud_interface.account_id for cloud_interface in FakeCloudInterface.instances} == {
+        "111111111111",
+        "222222222222",
+    }
+    assert len(FakeCloudInterface.instances) > 2
+    assert all(len(cloud_interface.thread_ids) == 1 for cloud_interface in FakeCloudInterface.instances)
+    assert all(cloud_interface.closed for cloud_interface in FakeCloudInterface.instances)
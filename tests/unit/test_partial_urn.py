@@ -1,6 +1,6 @@
 import pytest
 
-from cloudwanderer.urn import PartialUrn
+from cloudwanderer.urn import URN, PartialUrn
 
 
 @pytest.fixture
@@ -36,3 +36,18 @@ def test_non_string_id_parts():
         PartialUrn(
             account_id="1", region="region", service="service", resource_type="resource_type", resource_id_parts=[1]
         )
+
+
+def test_equality_with_urn(partial_urn):
+    urn = URN(
+        account_id="111111111111",
+        region="unknown",
+        service="service",
+        resource_type="resource_type",
+        resource_id_parts=["id"],
+        cloud_name="unknown",
+    )
+
+    assert partial_urn == urn
+    assert hash(partial_urn) == hash(urn)
+    assert partial_urn != partial_urn.copy(region="eu-west-1")
@@ -5,3 +5,14 @@ def test_dict():
     subject = ResourceMetadata({"VpcId": "vpc-1111"})
 
     assert dict(subject) == {"VpcId": "vpc-1111"}
+
+
+def test_standardised_resource_data():
+    subject = ResourceMetadata({"VpcId": "vpc-1111", "Name": ""})
+
+    assert subject.standardised_resource_data == {"VpcId": "vpc-1111", "Name": None}
+    assert subject.standardised_resource_data is subject.standardised_resource_data
+
+    subject.resource_data = {"VpcId": "vpc-2222"}
+
+    assert subject.standardised_resource_data == {"VpcId": "vpc-2222"}
@@ -0,0 +1,87 @@
+import threading
+import time
+
+import pytest
+
+from cloudwanderer.models import ActionSet
+from cloudwanderer.scheduler import DiscoveryScheduler
+from cloudwanderer.urn import PartialUrn
+
+
+def partial_urn(service, resource_type, region="eu-west-1"):
+    return PartialUrn(
+        cloud_name="aws", account_id="111111111111", region=region, service=service, resource_type=resource_type
+    )
+
+
+@pytest.fixture
+def action_sets():
+    return [
+        ActionSet(
+            get_urns=[partial_urn("iam", "role", "us-east-1")],
+            delete_urns=[partial_urn("iam", "role", "us-east-1")],
+        ),
+        ActionSet(get_urns=[], delete_urns=[partial_urn("iam", "role_policy", "us-east-1")]),
+        ActionSet(
+            get_urns=[partial_urn("ec2", "vpc", "eu-west-1"), partial_urn("ec2", "vpc", "eu-west-2")],
+            delete_urns=[partial_urn("ec2", "vpc", "eu-west-1"), partial_urn("ec2", "vpc", "eu-west-2")],
+        ),
+    ]
+
+
+def test_dependencies(action_sets):
+    scheduler = DiscoveryScheduler(action_sets=action_sets, get_action=print, delete_action=print)
+
+    assert [task.urn for task in scheduler.get_tasks] == [
+        partial_urn("iam", "role", "us-east-1"),
+        partial_urn("ec2", "vpc", "eu-west-1"),
+        partial_urn("ec2", "vpc", "eu-west-2"),
+    ]
+    assert [task.dependencies for task in scheduler.delete_tasks] == [
+        [("111111111111", "aws", "iam", "role")],
+        [("111111111111", "aws", "iam")],
+        [("111111111111", "aws", "ec2", "vpc")],
+        [("111111111111", "aws", "ec2", "vpc")],
+    ]
+
+
+def test_deletes_run_after_all_gets_of_their_type(action_sets):
+    events = []
+    lock = threading.Lock()
+
+    def get_action(urn):
+        # Make the eu-west-2 vpc get finish last to ensure the vpc deletes wait for it.
+        time.sleep(0.2 if urn.region == "eu-west-2" else 0)
+        with lock:
+            events.append(("get", str(urn)))
+
+    def delete_action(urn):
+        with lock:
+            events.append(("delete", str(urn)))
+
+    DiscoveryScheduler(action_sets=action_sets, get_action=get_action, delete_action=delete_action, concurrency=3).run()
+
+    last_vpc_get = events.index(("get", str(partial_urn("ec2", "vpc", "eu-west-2"))))
+    for region in ["eu-west-1", "eu-west-2"]:
+        assert events.index(("delete", str(partial_urn("ec2", "vpc", region)))) > last_vpc_get
+    role_get = events.index(("get", str(partial_urn("iam", "role", "us-east-1"))))
+    assert events.index(("delete", str(partial_urn("iam", "role_policy", "us-east-1")))) > role_get
+    assert len(events) == 7
+
+
+def test_failed_get_skips_dependent_deletes(action_sets):
+    deleted = []
+
+    def get_action(urn):
+        if urn.service == "iam":
+            raise RuntimeError("Discovery failed")
+
+    with pytest.raises(RuntimeError, match="Discovery failed"):
+        DiscoveryScheduler(
+            action_sets=action_sets, get_action=get_action, delete_action=deleted.append, concurrency=2
+        ).run()
+
+    assert sorted(str(urn) for urn in deleted) == [
+        str(partial_urn("ec2", "vpc", "eu-west-1")),
+        str(partial_urn("ec2", "vpc", "eu-west-2")),
+    ]
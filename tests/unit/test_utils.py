@@ -1,6 +1,16 @@
+import json
+from datetime import datetime
+from decimal import Decimal
 from unittest.mock import MagicMock
 
-from cloudwanderer.utils import camel_to_snake, exception_logging_wrapper, snake_to_pascal
+from cloudwanderer.utils import (
+    camel_to_snake,
+    exception_logging_wrapper,
+    json_default,
+    json_object_hook,
+    snake_to_pascal,
+    standardise_data_types,
+)
 
 
 def test_exception_logging_wrapper(caplog):
@@ -18,3 +28,43 @@ def test_snake_to_pascal():
 def test_camel_to_snake():
     assert camel_to_snake("camelToSnake") == "CAMEL_TO_SNAKE"
     assert camel_to_snake("camelToSnake", False) == "camel_to_snake"
+
+
+def test_standardise_data_types():
+    resource = {
+        "Name": "",
+        "CreateDate": datetime(2021, 1, 2, 3, 4, 5),
+        "Size": 1.5,
+        "Count": 1,
+        "Enabled": True,
+        "Tags": [{"Key": "Name", "Value": ""}],
+        "Values": ["", 0.1, (1, 2)],
+        1: None,
+        "Unserializable": object(),
+    }
+
+    assert standardise_data_types(resource) == {
+        "Name": None,
+        "CreateDate": "2021-01-02T03:04:05",
+        "Size": Decimal("1.5"),
+        "Count": 1,
+        "Enabled": True,
+        "Tags": [{"Key": "Name", "Value": None}],
+        "Values": ["", Decimal("0.1"), [1, 2]],
+        "1": None,
+        "Unserializable": None,
+    }
+
+
+def test_standardise_data_types_matches_json_round_trip():
+    resource = {
+        "Float": 1e-07,
+        "Large": 1.0e20,
+        "Infinity": float("inf"),
+        True: "",
+        None: [{"Nested": {"Empty": "", "Time": datetime(2021, 1, 1, microsecond=1)}}],
+    }
+
+    assert standardise_data_types(resource) == json.loads(
+        json.dumps(resource, default=json_default), object_hook=json_object_hook, parse_float=Decimal
+    )